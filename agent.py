@@ -0,0 +1,105 @@
+"""Модуль клиента агента хранилища паролей.
+
+Агент (модуль agentd) - фоновый процесс, который держит хранилище
+открытым, а ключ мастер-пароля сформированным, и выполняет запросы
+команд find, verify и сохранения пароля через сокет Unix
+``<файл хранилища>.agent``. Команды CLI используют агент, если его сокет
+существует, и не читают хранилище и не формируют ключ мастер-пароля сами.
+
+Протокол: запрос и ответ - по одной строке JSON. Запрос содержит имя
+операции ``op`` и ее параметры, ответ - ``{"result": ...}`` или
+``{"error": "сообщение"}``.
+
+Модуль не импортирует asyncio, чтобы не замедлять запуск команд CLI.
+"""
+
+import json
+import os
+import socket
+
+AGENT_SUFFIX = '.agent'
+# Время простоя в секундах, после которого агент завершается.
+AGENT_TIMEOUT = 900.0
+# Время ожидания ответа агента в секундах.
+CLIENT_TIMEOUT = 60.0
+
+
+def agent_path(storage_file):
+    """Возвращает путь к сокету агента хранилища.
+
+    Args:
+        storage_file (str): Путь к файлу хранилища.
+
+    Returns:
+        str: Путь к сокету.
+    """
+    return storage_file + AGENT_SUFFIX
+
+
+class AgentClient():
+    """Синхронный клиент агента хранилища.
+
+    Соединение открывается методом connect и используется для любого
+    количества запросов.
+    """
+
+    def __init__(self, sock):
+        """Создает клиент для установленного соединения.
+
+        Args:
+            sock (socket.socket): Соединение с агентом.
+        """
+        self._socket = sock
+        self._reader = sock.makefile('rb')
+
+    @classmethod
+    def connect(cls, path, timeout=CLIENT_TIMEOUT):
+        """Подключается к агенту, если он запущен.
+
+        Args:
+            path (str): Путь к сокету агента.
+            timeout (float): Время ожидания ответа в секундах. По умолчанию CLIENT_TIMEOUT.
+
+        Returns:
+            AgentClient: Клиент или None, если сокета нет или агент не
+                         принимает соединения (например, сокет остался от
+                         завершенного агента).
+        """
+        if not hasattr(socket, 'AF_UNIX') or not os.path.exists(path):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            return None
+        return cls(sock)
+
+    def request(self, op, **params):
+        """Выполняет запрос к агенту.
+
+        Args:
+            op (str): Имя операции.
+            **params: Параметры операции.
+
+        Returns:
+            Результат операции.
+
+        Raises:
+            ValueError: Если агент вернул ошибку.
+            OSError: Если соединение с агентом прервано.
+        """
+        self._socket.sendall(json.dumps(dict(params, op=op)).encode() + b'\n')
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Агент закрыл соединение")
+        response = json.loads(line)
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response.get('result')
+
+    def close(self):
+        """Закрывает соединение с агентом."""
+        self._reader.close()
+        self._socket.close()
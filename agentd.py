@@ -0,0 +1,275 @@
+"""Модуль агента хранилища паролей.
+
+Агент держит хранилище открытым, а в памяти - только ключ мастер-пароля
+(PasswordStorage.unlock), но не сам мастер-пароль, и выполняет запросы
+клиентов (модуль agent) через сокет Unix. Поэтому команды find, verify и сохранение пароля не загружают
+хранилище и индексы поиска и не выполняют медленную функцию формирования
+ключа при каждом запуске CLI. Перед каждым запросом агент загружает
+изменения, сохраненные другими процессами (PasswordStorage.sync).
+
+Сокет создается с правами только для владельца: доступ к нему
+равнозначен знанию мастер-пароля. Агент завершается после AGENT_TIMEOUT
+секунд без запросов, по запросу stop или по сигналу SIGTERM.
+
+Модуль импортирует asyncio, поэтому импортируется только при запуске
+агента, а не командами CLI.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import signal
+import socket
+import sqlite3
+
+from agent import AGENT_TIMEOUT, AgentClient
+from fuzzy import FUZZY_LIMIT
+
+
+def listen(path):
+    """Создает слушающий сокет агента.
+
+    Сокет, оставшийся от завершенного агента, удаляется.
+
+    Args:
+        path (str): Путь к сокету.
+
+    Returns:
+        socket.socket: Слушающий сокет.
+
+    Raises:
+        ValueError: Если агент этого хранилища уже запущен.
+        OSError: Если сокет не удалось создать.
+    """
+    client = AgentClient.connect(path)
+    if client is not None:
+        client.close()
+        raise ValueError("Агент уже запущен")
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)
+    try:
+        sock.bind(path)
+    except OSError:
+        sock.close()
+        raise
+    finally:
+        os.umask(umask)
+    sock.listen()
+    return sock
+
+
+def daemonize():
+    """Переводит процесс в фоновый режим.
+
+    Дочерний процесс создает новый сеанс, отключается от терминала и
+    перенаправляет стандартные потоки в /dev/null.
+
+    Returns:
+        bool: True в родительском процессе, False в дочернем.
+    """
+    if os.fork():
+        return True
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in range(3):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    return False
+
+
+class VaultAgent():
+    """Агент, выполняющий запросы к открытому хранилищу.
+
+    Запросы выполняются по одному в цикле событий asyncio, поэтому
+    хранилищу не нужна синхронизация между потоками. Операции:
+
+    * ``find`` (service) - словарь сервисов и имен пользователей;
+    * ``fuzzy`` (service, limit) - тройки (сервис, расстояние, имя пользователя);
+    * ``verify`` (service, password) - True, если пароль верный;
+    * ``store`` (service, username, password) - сохранить пароль;
+    * ``stop`` - завершить агент.
+
+    Attributes:
+        storage (PasswordStorage): Открытое хранилище.
+        timeout (float): Время простоя в секундах до завершения или None.
+    """
+    def __init__(self, storage, key, timeout=AGENT_TIMEOUT, sock=None):
+        """Инициализирует агент.
+
+        Args:
+            storage (PasswordStorage): Открытое хранилище.
+            key (bytes): Ключ мастер-пароля (см. PasswordStorage.unlock).
+            timeout (float): Время простоя в секундах до завершения или None
+                             без ограничения. По умолчанию AGENT_TIMEOUT.
+            sock (socket.socket): Слушающий сокет (см. listen).
+        """
+        self.storage = storage
+        self.timeout = timeout
+        self._key = key
+        self._socket = sock
+        self._operations = {
+            'find': self.find,
+            'fuzzy': self.fuzzy,
+            'verify': self.verify,
+            'store': self.store,
+            'stop': self.stop,
+        }
+        self._loop = None
+        self._stopped = None
+        self._deadline = 0
+        self._clients = {}
+
+    def find(self, service):
+        """Находит сервисы по частичному совпадению названия.
+
+        Args:
+            service (str): Название сервиса или его часть.
+
+        Returns:
+            dict: Имена пользователей найденных сервисов.
+        """
+        return {name: record['username']
+                for name, record in self.storage.find_service(service).items()}
+
+    def fuzzy(self, service, limit=FUZZY_LIMIT):
+        """Находит сервисы, похожие на запрос.
+
+        Args:
+            service (str): Название сервиса, возможно с опечатками.
+            limit (int): Максимальное количество результатов. По умолчанию FUZZY_LIMIT.
+
+        Returns:
+            list: Тройки (название, расстояние редактирования, имя пользователя).
+        """
+        return [(name, distance, record['username'])
+                for name, distance, record in self.storage.find_fuzzy(service, limit)]
+
+    def verify(self, service, password):
+        """Проверяет пароль сервиса.
+
+        Args:
+            service (str): Название сервиса.
+            password (str): Пароль для проверки.
+
+        Returns:
+            bool: True если пароль верный.
+
+        Raises:
+            ValueError: Если мастер-пароль хранилища изменился.
+        """
+        return self.storage.verify_with_key(service, password, self._key)
+
+    def store(self, service, username, password):
+        """Сохраняет пароль сервиса.
+
+        Args:
+            service (str): Название сервиса.
+            username (str): Имя пользователя.
+            password (str): Пароль.
+
+        Raises:
+            ValueError: Если сервис уже существует или мастер-пароль
+                        хранилища изменился.
+        """
+        self.storage.store_with_key(service, username, password, self._key)
+
+    def stop(self):
+        """Завершает агент. Может вызываться из любого потока."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+    def respond(self, line):
+        """Выполняет запрос и возвращает ответ.
+
+        Args:
+            line (bytes): Строка запроса в JSON.
+
+        Returns:
+            bytes: Строка ответа в JSON.
+        """
+        try:
+            request = json.loads(line)
+            operation = self._operations.get(request.pop('op', None)) if isinstance(request, dict) else None
+            if operation is None:
+                raise ValueError("Неизвестная операция")
+            if operation != self.stop:
+                self.storage.sync()
+            response = {'result': operation(**request)}
+        except TypeError:
+            response = {'error': "Неверные параметры операции"}
+        except (OSError, ValueError, sqlite3.Error) as e:
+            response = {'error': str(e)}
+        return json.dumps(response).encode() + b'\n'
+
+    async def _handle(self, reader, writer):
+        """Обслуживает соединение клиента до его закрытия.
+
+        Args:
+            reader (asyncio.StreamReader): Поток чтения соединения.
+            writer (asyncio.StreamWriter): Поток записи соединения.
+        """
+        self._clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self._deadline = self._loop.time() + (self.timeout or 0)
+                writer.write(self.respond(line))
+                await writer.drain()
+        except (OSError, ValueError):
+            # Клиент разорвал соединение или прислал слишком длинную строку.
+            pass
+        finally:
+            del self._clients[writer]
+            writer.close()
+
+    async def _watch(self):
+        """Завершает агент, когда с последнего запроса прошло timeout секунд."""
+        while True:
+            remaining = self._deadline - self._loop.time()
+            if remaining <= 0:
+                self._stopped.set()
+                return
+            await asyncio.sleep(remaining)
+
+    async def serve(self):
+        """Принимает соединения, пока агент не будет завершен.
+
+        При завершении соединения клиентов закрываются (агент дожидается
+        завершения их обработчиков), а файл сокета удаляется.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._deadline = self._loop.time() + (self.timeout or 0)
+        path = self._socket.getsockname()
+        server = await asyncio.start_unix_server(self._handle, sock=self._socket)
+        watchdog = asyncio.ensure_future(self._watch()) if self.timeout else None
+        try:
+            await self._stopped.wait()
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            server.close()
+            handlers = list(self._clients.values())
+            for writer in list(self._clients):
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await server.wait_closed()
+            self._loop = None
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+
+    def run(self):
+        """Запускает агент и ожидает его завершения.
+
+        SIGTERM и Ctrl+C завершают агент так же, как запрос stop.
+        """
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        with contextlib.suppress(KeyboardInterrupt):
+            asyncio.run(self.serve())
+        self.storage.close()
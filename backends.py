@@ -0,0 +1,1220 @@
+"""Модуль движков хранения данных хранилища паролей.
+
+Содержит движки, на которые PasswordStorage перекладывает чтение и запись
+данных. Все движки принимают изменения в виде списка мутаций:
+
+* ``('master', master_hash)`` - установить хеш мастер-пароля;
+* ``('master', master_hash, previous)`` - заменить хеш мастер-пароля
+  previous новым (например, при переходе на новый формат хеша);
+* ``('put', service, record)`` - сохранить запись сервиса;
+* ``('add', service, record)`` - сохранить запись нового сервиса; если
+  сервис успел сохранить другой процесс, фиксация отклоняется.
+
+Мутации идемпотентны, поэтому их повторное применение (например, при
+воспроизведении журнала после сжатия) не меняет результат.
+
+Каждый вызов apply сохраняется на диск с fsync. Внутри блока
+``with backend.batch():`` изменения сразу видны через методы чтения,
+но сохраняются одной записью при выходе из блока (групповая фиксация)
+или отменяются целиком, если блок завершился исключением.
+
+Фиксация изменений выполняется под рекомендательной блокировкой записи
+(см. WriteLock), а не все время работы с хранилищем. Если с момента
+загрузки данных хранилище изменил другой процесс, движок перед записью
+загружает новое состояние и заново применяет к нему свои мутации, поэтому
+одновременные записи нескольких процессов не теряются (при замене записи
+одного сервиса мутацией 'put' сохраняется последняя, а мутация 'add' для
+сервиса, сохраненного другим процессом, отклоняется).
+"""
+
+import contextlib
+import json
+import os
+import sqlite3
+import struct
+import zlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from records import RecordTable
+from vaultcache import load_json_vault
+from vaultfile import VaultFile, encode_vault
+
+JOURNAL_SUFFIX = '.journal'
+# Длина полезной нагрузки и ее контрольная сумма CRC-32.
+RECORD_HEADER = struct.Struct('<II')
+COMPACT_MIN_SIZE = 1 << 20
+LOCK_SUFFIX = '.lock'
+# Счетчик зафиксированных изменений в файле блокировки.
+GENERATION = struct.Struct('<Q')
+
+
+class Backend():
+    """Базовый класс движков хранения с групповой фиксацией изменений.
+
+    Наследники реализуют stage (применение мутаций без сохранения),
+    save (запись примененных мутаций на диск), refresh (загрузка изменений
+    других процессов) и rollback (отмена примененных, но не сохраненных
+    мутаций), а commit сохраняет мутации под блокировкой записи.
+
+    Attributes:
+        path (str): Путь к файлу хранилища.
+        commit_hook (callable): Функция, вызываемая после каждой фиксации,
+                                пока удерживается блокировка записи, с
+                                отпечатком хранилища до фиксации и признаком
+                                загрузки изменений другого процесса, или None.
+    """
+    def __init__(self, path):
+        """Запоминает путь к файлу хранилища.
+
+        Args:
+            path (str): Путь к файлу хранилища.
+        """
+        self.path = path
+        self.commit_hook = None
+        self._batch_depth = 0
+        self._pending = []
+        self._generation = 0
+        self._fingerprint = None
+
+    def _mark_loaded(self):
+        """Запоминает счетчик изменений и отпечаток хранилища перед загрузкой данных.
+
+        Значения читаются до данных, поэтому изменение, записанное другим
+        процессом во время загрузки, будет обнаружено при фиксации.
+        """
+        self._generation = read_generation(self.path)
+        self._fingerprint = self.read_fingerprint(self.path)
+
+    def stage(self, mutations):
+        """Применяет мутации без сохранения на диск.
+
+        Args:
+            mutations (list): Мутации.
+        """
+        raise NotImplementedError
+
+    def save(self, mutations):
+        """Записывает на диск уже примененные мутации.
+
+        Args:
+            mutations (list): Мутации.
+        """
+        raise NotImplementedError
+
+    def refresh(self):
+        """Загружает изменения, сохраненные другими процессами.
+
+        Вызывается под блокировкой записи; несохраненные мутации после
+        этого применяются заново (см. commit).
+        """
+        raise NotImplementedError
+
+    def sync(self):
+        """Загружает изменения, сохраненные другими процессами после загрузки данных.
+
+        Нужен процессам, которые держат хранилище открытым между запросами
+        (см. модуль agentd). Если хранилище не менялось, читаются только
+        счетчик и метаданные файлов. Данные загружаются под блокировкой
+        записи, чтобы не прочитать их во время фиксации другого процесса.
+        Внутри блока batch изменения не загружаются.
+
+        Returns:
+            bool: True, если данные обновлены.
+        """
+        if self._batch_depth or ((read_generation(self.path), self.read_fingerprint(self.path))
+                                 == (self._generation, self._fingerprint)):
+            return False
+        with WriteLock(self.path):
+            self.refresh()
+        return True
+
+    def commit(self):
+        """Сохраняет на диск все примененные мутации под блокировкой записи.
+
+        Если после загрузки данных хранилище изменил другой процесс (изменился
+        счетчик в файле блокировки или отпечаток файлов), данные сначала
+        обновляются методом refresh, и мутации применяются к ним заново.
+        Мутации считаются сохраненными только после успешного save: если
+        запись не удалась (например, OSError при заполненном диске), они
+        остаются несохраненными и записываются следующей фиксацией или
+        отменяются rollback.
+
+        Raises:
+            ValueError: Если другой процесс задал другой хеш мастер-пароля,
+                        пока этот процесс задавал или заменял его, или
+                        сохранил сервис, добавляемый мутацией 'add'.
+                        Мутации при этом отменяются.
+        """
+        if not self._pending:
+            return
+        mutations = self._pending
+        with WriteLock(self.path) as lock:
+            fingerprint = self.read_fingerprint(self.path)
+            refreshed = (lock.generation, fingerprint) != (self._generation, self._fingerprint)
+            if refreshed:
+                self.refresh()
+                master_hash = self.master_hash()
+                for mutation in mutations:
+                    if (mutation[0] == 'master'
+                            and master_hash not in (_previous(mutation), mutation[1])):
+                        self.rollback()
+                        raise ValueError("Мастер-пароль хранилища изменен другим процессом")
+                    # После загрузки только новых записей журнала данные уже
+                    # содержат свою запись, поэтому конфликтом считается
+                    # только чужая.
+                    if mutation[0] == 'add' and self.get(mutation[1]) not in (None, mutation[2]):
+                        self.rollback()
+                        raise ValueError(f"Сервис '{mutation[1]}' уже существует")
+                self._pending = []
+                self.stage(mutations)
+            self.save(mutations)
+            self._pending = []
+            self._generation = lock.advance()
+            self._fingerprint = self.read_fingerprint(self.path)
+            if self.commit_hook is not None:
+                self.commit_hook(fingerprint, refreshed)
+
+    def rollback(self):
+        """Отменяет примененные, но не сохраненные мутации."""
+        raise NotImplementedError
+
+    def apply(self, mutations):
+        """Применяет мутации и сохраняет их, если не открыт блок batch.
+
+        Если мутации не удалось применить или сохранить, изменения
+        отменяются так же, как при исключении в блоке batch.
+
+        Args:
+            mutations (list): Мутации.
+        """
+        with self.batch():
+            self.stage(mutations)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Откладывает сохранение изменений до выхода из блока with.
+
+        Блоки могут быть вложенными, изменения сохраняются при выходе из
+        внешнего блока. Если исключение выходит из внешнего блока, все
+        изменения блока отменяются.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.rollback()
+            raise
+        self._batch_depth -= 1
+        if not self._batch_depth:
+            self.commit()
+
+    @classmethod
+    def files(cls, path):
+        """Возвращает файлы, в которых движок хранит данные.
+
+        Args:
+            path (str): Путь к файлу хранилища.
+
+        Returns:
+            list: Пути к файлам.
+        """
+        return [path]
+
+    def fingerprint(self):
+        """Возвращает отпечаток состояния хранилища, загруженного движком.
+
+        Отпечаток меняется при каждой фиксации изменений, в том числе
+        другим процессом, и используется для проверки актуальности
+        производных файлов (например, триграммного индекса). Пока движок не
+        загрузил изменения другого процесса, отпечаток относится к прежнему
+        состоянию, поэтому индекс, построенный по данным движка, не
+        сохраняется с отпечатком более нового состояния.
+
+        Returns:
+            str: Отпечаток, составленный из inode, размера и времени
+                 изменения файлов хранилища.
+        """
+        return self._fingerprint
+
+    @classmethod
+    def read_fingerprint(cls, path):
+        """Возвращает отпечаток хранилища без открытия движка и чтения данных.
+
+        Args:
+            path (str): Путь к файлу хранилища.
+
+        Returns:
+            str: Тот же отпечаток, что и fingerprint открытого движка.
+        """
+        parts = []
+        for file in cls.files(path):
+            try:
+                stat = os.stat(file)
+            except FileNotFoundError:
+                parts.append('-')
+            else:
+                parts.append(f'{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}')
+        return ';'.join(parts)
+
+    def close(self):
+        """Освобождает ресурсы движка."""
+
+
+class MemoryBackend(Backend):
+    """Базовый движок, держащий все данные хранилища в словаре.
+
+    Записи паролей хранятся в компактной таблице records.RecordTable,
+    которая читается как словарь записей, но занимает в памяти в несколько
+    раз меньше.
+
+    Attributes:
+        data (dict): Данные хранилища в формате passwords.json.
+    """
+    def __init__(self, path):
+        """Загружает данные хранилища.
+
+        Args:
+            path (str): Путь к файлу хранилища.
+        """
+        super().__init__(path)
+        self.data = self._load_data()
+
+    def _load_data(self):
+        """Загружает данные и переводит записи паролей в компактную таблицу.
+
+        Returns:
+            dict: Данные хранилища.
+        """
+        self._mark_loaded()
+        data = self.load()
+        passwords = data.get('passwords')
+        if passwords is not None and not isinstance(passwords, RecordTable):
+            data['passwords'] = RecordTable(passwords)
+        return data
+
+    def load(self):
+        """Загружает данные хранилища.
+
+        Returns:
+            dict: Данные хранилища.
+        """
+        raise NotImplementedError
+
+    def master_hash(self):
+        """Возвращает хеш мастер-пароля.
+
+        Returns:
+            str: Хеш мастер-пароля или None, если он еще не задан.
+        """
+        return self.data.get('master_hash')
+
+    def get(self, service):
+        """Возвращает запись сервиса.
+
+        Args:
+            service (str): Название сервиса.
+
+        Returns:
+            dict: Запись сервиса или None, если сервис не найден.
+        """
+        return self.data.get('passwords', {}).get(service)
+
+    def find(self, service_name):
+        """Находит сервисы по подстроке названия без учета регистра.
+
+        Args:
+            service_name (str): Название сервиса или его часть.
+
+        Returns:
+            dict: Найденные записи по названиям сервисов.
+        """
+        service_name = service_name.lower()
+        passwords = self.data.get('passwords', {})
+        return {service: passwords[service] for service in passwords
+                if service_name in service.lower()}
+
+    def records(self):
+        """Перебирает все записи хранилища.
+
+        Yields:
+            tuple: Название сервиса и его запись.
+        """
+        yield from self.data.get('passwords', {}).items()
+
+    def stage(self, mutations):
+        """Применяет мутации к данным в памяти.
+
+        Args:
+            mutations (list): Мутации.
+        """
+        for mutation in mutations:
+            apply_mutation(self.data, mutation)
+        self._pending.extend(mutations)
+
+    def refresh(self):
+        """Перечитывает данные с диска."""
+        self.data = self._load_data()
+
+    def rollback(self):
+        """Отменяет несохраненные мутации, перечитывая данные с диска."""
+        if self._pending:
+            self._pending = []
+            self.data = self._load_data()
+
+
+class JsonBackend(MemoryBackend):
+    """Движок, перезаписывающий весь JSON-файл при каждой фиксации.
+
+    Файл заменяется атомарно (см. write_atomic), поэтому сбой во время
+    записи оставляет прежнюю версию хранилища.
+    """
+    def load(self):
+        """Загружает данные из JSON-файла или его кеша (см. vaultcache).
+
+        Returns:
+            dict: Загруженные данные или пустой словарь, если файл не существует.
+        """
+        return load_json_vault(self.path)
+
+    def save(self, mutations):
+        """Атомарно перезаписывает JSON-файл текущими данными.
+
+        Args:
+            mutations (list): Мутации (не используются).
+        """
+        write_atomic(self.path, json.dumps(self.data, indent=2, default=dict).encode())
+
+
+class JournalBackend(MemoryBackend):
+    """Движок с журналом изменений, дописываемым в конец файла.
+
+    Данные состоят из снимка (файл хранилища в формате JSON) и журнала
+    ``<файл>.journal``. Каждая мутация записывается в журнал одной записью:
+    заголовок RECORD_HEADER и мутация в компактном JSON. Поэтому сохранение
+    стоит O(размера записи), а не O(размера хранилища). Когда журнал
+    становится больше снимка (и больше COMPACT_MIN_SIZE), данные сжимаются
+    в новый снимок, а журнал очищается.
+
+    При загрузке к снимку применяются записи журнала до первой неполной
+    или поврежденной записи. Такой хвост остается от прерванной записи и
+    отрезается перед следующей фиксацией под блокировкой записи: без нее
+    неполной может оказаться запись, которую другой процесс еще дописывает.
+
+    Attributes:
+        journal_path (str): Путь к файлу журнала.
+    """
+    def __init__(self, path):
+        """Загружает снимок, воспроизводит журнал и открывает его на дозапись.
+
+        Args:
+            path (str): Путь к файлу снимка.
+        """
+        self.journal_path = path + JOURNAL_SUFFIX
+        self._journal = open(self.journal_path, 'ab')
+        super().__init__(path)
+
+    def load(self):
+        """Загружает снимок и применяет к нему записи журнала.
+
+        Returns:
+            dict: Данные хранилища.
+        """
+        self._snapshot_id = file_id(self.path)
+        data = load_json_vault(self.path)
+        self._snapshot_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+        self._journal_size = replay_journal(self.journal_path, data)
+        return data
+
+    def refresh(self):
+        """Загружает изменения других процессов.
+
+        Если снимок не менялся, применяются только записи, дописанные в
+        журнал после уже прочитанных, иначе данные перечитываются целиком.
+        """
+        if file_id(self.path) != self._snapshot_id:
+            self.data = self._load_data()
+            return
+        self._mark_loaded()
+        self._journal_size = replay_journal(self.journal_path, self.data, self._journal_size)
+
+    def save(self, mutations):
+        """Дописывает мутации в журнал с fsync и при необходимости сжимает его.
+
+        Args:
+            mutations (list): Мутации.
+        """
+        append_journal(self._journal, self._journal_size, mutations)
+        self._journal_size = self._journal.tell()
+        if self._journal_size > max(COMPACT_MIN_SIZE, self._snapshot_size):
+            self.compact()
+
+    def compact(self):
+        """Записывает текущие данные в новый снимок и очищает журнал.
+
+        Снимок атомарно заменяет старый (см. write_atomic), поэтому сбой
+        во время сжатия не теряет данных: старый снимок и журнал остаются
+        согласованными, а журнал очищается только после замены снимка.
+        """
+        snapshot = json.dumps(self.data, separators=(',', ':'), default=dict).encode()
+        write_atomic(self.path, snapshot)
+        self._snapshot_size = len(snapshot)
+        self._snapshot_id = file_id(self.path)
+
+        self._journal.close()
+        self._journal = open(self.journal_path, 'wb')
+        self._journal_size = 0
+
+    @classmethod
+    def files(cls, path):
+        """Возвращает файлы снимка и журнала.
+
+        Args:
+            path (str): Путь к файлу снимка.
+
+        Returns:
+            list: Пути к файлам.
+        """
+        return [path, path + JOURNAL_SUFFIX]
+
+    def close(self):
+        """Закрывает файл журнала."""
+        self._journal.close()
+
+
+class BinaryBackend(Backend):
+    """Движок с двоичным файлом хранилища и журналом изменений.
+
+    Данные состоят из снимка в двоичном формате (см. vaultfile) и журнала
+    ``<файл>.journal`` в том же формате, что у JournalBackend. Снимок
+    отображается в память и не разбирается при открытии: проверка пароля
+    декодирует одну запись, найденную двоичным поиском. Изменения из
+    журнала хранятся в памяти поверх снимка, а когда журнал становится
+    больше снимка (и больше COMPACT_MIN_SIZE), снимок записывается заново.
+
+    Attributes:
+        journal_path (str): Путь к файлу журнала.
+    """
+    def __init__(self, path):
+        """Открывает снимок, воспроизводит журнал и открывает его на дозапись.
+
+        Args:
+            path (str): Путь к файлу снимка.
+
+        Raises:
+            ValueError: Если файл снимка поврежден.
+        """
+        super().__init__(path)
+        self.journal_path = path + JOURNAL_SUFFIX
+        self._snapshot = None
+        self._journal = open(self.journal_path, 'ab')
+        try:
+            self._load()
+        except ValueError:
+            self._journal.close()
+            raise
+
+    def _load(self):
+        """Открывает снимок заново и воспроизводит журнал.
+
+        Raises:
+            ValueError: Если файл снимка поврежден.
+        """
+        self._mark_loaded()
+        if self._snapshot is not None:
+            self._snapshot.close()
+        self._snapshot_id = file_id(self.path)
+        self._snapshot = VaultFile(self.path)
+        self._snapshot_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        self._changes = {}
+        self._journal_size = replay_journal(self.journal_path, self._changes)
+
+    @property
+    def data(self):
+        """dict: Все данные хранилища в формате passwords.json."""
+        data = {}
+        master_hash = self.master_hash()
+        if master_hash is not None:
+            data['master_hash'] = master_hash
+        passwords = dict(self.records())
+        if passwords:
+            data['passwords'] = passwords
+        return data
+
+    def master_hash(self):
+        """Возвращает хеш мастер-пароля.
+
+        Returns:
+            str: Хеш мастер-пароля или None, если он еще не задан.
+        """
+        return self._changes.get('master_hash', self._snapshot.master_hash)
+
+    def get(self, service):
+        """Возвращает запись сервиса из журнала или снимка.
+
+        Args:
+            service (str): Название сервиса.
+
+        Returns:
+            dict: Запись сервиса или None, если сервис не найден.
+        """
+        record = self._changes.get('passwords', {}).get(service)
+        if record is not None:
+            return record
+        return self._snapshot.get(service)
+
+    def find(self, service_name):
+        """Находит сервисы по подстроке названия без учета регистра.
+
+        Декодируются только записи найденных сервисов.
+
+        Args:
+            service_name (str): Название сервиса или его часть.
+
+        Returns:
+            dict: Найденные записи по названиям сервисов.
+        """
+        service_name = service_name.lower()
+        return {service: self.get(service) for service in self._services()
+                if service_name in service.lower()}
+
+    def _services(self):
+        """Перебирает названия сервисов снимка и журнала без повторов.
+
+        Yields:
+            str: Название сервиса.
+        """
+        yield from self._snapshot
+        for service in self._changes.get('passwords', {}):
+            if service not in self._snapshot:
+                yield service
+
+    def records(self):
+        """Перебирает все записи хранилища.
+
+        Записи снимка выдаются в порядке добавления с учетом изменений из
+        журнала, затем - новые сервисы из журнала.
+
+        Yields:
+            tuple: Название сервиса и его запись.
+        """
+        changed = self._changes.get('passwords', {})
+        for service, record in self._snapshot.items():
+            yield service, changed.get(service, record)
+        for service, record in changed.items():
+            if service not in self._snapshot:
+                yield service, record
+
+    def stage(self, mutations):
+        """Применяет мутации к изменениям в памяти.
+
+        Args:
+            mutations (list): Мутации.
+        """
+        for mutation in mutations:
+            apply_mutation(self._changes, mutation)
+        self._pending.extend(mutations)
+
+    def save(self, mutations):
+        """Дописывает мутации в журнал с fsync и при необходимости сжимает его.
+
+        Args:
+            mutations (list): Мутации.
+        """
+        append_journal(self._journal, self._journal_size, mutations)
+        self._journal_size = self._journal.tell()
+        if self._journal_size > max(COMPACT_MIN_SIZE, self._snapshot_size):
+            self.compact()
+
+    def refresh(self):
+        """Загружает изменения других процессов.
+
+        Если снимок не менялся, применяются только записи, дописанные в
+        журнал после уже прочитанных, иначе снимок открывается заново.
+        """
+        if file_id(self.path) != self._snapshot_id:
+            self._load()
+            return
+        self._mark_loaded()
+        self._journal_size = replay_journal(self.journal_path, self._changes, self._journal_size)
+
+    def rollback(self):
+        """Отменяет несохраненные мутации, перечитывая снимок и журнал."""
+        if self._pending:
+            self._pending = []
+            self._load()
+
+    def compact(self):
+        """Записывает текущие данные в новый снимок и очищает журнал.
+
+        Как и у JournalBackend, журнал очищается только после атомарной
+        замены снимка.
+        """
+        snapshot = encode_vault(self.master_hash(), self.records())
+        write_atomic(self.path, snapshot)
+        self._snapshot_size = len(snapshot)
+        self._snapshot_id = file_id(self.path)
+        self._snapshot.close()
+        self._snapshot = VaultFile(self.path)
+        self._changes = {}
+
+        self._journal.close()
+        self._journal = open(self.journal_path, 'wb')
+        self._journal_size = 0
+
+    @classmethod
+    def files(cls, path):
+        """Возвращает файлы снимка и журнала.
+
+        Args:
+            path (str): Путь к файлу снимка.
+
+        Returns:
+            list: Пути к файлам.
+        """
+        return [path, path + JOURNAL_SUFFIX]
+
+    def close(self):
+        """Закрывает файл журнала и отображение снимка."""
+        self._journal.close()
+        self._snapshot.close()
+
+
+class SqliteBackend(Backend):
+    """Движок на базе SQLite с индексами по сервису и имени пользователя.
+
+    В отличие от движков на словаре, данные не загружаются при открытии:
+    проверка и сохранение пароля затрагивают одну строку таблицы, а поиск
+    выполняется запросом к базе. База работает в режиме WAL, поэтому
+    чтение не блокируется записью из другого процесса, а synchronous=FULL
+    делает каждую фиксацию транзакции устойчивой к сбою питания.
+
+    Каждая фиксация изменений увеличивает счетчик generation в таблице
+    meta: время изменения файлов базы меняется и без изменения данных
+    (например, при переносе WAL в основной файл), поэтому отпечаток
+    состояния строится по счетчику.
+    """
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS meta ('
+        ' key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID',
+        'CREATE TABLE IF NOT EXISTS passwords ('
+        ' service TEXT PRIMARY KEY, service_key TEXT NOT NULL,'
+        ' username TEXT NOT NULL, password_hash TEXT NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS passwords_service_key ON passwords (service_key)',
+        'CREATE INDEX IF NOT EXISTS passwords_username ON passwords (username)',
+    )
+
+    def __init__(self, path):
+        """Открывает базу данных и создает схему при первом запуске.
+
+        Args:
+            path (str): Путь к файлу базы данных.
+        """
+        super().__init__(path)
+        self._changed = False
+        self._generation = read_generation(path)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=FULL')
+        with self._connection:
+            for statement in self.SCHEMA:
+                self._connection.execute(statement)
+
+    @property
+    def data(self):
+        """dict: Все данные хранилища в формате passwords.json."""
+        data = {}
+        master_hash = self.master_hash()
+        if master_hash is not None:
+            data['master_hash'] = master_hash
+        passwords = dict(self.records())
+        if passwords:
+            data['passwords'] = passwords
+        return data
+
+    def master_hash(self):
+        """Возвращает хеш мастер-пароля.
+
+        Returns:
+            str: Хеш мастер-пароля или None, если он еще не задан.
+        """
+        row = self._connection.execute(
+            "SELECT value FROM meta WHERE key = 'master_hash'").fetchone()
+        return row[0] if row else None
+
+    def fingerprint(self):
+        """Возвращает отпечаток сохраненного состояния базы.
+
+        Returns:
+            str: inode файла базы и счетчик зафиксированных изменений.
+        """
+        return self._generation_fingerprint(self.path, self._connection)
+
+    @classmethod
+    def read_fingerprint(cls, path):
+        """Возвращает отпечаток базы без создания схемы и настройки соединения.
+
+        Args:
+            path (str): Путь к файлу базы данных.
+
+        Returns:
+            str: Тот же отпечаток, что и fingerprint открытого движка, или
+                 '-', если база отсутствует или еще не инициализирована.
+        """
+        if not os.path.exists(path):
+            return '-'
+        connection = sqlite3.connect(path)
+        try:
+            return cls._generation_fingerprint(path, connection)
+        except sqlite3.Error:
+            return '-'
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _generation_fingerprint(path, connection):
+        """Составляет отпечаток из inode файла базы и счетчика generation.
+
+        Args:
+            path (str): Путь к файлу базы данных.
+            connection (sqlite3.Connection): Соединение с базой.
+
+        Returns:
+            str: Отпечаток базы.
+        """
+        row = connection.execute(
+            "SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return f"{os.stat(path).st_ino}:{row[0] if row else 0}"
+
+    def get(self, service):
+        """Возвращает запись сервиса по первичному ключу.
+
+        Args:
+            service (str): Название сервиса.
+
+        Returns:
+            dict: Запись сервиса или None, если сервис не найден.
+        """
+        row = self._connection.execute(
+            'SELECT username, password_hash FROM passwords WHERE service = ?',
+            (service,)).fetchone()
+        return {'username': row[0], 'password_hash': row[1]} if row else None
+
+    def find(self, service_name):
+        """Находит сервисы по подстроке названия без учета регистра.
+
+        Названия приводятся к нижнему регистру при записи (столбец
+        service_key). Подходящие ключи ищутся просмотром индекса без чтения
+        остальных столбцов, затем записи читаются по индексу.
+
+        Args:
+            service_name (str): Название сервиса или его часть.
+
+        Returns:
+            dict: Найденные записи по названиям сервисов.
+        """
+        keys = [row[0] for row in self._connection.execute(
+            'SELECT DISTINCT service_key FROM passwords WHERE instr(service_key, ?) > 0',
+            (service_name.lower(),))]
+        result = {}
+        for key in keys:
+            for service, username, password_hash in self._connection.execute(
+                    'SELECT service, username, password_hash FROM passwords'
+                    ' WHERE service_key = ?', (key,)):
+                result[service] = {'username': username, 'password_hash': password_hash}
+        return result
+
+    def records(self):
+        """Перебирает все записи хранилища.
+
+        Yields:
+            tuple: Название сервиса и его запись.
+        """
+        for service, username, password_hash in self._connection.execute(
+                'SELECT service, username, password_hash FROM passwords'):
+            yield service, {'username': username, 'password_hash': password_hash}
+
+    def stage(self, mutations):
+        """Выполняет мутации в текущей транзакции без ее фиксации.
+
+        Записи сервисов вставляются одним вызовом executemany для мутаций
+        'put' и одним - для мутаций 'add'.
+
+        Args:
+            mutations (list): Мутации.
+
+        Raises:
+            ValueError: Если тип мутации неизвестен, заменяемый хеш
+                        мастер-пароля изменен другим процессом или
+                        добавляемый сервис уже существует.
+        """
+        replaced = []
+        added = []
+        self._changed = self._changed or bool(mutations)
+        for mutation in mutations:
+            kind = mutation[0]
+            if kind == 'master':
+                # Условная замена захватывает блокировку записи базы, поэтому
+                # другой процесс не может задать хеш между проверкой и заменой.
+                self._connection.execute(
+                    "UPDATE meta SET value = ? WHERE key = 'master_hash' AND value IS ?",
+                    (mutation[1], _previous(mutation)))
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO meta (key, value) VALUES ('master_hash', ?)",
+                    (mutation[1],))
+                if self.master_hash() != mutation[1]:
+                    raise ValueError("Мастер-пароль хранилища изменен другим процессом")
+            elif kind in ('put', 'add'):
+                service, record = mutation[1], mutation[2]
+                rows = added if kind == 'add' else replaced
+                rows.append((service, service.lower(), record['username'], record['password_hash']))
+            else:
+                raise ValueError(f"Неизвестная мутация: {kind}")
+        if replaced:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO passwords'
+                ' (service, service_key, username, password_hash) VALUES (?, ?, ?, ?)', replaced)
+        if added:
+            # Новые сервисы вставляются без замены внутри транзакции записи,
+            # поэтому сервис, сохраненный другим процессом после проверки его
+            # отсутствия, не перезаписывается.
+            inserted = self._connection.executemany(
+                'INSERT OR IGNORE INTO passwords'
+                ' (service, service_key, username, password_hash) VALUES (?, ?, ?, ?)',
+                added).rowcount
+            if inserted != len(added):
+                for service, _, _, password_hash in added:
+                    if self.get(service)['password_hash'] != password_hash:
+                        raise ValueError(f"Сервис '{service}' уже существует")
+
+    def sync(self):
+        """Запоминает счетчик изменений, зафиксированных другими процессами.
+
+        Данные SQLite читаются из базы при каждом запросе, поэтому загружать
+        их заново не нужно.
+
+        Returns:
+            bool: True, если после прошлой проверки другой процесс
+                  зафиксировал изменения.
+        """
+        generation = read_generation(self.path)
+        if self._batch_depth or generation == self._generation:
+            return False
+        self._generation = generation
+        return True
+
+    def commit(self):
+        """Увеличивает счетчик generation и фиксирует текущую транзакцию.
+
+        Одновременные записи упорядочивает сама SQLite: транзакция с
+        изменениями удерживает блокировку записи базы с первой мутации.
+        Блокировка WriteLock захватывается только на время фиксации, чтобы
+        commit_hook обновлял производные файлы согласованно с другими
+        процессами.
+        """
+        if not self._changed:
+            self._connection.commit()
+            return
+        with WriteLock(self.path) as lock:
+            fingerprint = self.fingerprint()
+            self._connection.execute(
+                "INSERT INTO meta (key, value) VALUES ('generation', 1)"
+                " ON CONFLICT (key) DO UPDATE SET value = value + 1")
+            self._changed = False
+            self._connection.commit()
+            refreshed = lock.generation != self._generation
+            self._generation = lock.advance()
+            if self.commit_hook is not None:
+                self.commit_hook(fingerprint, refreshed)
+
+    def rollback(self):
+        """Откатывает текущую транзакцию."""
+        self._changed = False
+        self._connection.rollback()
+
+    def close(self):
+        """Закрывает соединение с базой данных."""
+        self._connection.close()
+
+
+BACKENDS = {
+    'json': JsonBackend,
+    'journal': JournalBackend,
+    'sqlite': SqliteBackend,
+    'binary': BinaryBackend,
+}
+DEFAULT_FILES = {
+    'json': 'passwords.json',
+    'journal': 'passwords.json',
+    'sqlite': 'passwords.db',
+    'binary': 'passwords.vault',
+}
+
+
+def open_backend(name, path):
+    """Создает движок хранения по имени.
+
+    Args:
+        name (str): Имя движка из BACKENDS.
+        path (str): Путь к файлу хранилища.
+
+    Returns:
+        MemoryBackend | BinaryBackend | SqliteBackend: Движок хранения.
+
+    Raises:
+        ValueError: Если движок с таким именем неизвестен.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Неизвестный движок хранения: {name}")
+    return BACKENDS[name](path)
+
+
+def write_atomic(path, data):
+    """Атомарно заменяет содержимое файла.
+
+    Данные пишутся во временный файл в том же каталоге и сбрасываются на
+    диск (fsync), после чего файл переименовывается поверх старого, а
+    каталог тоже сбрасывается на диск. При любом сбое на месте остается
+    либо старая, либо новая версия файла целиком.
+
+    Args:
+        path (str): Путь к файлу.
+        data (bytes): Новое содержимое файла.
+    """
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    try:
+        directory = os.open(os.path.dirname(os.path.abspath(path)),
+                            os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    except OSError:
+        return
+    try:
+        os.fsync(directory)
+    except OSError:
+        pass
+    finally:
+        os.close(directory)
+
+
+def _previous(mutation):
+    """Возвращает хеш мастер-пароля, который заменяет мутация 'master'.
+
+    Args:
+        mutation (tuple): Мутация 'master'.
+
+    Returns:
+        str: Прежний хеш или None, если мутация задает мастер-пароль впервые.
+    """
+    return mutation[2] if len(mutation) > 2 else None
+
+
+def apply_mutation(data, mutation):
+    """Применяет одну мутацию к данным хранилища.
+
+    Args:
+        data (dict): Данные хранилища.
+        mutation (tuple): Мутация.
+
+    Raises:
+        ValueError: Если тип мутации неизвестен.
+    """
+    kind = mutation[0]
+    if kind == 'master':
+        data['master_hash'] = mutation[1]
+    elif kind in ('put', 'add'):
+        passwords = data.get('passwords')
+        if passwords is None:
+            passwords = data['passwords'] = RecordTable()
+        passwords[mutation[1]] = mutation[2]
+    else:
+        raise ValueError(f"Неизвестная мутация: {kind}")
+
+
+def encode_record(mutation):
+    """Кодирует мутацию в запись журнала.
+
+    Args:
+        mutation (tuple): Мутация.
+
+    Returns:
+        bytes: Заголовок с длиной и CRC-32 и мутация в компактном JSON.
+    """
+    payload = json.dumps(mutation, separators=(',', ':')).encode()
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def replay_journal(path, data, offset=0):
+    """Применяет к данным записи журнала до первой неполной или поврежденной.
+
+    Журнал не изменяется: неполный хвост отрезает append_journal под
+    блокировкой записи.
+
+    Args:
+        path (str): Путь к файлу журнала.
+        data (dict): Данные хранилища.
+        offset (int): Смещение первой записи, с которой начинается чтение.
+
+    Returns:
+        int: Смещение конца последней целой записи.
+    """
+    if not os.path.exists(path):
+        return offset
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        journal = f.read()
+    size = 0
+    for mutation, end in iter_records(journal):
+        apply_mutation(data, mutation)
+        size = end
+    return offset + size
+
+
+def append_journal(journal, size, mutations):
+    """Дописывает мутации в журнал с fsync, отрезая неполный хвост.
+
+    Вызывается под блокировкой записи, поэтому данные после последней
+    целой записи остались от прерванной записи и могут быть отрезаны.
+
+    Args:
+        journal (file): Файл журнала, открытый на дозапись.
+        size (int): Смещение конца последней целой записи.
+        mutations (list): Мутации.
+    """
+    if os.fstat(journal.fileno()).st_size != size:
+        journal.truncate(size)
+    journal.write(b''.join(encode_record(mutation) for mutation in mutations))
+    journal.flush()
+    os.fsync(journal.fileno())
+
+
+def file_id(path):
+    """Возвращает метаданные, по которым определяется замена файла.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        tuple: inode, размер и время изменения файла или None, если файла нет.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def read_generation(path):
+    """Читает счетчик зафиксированных изменений хранилища без блокировки.
+
+    Args:
+        path (str): Путь к файлу хранилища.
+
+    Returns:
+        int: Значение счетчика или 0, если изменения еще не фиксировались.
+    """
+    try:
+        with open(path + LOCK_SUFFIX, 'rb') as f:
+            data = f.read(GENERATION.size)
+    except FileNotFoundError:
+        return 0
+    return GENERATION.unpack(data)[0] if len(data) == GENERATION.size else 0
+
+
+class WriteLock():
+    """Рекомендательная блокировка записи хранилища со счетчиком изменений.
+
+    Блокировка захватывается через fcntl.flock на файле ``<файл>.lock``,
+    в начале которого хранится счетчик зафиксированных изменений
+    (GENERATION). Движок увеличивает счетчик после каждой записи, поэтому
+    процесс, загрузивший данные при другом значении счетчика, знает, что
+    его данные устарели. Там, где fcntl недоступен, блокировка не
+    захватывается, но счетчик ведется.
+
+    Пример::
+
+        with WriteLock(path) as lock:
+            ...
+            lock.advance()
+
+    Attributes:
+        path (str): Путь к файлу блокировки.
+        generation (int): Значение счетчика.
+    """
+    def __init__(self, path):
+        """Запоминает путь к файлу блокировки.
+
+        Args:
+            path (str): Путь к файлу хранилища.
+        """
+        self.path = path + LOCK_SUFFIX
+        self.generation = 0
+        self._fd = None
+
+    def __enter__(self):
+        """Захватывает блокировку, ожидая ее освобождения другим процессом.
+
+        Returns:
+            WriteLock: Захваченная блокировка.
+        """
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            data = os.read(self._fd, GENERATION.size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self.generation = GENERATION.unpack(data)[0] if len(data) == GENERATION.size else 0
+        return self
+
+    def advance(self):
+        """Увеличивает счетчик зафиксированных изменений.
+
+        Returns:
+            int: Новое значение счетчика.
+        """
+        self.generation += 1
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, GENERATION.pack(self.generation))
+        return self.generation
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Освобождает блокировку, закрывая файл."""
+        os.close(self._fd)
+        self._fd = None
+
+
+def iter_records(journal):
+    """Перебирает целые записи журнала до первой неполной или поврежденной.
+
+    Args:
+        journal (bytes): Содержимое журнала.
+
+    Yields:
+        tuple: Мутация и смещение конца ее записи.
+    """
+    position = 0
+    while position + RECORD_HEADER.size <= len(journal):
+        length, checksum = RECORD_HEADER.unpack_from(journal, position)
+        start = position + RECORD_HEADER.size
+        payload = journal[start:start + length]
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            return
+        position = start + length
+        yield tuple(json.loads(payload)), position
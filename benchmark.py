@@ -0,0 +1,935 @@
+"""Модуль замеров производительности.
+
+Содержит бенчмарки для основных сценариев работы с паролями.
+Каждый бенчмарк можно запустить отдельно, передав его имя аргументом командной строки.
+"""
+
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+
+from bulk import generate_to_file
+from agent import AgentClient, agent_path
+from backends import BACKENDS, BinaryBackend, JsonBackend
+from dedup import (ExactDeduplicator, BloomDeduplicator, make_deduplicator, password_digest,
+                   unique_passwords)
+from fuzzy import FUZZY_LIMIT, FUZZY_SUFFIX, MAX_DISTANCE, FuzzyIndex, edit_distance
+from generator import PasswordGenerator, compile_policy
+from importer import read_entries
+from kdf import (KDFS, KEY_SIZE, MAX_ENTRY_MATCHES, SALT_SIZE, calibrate, clear_key_cache,
+                 entry_matcher, hash_entry, new_master, split_entry_hash)
+from markov import MarkovModel
+from storage import PasswordStorage, complete_services
+from utils import write_passwords
+from vaultcache import CACHE_SUFFIX
+from vaultfile import encode_vault
+from wordlist import Wordlist
+
+
+def _measure(func, repeat=3):
+    """Выполняет функцию несколько раз и возвращает лучшее время.
+
+    Args:
+        func (callable): Замеряемая функция без аргументов.
+        repeat (int): Количество повторов. По умолчанию 3.
+
+    Returns:
+        float: Минимальное время выполнения в секундах.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_generate_many(count=200000):
+    """Замеряет скорость пакетной генерации паролей на одном ядре.
+
+    Сравнивает цикл вызовов generate с generate_many и проверяет цель
+    в 1 000 000 паролей в минуту с учетом буферизованного вывода.
+
+    Args:
+        count (int): Количество паролей в замере. По умолчанию 200000.
+    """
+    generator = PasswordGenerator()
+
+    single = _measure(lambda: [generator.generate() for _ in range(count)])
+    batched = _measure(lambda: write_passwords(generator.generate_many(count), io.StringIO()))
+
+    per_minute = count / batched * 60
+    print(f"generate x{count}:        {single:.3f} с")
+    print(f"generate_many({count}) + вывод: {batched:.3f} с")
+    print(f"Ускорение: {single / batched:.2f}x")
+    print(f"Скорость: {per_minute:,.0f} паролей/мин "
+          f"({'цель достигнута' if per_minute >= 1000000 else 'цель не достигнута'})")
+
+
+def _legacy_generate(chars_sets, length=12):
+    """Генерирует пароль прежним способом: random.choice на каждый символ и shuffle.
+
+    Args:
+        chars_sets (dict): Наборы символов генератора.
+        length (int): Длина пароля. По умолчанию 12.
+
+    Returns:
+        str: Сгенерированный пароль.
+    """
+    chars = ''.join(chars_sets.values())
+    password = [random.choice(chars_sets[name]) for name in ('uppercase', 'digits', 'special')]
+    password.extend(random.choice(chars) for _ in range(length - len(password)))
+    random.shuffle(password)
+    return ''.join(password)
+
+
+def bench_entropy_pool(count=200000):
+    """Сравнивает генерацию через пул энтропии с прежней реализацией на random.
+
+    Args:
+        count (int): Количество паролей в замере. По умолчанию 200000.
+    """
+    generator = PasswordGenerator()
+
+    legacy = _measure(lambda: [_legacy_generate(generator.chars_sets) for _ in range(count)])
+    pooled = _measure(lambda: generator.generate_many(count))
+
+    print(f"random.choice + shuffle: {count / legacy:,.0f} паролей/с")
+    print(f"EntropyPool (os.urandom): {count / pooled:,.0f} паролей/с")
+    print(f"Ускорение: {legacy / pooled:.2f}x")
+
+
+def bench_workers(count=2000000):
+    """Замеряет масштабирование генерации в файл по числу процессов.
+
+    Args:
+        count (int): Количество паролей в замере. По умолчанию 2000000.
+    """
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output = os.path.join(temp_dir, 'passwords.txt')
+        baseline = None
+        for workers in worker_counts:
+            elapsed = _measure(lambda: generate_to_file(output, count, workers=workers), repeat=1)
+            baseline = baseline or elapsed
+            print(f"{workers} процесс(ов): {count / elapsed:,.0f} паролей/с, "
+                  f"ускорение {baseline / elapsed:.2f}x (идеал {workers}x)")
+
+
+def bench_policy(count=100000):
+    """Замеряет накладные расходы на один вызов generate с политикой и без нее.
+
+    Сравнивает компиляцию политики на каждый вызов (прежнее поведение),
+    кешированную политику по параметрам и заранее переданный объект политики.
+
+    Args:
+        count (int): Количество вызовов в замере. По умолчанию 100000.
+    """
+    generator = PasswordGenerator()
+    uncached = compile_policy.__wrapped__
+    policy = compile_policy()
+
+    rebuilt = _measure(lambda: [generator.generate(policy=uncached()) for _ in range(count)])
+    cached = _measure(lambda: [generator.generate() for _ in range(count)])
+    compiled = _measure(lambda: [generator.generate(policy=policy) for _ in range(count)])
+
+    print(f"Сборка политики на каждый вызов: {rebuilt / count * 1e6:.2f} мкс/вызов")
+    print(f"Кеш compile_policy по параметрам: {cached / count * 1e6:.2f} мкс/вызов")
+    print(f"Готовый объект PasswordPolicy:   {compiled / count * 1e6:.2f} мкс/вызов")
+
+
+def bench_constraints(count=100000):
+    """Сравнивает скорость генерации по умолчанию и по строгой политике.
+
+    Строгая политика строит пароль напрямую, поэтому ее стоимость остается
+    O(длины пароля), а не растет как у генерации с отбраковкой.
+
+    Args:
+        count (int): Количество паролей в замере. По умолчанию 100000.
+    """
+    generator = PasswordGenerator()
+    default = compile_policy(16)
+    strict = compile_policy(16, min_lowercase=2, min_uppercase=2, min_digits=4, min_special=4,
+                            exclude_ambiguous=True, max_repeat=1)
+
+    default_time = _measure(lambda: generator.generate_many(count, policy=default))
+    strict_time = _measure(lambda: generator.generate_many(count, policy=strict))
+
+    print(f"Политика по умолчанию: {count / default_time:,.0f} паролей/с")
+    print(f"Строгая политика:      {count / strict_time:,.0f} паролей/с")
+
+
+def bench_passphrases(words=1000000, count=100000):
+    """Замеряет открытие большого списка слов и скорость генерации парольных фраз.
+
+    Сравнивает полный разбор списка в Python-строки с открытием через mmap
+    при построении индекса и при готовом индексе.
+
+    Args:
+        words (int): Размер списка слов. По умолчанию 1000000.
+        count (int): Количество парольных фраз. По умолчанию 100000.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'words.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(f"{i:07d}\tword{i}" for i in range(words)))
+
+        def parse():
+            with open(path, encoding='utf-8') as f:
+                return [line.split()[-1] for line in f if line.strip()]
+
+        def build_index():
+            if os.path.exists(path + '.idx'):
+                os.remove(path + '.idx')
+            Wordlist(path).close()
+
+        parsed = _measure(parse)
+        cold = _measure(build_index, repeat=1)
+        warm = _measure(lambda: Wordlist(path).close())
+
+        generator = PasswordGenerator()
+        phrases = _measure(lambda: generator.generate_passphrases(count, words=6, wordlist=path))
+        generator.load_wordlist(path).close()
+
+        print(f"Разбор списка из {words} слов: {parsed * 1000:.1f} мс")
+        print(f"Открытие с построением индекса: {cold * 1000:.1f} мс")
+        print(f"Открытие с готовым индексом:   {warm * 1000:.3f} мс")
+        print(f"Парольные фразы (6 слов): {count / phrases:,.0f} фраз/с")
+
+
+def bench_pronounceable(words=200000, count=50000):
+    """Замеряет обучение, загрузку марковской модели и генерацию произносимых паролей.
+
+    Args:
+        words (int): Количество слов в синтетическом корпусе. По умолчанию 200000.
+        count (int): Количество паролей. По умолчанию 50000.
+    """
+    generator = PasswordGenerator()
+    syllables = ['ka', 'ro', 'mi', 'te', 'su', 'na', 'lo', 've', 'di', 'pa', 'ne', 'bo']
+    with tempfile.TemporaryDirectory() as temp_dir:
+        corpus = os.path.join(temp_dir, 'corpus.txt')
+        with open(corpus, 'w', encoding='utf-8') as f:
+            for _ in range(words):
+                f.write(''.join(random.choices(syllables, k=random.randint(2, 4))) + '\n')
+
+        trained = _measure(lambda: MarkovModel.train(corpus), repeat=1)
+        MarkovModel.load_or_train(corpus)
+        loaded = _measure(lambda: MarkovModel.load_or_train(corpus))
+        passwords = _measure(lambda: generator.generate_pronounceable_many(count, corpus=corpus))
+
+        print(f"Обучение на {words} словах: {trained * 1000:.1f} мс")
+        print(f"Загрузка двоичной модели:  {loaded * 1000:.3f} мс")
+        print(f"Произносимые пароли: {count / passwords:,.0f} паролей/с")
+
+
+def bench_dedup(count=1000000):
+    """Замеряет расход памяти и скорость генерации с устранением повторов.
+
+    Args:
+        count (int): Количество паролей. По умолчанию 1000000.
+    """
+    generator = PasswordGenerator()
+
+    def run(deduplicator):
+        passwords = generator.iter_passwords()
+        if deduplicator is not None:
+            passwords = unique_passwords(passwords, deduplicator)
+        for _ in islice(passwords, count):
+            pass
+
+    plain = _measure(lambda: run(None), repeat=1)
+    print(f"Без дедупликации: {count / plain:,.0f} паролей/с")
+
+    for name, factory in (('Точное множество', ExactDeduplicator),
+                          ('Фильтр Блума', lambda: BloomDeduplicator(count))):
+        elapsed = _measure(lambda: run(factory()), repeat=1)
+
+        tracemalloc.start()
+        deduplicator = factory()
+        for i in range(count):
+            deduplicator.add_digest(password_digest(str(i)))
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del deduplicator
+
+        print(f"{name}: {count / elapsed:,.0f} паролей/с, "
+              f"{memory / count * 1000000 / 2 ** 20:.1f} МиБ на 1 млн записей")
+
+
+def bench_unique_vault(sizes=(1000, 10000, 100000), count=1000):
+    """Замеряет исключение паролей хранилища при generate --unique-vault.
+    
+    Хеши прежнего формата проверяются поиском в дедупликаторе, а хеши с
+    солью - сравнением с каждым хешем (kdf.entry_matcher), поэтому для
+    них выводится и наибольший --count при MAX_ENTRY_MATCHES.
+    
+    Args:
+        sizes (tuple): Количество паролей в хранилище.
+        count (int): Наибольшее количество проверяемых паролей. По умолчанию 1000.
+    """
+    key = os.urandom(KEY_SIZE)
+    generator = PasswordGenerator()
+    for size in sizes:
+        passwords = generator.generate_many(count)
+        checked = passwords[:max(1, min(count, 10 ** 6 // size))]
+        deduplicator = make_deduplicator(count + size)
+        for i in range(size):
+            deduplicator.add_digest(password_digest(f'stored{i}'))
+        matches = entry_matcher(key, [split_entry_hash(hash_entry(key, f'stored{i}'))
+                                      for i in range(size)])
+        
+        def legacy():
+            for _ in unique_passwords(passwords, deduplicator):
+                pass
+        
+        def salted():
+            for password in checked:
+                matches(password)
+        
+        fast = _measure(legacy, repeat=1)
+        slow = _measure(salted, repeat=1)
+        print(f"{size:>7} записей: прежний формат {count / fast:12,.0f} паролей/с, "
+              f"с солью {len(checked) / slow:10,.0f} паролей/с, "
+              f"наибольший --count {MAX_ENTRY_MATCHES // size:,}")
+
+
+def bench_seeded(count=100000, offset=10 ** 12):
+    """Замеряет детерминированную генерацию с зерном и переход по номеру пароля.
+    
+    Args:
+        count (int): Количество паролей. По умолчанию 100000.
+        offset (int): Номер пароля для перехода. По умолчанию 10**12.
+    """
+    secure = PasswordGenerator()
+    seeded = PasswordGenerator(seed='benchmark')
+    
+    secure_time = _measure(lambda: secure.generate_many(count))
+    seeded_time = _measure(lambda: seeded.generate_many(count))
+    
+    def jump():
+        seeded.seek(offset)
+        seeded.generate()
+    
+    jump_time = _measure(jump)
+    
+    print(f"EntropyPool (os.urandom):     {count / secure_time:,.0f} паролей/с")
+    print(f"SeededEntropyPool (BLAKE2b):  {count / seeded_time:,.0f} паролей/с")
+    print(f"Переход к паролю {offset:,}: {jump_time * 1e6:.1f} мкс")
+
+
+def _write_vault(path, entries):
+    """Записывает JSON-файл хранилища с заданным количеством записей.
+    
+    Мастер-пароль всех записей - 'master', пароль - 'password'.
+    
+    Args:
+        path (str): Путь к файлу хранилища.
+        entries (int): Количество записей.
+    """
+    master_hash, key = new_master('master')
+    data = {
+        'master_hash': master_hash,
+        'passwords': {f'service{i}': {'username': f'user{i}', 'password_hash': hash_entry(key, 'password')}
+                      for i in range(entries)}
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def bench_storage(sizes=(1000, 100000, 1000000)):
+    """Сравнивает движки хранения: открытие, добавление, проверку и поиск.
+    
+    Хранилища всех движков, кроме JSON, создаются переносом из JSON-файла.
+    
+    Args:
+        sizes (tuple): Размеры хранилища в записях. По умолчанию 1 тыс., 100 тыс. и 1 млн.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for entries in sizes:
+            source_path = os.path.join(temp_dir, f'source-{entries}.json')
+            _write_vault(source_path, entries)
+            source = PasswordStorage(source_path)
+            
+            for backend in BACKENDS:
+                if backend == 'json':
+                    path = source_path
+                else:
+                    path = os.path.join(temp_dir, f'{backend}-{entries}')
+                    source.migrate(path, backend).close()
+                inserts = 1000 if backend != 'json' else max(3, min(100, 100000 // entries))
+                gc.collect()
+                
+                start = time.perf_counter()
+                storage = PasswordStorage(path, backend=backend)
+                opened = time.perf_counter() - start
+                
+                start = time.perf_counter()
+                for i in range(inserts):
+                    storage.store_password(f'new{i}', 'user', 'password', 'master')
+                inserted = (time.perf_counter() - start) / inserts
+                
+                verified = _measure(lambda: storage.verify_password('service7', 'password', 'master'))
+                found = _measure(lambda: storage.find_service('service99999'))
+                storage.close()
+                del storage
+                
+                print(f"{backend:>8}, {entries:>9,} записей: открытие {opened * 1000:8.1f} мс, "
+                      f"добавление {inserted * 1000:8.3f} мс, проверка {verified * 1000:6.3f} мс, "
+                      f"поиск {found * 1000:7.1f} мс")
+            source.close()
+
+
+def bench_batch(count=2000):
+    """Сравнивает сохранение записей по одной и групповой фиксацией storage.batch.
+    
+    Args:
+        count (int): Количество сохраняемых записей. По умолчанию 2000.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for backend in BACKENDS:
+            def store(name, batched):
+                storage = PasswordStorage(os.path.join(temp_dir, f'{backend}-{name}'), backend)
+                with storage.batch() if batched else contextlib.nullcontext():
+                    for i in range(count):
+                        storage.store_password(f'service{i}', 'user', 'password', 'master')
+                storage.close()
+            
+            single = _measure(lambda: store('single', False), repeat=1)
+            batched = _measure(lambda: store('batch', True), repeat=1)
+            print(f"{backend:>8}: по одной {count / single:10,.0f} записей/с, "
+                  f"batch {count / batched:10,.0f} записей/с, ускорение {single / batched:.0f}x")
+
+
+def bench_import(rows=1000000):
+    """Замеряет импорт CSV-файла в пустое хранилище для каждого движка.
+    
+    Args:
+        rows (int): Количество строк в файле. По умолчанию 1000000.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'accounts.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('service,username,password\n')
+            f.writelines(f'service{i},user{i},password{i}\n' for i in range(rows))
+        
+        for backend in BACKENDS:
+            storage = PasswordStorage(os.path.join(temp_dir, f'vault-{backend}'), backend)
+            start = time.perf_counter()
+            storage.store_many(read_entries(path), 'master')
+            elapsed = time.perf_counter() - start
+            storage.close()
+            del storage
+            print(f"{backend:>8}: {rows:,} строк за {elapsed:.1f} с ({rows / elapsed:,.0f} строк/с)")
+
+
+def bench_search(sizes=(10000, 100000, 1000000)):
+    """Сравнивает поиск сервиса по подстроке просмотром всех записей и по триграммному индексу.
+    
+    Также замеряет построение индекса при первом поиске, загрузку
+    сохраненного индекса и сохранение пароля с дозаписью в индекс. Хранилище
+    открывается движком journal, чтобы время сохранения пароля не включало
+    перезапись всего JSON-файла.
+    
+    Args:
+        sizes (tuple): Размеры хранилища в записях. По умолчанию 10 тыс., 100 тыс. и 1 млн.
+    """
+    queries = ('service12345', 'ice9999', 'SERVICE')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for entries in sizes:
+            path = os.path.join(temp_dir, f'vault-{entries}.json')
+            _write_vault(path, entries)
+            
+            storage = PasswordStorage(path, 'journal')
+            built = _measure(lambda: storage.find_service(queries[0]), repeat=1)
+            storage.close()
+            complete_services('', path, 'journal', limit=0)
+            storage = PasswordStorage(path, 'journal')
+            loaded = _measure(lambda: storage.find_service(queries[0]), repeat=1)
+            stored = _measure(lambda: storage.store_password('new', 'user', 'password', 'master'),
+                              repeat=1)
+            print(f"{entries:>9,} записей: построение индекса {built * 1000:7.1f} мс, "
+                  f"загрузка {loaded * 1000:5.1f} мс, сохранение пароля {stored * 1000:6.1f} мс")
+            
+            for query in queries:
+                assert storage.find_service(query) == storage.backend.find(query)
+                scan = _measure(lambda: storage.backend.find(query))
+                indexed = _measure(lambda: storage.find_service(query))
+                print(f"    {query!r:>14}: просмотр {scan * 1000:8.2f} мс, "
+                      f"индекс {indexed * 1000:8.3f} мс, ускорение {scan / indexed:6.1f}x")
+            storage.close()
+            del storage
+            gc.collect()
+
+
+def bench_fuzzy(sizes=(10000, 100000), queries=200):
+    """Сравнивает нечеткий поиск просмотром всех названий и по индексу удалений.
+    
+    Названия сервисов - случайные произносимые слова с доменом, запросы -
+    существующие названия с одной или двумя случайными правками.
+    
+    Args:
+        sizes (tuple): Размеры хранилища в записях. По умолчанию 10 тыс. и 100 тыс.
+        queries (int): Количество запросов. По умолчанию 200.
+    """
+    rng = random.Random(17)
+    consonants, vowels = 'bcdfghjklmnprstvz', 'aeiou'
+    
+    def word():
+        return ''.join(rng.choice(consonants) + rng.choice(vowels)
+                       for _ in range(rng.randint(3, 6)))
+    
+    def typo(name):
+        for _ in range(rng.randint(1, 2)):
+            position = rng.randrange(len(name))
+            name = name[:position] + rng.choice(consonants + vowels) + name[position + 1:]
+        return name
+    
+    def scan(names, query):
+        matches = sorted((edit_distance(query, name.lower()), number, name)
+                         for number, name in enumerate(names))
+        return [(name, distance) for distance, _, name in matches[:FUZZY_LIMIT]
+                if distance <= MAX_DISTANCE]
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for entries in sizes:
+            names = list(dict.fromkeys(word() + rng.choice(('.com', '.ru', '.org', ''))
+                                       for _ in range(entries)))
+            sample = [typo(rng.choice(names)) for _ in range(queries)]
+            path = os.path.join(temp_dir, f'vault-{entries}.json' + FUZZY_SUFFIX)
+            
+            start = time.perf_counter()
+            index = FuzzyIndex.build(names)
+            index.save(path, 'bench')
+            built = time.perf_counter() - start
+            index.close()
+            del index
+            gc.collect()
+            start = time.perf_counter()
+            index = FuzzyIndex.load(path, 'bench')
+            loaded = time.perf_counter() - start
+            
+            assert all(index.search(query) == scan(names, query) for query in sample[:10])
+            scanned = _measure(lambda: [scan(names, query) for query in sample[:10]], repeat=1) / 10
+            indexed = _measure(lambda: [index.search(query) for query in sample]) / queries
+            index.close()
+            print(f"{len(names):>9,} сервисов: построение {built:6.2f} с, загрузка "
+                  f"{loaded * 1000:5.1f} мс, файл {os.path.getsize(path) / 2 ** 20:6.1f} МиБ")
+            print(f"    просмотр {scanned * 1000:9.2f} мс, индекс {indexed * 1000:7.3f} мс, "
+                  f"ускорение {scanned / indexed:7.0f}x")
+
+
+def bench_startup(sizes=(0, 100000, 1000000)):
+    """Замеряет время запуска generate и find в зависимости от размера хранилища.
+    
+    Команда generate не открывает хранилище, поэтому ее время не должно
+    зависеть от размера файла, в отличие от find.
+    
+    Args:
+        sizes (tuple): Размеры хранилища в записях. По умолчанию 0, 100 тыс. и 1 млн.
+    """
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for entries in sizes:
+            path = os.path.join(temp_dir, f'vault-{entries}.json')
+            _write_vault(path, entries)
+            
+            def run(*command):
+                subprocess.run([sys.executable, main_path, '--storage', path, *command],
+                               stdout=subprocess.DEVNULL, check=True)
+            
+            generate = _measure(lambda: run('generate'))
+            find = _measure(lambda: run('find', 'service1'), repeat=1)
+            print(f"{entries:>9,} записей: generate {generate * 1000:7.1f} мс, "
+                  f"find {find * 1000:7.1f} мс")
+
+
+def bench_complete(sizes=(10000, 100000, 1000000)):
+    """Сравнивает автодополнение по индексу названий с чтением всего хранилища.
+    
+    Замеряет построение индекса, поиск по префиксу в процессе (вместе с
+    проверкой отпечатка и загрузкой индекса) и полный запуск команды
+    complete, время которого почти целиком занимает запуск интерпретатора.
+    
+    Args:
+        sizes (tuple): Размеры хранилища в записях. По умолчанию 10 тыс., 100 тыс. и 1 млн.
+    """
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    prefixes = ('service12', 'SERVICE99999', 'x')
+    
+    def scan(path, prefix):
+        with open(path) as f:
+            services = json.load(f)['passwords']
+        prefix = prefix.lower()
+        return sorted(service for service in services if service.lower().startswith(prefix))
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for entries in sizes:
+            path = os.path.join(temp_dir, f'vault-{entries}.json')
+            _write_vault(path, entries)
+            built = _measure(lambda: complete_services('', path, limit=0), repeat=1)
+            process = _measure(lambda: subprocess.run(
+                [sys.executable, main_path, '--storage', path, 'complete', prefixes[0]],
+                stdout=subprocess.DEVNULL, check=True))
+            print(f"{entries:>9,} записей: построение индекса {built * 1000:7.1f} мс, "
+                  f"команда complete {process * 1000:6.1f} мс")
+            
+            for prefix in prefixes:
+                assert complete_services(prefix, path) == scan(path, prefix)[:100]
+                full = _measure(lambda: scan(path, prefix), repeat=1)
+                indexed = _measure(lambda: complete_services(prefix, path))
+                print(f"    {prefix!r:>14}: чтение хранилища {full * 1000:8.1f} мс, "
+                      f"индекс {indexed * 1000:6.3f} мс")
+
+
+def bench_memory(sizes=(100000, 1000000)):
+    """Сравнивает память, занимаемую записями хранилища, до и после перехода на RecordTable.
+    
+    Прежнее представление - словари, полученные json.load, новое - данные
+    движка JSON с компактной таблицей записей. Память замеряется tracemalloc
+    после загрузки и включает названия сервисов.
+    
+    Args:
+        sizes (tuple): Размеры хранилища в записях. По умолчанию 100 тыс. и 1 млн.
+    """
+    def traced(load):
+        gc.collect()
+        tracemalloc.start()
+        data = load()
+        gc.collect()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return data, memory
+    
+    def load_json(path):
+        with open(path) as f:
+            return json.load(f)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for entries in sizes:
+            path = os.path.join(temp_dir, f'vault-{entries}.json')
+            _write_vault(path, entries)
+            data, before = traced(lambda: load_json(path))
+            backend, after = traced(lambda: JsonBackend(path))
+            assert backend.data == data
+            del data, backend
+            print(f"{entries:>9,} записей: словари {before / entries:6.0f} байт на запись, "
+                  f"RecordTable {after / entries:6.0f} байт на запись "
+                  f"(в {before / after:.1f} раза меньше)")
+
+
+def bench_vault(sizes=(100000, 1000000)):
+    """Сравнивает открытие хранилища в JSON и в двоичном формате.
+    
+    Для JSON время открытия - разбор файла json.load и перевод записей в
+    RecordTable (MemoryBackend._load_data), для двоичного формата -
+    отображение файла в память. Также замеряется проверка пароля вместе с
+    открытием хранилища, как при запуске команды verify.
+    
+    Args:
+        sizes (tuple): Размеры хранилища в записях. По умолчанию 100 тыс. и 1 млн.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for entries in sizes:
+            json_path = os.path.join(temp_dir, f'vault-{entries}.json')
+            vault_path = os.path.join(temp_dir, f'vault-{entries}.vault')
+            _write_vault(json_path, entries)
+            with open(json_path) as f:
+                data = json.load(f)
+            with open(vault_path, 'wb') as f:
+                f.write(encode_vault(data['master_hash'], data['passwords'].items()))
+            del data
+            print(f"{entries:>9,} записей: JSON {os.path.getsize(json_path) / 2 ** 20:6.1f} МиБ, "
+                  f"двоичный {os.path.getsize(vault_path) / 2 ** 20:6.1f} МиБ")
+            
+            for name, backend_class, path, backend in (('JSON', JsonBackend, json_path, 'json'),
+                                                       ('двоичный', BinaryBackend, vault_path, 'binary')):
+                opened = _measure(lambda: backend_class(path).close(), repeat=1)
+                
+                def verify():
+                    storage = PasswordStorage(path, backend)
+                    assert storage.verify_password(f'service{entries // 2}', 'password', 'master')
+                    storage.close()
+                
+                verified = _measure(verify, repeat=1)
+                print(f"    {name:>8}: открытие {opened * 1000:9.2f} мс, "
+                      f"открытие и проверка пароля {verified * 1000:9.2f} мс")
+
+
+def bench_cache(sizes=(100000,)):
+    """Сравнивает холодный и теплый запуск с кешем разобранного хранилища.
+    
+    Холодный запуск разбирает JSON-файл и записывает кеш (vaultcache),
+    теплый - загружает данные из кеша. Замеряется открытие JsonBackend в
+    процессе и полный запуск команды find.
+    
+    Args:
+        sizes (tuple): Размеры хранилища в записях. По умолчанию 100 тыс.
+    """
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for entries in sizes:
+            path = os.path.join(temp_dir, f'vault-{entries}.json')
+            _write_vault(path, entries)
+            past = time.time() - 10
+            os.utime(path, (past, past))
+            
+            def cold(func):
+                if os.path.exists(path + CACHE_SUFFIX):
+                    os.remove(path + CACHE_SUFFIX)
+                func()
+            
+            def run():
+                subprocess.run([sys.executable, main_path, '--storage', path, 'find', 'service1'],
+                               stdout=subprocess.DEVNULL, check=True)
+            
+            run()
+            print(f"{entries:>9,} записей, кеш {os.path.getsize(path + CACHE_SUFFIX) / 2 ** 20:.1f} МиБ:")
+            for name, func in (('открытие', lambda: JsonBackend(path).close()), ('find', run)):
+                cold_time = _measure(lambda: cold(func))
+                warm_time = _measure(func)
+                print(f"    {name:>8}: холодный {cold_time * 1000:8.1f} мс, "
+                      f"теплый {warm_time * 1000:8.1f} мс, ускорение {cold_time / warm_time:5.1f}x")
+
+
+def bench_verify(entries=100000, count=100000):
+    """Сравнивает проверку паролей по одному и пакетом verify_many.
+    
+    Args:
+        entries (int): Размер хранилища в записях. По умолчанию 100 тыс.
+        count (int): Количество проверяемых пар. По умолчанию 100 тыс.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for backend in ('json', 'binary', 'sqlite'):
+            path = os.path.join(temp_dir, f'vault-{backend}')
+            source = os.path.join(temp_dir, 'vault.json')
+            if not os.path.exists(source):
+                _write_vault(source, entries)
+            PasswordStorage(source).migrate(path, backend).close()
+            storage = PasswordStorage(path, backend)
+            pairs = [(f'service{random.randrange(entries)}', random.choice(['password', 'wrong']))
+                     for _ in range(count)]
+            
+            def one_by_one():
+                for service, password in pairs:
+                    storage.verify_password(service, password, 'master')
+            
+            def batch():
+                for _ in storage.verify_many(pairs, 'master'):
+                    pass
+            
+            single = _measure(one_by_one, repeat=1)
+            many = _measure(batch, repeat=1)
+            storage.close()
+            print(f"{backend:>7}: verify_password {count / single:9.0f} проверок/с, "
+                  f"verify_many {count / many:9.0f} проверок/с")
+
+
+def bench_kdf(count=1000, uncached=10):
+    """Замеряет подбор параметров функций формирования ключа и кеш ключа мастер-пароля.
+    
+    Args:
+        count (int): Количество проверок с кешем ключа и с готовым ключом. По умолчанию 1000.
+        uncached (int): Количество проверок без кеша ключа. По умолчанию 10.
+    """
+    for name in KDFS:
+        start = time.perf_counter()
+        kdf = calibrate(name)
+        elapsed = time.perf_counter() - start
+        derive = _measure(lambda: kdf.derive('master', bytes(SALT_SIZE)))
+        print(f"{name:>7}: {kdf.params:<18} формирование ключа {derive * 1000:6.1f} мс, "
+              f"подбор {elapsed:.2f} с")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        storage = PasswordStorage(os.path.join(temp_dir, 'vault.json'))
+        storage.store_password('github', 'user', 'password', 'master')
+        key = storage.unlock('master')
+        
+        def without_cache():
+            for _ in range(uncached):
+                clear_key_cache()
+                storage.verify_password('github', 'password', 'master')
+        
+        def with_cache():
+            for _ in range(count):
+                storage.verify_password('github', 'password', 'master')
+        
+        def with_key():
+            for _ in range(count):
+                storage.verify_with_key('github', 'password', key)
+        
+        slow = _measure(without_cache, repeat=1)
+        cached = _measure(with_cache, repeat=1)
+        fast = _measure(with_key, repeat=1)
+        storage.close()
+        print(f"verify_password: без кеша ключа {uncached / slow:8.1f} проверок/с, "
+              f"с кешем {count / cached:8.0f} проверок/с; "
+              f"verify_with_key {count / fast:8.0f} проверок/с")
+
+
+# Запуск агента в отдельном процессе без запроса мастер-пароля (для bench_agent).
+AGENT_SCRIPT = '''
+import sys
+from agent import agent_path
+from agentd import VaultAgent, listen
+from storage import PasswordStorage
+storage = PasswordStorage(sys.argv[1])
+VaultAgent(storage, storage.unlock('master'), None, listen(agent_path(sys.argv[1]))).run()
+'''
+
+
+def bench_agent(entries=1000000, count=10000):
+    """Сравнивает find и verify через агент хранилища с выполнением в процессе команды.
+    
+    Замеряет запрос к агенту, открытие хранилища с поиском (то, что без
+    агента делает каждая команда find) и полный запуск команд find и
+    verify, время которого с агентом почти целиком занимает запуск
+    интерпретатора.
+    
+    Args:
+        entries (int): Размер хранилища в записях. По умолчанию 1 млн.
+        count (int): Количество запросов к агенту. По умолчанию 10 тыс.
+    """
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'vault.json')
+        _write_vault(path, entries)
+        services = [f'service{random.randrange(entries)}' for _ in range(count)]
+        
+        def open_and_find():
+            storage = PasswordStorage(path)
+            storage.find_service(services[0])
+            storage.close()
+        
+        def run(*command, stdin=None):
+            subprocess.run([sys.executable, main_path, '--storage', path, *command], input=stdin,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        
+        open_and_find()
+        local = _measure(open_and_find)
+        find = _measure(lambda: run('find', services[0]))
+        verify = _measure(lambda: run('verify', services[0], stdin=b'password\nmaster\n'), repeat=1)
+        
+        process = subprocess.Popen([sys.executable, '-c', AGENT_SCRIPT, path],
+                                   cwd=os.path.dirname(main_path))
+        try:
+            client = None
+            while client is None:
+                time.sleep(0.05)
+                client = AgentClient.connect(agent_path(path))
+            client.request('find', service=services[0])
+            
+            def requests():
+                for service in services:
+                    client.request('find', service=service)
+            
+            agent = _measure(requests, repeat=1) / count
+            agent_find = _measure(lambda: run('find', services[0]))
+            agent_verify = _measure(lambda: run('verify', services[0], stdin=b'password\n'))
+            client.request('stop')
+            client.close()
+        finally:
+            process.wait(timeout=60)
+        
+        print(f"{entries:,} записей")
+        print(f"    find без агента: открытие и поиск {local * 1000:8.1f} мс, команда {find * 1000:7.1f} мс")
+        print(f"    find с агентом:  запрос {agent * 1000:18.3f} мс, команда {agent_find * 1000:7.1f} мс")
+        print(f"    verify: команда без агента {verify * 1000:7.1f} мс, с агентом {agent_verify * 1000:7.1f} мс")
+
+
+def _store_worker(path, backend, worker, count):
+    """Сохраняет пароли по одному из отдельного процесса (для bench_writers).
+    
+    Args:
+        path (str): Путь к файлу хранилища.
+        backend (str): Имя движка хранения.
+        worker (int): Номер процесса, входящий в названия сервисов.
+        count (int): Количество паролей.
+    """
+    storage = PasswordStorage(path, backend)
+    for i in range(count):
+        storage.store_password(f'worker{worker}-{i}', 'user', 'password', 'master')
+    storage.close()
+
+
+def bench_writers(workers=(1, 2, 4, 8), count=200):
+    """Замеряет одновременную запись в хранилище из нескольких процессов.
+    
+    Каждый процесс сохраняет count паролей отдельными фиксациями.
+    Проверяется, что в хранилище попали записи всех процессов.
+    
+    Args:
+        workers (tuple): Количество процессов. По умолчанию 1, 2, 4 и 8.
+        count (int): Количество паролей на процесс. По умолчанию 200.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for backend in ('journal', 'binary', 'sqlite', 'json'):
+            for processes in workers:
+                path = os.path.join(temp_dir, f'vault-{backend}-{processes}')
+                start = time.perf_counter()
+                with ProcessPoolExecutor(max_workers=processes) as executor:
+                    futures = [executor.submit(_store_worker, path, backend, worker, count)
+                               for worker in range(processes)]
+                    for future in futures:
+                        future.result()
+                elapsed = time.perf_counter() - start
+                storage = PasswordStorage(path, backend)
+                stored = sum(1 for _ in storage.backend.records())
+                storage.close()
+                print(f"{backend:>8}, {processes} процесс(ов): {processes * count / elapsed:8.0f} записей/с, "
+                      f"сохранено {stored} из {processes * count}")
+
+
+BENCHMARKS = {
+    'generate_many': bench_generate_many,
+    'entropy_pool': bench_entropy_pool,
+    'workers': bench_workers,
+    'policy': bench_policy,
+    'constraints': bench_constraints,
+    'passphrases': bench_passphrases,
+    'pronounceable': bench_pronounceable,
+    'dedup': bench_dedup,
+    'unique_vault': bench_unique_vault,
+    'seeded': bench_seeded,
+    'storage': bench_storage,
+    'batch': bench_batch,
+    'import': bench_import,
+    'startup': bench_startup,
+    'search': bench_search,
+    'fuzzy': bench_fuzzy,
+    'complete': bench_complete,
+    'memory': bench_memory,
+    'vault': bench_vault,
+    'cache': bench_cache,
+    'writers': bench_writers,
+    'verify': bench_verify,
+    'kdf': bench_kdf,
+    'agent': bench_agent,
+}
+
+
+if __name__ == "__main__":
+    """Точка входа для запуска бенчмарков.
+
+    Без аргументов запускает все бенчмарки, иначе только указанные.
+    """
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Неизвестный бенчмарк: {name}")
+            print(f"Доступные бенчмарки: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
@@ -0,0 +1,272 @@
+"""Модуль массовой генерации паролей в файл.
+
+Распределяет генерацию больших пакетов паролей между несколькими процессами.
+Каждый процесс пишет свою часть (шард) во временный файл, после чего шарды
+склеиваются в итоговый файл без загрузки их содержимого в память Python.
+"""
+
+import math
+import os
+import shutil
+import tempfile
+from itertools import islice, product
+
+from generator import CHAR_SETS, PasswordGenerator, STREAM_BATCH_SIZE, compile_policy
+from utils import write_passwords
+
+SHARD_BATCH_SIZE = 50000
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def split_count(count, workers):
+    """Делит общее количество паролей между процессами.
+
+    Args:
+        count (int): Общее количество паролей.
+        workers (int): Количество процессов.
+
+    Returns:
+        list: Количество паролей для каждого процесса (без нулевых частей).
+    """
+    base, extra = divmod(count, workers)
+    shares = [base + (1 if i < extra else 0) for i in range(workers)]
+    return [share for share in shares if share > 0]
+
+
+def _password_keyspace(policy):
+    """Оценивает сверху количество различных паролей политики.
+
+    Считаются две точные величины, каждая из которых учитывает только
+    часть ограничений политики: количество паролей с минимумами типов
+    символов (без ограничения повторов) и количество паролей без серий
+    длиннее max_repeat (без минимумов). Верхней оценкой служит меньшая.
+
+    Args:
+        policy (PasswordPolicy): Политика генерации паролей.
+
+    Returns:
+        int: Верхняя оценка количества различных паролей.
+    """
+    length = policy.length
+    # Формула включений-исключений: из всех паролей вычитаются пароли, в
+    # которых типов из набора short меньше минимума (по k символов), а
+    # остальные позиции заняты символами других типов.
+    bound = 0
+    for short in product((False, True), repeat=len(policy.classes)):
+        # ways[j] - количество заполнений j позиций типами из short,
+        # каждым меньше его минимума.
+        ways = [1]
+        rest = 0
+        for (_, chars, minimum), is_short in zip(policy.classes, short):
+            if not is_short:
+                rest += len(chars)
+                continue
+            ways = [sum(ways[j - k] * math.comb(j, k) * len(chars) ** k
+                        for k in range(max(0, j - len(ways) + 1), min(j, minimum - 1) + 1))
+                    for j in range(min(length, len(ways) + minimum - 2) + 1)]
+        sign = -1 if sum(short) % 2 else 1
+        bound += sign * sum(count * math.comb(length, j) * rest ** (length - j)
+                            for j, count in enumerate(ways))
+    if policy.max_repeat is not None and length > 0:
+        # runs[n] - количество строк длины n, разбитых на серии одинаковых
+        # символов не длиннее max_repeat; window - сумма последних
+        # max_repeat значений runs.
+        size = len(policy.alphabet)
+        runs = [1]
+        window = 1
+        for n in range(1, length + 1):
+            runs.append((size - 1) * window + (1 if n <= policy.max_repeat else 0))
+            window += runs[n] - (runs[n - policy.max_repeat] if n >= policy.max_repeat else 0)
+        bound = min(bound, runs[length])
+    return bound
+
+
+def open_stream(generator, mode, params, batch_size=STREAM_BATCH_SIZE, policy=None):
+    """Открывает бесконечный поток паролей выбранного режима.
+
+    Args:
+        generator (PasswordGenerator): Генератор паролей.
+        mode (str): Режим генерации: 'password', 'passphrase' или 'pronounceable'.
+        params (dict): Параметры режима: аргументы compile_policy для 'password',
+                       PasswordGenerator.iter_passphrases для 'passphrase' или
+                       PasswordGenerator.generate_pronounceable_many для 'pronounceable'.
+        batch_size (int): Размер пакета генерации. По умолчанию STREAM_BATCH_SIZE.
+        policy (PasswordPolicy): Готовая политика для режима 'password'.
+                                 По умолчанию компилируется из params.
+
+    Returns:
+        iterator: Бесконечный поток паролей.
+
+    Raises:
+        ValueError: Если режим генерации неизвестен.
+    """
+    if mode == 'passphrase':
+        return generator.iter_passphrases(batch_size=batch_size, **params)
+    if mode == 'pronounceable':
+        return generator.iter_pronounceable(batch_size=batch_size, **params)
+    if mode == 'password':
+        if policy is None:
+            policy = compile_policy(**params)
+        return generator.iter_passwords(batch_size=batch_size, policy=policy)
+    raise ValueError(f"Неизвестный режим генерации: {mode}")
+
+
+def keyspace(generator, mode, params, policy=None):
+    """Оценивает сверху количество различных паролей режима генерации.
+
+    Используется, чтобы заранее отказаться от пакета без повторов, который
+    больше пространства паролей: иначе генерация ждала бы новых паролей
+    бесконечно.
+
+    Args:
+        generator (PasswordGenerator): Генератор паролей.
+        mode (str): Режим генерации (см. open_stream).
+        params (dict): Параметры режима генерации (см. open_stream).
+        policy (PasswordPolicy): Готовая политика для режима 'password'.
+                                 По умолчанию компилируется из params.
+
+    Returns:
+        int: Верхняя оценка количества различных паролей.
+
+    Raises:
+        ValueError: Если режим генерации неизвестен.
+    """
+    if mode == 'passphrase':
+        return len(generator.load_wordlist(params['wordlist'])) ** params['words']
+    if mode == 'pronounceable':
+        digits = params.get('min_digits', 1) if params.get('use_digits', True) else 0
+        specials = params.get('min_special', 1) if params.get('use_special', True) else 0
+        letters = params['length'] - digits - specials
+        model = generator.load_markov(params['corpus'])
+        return (model.count_strings(letters) * len(CHAR_SETS['digits']) ** digits
+                * len(CHAR_SETS['special']) ** specials)
+    if mode == 'password':
+        if policy is None:
+            policy = compile_policy(**params)
+        return _password_keyspace(policy)
+    raise ValueError(f"Неизвестный режим генерации: {mode}")
+
+
+def write_shard(path, count, params, output_format='plain', mode='password', seed=None, start=0):
+    """Генерирует пароли и записывает их в файл шарда.
+
+    Вызывается в отдельном процессе, поэтому создает собственный генератор
+    с независимым пулом энтропии. При генерации с зерном генератор сразу
+    переходит к первому паролю шарда.
+
+    Args:
+        path (str): Путь к файлу шарда.
+        count (int): Количество паролей в шарде.
+        params (dict): Параметры режима генерации (см. open_stream).
+        output_format (str): Формат строк для utils.write_passwords. По умолчанию 'plain'.
+        mode (str): Режим генерации (см. open_stream). По умолчанию 'password'.
+        seed: Зерно детерминированной генерации. По умолчанию None.
+        start (int): Номер первого пароля шарда при генерации с зерном. По умолчанию 0.
+
+    Returns:
+        str: Путь к записанному шарду.
+    """
+    generator = PasswordGenerator(seed)
+    if seed is not None:
+        generator.seek(start)
+    passwords = open_stream(generator, mode, params, min(count, SHARD_BATCH_SIZE))
+    with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+        write_passwords(islice(passwords, count), f, output_format)
+    return path
+
+
+def _append_file(source_path, target):
+    """Дописывает содержимое файла в конец открытого файла.
+
+    Использует os.sendfile для копирования средствами ядра, а при его
+    недоступности - shutil.copyfileobj с буфером фиксированного размера.
+
+    Args:
+        source_path (str): Путь к дописываемому файлу.
+        target: Открытый на запись бинарный файл.
+    """
+    with open(source_path, 'rb') as source:
+        size = os.fstat(source.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(target.fileno(), source.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except (AttributeError, OSError):
+            source.seek(offset)
+            target.seek(0, os.SEEK_END)
+            shutil.copyfileobj(source, target, WRITE_BUFFER_SIZE)
+
+
+def concatenate_shards(shard_paths, output):
+    """Склеивает шарды в итоговый файл и удаляет их.
+
+    Первый шард переименовывается в итоговый файл, остальные дописываются
+    в его конец.
+
+    Args:
+        shard_paths (list): Пути к шардам в порядке склейки.
+        output (str): Путь к итоговому файлу.
+    """
+    first, rest = shard_paths[0], shard_paths[1:]
+    os.replace(first, output)
+    with open(output, 'r+b') as target:
+        target.seek(0, os.SEEK_END)
+        for shard_path in rest:
+            _append_file(shard_path, target)
+            os.remove(shard_path)
+
+
+def generate_to_file(output, count, workers=1, output_format='plain', mode='password',
+                     seed=None, start=0, **params):
+    """Генерирует пароли в файл, распределяя работу между процессами.
+
+    При генерации с зерном каждый шард начинается со своего номера пароля,
+    поэтому содержимое файла не зависит от количества процессов.
+
+    Args:
+        output (str): Путь к итоговому файлу.
+        count (int): Общее количество паролей.
+        workers (int): Количество процессов. По умолчанию 1.
+        output_format (str): Формат строк для utils.write_passwords. По умолчанию 'plain'.
+        mode (str): Режим генерации (см. open_stream). По умолчанию 'password'.
+        seed: Зерно детерминированной генерации. По умолчанию None.
+        start (int): Номер первого пароля при генерации с зерном. По умолчанию 0.
+        **params: Параметры режима генерации (см. open_stream).
+
+    Returns:
+        int: Количество записанных паролей.
+
+    Raises:
+        ValueError: Если количество паролей или процессов меньше 1.
+    """
+    if count < 1:
+        raise ValueError("Количество паролей должно быть не менее 1")
+    if workers < 1:
+        raise ValueError("Количество процессов должно быть не менее 1")
+
+    shares = split_count(count, workers)
+    if len(shares) == 1:
+        write_shard(output, count, params, output_format, mode, seed, start)
+        return count
+
+    # Импорт пула процессов тянет multiprocessing и logging, поэтому
+    # откладывается до параллельной генерации, чтобы не замедлять запуск CLI.
+    from concurrent.futures import ProcessPoolExecutor
+
+    starts = [start + sum(shares[:i]) for i in range(len(shares))]
+    shard_dir = tempfile.mkdtemp(prefix='shards-', dir=os.path.dirname(os.path.abspath(output)))
+    shard_paths = [os.path.join(shard_dir, f'shard-{i}.txt') for i in range(len(shares))]
+    try:
+        with ProcessPoolExecutor(max_workers=len(shares)) as executor:
+            futures = [executor.submit(write_shard, path, share, params, output_format, mode,
+                                       seed, shard_start)
+                       for path, share, shard_start in zip(shard_paths, shares, starts)]
+            for future in futures:
+                future.result()
+        concatenate_shards(shard_paths, output)
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+    return count
@@ -3,38 +3,186 @@
 Содержит класс PasswordCommands с методами для обработки команд пользователя.
 """
 
-from generator import PasswordGenerator
-from storage import PasswordStorage
-from utils import print_password_information
-from getpass import getpass
+from agent import AGENT_TIMEOUT, AgentClient, agent_path
+from backends import DEFAULT_FILES
+from bulk import generate_to_file, keyspace, open_stream
+from completion import COMPLETE_LIMIT, completion_script
+from dedup import make_deduplicator, unique_passwords
+from generator import (PasswordGenerator, STREAM_BATCH_SIZE, DEFAULT_WORDLIST, DEFAULT_CORPUS,
+                       compile_policy)
+from fuzzy import FUZZY_LIMIT
+from importer import VERIFY_FIELDS, read_entries
+from kdf import MAX_ENTRY_MATCHES, entry_matcher
+from storage import DEFAULT_BACKEND, PasswordStorage, complete_services
+from utils import print_password_information, write_passwords
+from itertools import islice
+import functools
+import getpass
+import json
+import os
+import sys
+import time
+
+# Результат запроса, если агент хранилища не запущен (см. PasswordCommands._agent_request).
+NO_AGENT = object()
+
+def _option(args, name, default):
+    """Возвращает значение необязательного параметра команды.
+    
+    Позволяет вызывать команды с объектом аргументов, в котором заданы
+    не все параметры подкоманды.
+    
+    Args:
+        args: Аргументы командной строки.
+        name (str): Имя параметра.
+        default: Значение по умолчанию, если параметр не задан.
+    
+    Returns:
+        Значение параметра или default.
+    """
+    return vars(args).get(name, default)
+
+def _until(passwords, deadline):
+    """Выдает пароли из потока, пока не наступит указанный момент времени.
+    
+    Args:
+        passwords (iterable): Поток паролей.
+        deadline (float): Момент остановки по часам time.monotonic.
+    
+    Yields:
+        str: Очередной пароль.
+    """
+    for password in passwords:
+        if time.monotonic() >= deadline:
+            return
+        yield password
 
 class PasswordCommands:
     """Класс для обработки команд управления паролями.
     
     Attributes:
-        generator (PasswordGenerator): Генератор паролей.
-        storage (PasswordStorage): Хранилище паролей.
+        storage_file (str): Путь к файлу хранилища или None для файла движка.
+        backend (str): Имя движка хранения.
     """
-    def __init__(self):
-        """Инициализирует генератор и хранилище паролей."""
-        self.generator = PasswordGenerator()
-        self.storage = PasswordStorage()
+    def __init__(self, storage_file=None, backend=DEFAULT_BACKEND):
+        """Запоминает параметры хранилища.
+        
+        Генератор и хранилище создаются при первом обращении, поэтому
+        команды, которым хранилище не нужно (например, generate без --save),
+        не читают его с диска.
+        
+        Args:
+            storage_file (str): Путь к файлу хранилища. По умолчанию файл движка.
+            backend (str): Имя движка хранения. По умолчанию DEFAULT_BACKEND.
+        """
+        self.storage_file = storage_file
+        self.backend = backend
+    
+    @functools.cached_property
+    def generator(self):
+        """PasswordGenerator: Генератор паролей, создаваемый при первом обращении."""
+        return PasswordGenerator()
+    
+    @functools.cached_property
+    def storage(self):
+        """PasswordStorage: Хранилище паролей, открываемое при первом обращении."""
+        return PasswordStorage(self.storage_file, self.backend)
+    
+    @functools.cached_property
+    def agent(self):
+        """AgentClient: Соединение с агентом хранилища или None, если агент не запущен."""
+        storage_file = self.storage_file or DEFAULT_FILES.get(self.backend, 'passwords.json')
+        return AgentClient.connect(agent_path(storage_file))
+    
+    def _agent_request(self, op, **params):
+        """Выполняет запрос к агенту хранилища, если он запущен.
+        
+        Если соединение с агентом прервано, команда продолжает работу с
+        хранилищем сама.
+        
+        Args:
+            op (str): Имя операции (см. agentd.VaultAgent).
+            **params: Параметры операции.
+        
+        Returns:
+            Результат операции или NO_AGENT, если агент недоступен.
+        
+        Raises:
+            ValueError: Если агент вернул ошибку.
+        """
+        if self.agent is None:
+            return NO_AGENT
+        try:
+            return self.agent.request(op, **params)
+        except OSError:
+            self.agent.close()
+            self.agent = None
+            return NO_AGENT
         
     def generate_command(self, args):
         """Обрабатывает команду генерации пароля.
         
+        Невыполнимые параметры генерации (например, длина меньше суммы
+        минимумов по типам символов, отсутствующий список слов или корпус)
+        выводятся как ошибка. С зерном пароли генерируются воспроизводимо,
+        начиная с номера seed_offset, и не могут быть сохранены.
+        
         Args:
             args: Аргументы командной строки с параметрами генерации.
-            
-        Raises:
-            ValueError: При ошибках валидации параметров.
         """
-        password = self.generator.generate(
-            length=args.length,
-            use_uppercase=args.uppercase,
-            use_digits=args.digits,
-            use_special=args.special
-        )
+        seed = _option(args, 'seed', None)
+        if seed is not None:
+            if args.save:
+                print("Ошибка: пароли, сгенерированные с --seed, воспроизводимы и не сохраняются")
+                return
+            self.generator = PasswordGenerator(seed)
+            self.generator.seek(_option(args, 'seed_offset', 0))
+        
+        words = _option(args, 'words', None)
+        try:
+            if words:
+                mode = 'passphrase'
+                params = {
+                    'words': words,
+                    'wordlist': _option(args, 'wordlist', DEFAULT_WORDLIST),
+                    'separator': _option(args, 'separator', '-')
+                }
+                policy = None
+                self.generator.load_wordlist(params['wordlist'])
+            elif _option(args, 'pronounceable', False):
+                mode = 'pronounceable'
+                params = {
+                    'length': args.length,
+                    'use_uppercase': args.uppercase,
+                    'use_digits': args.digits,
+                    'use_special': args.special,
+                    'min_digits': _option(args, 'min_digits', 1),
+                    'min_special': _option(args, 'min_special', 1),
+                    'corpus': _option(args, 'corpus', DEFAULT_CORPUS)
+                }
+                policy = None
+                # Пустой пакет проверяет параметры и загружает модель, не
+                # расходуя номер пароля при генерации с зерном.
+                self.generator.generate_pronounceable_many(0, **params)
+            else:
+                mode = 'password'
+                params = self._generation_params(args)
+                policy = compile_policy(**params)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка генерации: {e}")
+            return
+        
+        count = _option(args, 'count', None)
+        if _option(args, 'stream', False):
+            self._generate_stream(args, count, mode, params, policy)
+            return
+        
+        count = count or 1
+        if count > 1 or _option(args, 'output', None) is not None:
+            self._generate_bulk(args, count, mode, params, policy)
+            return
+        
+        password = next(open_stream(self.generator, mode, params, 1, policy))
         
         print_password_information(password)
         
@@ -42,49 +190,383 @@ class PasswordCommands:
         if args.save:        
             service = input("Введите название сервиса: ")            
             username = input("Введите имя пользователя: ")
-            master_password = getpass("Введите мастер-пароль: ")
             
             try:
-                self.storage.store_password(service, username, password, master_password)
+                if self._agent_request('store', service=service, username=username,
+                                       password=password) is NO_AGENT:
+                    master_password = getpass.getpass("Введите мастер-пароль: ")
+                    self.storage.store_password(service, username, password, master_password)
                 print(f"Пароль для {service} сохранен!")
             except ValueError as e:
                 print(f"Ошибка сохранения: {e}")
             except Exception as e:
                 print(f"Неожиданная ошибка: {e}")
             
+    def _generate_bulk(self, args, count, mode, params, policy):
+        """Генерирует пакет паролей и выводит их по одному на строку.
+        
+        Если указан файл вывода, пароли записываются в него, при необходимости
+        несколькими процессами.
+        
+        Args:
+            args: Аргументы командной строки с параметрами генерации.
+            count (int): Количество паролей.
+            mode (str): Режим генерации (см. bulk.open_stream).
+            params (dict): Параметры режима генерации.
+            policy (PasswordPolicy): Скомпилированная политика для режима 'password'.
+        """
+        if args.save:
+            print("Ошибка: сохранение доступно только при генерации одного пароля")
+            return
+        
+        output = _option(args, 'output', None)
+        workers = _option(args, 'workers', 1)
+        output_format = _option(args, 'format', 'plain')
+        unique = _option(args, 'unique', False) or _option(args, 'unique_vault', False)
+        
+        if unique and keyspace(self.generator, mode, params, policy) < count:
+            print("Ошибка: при заданных параметрах невозможно получить столько уникальных паролей")
+        elif output is not None and not unique:
+            generate_to_file(output, count, workers=workers, output_format=output_format,
+                             mode=mode, seed=self.generator.seed, start=self.generator.position,
+                             **params)
+            print(f"Сгенерировано {count} паролей в файл {output}")
+        elif workers > 1:
+            print("Ошибка: параллельная генерация доступна только с --output и без --unique")
+        else:
+            passwords = open_stream(self.generator, mode, params,
+                                    min(count, STREAM_BATCH_SIZE), policy)
+            try:
+                passwords = islice(self._deduplicate(args, passwords, count), count)
+                if output is None:
+                    write_passwords(passwords, output_format=output_format)
+                else:
+                    with open(output, 'w', encoding='utf-8') as f:
+                        write_passwords(passwords, f, output_format)
+                    print(f"Сгенерировано {count} паролей в файл {output}")
+            except ValueError as e:
+                print(f"Ошибка: {e}")
+    
+    def _generate_stream(self, args, count, mode, params, policy):
+        """Выводит поток паролей до достижения количества или ограничения по времени.
+        
+        Без ограничений поток продолжается до закрытия stdout. Закрытие канала
+        читающей стороной (например, ``| head``) завершает вывод без трассировки.
+        
+        Args:
+            args: Аргументы командной строки с параметрами генерации.
+            count (int): Количество паролей или None для неограниченного потока.
+            mode (str): Режим генерации (см. bulk.open_stream).
+            params (dict): Параметры режима генерации.
+            policy (PasswordPolicy): Скомпилированная политика для режима 'password'.
+        """
+        unique = _option(args, 'unique', False) or _option(args, 'unique_vault', False)
+        if unique and count and keyspace(self.generator, mode, params, policy) < count:
+            print("Ошибка: при заданных параметрах невозможно получить столько уникальных паролей")
+            return
+        
+        batch_size = min(count, STREAM_BATCH_SIZE) if count else STREAM_BATCH_SIZE
+        time_limit = _option(args, 'time_limit', None)
+        try:
+            passwords = self._deduplicate(args, open_stream(self.generator, mode, params,
+                                                            batch_size, policy), count)
+            if count:
+                passwords = islice(passwords, count)
+            if time_limit:
+                passwords = _until(passwords, time.monotonic() + time_limit)
+            write_passwords(passwords, output_format=_option(args, 'format', 'plain'))
+        except ValueError as e:
+            print(f"Ошибка: {e}")
+        except BrokenPipeError:
+            # Перенаправляем stdout в /dev/null, чтобы при завершении
+            # интерпретатор не получил повторную ошибку при сбросе буфера.
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            
+    def _deduplicate(self, args, passwords, count):
+        """Оставляет в потоке только уникальные пароли, если это запрошено.
+        
+        С параметром unique_vault дедупликатор предварительно заполняется хешами
+        паролей прежнего формата из хранилища, а пароли, совпадающие с хешами
+        с солью, исключаются проверкой ключом мастер-пароля. Мастер-пароль
+        запрашивается, только если в хранилище есть хеши с солью. Каждый
+        пароль сравнивается с каждым хешем с солью, поэтому генерация
+        отклоняется, если сравнений больше MAX_ENTRY_MATCHES или количество
+        паролей не ограничено.
+        
+        Args:
+            args: Аргументы командной строки с параметрами генерации.
+            passwords (iterable): Поток паролей.
+            count (int): Ожидаемое количество паролей или None.
+        
+        Returns:
+            iterable: Исходный поток или поток уникальных паролей.
+        
+        Raises:
+            ValueError: Если мастер-пароль неверен или сравнение с хешами с
+                        солью заняло бы слишком много времени.
+        """
+        if not (_option(args, 'unique', False) or _option(args, 'unique_vault', False)):
+            return passwords
+        
+        hashes = []
+        salted = []
+        if _option(args, 'unique_vault', False):
+            hashes = list(self.storage.iter_password_hashes())
+            salted = list(self.storage.iter_salted_hashes())
+        if salted:
+            if count is None:
+                raise ValueError("для хранилища с хешами с солью --unique-vault требует --count")
+            if count * len(salted) > MAX_ENTRY_MATCHES:
+                raise ValueError(f"сравнение {count} паролей с {len(salted)} паролями хранилища"
+                                 f" заняло бы слишком много времени; уменьшите --count")
+            master_password = getpass.getpass("Введите мастер-пароль: ")
+            matches = entry_matcher(self.storage.unlock(master_password), salted)
+            passwords = (password for password in passwords if not matches(password))
+        deduplicator = make_deduplicator(count + len(hashes) if count else None)
+        for password_hash in hashes:
+            deduplicator.add_digest(bytes.fromhex(password_hash))
+        return unique_passwords(passwords, deduplicator)
+    
+    def _generation_params(self, args):
+        """Собирает параметры генерации из аргументов командной строки.
+        
+        Args:
+            args: Аргументы командной строки с параметрами генерации.
+        
+        Returns:
+            dict: Параметры для compile_policy.
+        """
+        return {
+            'length': args.length,
+            'use_uppercase': args.uppercase,
+            'use_digits': args.digits,
+            'use_special': args.special,
+            'exclude': _option(args, 'exclude', ''),
+            'min_lowercase': _option(args, 'min_lowercase', 1),
+            'min_uppercase': _option(args, 'min_uppercase', 1),
+            'min_digits': _option(args, 'min_digits', 1),
+            'min_special': _option(args, 'min_special', 1),
+            'exclude_ambiguous': _option(args, 'exclude_ambiguous', False),
+            'max_repeat': _option(args, 'max_repeat', None)
+        }
+            
     def find_command(self, args):
         """Обрабатывает команду поиска пароля по сервису.
         
+        С флагом --fuzzy выводит до --limit сервисов, ближайших к запросу по
+        расстоянию редактирования, вместо поиска по подстроке. Если запущен
+        агент хранилища, поиск выполняет он.
+        
         Args:
             args: Аргументы командной строки с названием сервиса.
         """
         service_name = args.service
-        results = self.storage.find_service(service_name)
+        if _option(args, 'fuzzy', False):
+            self._find_fuzzy(service_name, _option(args, 'limit', FUZZY_LIMIT))
+            return
+        results = self._agent_request('find', service=service_name)
+        if results is NO_AGENT:
+            results = {service: data['username']
+                       for service, data in self.storage.find_service(service_name).items()}
         
         
         if results:
             print(f"Найдено {len(results)} сервисов:")
-            for service, data in results.items():
-                print(f"  {service}: {data['username']}")
+            for service, username in results.items():
+                print(f"  {service}: {username}")
         else:
             print("Сервисы не найдены")
             
         
+    def _find_fuzzy(self, service_name, limit):
+        """Выводит сервисы, похожие на запрос, от ближайшего к дальнему.
+        
+        Args:
+            service_name (str): Название сервиса, возможно с опечатками.
+            limit (int): Максимальное количество результатов.
+        """
+        matches = self._agent_request('fuzzy', service=service_name, limit=limit)
+        if matches is NO_AGENT:
+            matches = [(service, distance, data['username'])
+                       for service, distance, data in self.storage.find_fuzzy(service_name, limit)]
+        if matches:
+            print(f"Похожие сервисы ({len(matches)}):")
+            for service, distance, username in matches:
+                print(f"  {service}: {username} (расстояние {distance})")
+        else:
+            print("Похожие сервисы не найдены")
+    
+    def complete_command(self, args):
+        """Обрабатывает скрытую команду автодополнения.
+        
+        Выводит по одному в строке названия сервисов, начинающиеся с
+        префикса, читая только индекс автодополнения, а с флагом --shell -
+        сценарий автодополнения для bash или zsh. Ошибки выводятся в stderr,
+        чтобы не попасть в варианты дополнения.
+        
+        Args:
+            args: Аргументы командной строки с префиксом названия сервиса.
+        """
+        shell = _option(args, 'shell', None)
+        if shell is not None:
+            main_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+            print(completion_script(shell, [sys.executable, main_file], _option(args, 'commands', ())),
+                  end='')
+            return
+        
+        try:
+            services = complete_services(_option(args, 'prefix', ''), self.storage_file, self.backend,
+                                         _option(args, 'limit', COMPLETE_LIMIT))
+        except (OSError, ValueError) as e:
+            print(f"Ошибка автодополнения: {e}", file=sys.stderr)
+            return
+        for service in services:
+            print(service)
+    
     def verify_command(self, args):
         """Обрабатывает команду проверки существования пароля.
         
+        С параметром --batch проверяет пары из файла (см. _verify_batch).
+        Если запущен агент хранилища, пароль проверяет он, и мастер-пароль
+        не запрашивается.
+        
         Args:
             args: Аргументы командной строки с названием сервиса.
         """
+        batch = _option(args, 'batch', None)
+        if batch is not None:
+            self._verify_batch(batch, _option(args, 'format', None))
+            return
         service = args.service
-        password = getpass("Введите пароль для проверки: ")
-        master_password = getpass("Введите мастер-пароль: ")
+        password = getpass.getpass("Введите пароль для проверки: ")
         
         
         try:
-            if self.storage.verify_password(service, password, master_password):
+            valid = self._agent_request('verify', service=service, password=password)
+            if valid is NO_AGENT:
+                master_password = getpass.getpass("Введите мастер-пароль: ")
+                valid = self.storage.verify_password(service, password, master_password)
+            if valid:
                 print("Пароль верный!")
             else:
                 print("Пароль неверный!")
         except Exception as e:
-            print(f"Ошибка проверки: {e}")
\ No newline at end of file
+            print(f"Ошибка проверки: {e}")
+    
+    def _verify_batch(self, path, input_format):
+        """Проверяет пары сервис-пароль из файла CSV или JSONL.
+        
+        Мастер-пароль запрашивается и проверяется один раз, пары читаются
+        построчно, а результат каждой пары выводится строкой JSONL
+        ``{"service": ..., "valid": ...}``. Итог и скорость проверки
+        выводятся в stderr.
+        
+        Args:
+            path (str): Файл с полями service и password или '-' для stdin.
+            input_format (str): 'csv', 'jsonl' или None для определения по расширению.
+        """
+        master_password = getpass.getpass("Введите мастер-пароль: ")
+        checked = valid = 0
+        start = time.perf_counter()
+        try:
+            pairs = read_entries(path, input_format, VERIFY_FIELDS)
+            for service, result in self.storage.verify_many(pairs, master_password):
+                sys.stdout.write(json.dumps({'service': service, 'valid': result}) + '\n')
+                checked += 1
+                valid += result
+        except (OSError, ValueError) as e:
+            sys.stdout.flush()
+            print(f"Ошибка проверки: {e}", file=sys.stderr)
+            return
+        sys.stdout.flush()
+        
+        elapsed = time.perf_counter() - start
+        rate = checked / elapsed if elapsed > 0 else 0
+        print(f"Проверено {checked} паролей, верных {valid}, неверных {checked - valid} "
+              f"({rate:.0f} проверок/с)", file=sys.stderr)
+    
+    def import_command(self, args):
+        """Обрабатывает команду импорта паролей из файла CSV или JSONL.
+        
+        Мастер-пароль запрашивается один раз, ход импорта выводится в stderr.
+        
+        Args:
+            args: Аргументы командной строки с путем к файлу и его форматом.
+        """
+        master_password = getpass.getpass("Введите мастер-пароль: ")
+        
+        def progress(stored, skipped):
+            print(f"\rИмпортировано: {stored}, пропущено: {skipped}", end='', file=sys.stderr)
+        
+        try:
+            entries = read_entries(args.file, _option(args, 'format', None))
+            stored, skipped = self.storage.store_many(entries, master_password, progress)
+        except (OSError, ValueError) as e:
+            print(f"\nОшибка импорта: {e}", file=sys.stderr)
+            return
+        
+        print(file=sys.stderr)
+        print(f"Импортировано {stored} записей, пропущено {skipped} (сервис уже существует)")
+    
+    def migrate_command(self, args):
+        """Обрабатывает команду переноса хранилища на другой движок.
+        
+        Args:
+            args: Аргументы командной строки с именем движка и путем к новому хранилищу.
+        """
+        try:
+            target = self.storage.migrate(_option(args, 'target', None), args.to)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка переноса: {e}")
+            return
+        
+        count = sum(1 for _ in target.backend.records())
+        target.close()
+        print(f"Перенесено {count} записей в {target.storage_file} ({args.to})")
+    
+    def agent_command(self, args):
+        """Обрабатывает команду запуска и остановки агента хранилища.
+        
+        Агент (модуль agentd) запускается после проверки мастер-пароля и,
+        если не указан --foreground, продолжает работу в фоне. С флагом
+        --stop запущенный агент завершается.
+        
+        Args:
+            args: Аргументы командной строки с параметрами агента.
+        """
+        if _option(args, 'stop', False):
+            try:
+                stopped = self._agent_request('stop') is not NO_AGENT
+            except ValueError as e:
+                print(f"Ошибка остановки агента: {e}")
+                return
+            print("Агент остановлен" if stopped else "Агент не запущен")
+            return
+        
+        # Агент работает на asyncio, импорт которого занимает десятки
+        # миллисекунд, поэтому модуль откладывается до запуска агента,
+        # чтобы не замедлять остальные команды.
+        from agentd import VaultAgent, daemonize, listen
+        
+        try:
+            key = self.storage.unlock(getpass.getpass("Введите мастер-пароль: "))
+            sock = listen(agent_path(self.storage.storage_file))
+        except (OSError, ValueError) as e:
+            print(f"Ошибка запуска агента: {e}")
+            return
+        
+        path = sock.getsockname()
+        if not _option(args, 'foreground', False):
+            # Хранилище открывается заново в фоновом процессе: соединение
+            # SQLite нельзя использовать после fork. Ключ мастер-пароля
+            # передается агенту, поэтому повторно не формируется.
+            self.storage.close()
+            del self.storage
+            if daemonize():
+                sock.close()
+                print(f"Агент запущен: {path}")
+                return
+        else:
+            print(f"Агент запущен: {path}")
+        VaultAgent(self.storage, key, _option(args, 'timeout', AGENT_TIMEOUT), sock).run()
@@ -0,0 +1,265 @@
+"""Модуль автодополнения названий сервисов в командной оболочке.
+
+Содержит класс CompletionIndex - отсортированный индекс названий сервисов
+для поиска по префиксу и сценарии автодополнения для bash и zsh.
+
+Индекс хранит номера сервисов, упорядоченные по названию в нижнем
+регистре, поэтому названия с заданным префиксом образуют непрерывный
+отрезок, который находится двоичным поиском прямо в отображении файла в
+память. Файл индекса устроен как у триграммного индекса (см.
+trigram.ServiceIndex), а хранилище обновляет его при каждой записи, чтобы
+команде complete не приходилось читать само хранилище.
+"""
+
+import heapq
+import shlex
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+from trigram import ServiceIndex
+
+COMPLETE_SUFFIX = '.complete'
+COMPLETE_MAGIC = b'CMP1'
+COMPLETE_VERSION = 1
+COMPLETE_LIMIT = 100
+SHELLS = ('bash', 'zsh')
+
+BASH_SCRIPT = r'''# Автодополнение CLI Password Generator для bash.
+# Подключение: eval "$(python main.py complete --shell bash)"
+pwgen() {
+    @COMMAND@ "$@"
+}
+
+_pwgen() {
+    local cur=${COMP_WORDS[COMP_CWORD]} command= word i
+    local -a options=()
+    local -i positional=0
+    for ((i = 1; i < COMP_CWORD; i++)); do
+        word=${COMP_WORDS[i]}
+        case $word in
+            --backend|--storage) options+=("$word" "${COMP_WORDS[i + 1]}"); ((i++)) ;;
+            --*) [[ $word == --limit ]] && ((i++)) ;;
+            -*) ;;
+            *) if [[ -z $command ]]; then command=$word; else ((positional++)); fi ;;
+        esac
+    done
+    if [[ -z $command ]]; then
+        COMPREPLY=($(compgen -W "@COMMANDS@" -- "$cur"))
+    elif [[ ($command == find || $command == verify) && $cur != -* ]] && ((positional == 0)); then
+        local IFS=$'\n'
+        COMPREPLY=($(pwgen "${options[@]}" complete -- "$cur" 2>/dev/null))
+    fi
+}
+complete -F _pwgen pwgen
+'''
+
+ZSH_SCRIPT = r'''# Автодополнение CLI Password Generator для zsh.
+# Подключение: eval "$(python main.py complete --shell zsh)"
+pwgen() {
+    @COMMAND@ "$@"
+}
+
+_pwgen() {
+    local command= word i
+    local -a options services
+    local -i positional=0
+    for ((i = 2; i < CURRENT; i++)); do
+        word=${words[i]}
+        case $word in
+            --backend|--storage) options+=("$word" "${words[i + 1]}"); ((i++)) ;;
+            --*) [[ $word == --limit ]] && ((i++)) ;;
+            -*) ;;
+            *) if [[ -z $command ]]; then command=$word; else ((positional++)); fi ;;
+        esac
+    done
+    if [[ -z $command ]]; then
+        compadd -- @COMMANDS@
+    elif [[ $command == (find|verify) && $PREFIX != -* ]] && ((positional == 0)); then
+        services=(${(f)"$(pwgen "${options[@]}" complete -- "$PREFIX" 2>/dev/null)"})
+        compadd -M 'm:{a-zA-Z}={A-Za-z}' -a services
+    fi
+}
+compdef _pwgen pwgen
+'''
+
+
+def _sort_key(name):
+    """Возвращает ключ упорядочения названий в индексе.
+
+    Args:
+        name (str): Название сервиса.
+
+    Returns:
+        tuple: Название в нижнем регистре и исходное название.
+    """
+    return name.lower(), name
+
+
+def completion_script(shell, command, commands):
+    """Возвращает сценарий автодополнения для командной оболочки.
+
+    Сценарий объявляет функцию pwgen, вызывающую CLI, и автодополнение
+    для нее: названия подкоманд и названия сервисов для find и verify.
+
+    Args:
+        shell (str): Оболочка из SHELLS.
+        command (list): Команда запуска CLI, например [sys.executable, 'main.py'].
+        commands (iterable): Названия подкоманд CLI.
+
+    Returns:
+        str: Текст сценария.
+
+    Raises:
+        ValueError: Если оболочка не поддерживается.
+    """
+    scripts = {'bash': BASH_SCRIPT, 'zsh': ZSH_SCRIPT}
+    if shell not in scripts:
+        raise ValueError(f"Неподдерживаемая оболочка: {shell}")
+    return (scripts[shell].replace('@COMMAND@', shlex.join(command))
+            .replace('@COMMANDS@', ' '.join(commands)))
+
+
+class CompletionIndex(ServiceIndex):
+    """Отсортированный индекс названий сервисов для поиска по префиксу.
+
+    Номера сервисов основной части, упорядоченные по названию, хранятся в
+    отображении файла в память, а сервисы, добавленные позже, - в
+    отсортированном списке в памяти.
+    """
+    SUFFIX = COMPLETE_SUFFIX
+    MAGIC = COMPLETE_MAGIC
+    VERSION = COMPLETE_VERSION
+    EAGER = True
+
+    def __init__(self):
+        """Создает пустой индекс."""
+        super().__init__()
+        self._order = ()
+        self._delta = []
+
+    def _index_service(self, number, key):
+        """Вставляет сервис в отсортированный список добавленных сервисов.
+
+        Args:
+            number (int): Номер сервиса.
+            key (str): Название сервиса в нижнем регистре.
+        """
+        self._delta.insert(bisect_left(self._delta, (key,)), (key, number))
+
+    @classmethod
+    def build(cls, services):
+        """Строит индекс по названиям сервисов одной сортировкой.
+
+        Args:
+            services (iterable): Названия сервисов.
+
+        Returns:
+            CompletionIndex: Индекс.
+        """
+        index = cls()
+        index._added = list(services)
+        index._order = array('I', sorted(range(len(index._added)), key=index._number_key))
+        return index
+
+    def _number_key(self, number):
+        """Возвращает ключ упорядочения сервиса по его номеру.
+
+        Args:
+            number (int): Номер сервиса.
+
+        Returns:
+            tuple: Ключ упорядочения (см. _sort_key).
+        """
+        return _sort_key(self.name(number))
+
+    def _lower_bound(self, prefix):
+        """Находит первую позицию основной части с названием не меньше префикса.
+
+        Args:
+            prefix (str): Префикс в нижнем регистре.
+
+        Returns:
+            int: Позиция в упорядоченных номерах.
+        """
+        low, high = 0, len(self._order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.name(self._order[middle]).lower() < prefix:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _base_matches(self, prefix):
+        """Перебирает сервисы основной части с заданным префиксом.
+
+        Args:
+            prefix (str): Префикс в нижнем регистре.
+
+        Yields:
+            tuple: Ключ упорядочения и название сервиса.
+        """
+        for position in range(self._lower_bound(prefix), len(self._order)):
+            key = self._number_key(self._order[position])
+            if not key[0].startswith(prefix):
+                return
+            yield key
+
+    def _delta_matches(self, prefix):
+        """Перебирает добавленные сервисы с заданным префиксом.
+
+        Args:
+            prefix (str): Префикс в нижнем регистре.
+
+        Yields:
+            tuple: Ключ упорядочения и название сервиса.
+        """
+        for position in range(bisect_left(self._delta, (prefix,)), len(self._delta)):
+            key, number = self._delta[position]
+            if not key.startswith(prefix):
+                return
+            yield key, self.name(number)
+
+    def complete(self, prefix, limit=COMPLETE_LIMIT):
+        """Находит сервисы, название которых начинается с префикса без учета регистра.
+
+        Args:
+            prefix (str): Начало названия сервиса.
+            limit (int): Максимальное количество результатов. По умолчанию COMPLETE_LIMIT.
+
+        Returns:
+            list: Названия сервисов в порядке сортировки без учета регистра.
+        """
+        prefix = prefix.lower()
+        matches = heapq.merge(self._base_matches(prefix), sorted(self._delta_matches(prefix)))
+        return [name for _, name in islice(matches, limit)]
+
+    def _dump_body(self):
+        """Возвращает номера всех сервисов, упорядоченные по названию.
+
+        Returns:
+            list: Фрагменты данных в байтах.
+        """
+        order = self._order
+        if self._delta:
+            added = sorted((number for _, number in self._delta), key=self._number_key)
+            order = array('I', heapq.merge(order, added, key=self._number_key))
+        return [bytes(order)]
+
+    def _load_body(self, body):
+        """Отображает упорядоченные номера сервисов.
+
+        Args:
+            body (memoryview): Данные индекса.
+
+        Returns:
+            bool: True.
+
+        Raises:
+            ValueError: Если данные индекса повреждены.
+        """
+        if len(body) != 4 * self._base_count:
+            raise ValueError("Файл индекса поврежден")
+        self._order = self._map_view(body, 'I')
+        return True
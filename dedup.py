@@ -0,0 +1,264 @@
+"""Модуль устранения повторов при массовой генерации паролей.
+
+Содержит дедупликаторы с общим интерфейсом: точное множество дайджестов
+для небольших пакетов, фильтр Блума с ограниченным расходом памяти для
+больших и растущий набор фильтров Блума для потоков без ограничения размера.
+Оба работают с дайджестами SHA-256, поэтому могут быть предзаполнены хешами
+паролей из хранилища PasswordStorage.
+"""
+
+import hashlib
+import math
+
+EXACT_LIMIT = 100000
+DEFAULT_ERROR_RATE = 1e-6
+DEFAULT_BLOOM_CAPACITY = 10000000
+# Во сколько раз каждый следующий фильтр растущего набора больше предыдущего
+# и во сколько раз меньше его доля ложных срабатываний.
+BLOOM_GROWTH = 2
+BLOOM_TIGHTENING = 0.5
+# Количество повторов подряд, после которого поток считается исчерпанным.
+MAX_DUPLICATE_RUN = 1000000
+
+
+def password_digest(password):
+    """Вычисляет дайджест пароля, совместимый с хешами хранилища.
+
+    Args:
+        password (str): Пароль.
+
+    Returns:
+        bytes: Дайджест SHA-256 пароля (32 байта).
+    """
+    return hashlib.sha256(password.encode()).digest()
+
+
+class ExactDeduplicator():
+    """Точный дедупликатор на основе множества дайджестов.
+
+    Attributes:
+        digests (set): Дайджесты уже встреченных паролей.
+    """
+    def __init__(self):
+        """Инициализирует пустое множество дайджестов."""
+        self.digests = set()
+
+    def add_digest(self, digest):
+        """Добавляет дайджест, если он еще не встречался.
+
+        Args:
+            digest (bytes): Дайджест пароля.
+
+        Returns:
+            bool: True, если дайджест новый.
+        """
+        if digest in self.digests:
+            return False
+        self.digests.add(digest)
+        return True
+
+    def add(self, password):
+        """Добавляет пароль, если он еще не встречался.
+
+        Args:
+            password (str): Пароль.
+
+        Returns:
+            bool: True, если пароль новый.
+        """
+        return self.add_digest(password_digest(password))
+
+
+class BloomDeduplicator():
+    """Дедупликатор на основе фильтра Блума.
+
+    Фильтр не дает ложноотрицательных ответов, поэтому пропущенный им пароль
+    гарантированно новый. Ложноположительный ответ лишь отбрасывает уникальный
+    пароль, и генератор выдает вместо него следующий, так что уникальность
+    пакета сохраняется без точной проверки. Доля ложных срабатываний
+    соответствует error_rate, пока в фильтре не больше capacity элементов,
+    а дальше растет, поэтому для потока неизвестного размера используется
+    ScalableBloomDeduplicator.
+
+    Attributes:
+        capacity (int): Расчетное количество элементов.
+        error_rate (float): Допустимая доля ложных срабатываний.
+        size (int): Размер битового массива в битах.
+        hashes (int): Количество хеш-функций.
+        count (int): Количество добавленных элементов.
+    """
+    def __init__(self, capacity=DEFAULT_BLOOM_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        """Выделяет битовый массив под заданную емкость и долю ложных срабатываний.
+
+        Args:
+            capacity (int): Расчетное количество элементов. По умолчанию DEFAULT_BLOOM_CAPACITY.
+            error_rate (float): Допустимая доля ложных срабатываний.
+                                По умолчанию DEFAULT_ERROR_RATE.
+        """
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def contains_digest(self, digest):
+        """Проверяет, содержит ли фильтр дайджест.
+
+        Args:
+            digest (bytes): Дайджест пароля.
+
+        Returns:
+            bool: True, если дайджест, возможно, уже добавлен.
+        """
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:16], 'little') | 1
+        bits = self._bits
+        size = self.size
+        for i in range(self.hashes):
+            position = (first + i * second) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add_digest(self, digest):
+        """Добавляет дайджест, если фильтр его еще не содержит.
+
+        Позиции битов вычисляются двойным хешированием по двум 64-битным
+        частям дайджеста.
+
+        Args:
+            digest (bytes): Дайджест пароля.
+
+        Returns:
+            bool: True, если дайджест новый.
+        """
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:16], 'little') | 1
+        bits = self._bits
+        size = self.size
+        new = False
+        for i in range(self.hashes):
+            position = (first + i * second) % size
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                new = True
+        self.count += new
+        return new
+
+    def add(self, password):
+        """Добавляет пароль, если фильтр его еще не содержит.
+
+        Args:
+            password (str): Пароль.
+
+        Returns:
+            bool: True, если пароль новый.
+        """
+        return self.add_digest(password_digest(password))
+
+
+class ScalableBloomDeduplicator():
+    """Дедупликатор на основе растущего набора фильтров Блума.
+
+    Новые элементы добавляются в последний фильтр. Когда он заполняется
+    до расчетной емкости, добавляется следующий фильтр в BLOOM_GROWTH раз
+    больше с долей ложных срабатываний в 1 / BLOOM_TIGHTENING раз меньше.
+    Поэтому общая доля ложных срабатываний не превышает
+    error_rate / (1 - BLOOM_TIGHTENING) при любом размере потока, а память
+    растет пропорционально количеству элементов.
+
+    Attributes:
+        filters (list): Фильтры Блума от первого к последнему.
+    """
+    def __init__(self, capacity=DEFAULT_BLOOM_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        """Создает набор из одного фильтра.
+
+        Args:
+            capacity (int): Емкость первого фильтра. По умолчанию DEFAULT_BLOOM_CAPACITY.
+            error_rate (float): Доля ложных срабатываний первого фильтра.
+                                По умолчанию DEFAULT_ERROR_RATE.
+        """
+        self.filters = [BloomDeduplicator(capacity, error_rate)]
+
+    def add_digest(self, digest):
+        """Добавляет дайджест, если ни один фильтр его еще не содержит.
+
+        Args:
+            digest (bytes): Дайджест пароля.
+
+        Returns:
+            bool: True, если дайджест новый.
+        """
+        *full, last = self.filters
+        if any(bloom.contains_digest(digest) for bloom in full) or not last.add_digest(digest):
+            return False
+        if last.count >= last.capacity:
+            self.filters.append(BloomDeduplicator(last.capacity * BLOOM_GROWTH,
+                                                  last.error_rate * BLOOM_TIGHTENING))
+        return True
+
+    def add(self, password):
+        """Добавляет пароль, если ни один фильтр его еще не содержит.
+
+        Args:
+            password (str): Пароль.
+
+        Returns:
+            bool: True, если пароль новый.
+        """
+        return self.add_digest(password_digest(password))
+
+
+def make_deduplicator(expected, exact_limit=EXACT_LIMIT, error_rate=DEFAULT_ERROR_RATE):
+    """Выбирает дедупликатор по ожидаемому количеству элементов.
+
+    Args:
+        expected (int): Ожидаемое количество элементов или None, если оно неизвестно.
+        exact_limit (int): Наибольшее количество элементов для точного множества.
+                           По умолчанию EXACT_LIMIT.
+        error_rate (float): Доля ложных срабатываний фильтра Блума.
+                            По умолчанию DEFAULT_ERROR_RATE.
+
+    Returns:
+        ExactDeduplicator | BloomDeduplicator | ScalableBloomDeduplicator:
+            Дедупликатор; для неизвестного количества - растущий набор
+            фильтров Блума.
+    """
+    if expected is None:
+        return ScalableBloomDeduplicator(error_rate=error_rate)
+    if expected <= exact_limit:
+        return ExactDeduplicator()
+    return BloomDeduplicator(expected, error_rate)
+
+
+def unique_passwords(passwords, deduplicator, max_duplicate_run=MAX_DUPLICATE_RUN):
+    """Пропускает из потока только пароли, которых еще не было.
+
+    Если поток выдает max_duplicate_run повторов подряд, пространство
+    паролей считается исчерпанным: без этого ограничения ожидание нового
+    пароля было бы бесконечным.
+
+    Args:
+        passwords (iterable): Поток паролей.
+        deduplicator: Дедупликатор с методом add.
+        max_duplicate_run (int): Допустимое количество повторов подряд.
+                                 По умолчанию MAX_DUPLICATE_RUN.
+
+    Yields:
+        str: Очередной уникальный пароль.
+
+    Raises:
+        ValueError: Если поток выдал max_duplicate_run повторов подряд.
+    """
+    add = deduplicator.add
+    duplicates = 0
+    for password in passwords:
+        if add(password):
+            duplicates = 0
+            yield password
+            continue
+        duplicates += 1
+        if duplicates >= max_duplicate_run:
+            raise ValueError(f"{duplicates} повторов подряд: пространство паролей исчерпано")
@@ -0,0 +1,247 @@
+"""Модуль нечеткого поиска сервисов по расстоянию редактирования.
+
+Содержит класс FuzzyIndex - индекс удалений в духе SymSpell. Для каждого
+названия сервиса в нижнем регистре индекс хранит все строки, получаемые
+удалением не более MAX_DISTANCE символов из его первых PREFIX_LENGTH
+символов. Если расстояние Левенштейна между запросом и названием не
+больше MAX_DISTANCE, у их префиксов найдется общая строка удалений, поэтому
+кандидатов дает поиск удалений запроса в индексе, а точное расстояние
+вычисляется только для них.
+
+Строки удалений хранятся в виде CRC-32 в отсортированном массиве, который
+отображается в память при загрузке. Совпадения хешей отсеиваются
+вычислением расстояния. Файл индекса устроен как у триграммного индекса
+(см. trigram.ServiceIndex).
+"""
+
+import struct
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+
+from trigram import ServiceIndex
+
+FUZZY_SUFFIX = '.fuzzy'
+FUZZY_MAGIC = b'FZY1'
+FUZZY_VERSION = 1
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+FUZZY_LIMIT = 5
+# Максимальное расстояние, длина префикса и число записей индекса.
+FUZZY_PARAMS = struct.Struct('<BBQ')
+
+
+def deletes(word, distance=MAX_DISTANCE):
+    """Возвращает строки, получаемые удалением не более distance символов.
+
+    Args:
+        word (str): Строка.
+        distance (int): Максимальное число удаляемых символов.
+
+    Returns:
+        set: Строки удалений, включая саму строку.
+    """
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {item[:i] + item[i + 1:] for item in frontier for i in range(len(item))}
+        result |= frontier
+    return result
+
+
+def _delete_hashes(key):
+    """Возвращает хеши строк удалений префикса названия.
+
+    Args:
+        key (str): Название или запрос в нижнем регистре.
+
+    Returns:
+        set: CRC-32 строк удалений в UTF-8.
+    """
+    return {zlib.crc32(item.encode('utf-8')) for item in deletes(key[:PREFIX_LENGTH])}
+
+
+def edit_distance(first, second, limit=MAX_DISTANCE):
+    """Вычисляет расстояние Левенштейна с отсечением по пределу.
+
+    Общие начало и конец строк отбрасываются, а из таблицы вычисляются
+    только клетки на расстоянии не больше limit от диагонали: путь через
+    остальные клетки дает расстояние больше предела.
+
+    Args:
+        first (str): Первая строка.
+        second (str): Вторая строка.
+        limit (int): Предел расстояния. По умолчанию MAX_DISTANCE.
+
+    Returns:
+        int: Расстояние или limit + 1, если оно больше предела.
+    """
+    if len(first) > len(second):
+        first, second = second, first
+    over = limit + 1
+    if len(second) - len(first) > limit:
+        return over
+    start = 0
+    while start < len(first) and first[start] == second[start]:
+        start += 1
+    end = 0
+    while end < len(first) - start and first[-1 - end] == second[-1 - end]:
+        end += 1
+    first = first[start:len(first) - end]
+    second = second[start:len(second) - end]
+    width = len(second)
+    previous = list(range(width + 1))
+    for i, char in enumerate(first, 1):
+        current = [over] * (width + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = current[0]
+        for j in range(max(1, i - limit), min(width, i + limit) + 1):
+            cost = previous[j - 1] + (char != second[j - 1])
+            if previous[j] < cost:
+                cost = previous[j] + 1
+            if current[j - 1] < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return over
+        previous = current
+    return min(previous[width], over)
+
+
+def _split_entries(entries):
+    """Раскладывает отсортированные записи индекса на массивы хешей и номеров.
+
+    Args:
+        entries (list): Записи вида ``хеш << 32 | номер`` в порядке возрастания.
+
+    Returns:
+        tuple: Массивы array('I') хешей и номеров сервисов.
+    """
+    hashes = array('I', (entry >> 32 for entry in entries))
+    numbers = array('I', (entry & 0xFFFFFFFF for entry in entries))
+    return hashes, numbers
+
+
+class FuzzyIndex(ServiceIndex):
+    """Индекс удалений для поиска сервисов с опечатками.
+
+    Записи основной части - пары массивов (хеш удаления, номер сервиса),
+    отсортированные по хешу и отображенные в память. Удаления сервисов,
+    добавленных позже, хранятся в словаре в памяти.
+    """
+    SUFFIX = FUZZY_SUFFIX
+    MAGIC = FUZZY_MAGIC
+    VERSION = FUZZY_VERSION
+
+    def __init__(self):
+        """Создает пустой индекс."""
+        super().__init__()
+        self._hashes = ()
+        self._numbers = ()
+        self._delta = {}
+
+    def _index_service(self, number, key):
+        """Добавляет удаления префикса названия сервиса.
+
+        Args:
+            number (int): Номер сервиса.
+            key (str): Название сервиса в нижнем регистре.
+        """
+        delta = self._delta
+        for delete_hash in _delete_hashes(key):
+            numbers = delta.get(delete_hash)
+            if numbers is None:
+                delta[delete_hash] = [number]
+            else:
+                numbers.append(number)
+
+    @classmethod
+    def build(cls, services):
+        """Строит индекс по названиям сервисов сразу в виде отсортированных массивов.
+
+        Args:
+            services (iterable): Названия сервисов.
+
+        Returns:
+            FuzzyIndex: Индекс.
+        """
+        index = cls()
+        entries = array('Q')
+        for number, service in enumerate(services):
+            index._added.append(service)
+            entries.extend(delete_hash << 32 | number
+                           for delete_hash in _delete_hashes(service.lower()))
+        index._hashes, index._numbers = _split_entries(sorted(entries))
+        return index
+
+    def search(self, query, limit=FUZZY_LIMIT):
+        """Находит сервисы, ближайшие к запросу по расстоянию редактирования.
+
+        Сравнение выполняется без учета регистра по всему названию.
+
+        Args:
+            query (str): Название сервиса, возможно с опечатками.
+            limit (int): Максимальное количество результатов. По умолчанию FUZZY_LIMIT.
+
+        Returns:
+            list: Пары (название, расстояние) с расстоянием не больше
+                  MAX_DISTANCE, упорядоченные по расстоянию, а при равенстве -
+                  по порядку добавления.
+        """
+        query = query.lower()
+        candidates = set()
+        for delete_hash in _delete_hashes(query):
+            start = bisect_left(self._hashes, delete_hash)
+            end = bisect_right(self._hashes, delete_hash, start)
+            candidates.update(self._numbers[start:end])
+            candidates.update(self._delta.get(delete_hash, ()))
+
+        matches = []
+        for number in candidates:
+            name = self.name(number)
+            distance = edit_distance(query, name.lower())
+            if distance <= MAX_DISTANCE:
+                matches.append((distance, number, name))
+        matches.sort()
+        return [(name, distance) for distance, _, name in matches[:limit]]
+
+    def _dump_body(self):
+        """Возвращает параметры индекса и отсортированные массивы хешей и номеров.
+
+        Returns:
+            list: Фрагменты данных в байтах.
+        """
+        hashes, numbers = self._hashes, self._numbers
+        if self._delta:
+            entries = array('Q', (delete_hash << 32 | number
+                                  for delete_hash, number in zip(hashes, numbers)))
+            for delete_hash, added in self._delta.items():
+                entries.extend(delete_hash << 32 | number for number in added)
+            hashes, numbers = _split_entries(sorted(entries))
+        return [FUZZY_PARAMS.pack(MAX_DISTANCE, PREFIX_LENGTH, len(hashes)),
+                bytes(hashes), bytes(numbers)]
+
+    def _load_body(self, body):
+        """Отображает массивы хешей и номеров.
+
+        Args:
+            body (memoryview): Данные индекса.
+
+        Returns:
+            bool: False, если индекс построен с другими MAX_DISTANCE или PREFIX_LENGTH.
+
+        Raises:
+            ValueError: Если данные индекса повреждены.
+        """
+        max_distance, prefix_length, count = FUZZY_PARAMS.unpack_from(body)
+        if (max_distance, prefix_length) != (MAX_DISTANCE, PREFIX_LENGTH):
+            return False
+        hashes_end = FUZZY_PARAMS.size + 4 * count
+        if hashes_end + 4 * count != len(body):
+            raise ValueError("Файл индекса поврежден")
+        self._hashes = self._map_view(body[FUZZY_PARAMS.size:hashes_end], 'I')
+        self._numbers = self._map_view(body[hashes_end:], 'I')
+        return True
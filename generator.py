@@ -3,21 +3,417 @@
 Содержит класс PasswordGenerator для создания случайных паролей с различными параметрами.
 """
 
-import random
+import functools
+import hashlib
+import os
+import re
 import string
+from array import array
+
+from markov import MarkovModel
+from wordlist import Wordlist
+
+ENTROPY_BLOCK_SIZE = 65536
+SEED_BLOCK_SIZE = 64
+SEED_PERSON = b'pwgen-seed'
+STREAM_BATCH_SIZE = 10000
+
+CHAR_SETS = {
+    'lowercase': string.ascii_lowercase,
+    'uppercase': string.ascii_uppercase,
+    'digits': string.digits,
+    'special': '!@#$%^&*()_+-=[]{}|;:,.<>?'
+}
+AMBIGUOUS_CHARS = '0O1lI|'
+DEFAULT_WORDLIST = 'wordlist.txt'
+DEFAULT_CORPUS = 'corpus.txt'
+
+@functools.lru_cache(maxsize=64)
+def _translation_table(alphabet):
+    """Строит таблицу для отображения случайных байтов в символы алфавита.
+    
+    Байты, меньшие наибольшего кратного длине алфавита числа, отображаются
+    в символ ``alphabet[b % len(alphabet)]``, остальные удаляются. Такая
+    выборка с отклонением не дает смещения по модулю.
+    
+    Args:
+        alphabet (str): Алфавит из ASCII-символов длиной от 1 до 256.
+    
+    Returns:
+        tuple: Таблица для bytes.translate, удаляемые байты и доля
+               принимаемых байтов.
+    
+    Raises:
+        ValueError: Если алфавит пуст, слишком длинный или содержит не ASCII-символы.
+    """
+    if not 0 < len(alphabet) <= 256:
+        raise ValueError("Алфавит должен содержать от 1 до 256 символов")
+    if not alphabet.isascii():
+        raise ValueError("Алфавит должен состоять из ASCII-символов")
+    
+    size = len(alphabet)
+    limit = 256 - 256 % size
+    codes = alphabet.encode('ascii')
+    table = bytes(codes[b % size] if b < limit else 0 for b in range(256))
+    return table, bytes(range(limit, 256)), limit / 256
+
+class PasswordPolicy():
+    """Скомпилированная политика генерации паролей.
+    
+    Общий алфавит, таблицы выборки для каждого типа символов и число
+    обязательных символов вычисляются один раз при создании политики.
+    Для повторного использования одинаковых политик создавайте их через
+    compile_policy.
+    
+    Attributes:
+        length (int): Длина пароля.
+        classes (tuple): Включенные типы символов: кортежи (имя, алфавит, минимум).
+        exclude (str): Символы, исключенные из всех алфавитов.
+        alphabet (str): Общий алфавит пароля.
+        sampler (tuple): Таблица выборки для общего алфавита.
+        required (tuple): Пары (таблица выборки, минимум) для типов с минимумом больше нуля.
+        required_count (int): Общее число обязательных символов.
+        max_repeat (int): Максимум одинаковых символов подряд или None.
+        repeat_pattern (re.Pattern): Шаблон, находящий превышение max_repeat, или None.
+        char_classes (dict): Алфавит типа для каждого символа общего алфавита.
+    """
+    def __init__(self, length, classes, exclude='', max_repeat=None):
+        """Компилирует политику.
+        
+        Args:
+            length (int): Длина пароля.
+            classes (tuple): Кортежи (имя, алфавит, минимальное количество символов).
+            exclude (str): Символы, исключаемые из всех алфавитов. По умолчанию ''.
+            max_repeat (int): Максимум одинаковых символов подряд. По умолчанию
+                              None (без ограничения).
+        
+        Raises:
+            ValueError: Если длина пароля недостаточна для обязательных символов,
+                      после исключений алфавит типа символов пуст или слишком мал
+                      для ограничения повторов.
+        """
+        excluded = set(exclude)
+        compiled = []
+        for name, chars, minimum in classes:
+            chars = ''.join(c for c in chars if c not in excluded)
+            if not chars:
+                raise ValueError(f"После исключений не осталось символов типа '{name}'")
+            compiled.append((name, chars, minimum))
+            
+        self.length = length
+        self.classes = tuple(compiled)
+        self.exclude = exclude
+        self.alphabet = ''.join(chars for _, chars, _ in self.classes)
+        self.required = tuple((_translation_table(chars), minimum)
+                              for _, chars, minimum in self.classes if minimum > 0)
+        self.required_count = sum(minimum for _, minimum in self.required)
+        
+        if length < self.required_count:
+            raise ValueError("Длина пароля недостаточна для включенных типов символов")
+        self.sampler = _translation_table(self.alphabet)
+        
+        if max_repeat is not None:
+            if max_repeat < 1:
+                raise ValueError("Допустимое число повторов должно быть не менее 1")
+            # Замена символа, нарушающего ограничение, выбирается из его же типа
+            # и не должна совпадать с соседями, поэтому нужно хотя бы 3 символа.
+            if any(len(chars) < 3 for _, chars, _ in self.classes):
+                raise ValueError("Для ограничения повторов в каждом типе нужно не менее 3 символов")
+        self.max_repeat = max_repeat
+        self.repeat_pattern = (re.compile(r'(.)\1{%d}' % max_repeat, re.DOTALL)
+                               if max_repeat is not None else None)
+        self.char_classes = {c: chars for _, chars, _ in self.classes for c in chars}
+
+@functools.lru_cache(maxsize=128)
+def compile_policy(length=12, use_uppercase=True, use_digits=True, use_special=True, exclude='',
+                   min_lowercase=1, min_uppercase=1, min_digits=1, min_special=1,
+                   exclude_ambiguous=False, max_repeat=None):
+    """Возвращает скомпилированную политику для заданных параметров.
+    
+    Результат кешируется, поэтому повторные вызовы с теми же параметрами
+    возвращают один и тот же объект PasswordPolicy.
+    
+    Args:
+        length (int): Длина пароля. По умолчанию 12.
+        use_uppercase (bool): Использовать заглавные буквы. По умолчанию True.
+        use_digits (bool): Использовать цифры. По умолчанию True.
+        use_special (bool): Использовать специальные символы. По умолчанию True.
+        exclude (str): Символы, исключаемые из пароля. По умолчанию ''.
+        min_lowercase (int): Минимум строчных букв. По умолчанию 1.
+        min_uppercase (int): Минимум заглавных букв, если они включены. По умолчанию 1.
+        min_digits (int): Минимум цифр, если они включены. По умолчанию 1.
+        min_special (int): Минимум специальных символов, если они включены. По умолчанию 1.
+        exclude_ambiguous (bool): Исключить похожие символы AMBIGUOUS_CHARS.
+                                  По умолчанию False.
+        max_repeat (int): Максимум одинаковых символов подряд. По умолчанию None.
+    
+    Returns:
+        PasswordPolicy: Скомпилированная политика.
+    
+    Raises:
+        ValueError: Если политика невыполнима.
+    """
+    classes = [('lowercase', CHAR_SETS['lowercase'], min_lowercase)]
+    if use_uppercase:
+        classes.append(('uppercase', CHAR_SETS['uppercase'], min_uppercase))
+    if use_digits:
+        classes.append(('digits', CHAR_SETS['digits'], min_digits))
+    if use_special:
+        classes.append(('special', CHAR_SETS['special'], min_special))
+    if any(minimum < 0 for _, _, minimum in classes):
+        raise ValueError("Минимальное количество символов не может быть отрицательным")
+    if exclude_ambiguous:
+        exclude += AMBIGUOUS_CHARS
+    return PasswordPolicy(length, tuple(classes), exclude, max_repeat)
+
+class EntropyPool():
+    """Пул криптографически стойких случайных байтов.
+    
+    Байты запрашиваются у os.urandom крупными блоками и выдаются по мере
+    необходимости. После fork пул сбрасывается, чтобы дочерний процесс
+    не повторил байты родителя.
+    
+    Attributes:
+        block_size (int): Размер блока, запрашиваемого у os.urandom.
+    """
+    def __init__(self, block_size=ENTROPY_BLOCK_SIZE):
+        """Инициализирует пустой пул.
+        
+        Args:
+            block_size (int): Размер блока в байтах. По умолчанию ENTROPY_BLOCK_SIZE.
+        """
+        self.block_size = block_size
+        self._buffer = b''
+        self._position = 0
+        self._pid = os.getpid()
+        
+    def read(self, size):
+        """Возвращает следующие size случайных байтов, пополняя пул при нехватке.
+        
+        Args:
+            size (int): Количество байтов.
+        
+        Returns:
+            bytes: Случайные байты.
+        """
+        if self._pid != os.getpid():
+            self._buffer, self._position, self._pid = b'', 0, os.getpid()
+            
+        available = len(self._buffer) - self._position
+        if size > available:
+            self._buffer = (self._buffer[self._position:]
+                            + os.urandom(max(self.block_size, size - available)))
+            self._position = 0
+            
+        chunk = self._buffer[self._position:self._position + size]
+        self._position += size
+        return chunk
+    
+    def randbelow(self, n):
+        """Возвращает равномерно распределенное целое число из [0, n).
+        
+        Args:
+            n (int): Верхняя граница (не включается).
+        
+        Returns:
+            int: Случайное число.
+        
+        Raises:
+            ValueError: Если n не положительно.
+        """
+        if n <= 0:
+            raise ValueError("Верхняя граница должна быть положительной")
+        
+        nbytes = ((n - 1).bit_length() + 7) // 8 or 1
+        space = 1 << (8 * nbytes)
+        limit = space - space % n
+        while True:
+            value = int.from_bytes(self.read(nbytes), 'big')
+            if value < limit:
+                return value % n
+    
+    def randbelow_many(self, n, k):
+        """Возвращает k независимых равномерно распределенных чисел из [0, n).
+        
+        Случайные байты читаются одним блоком и разбираются как массив
+        беззнаковых чисел минимальной подходящей ширины, значения выше
+        наибольшего кратного n отбрасываются.
+        
+        Args:
+            n (int): Верхняя граница (не включается).
+            k (int): Количество чисел.
+        
+        Returns:
+            list: Список случайных чисел.
+        
+        Raises:
+            ValueError: Если n не положительно.
+        """
+        if n <= 0:
+            raise ValueError("Верхняя граница должна быть положительной")
+        if n > 1 << 32:
+            return [self.randbelow(n) for _ in range(k)]
+        
+        typecode = 'B' if n <= 1 << 8 else 'H' if n <= 1 << 16 else 'I'
+        width = array(typecode).itemsize
+        space = 1 << (8 * width)
+        limit = space - space % n
+        result = []
+        while len(result) < k:
+            need = k - len(result)
+            values = array(typecode, self.read(width * (int(need * space / limit) + 16)))
+            result.extend(value % n for value in values if value < limit)
+        return result[:k]
+    
+    def choices(self, alphabet, k):
+        """Выбирает k независимых равномерно распределенных символов алфавита.
+        
+        Отображение байтов в символы выполняется одним вызовом bytes.translate
+        на весь запрошенный блок.
+        
+        Args:
+            alphabet (str): Алфавит из ASCII-символов.
+            k (int): Количество символов.
+        
+        Returns:
+            str: Строка из k случайных символов.
+        """
+        return self.sample(_translation_table(alphabet), k)
+    
+    def sample(self, sampler, k):
+        """Выбирает k символов по заранее построенной таблице выборки.
+        
+        Args:
+            sampler (tuple): Результат _translation_table для алфавита.
+            k (int): Количество символов.
+        
+        Returns:
+            str: Строка из k случайных символов.
+        """
+        table, rejected, acceptance = sampler
+        result = b''
+        while len(result) < k:
+            need = k - len(result)
+            raw = self.read(int(need / acceptance) + 16)
+            result += raw.translate(table, rejected)
+        return result[:k].decode('ascii')
+
+class SeededEntropyPool(EntropyPool):
+    """Детерминированный пул псевдослучайных байтов для воспроизводимых данных.
+    
+    Байты вычисляются по счетчику: блок k потока s равен BLAKE2b(s, k) с ключом,
+    выведенным из зерна. Поэтому к любому потоку можно перейти за O(1), не
+    вычисляя предыдущие. Пул предназначен только для тестовых данных и
+    бенчмарков: пароли, полученные из известного зерна, не являются секретными.
+    
+    Attributes:
+        stream (int): Номер текущего потока.
+    """
+    def __init__(self, seed, stream=0):
+        """Выводит ключ из зерна и переходит к началу потока.
+        
+        Args:
+            seed (int | str | bytes): Зерно. Числа и строки с одинаковой
+                                      записью дают одинаковые потоки.
+            stream (int): Номер начального потока. По умолчанию 0.
+        """
+        if not isinstance(seed, bytes):
+            seed = str(seed).encode()
+        self.block_size = SEED_BLOCK_SIZE
+        self._key = hashlib.blake2b(seed, digest_size=64, person=SEED_PERSON).digest()
+        self._pid = os.getpid()
+        self.jump(stream)
+    
+    def jump(self, stream):
+        """Переходит к началу потока с указанным номером.
+        
+        Args:
+            stream (int): Номер потока от 0 до 2**64 - 1.
+        
+        Raises:
+            ValueError: Если номер потока вне допустимого диапазона.
+        """
+        if not 0 <= stream < 1 << 64:
+            raise ValueError("Номер потока должен быть от 0 до 2**64 - 1")
+        self.stream = stream
+        self._prefix = stream.to_bytes(8, 'little')
+        self._counter = 0
+        self._buffer = b''
+        self._position = 0
+    
+    def read(self, size):
+        """Возвращает следующие size байтов текущего потока.
+        
+        В отличие от EntropyPool, пул не сбрасывается после fork: одинаковые
+        зерно и номер потока дают одинаковые байты в любом процессе.
+        
+        Args:
+            size (int): Количество байтов.
+        
+        Returns:
+            bytes: Псевдослучайные байты.
+        """
+        available = len(self._buffer) - self._position
+        if size > available:
+            blocks = -(-(size - available) // SEED_BLOCK_SIZE)
+            start = self._counter
+            self._counter += blocks
+            self._buffer = self._buffer[self._position:] + b''.join(
+                hashlib.blake2b(self._prefix + counter.to_bytes(8, 'little'),
+                                digest_size=SEED_BLOCK_SIZE, key=self._key).digest()
+                for counter in range(start, self._counter))
+            self._position = 0
+        
+        chunk = self._buffer[self._position:self._position + size]
+        self._position += size
+        return chunk
 
 class PasswordGenerator():
-    """Класс для генерации паролей с настраиваемыми параметрами."""
-    def __init__(self):
-        """Инициализирует наборы символов для генерации паролей."""
-        self.chars_sets = {
-            'lowercase': string.ascii_lowercase,
-            'uppercase': string.ascii_uppercase,
-            'digits': string.digits,
-            'special': '!@#$%^&*()_+-=[]{}|;:,.<>?'
-        }
-        
-    def generate(self, length=12, use_uppercase=True, use_digits=True, use_special=True):
+    """Класс для генерации паролей с настраиваемыми параметрами.
+    
+    По умолчанию генератор использует криптографически стойкий EntropyPool.
+    Если передано зерно, используется SeededEntropyPool, и каждый пароль
+    (фраза) с номером n строится из собственного потока n. Последовательность
+    паролей тогда не зависит от размера пакетов, а к паролю с любым номером
+    можно перейти методом seek. Такой режим предназначен только для
+    воспроизводимых тестовых данных.
+    
+    Attributes:
+        seed: Зерно детерминированной генерации или None.
+        position (int): Номер следующего пароля в детерминированном режиме.
+    """
+    def __init__(self, seed=None):
+        """Инициализирует наборы символов и пул энтропии для генерации паролей.
+        
+        Args:
+            seed (int | str | bytes): Зерно для воспроизводимой генерации.
+                                      По умолчанию None - стойкая случайная генерация.
+        """
+        self.chars_sets = CHAR_SETS
+        self.seed = seed
+        self.position = 0
+        self.entropy = EntropyPool() if seed is None else SeededEntropyPool(seed)
+        self._wordlists = {}
+        self._markov_models = {}
+    
+    def seek(self, position):
+        """Переходит к паролю с указанным номером в детерминированном режиме.
+        
+        Предыдущие пароли не генерируются, поэтому переход выполняется за O(1).
+        
+        Args:
+            position (int): Номер следующего пароля.
+        
+        Raises:
+            ValueError: Если генератор создан без зерна или номер отрицательный.
+        """
+        if self.seed is None:
+            raise ValueError("Переход по номеру доступен только при генерации с зерном")
+        if position < 0:
+            raise ValueError("Номер пароля не может быть отрицательным")
+        self.position = position
+        
+    def generate(self, length=12, use_uppercase=True, use_digits=True, use_special=True, policy=None):
         """Генерирует случайный пароль с заданными параметрами.
         
         Гарантирует наличие хотя бы одного символа из каждого включенного типа.
@@ -27,6 +423,8 @@ class PasswordGenerator():
             use_uppercase (bool): Использовать заглавные буквы. По умолчанию True.
             use_digits (bool): Использовать цифры. По умолчанию True.
             use_special (bool): Использовать специальные символы. По умолчанию True.
+            policy (PasswordPolicy): Готовая политика. Если указана, остальные
+                                     параметры игнорируются.
         
         Returns:
             str: Сгенерированный пароль.
@@ -35,28 +433,338 @@ class PasswordGenerator():
             ValueError: Если длина пароля недостаточна для включенных типов символов
                       или все типы символов отключены.
         """
-        chars = self.chars_sets['lowercase']
+        return self.generate_many(1, length, use_uppercase, use_digits, use_special, policy)[0]
+    
+    def generate_many(self, count, length=12, use_uppercase=True, use_digits=True, use_special=True,
+                      policy=None):
+        """Генерирует сразу несколько паролей с одинаковыми параметрами.
         
-        if use_uppercase:
-            chars += self.chars_sets['uppercase']
-        if use_digits:
-            chars += self.chars_sets['digits']
-        if use_special:
-            chars += self.chars_sets['special']
-            
-            
-        password = []
-        
-        if use_uppercase:
-            password.append(random.choice(self.chars_sets['uppercase']))
-        if use_digits:
-            password.append(random.choice(self.chars_sets['digits']))
-        if use_special:
-            password.append(random.choice(self.chars_sets['special']))   
+        Случайные символы всех паролей выбираются из пула энтропии одним
+        блоком по таблицам скомпилированной политики. Обязательные символы
+        ставятся на случайные различные позиции, что эквивалентно
+        перемешиванию пароля, но требует лишь по одному случайному числу
+        на обязательный символ.
+        
+        Args:
+            count (int): Количество паролей.
+            length (int): Длина каждого пароля. По умолчанию 12.
+            use_uppercase (bool): Использовать заглавные буквы. По умолчанию True.
+            use_digits (bool): Использовать цифры. По умолчанию True.
+            use_special (bool): Использовать специальные символы. По умолчанию True.
+            policy (PasswordPolicy): Готовая политика. Если указана, остальные
+                                     параметры игнорируются.
+        
+        Returns:
+            list: Список сгенерированных паролей.
+        
+        Raises:
+            ValueError: Если количество паролей отрицательное или длина пароля
+                      недостаточна для включенных типов символов.
+        """
+        if count < 0:
+            raise ValueError("Количество паролей не может быть отрицательным")
+        if policy is None:
+            policy = compile_policy(length, use_uppercase, use_digits, use_special)
+        return self._per_index(count, lambda n: self._password_batch(n, policy))
+    
+    def _password_batch(self, count, policy):
+        """Генерирует пакет паролей по политике одним блоком энтропии.
+        
+        Args:
+            count (int): Количество паролей.
+            policy (PasswordPolicy): Политика генерации.
+        
+        Returns:
+            list: Список сгенерированных паролей.
+        """
+        length = policy.length
+        fill = self.entropy.sample(policy.sampler, count * length)
+        required_chars = [(self.entropy.sample(sampler, count * minimum), minimum)
+                          for sampler, minimum in policy.required]
+        
+        passwords = []
+        for i in range(count):
+            password = fill[i * length:(i + 1) * length]
+            if required_chars:
+                required = ''.join(chosen[i * minimum:(i + 1) * minimum]
+                                   for chosen, minimum in required_chars)
+                password = self._place_required(password, required)
+            if policy.repeat_pattern is not None and policy.repeat_pattern.search(password):
+                password = self._limit_repeats(password, policy)
+            passwords.append(password)
             
-        remaining_length = length - len(password)
-        password.extend(random.choice(chars) for _ in range(remaining_length))
+        return passwords
+    
+    def iter_passwords(self, length=12, use_uppercase=True, use_digits=True, use_special=True,
+                       batch_size=STREAM_BATCH_SIZE, policy=None):
+        """Бесконечно выдает пароли с заданными параметрами.
+        
+        Пароли генерируются пакетами по batch_size штук, поэтому расход памяти
+        не зависит от того, сколько паролей будет прочитано.
+        
+        Args:
+            length (int): Длина каждого пароля. По умолчанию 12.
+            use_uppercase (bool): Использовать заглавные буквы. По умолчанию True.
+            use_digits (bool): Использовать цифры. По умолчанию True.
+            use_special (bool): Использовать специальные символы. По умолчанию True.
+            batch_size (int): Размер пакета генерации. По умолчанию STREAM_BATCH_SIZE.
+            policy (PasswordPolicy): Готовая политика. Если указана, остальные
+                                     параметры генерации игнорируются.
+        
+        Yields:
+            str: Очередной сгенерированный пароль.
+        """
+        if policy is None:
+            policy = compile_policy(length, use_uppercase, use_digits, use_special)
+        while True:
+            yield from self.generate_many(batch_size, policy=policy)
+    
+    def load_wordlist(self, path=DEFAULT_WORDLIST):
+        """Возвращает список слов, открывая его при первом обращении.
+        
+        Открытый список кешируется, поэтому все парольные фразы генератора
+        используют одно отображение файла в память.
+        
+        Args:
+            path (str): Путь к файлу со списком слов. По умолчанию DEFAULT_WORDLIST.
+        
+        Returns:
+            Wordlist: Список слов.
+        
+        Raises:
+            FileNotFoundError: Если файл со списком слов не существует.
+            ValueError: Если список слов пуст.
+        """
+        wordlist = self._wordlists.get(path)
+        if wordlist is None:
+            wordlist = self._wordlists[path] = Wordlist(path)
+        return wordlist
+    
+    def generate_passphrase(self, words=6, wordlist=DEFAULT_WORDLIST, separator='-'):
+        """Генерирует парольную фразу по методу Diceware.
+        
+        Args:
+            words (int): Количество слов. По умолчанию 6.
+            wordlist (str): Путь к файлу со списком слов. По умолчанию DEFAULT_WORDLIST.
+            separator (str): Разделитель слов. По умолчанию '-'.
+        
+        Returns:
+            str: Парольная фраза.
+        """
+        return self.generate_passphrases(1, words, wordlist, separator)[0]
+    
+    def generate_passphrases(self, count, words=6, wordlist=DEFAULT_WORDLIST, separator='-'):
+        """Генерирует сразу несколько парольных фраз.
+        
+        Номера слов для всего пакета выбираются одним вызовом
+        EntropyPool.randbelow_many, слова читаются из отображенного в память списка.
+        
+        Args:
+            count (int): Количество парольных фраз.
+            words (int): Количество слов в фразе. По умолчанию 6.
+            wordlist (str): Путь к файлу со списком слов. По умолчанию DEFAULT_WORDLIST.
+            separator (str): Разделитель слов. По умолчанию '-'.
+        
+        Returns:
+            list: Список парольных фраз.
+        
+        Raises:
+            ValueError: Если количество фраз отрицательное или слов меньше одного.
+        """
+        if count < 0:
+            raise ValueError("Количество паролей не может быть отрицательным")
+        if words < 1:
+            raise ValueError("Парольная фраза должна содержать хотя бы одно слово")
+        
+        source = self.load_wordlist(wordlist)
+        
+        def batch(n):
+            numbers = self.entropy.randbelow_many(len(source), n * words)
+            return [separator.join([source[k] for k in numbers[i * words:(i + 1) * words]])
+                    for i in range(n)]
+        
+        return self._per_index(count, batch)
+    
+    def iter_passphrases(self, words=6, wordlist=DEFAULT_WORDLIST, separator='-',
+                         batch_size=STREAM_BATCH_SIZE):
+        """Бесконечно выдает парольные фразы пакетами по batch_size штук.
+        
+        Args:
+            words (int): Количество слов в фразе. По умолчанию 6.
+            wordlist (str): Путь к файлу со списком слов. По умолчанию DEFAULT_WORDLIST.
+            separator (str): Разделитель слов. По умолчанию '-'.
+            batch_size (int): Размер пакета генерации. По умолчанию STREAM_BATCH_SIZE.
+        
+        Yields:
+            str: Очередная парольная фраза.
+        """
+        while True:
+            yield from self.generate_passphrases(batch_size, words, wordlist, separator)
+    
+    def load_markov(self, corpus=DEFAULT_CORPUS):
+        """Возвращает марковскую модель корпуса, загружая ее при первом обращении.
+        
+        Args:
+            corpus (str): Путь к текстовому корпусу. По умолчанию DEFAULT_CORPUS.
         
-        random.shuffle(password)
+        Returns:
+            MarkovModel: Модель, загруженная из файла или обученная на корпусе.
+        
+        Raises:
+            FileNotFoundError: Если корпус не существует.
+            ValueError: Если в корпусе нет слов.
+        """
+        model = self._markov_models.get(corpus)
+        if model is None:
+            model = self._markov_models[corpus] = MarkovModel.load_or_train(corpus)
+        return model
+    
+    def generate_pronounceable(self, length=12, use_uppercase=True, use_digits=True,
+                               use_special=True, min_digits=1, min_special=1,
+                               corpus=DEFAULT_CORPUS):
+        """Генерирует произносимый пароль по марковской модели корпуса.
+        
+        Args:
+            length (int): Длина пароля. По умолчанию 12.
+            use_uppercase (bool): Начинать пароль с заглавной буквы. По умолчанию True.
+            use_digits (bool): Добавить цифры в конец пароля. По умолчанию True.
+            use_special (bool): Добавить специальные символы в конец пароля. По умолчанию True.
+            min_digits (int): Количество цифр. По умолчанию 1.
+            min_special (int): Количество специальных символов. По умолчанию 1.
+            corpus (str): Путь к текстовому корпусу. По умолчанию DEFAULT_CORPUS.
+        
+        Returns:
+            str: Сгенерированный пароль.
+        """
+        return self.generate_pronounceable_many(1, length, use_uppercase, use_digits, use_special,
+                                                min_digits, min_special, corpus)[0]
+    
+    def generate_pronounceable_many(self, count, length=12, use_uppercase=True, use_digits=True,
+                                    use_special=True, min_digits=1, min_special=1,
+                                    corpus=DEFAULT_CORPUS):
+        """Генерирует сразу несколько произносимых паролей.
+        
+        Буквенная часть пароля строится марковской цепью, затем при
+        необходимости первая буква делается заглавной, а в конец добавляются
+        цифры и специальные символы, чтобы пароль было легко продиктовать.
+        
+        Args:
+            count (int): Количество паролей.
+            length (int): Длина пароля. По умолчанию 12.
+            use_uppercase (bool): Начинать пароль с заглавной буквы. По умолчанию True.
+            use_digits (bool): Добавить цифры в конец пароля. По умолчанию True.
+            use_special (bool): Добавить специальные символы в конец пароля. По умолчанию True.
+            min_digits (int): Количество цифр. По умолчанию 1.
+            min_special (int): Количество специальных символов. По умолчанию 1.
+            corpus (str): Путь к текстовому корпусу. По умолчанию DEFAULT_CORPUS.
+        
+        Returns:
+            list: Список сгенерированных паролей.
+        
+        Raises:
+            ValueError: Если количество паролей отрицательное или длина пароля
+                      не оставляет места для букв.
+        """
+        if count < 0:
+            raise ValueError("Количество паролей не может быть отрицательным")
+        digits = min_digits if use_digits else 0
+        specials = min_special if use_special else 0
+        letters = length - digits - specials
+        if letters < 1:
+            raise ValueError("Длина пароля недостаточна для включенных типов символов")
+        
+        model = self.load_markov(corpus)
+        
+        def batch(n):
+            digit_chars = self.entropy.choices(CHAR_SETS['digits'], n * digits)
+            special_chars = self.entropy.choices(CHAR_SETS['special'], n * specials)
+            passwords = []
+            for i in range(n):
+                word = model.sample(self.entropy, letters)
+                if use_uppercase:
+                    word = word[0].upper() + word[1:]
+                passwords.append(word + digit_chars[i * digits:(i + 1) * digits]
+                                 + special_chars[i * specials:(i + 1) * specials])
+            return passwords
+        
+        return self._per_index(count, batch)
+    
+    def iter_pronounceable(self, batch_size=STREAM_BATCH_SIZE, **params):
+        """Бесконечно выдает произносимые пароли пакетами по batch_size штук.
+        
+        Args:
+            batch_size (int): Размер пакета генерации. По умолчанию STREAM_BATCH_SIZE.
+            **params: Параметры generate_pronounceable_many.
+        
+        Yields:
+            str: Очередной сгенерированный пароль.
+        """
+        while True:
+            yield from self.generate_pronounceable_many(batch_size, **params)
+    
+    def _per_index(self, count, batch):
+        """Генерирует пакет, в детерминированном режиме - по одному паролю на поток.
+        
+        Args:
+            count (int): Количество паролей.
+            batch (callable): Функция, генерирующая пакет из заданного числа паролей.
+        
+        Returns:
+            list: Список сгенерированных паролей.
+        """
+        if self.seed is None:
+            return batch(count)
+        
+        passwords = []
+        for _ in range(count):
+            self.entropy.jump(self.position)
+            passwords.extend(batch(1))
+            self.position += 1
+        return passwords
+    
+    def _place_required(self, password, required):
+        """Ставит обязательные символы на случайные различные позиции пароля.
+        
+        Args:
+            password (str): Пароль из случайных символов общего алфавита.
+            required (str): Обязательные символы.
+        
+        Returns:
+            str: Пароль с обязательными символами.
+        """
+        password = list(password)
+        # Частичное перемешивание Фишера-Йетса по списку позиций: первые
+        # len(required) позиций становятся случайной выборкой без повторов.
+        positions = list(range(len(password)))
+        for j, char in enumerate(required):
+            k = j + self.entropy.randbelow(len(positions) - j)
+            positions[j], positions[k] = positions[k], positions[j]
+            password[positions[j]] = char
+        return ''.join(password)
+    
+    def _limit_repeats(self, password, policy):
+        """Устраняет серии одинаковых символов длиннее policy.max_repeat.
+        
+        Символ, превышающий ограничение, заменяется случайным символом того же
+        типа, отличным от соседей, поэтому число символов каждого типа
+        сохраняется, а проход выполняется за O(длины пароля).
+        
+        Args:
+            password (str): Пароль с обязательными символами.
+            policy (PasswordPolicy): Политика с ограничением повторов.
+        
+        Returns:
+            str: Пароль без превышения ограничения повторов.
+        """
+        password = list(password)
+        run = 1
+        for i in range(1, len(password)):
+            run = run + 1 if password[i] == password[i - 1] else 1
+            if run > policy.max_repeat:
+                neighbours = {password[i - 1]}
+                if i + 1 < len(password):
+                    neighbours.add(password[i + 1])
+                candidates = [c for c in policy.char_classes[password[i]] if c not in neighbours]
+                password[i] = candidates[self.entropy.randbelow(len(candidates))]
+                run = 1
         return ''.join(password)
-        
\ No newline at end of file
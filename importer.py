@@ -0,0 +1,140 @@
+"""Модуль чтения файлов для импорта паролей в хранилище.
+
+Читает учетные записи из файлов CSV и JSONL построчно, поэтому расход
+памяти на чтение не зависит от размера файла. Каждая запись содержит
+поля service, username и password (IMPORT_FIELDS), а записи для пакетной
+проверки паролей - поля service и password (VERIFY_FIELDS).
+"""
+
+import csv
+import json
+import os
+import sys
+
+IMPORT_FIELDS = ('service', 'username', 'password')
+VERIFY_FIELDS = ('service', 'password')
+IMPORT_FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+
+def detect_format(path):
+    """Определяет формат файла импорта по расширению.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        str: 'csv' или 'jsonl'.
+
+    Raises:
+        ValueError: Если расширение файла не соответствует известному формату.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in IMPORT_FORMATS:
+        raise ValueError(f"Не удалось определить формат файла {path}, укажите --format")
+    return IMPORT_FORMATS[extension]
+
+
+def _entry(fields, line_number, names=IMPORT_FIELDS):
+    """Проверяет поля записи и возвращает ее в виде кортежа.
+
+    Args:
+        fields (dict): Поля записи.
+        line_number (int): Номер строки в файле для сообщения об ошибке.
+        names (tuple): Обязательные поля. По умолчанию IMPORT_FIELDS.
+
+    Returns:
+        tuple: Значения обязательных полей в порядке names.
+
+    Raises:
+        ValueError: Если обязательное поле отсутствует или пусто.
+    """
+    values = []
+    for name in names:
+        value = fields.get(name)
+        if not isinstance(value, str) or not value:
+            raise ValueError(f"Строка {line_number}: отсутствует поле {name}")
+        values.append(value)
+    return tuple(values)
+
+
+def read_csv(f, names=IMPORT_FIELDS):
+    """Читает записи из CSV-файла с заголовком.
+
+    Заголовок должен содержать обязательные столбцы (по умолчанию service,
+    username и password), остальные столбцы игнорируются.
+
+    Args:
+        f: Открытый текстовый файл.
+        names (tuple): Обязательные поля. По умолчанию IMPORT_FIELDS.
+
+    Yields:
+        tuple: Значения обязательных полей, например название сервиса, имя
+               пользователя и пароль.
+
+    Raises:
+        ValueError: Если в заголовке нет обязательных столбцов или строка неполная.
+    """
+    reader = csv.DictReader(f)
+    missing = [name for name in names if name not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"В заголовке CSV нет столбцов: {', '.join(missing)}")
+    for row in reader:
+        yield _entry(row, reader.line_num, names)
+
+
+def read_jsonl(f, names=IMPORT_FIELDS):
+    """Читает записи из файла JSONL: по одному JSON-объекту на строку.
+
+    Пустые строки пропускаются.
+
+    Args:
+        f: Открытый текстовый файл.
+        names (tuple): Обязательные поля. По умолчанию IMPORT_FIELDS.
+
+    Yields:
+        tuple: Значения обязательных полей, например название сервиса, имя
+               пользователя и пароль.
+
+    Raises:
+        ValueError: Если строка не является JSON-объектом с обязательными полями.
+    """
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            fields = json.loads(line)
+        except ValueError:
+            raise ValueError(f"Строка {line_number}: некорректный JSON")
+        if not isinstance(fields, dict):
+            raise ValueError(f"Строка {line_number}: ожидается JSON-объект")
+        yield _entry(fields, line_number, names)
+
+
+def read_entries(path, input_format=None, names=IMPORT_FIELDS):
+    """Построчно читает записи из файла импорта.
+
+    Args:
+        path (str): Путь к файлу или '-' для чтения из стандартного ввода
+                    (формат по умолчанию - jsonl).
+        input_format (str): 'csv' или 'jsonl'. По умолчанию определяется по расширению.
+        names (tuple): Обязательные поля. По умолчанию IMPORT_FIELDS.
+
+    Yields:
+        tuple: Значения обязательных полей, например название сервиса, имя
+               пользователя и пароль.
+
+    Raises:
+        ValueError: Если формат неизвестен или файл содержит некорректные записи.
+    """
+    if path == '-':
+        reader = read_csv if input_format == 'csv' else read_jsonl
+        yield from reader(sys.stdin, names)
+        return
+    input_format = input_format or detect_format(path)
+    reader = read_csv if input_format == 'csv' else read_jsonl
+    with open(path, encoding='utf-8', newline='') as f:
+        yield from reader(f, names)
@@ -0,0 +1,520 @@
+"""Модуль формирования ключей и хеширования паролей хранилища.
+
+Хеш мастер-пароля имеет вид ``<функция>$<параметры>$<соль>$<проверка>``,
+например ``scrypt$n=32768,r=8,p=1$<соль hex>$<проверка hex>``: из
+мастер-пароля и случайной соли медленной функцией (KDFS) формируется
+ключ, а для проверки мастер-пароля хранится HMAC-SHA256 от ключа
+строки MASTER_CHECK. Параметры функции подбираются функцией calibrate
+так, чтобы формирование ключа занимало около TARGET_TIME секунд.
+
+Хеши паролей сервисов имеют вид ``hmac-sha256$<соль>$<дайджест>``, где
+дайджест - HMAC-SHA256 ключом мастер-пароля от соли записи и пароля.
+Медленная функция выполняется один раз для мастер-пароля, а не для
+каждой записи, а ключ кешируется в процессе (derive_key) по параметрам и
+соли хеша мастер-пароля и HMAC мастер-пароля со случайным секретом
+процесса, поэтому повторные операции с тем же мастер-паролем не
+выполняют ее заново, а сам мастер-пароль в кеше не хранится. Агент
+хранилища (модуль agentd) хранит только ключ. Подобрать пароль сервиса по
+хешу без мастер-пароля нельзя.
+
+Хеши прежнего формата - SHA-256 без соли в шестнадцатеричном виде -
+по-прежнему проверяются (is_legacy_hash, verify_entry) и заменяются
+новыми при успешной проверке (см. storage.PasswordStorage).
+"""
+
+import functools
+import hashlib
+import hmac
+import math
+import os
+import time
+
+DIGEST_SIZE = 32
+SALT_SIZE = 16
+KEY_SIZE = 32
+ENTRY_PREFIX = 'hmac-sha256$'
+MASTER_CHECK = b'pwgen-master-check'
+# Время формирования ключа мастер-пароля, к которому подбираются параметры.
+TARGET_TIME = 0.1
+SCRYPT_MIN_N = 1 << 12
+# Ограничение памяти scrypt (128 * r * n байт): 128 МиБ при r = 8.
+SCRYPT_MAX_N = 1 << 17
+PBKDF2_MIN_ITERATIONS = 10000
+# Количество ключей, которые хранятся в кеше процесса.
+KEY_CACHE_SIZE = 16
+# Наибольшее количество сравнений паролей с хешами с солью (entry_matcher)
+# за одну операцию: около 3 мкс на сравнение, то есть до полуминуты.
+MAX_ENTRY_MATCHES = 10 ** 7
+# Секрет, которым мастер-пароль хешируется для поиска в кеше ключей.
+_CACHE_SECRET = os.urandom(KEY_SIZE)
+_key_cache = {}
+
+def _parse_params(params, names):
+    """Разбирает параметры функции формирования ключа вида ``a=1,b=2``.
+
+    Args:
+        params (str): Строка параметров.
+        names (tuple): Ожидаемые имена параметров в порядке записи.
+
+    Returns:
+        list: Значения параметров.
+
+    Raises:
+        ValueError: Если параметры не соответствуют ожидаемым.
+    """
+    values = dict(item.partition('=')[::2] for item in params.split(','))
+    if tuple(values) != names or not all(value.isdigit() for value in values.values()):
+        raise ValueError(f"Неверные параметры функции формирования ключа: {params}")
+    return [int(value) for value in values.values()]
+
+def _elapsed(kdf):
+    """Измеряет время формирования ключа.
+
+    Args:
+        kdf: Функция формирования ключа.
+
+    Returns:
+        float: Время в секундах.
+    """
+    start = time.perf_counter()
+    kdf.derive('calibration', bytes(SALT_SIZE))
+    return time.perf_counter() - start
+
+class ScryptKdf():
+    """Функция формирования ключа scrypt (hashlib.scrypt).
+
+    Attributes:
+        n (int): Параметр стоимости CPU и памяти (степень двойки).
+        r (int): Размер блока.
+        p (int): Параметр параллелизма.
+    """
+
+    name = 'scrypt'
+
+    def __init__(self, n=1 << 15, r=8, p=1):
+        """Задает параметры функции.
+
+        Args:
+            n (int): Параметр стоимости (степень двойки). По умолчанию 2**15.
+            r (int): Размер блока. По умолчанию 8.
+            p (int): Параметр параллелизма. По умолчанию 1.
+        """
+        self.n, self.r, self.p = n, r, p
+
+    @property
+    def params(self):
+        """Строка параметров для хеша мастер-пароля."""
+        return f'n={self.n},r={self.r},p={self.p}'
+
+    @classmethod
+    def from_params(cls, params):
+        """Создает функцию по строке параметров.
+
+        Args:
+            params (str): Строка параметров (см. params).
+
+        Returns:
+            ScryptKdf: Функция формирования ключа.
+        """
+        return cls(*_parse_params(params, ('n', 'r', 'p')))
+
+    def derive(self, password, salt):
+        """Формирует ключ из пароля и соли.
+
+        Args:
+            password (str): Пароль.
+            salt (bytes): Соль.
+
+        Returns:
+            bytes: Ключ длиной KEY_SIZE.
+        """
+        return hashlib.scrypt(password.encode(), salt=salt, n=self.n, r=self.r, p=self.p,
+                              maxmem=256 * self.r * self.n * self.p + (1 << 20), dklen=KEY_SIZE)
+
+    @classmethod
+    def calibrate(cls, target):
+        """Подбирает параметр n, при котором формирование ключа занимает около target.
+
+        n удваивается, пока следующее удвоение не отдалит время от target
+        сильнее, чем текущее значение.
+
+        Args:
+            target (float): Желаемое время в секундах.
+
+        Returns:
+            ScryptKdf: Функция с подобранными параметрами.
+        """
+        kdf = cls(SCRYPT_MIN_N)
+        while kdf.n < SCRYPT_MAX_N and _elapsed(kdf) * math.sqrt(2) < target:
+            kdf = cls(kdf.n * 2)
+        return kdf
+
+class Pbkdf2Kdf():
+    """Функция формирования ключа PBKDF2-HMAC-SHA256 (hashlib.pbkdf2_hmac).
+
+    Attributes:
+        iterations (int): Количество итераций.
+    """
+
+    name = 'pbkdf2'
+
+    def __init__(self, iterations=600000):
+        """Задает параметры функции.
+
+        Args:
+            iterations (int): Количество итераций. По умолчанию 600000.
+        """
+        self.iterations = iterations
+
+    @property
+    def params(self):
+        """Строка параметров для хеша мастер-пароля."""
+        return f'i={self.iterations}'
+
+    @classmethod
+    def from_params(cls, params):
+        """Создает функцию по строке параметров.
+
+        Args:
+            params (str): Строка параметров (см. params).
+
+        Returns:
+            Pbkdf2Kdf: Функция формирования ключа.
+        """
+        return cls(*_parse_params(params, ('i',)))
+
+    def derive(self, password, salt):
+        """Формирует ключ из пароля и соли.
+
+        Args:
+            password (str): Пароль.
+            salt (bytes): Соль.
+
+        Returns:
+            bytes: Ключ длиной KEY_SIZE.
+        """
+        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, self.iterations, KEY_SIZE)
+
+    @classmethod
+    def calibrate(cls, target):
+        """Подбирает количество итераций, при котором формирование ключа занимает около target.
+
+        Время пропорционально количеству итераций, поэтому достаточно одного
+        замера.
+
+        Args:
+            target (float): Желаемое время в секундах.
+
+        Returns:
+            Pbkdf2Kdf: Функция с подобранными параметрами.
+        """
+        elapsed = _elapsed(cls(PBKDF2_MIN_ITERATIONS))
+        iterations = round(PBKDF2_MIN_ITERATIONS * target / max(elapsed, 1e-9), -3)
+        return cls(max(PBKDF2_MIN_ITERATIONS, int(iterations)))
+
+KDFS = {kdf.name: kdf for kdf in (ScryptKdf, Pbkdf2Kdf)}
+# hashlib.scrypt доступна, только если Python собран с OpenSSL 1.1 и новее.
+DEFAULT_KDF = 'scrypt' if hasattr(hashlib, 'scrypt') else 'pbkdf2'
+
+@functools.lru_cache(maxsize=None)
+def calibrate(name=DEFAULT_KDF, target=TARGET_TIME):
+    """Подбирает параметры функции формирования ключа под целевое время.
+
+    Замер выполняется один раз за время работы процесса для каждой пары
+    аргументов.
+
+    Args:
+        name (str): Имя функции из KDFS. По умолчанию DEFAULT_KDF.
+        target (float): Желаемое время в секундах. По умолчанию TARGET_TIME.
+
+    Returns:
+        Функция формирования ключа с подобранными параметрами.
+
+    Raises:
+        ValueError: Если функция неизвестна.
+    """
+    if name not in KDFS:
+        raise ValueError(f"Неизвестная функция формирования ключа: {name}")
+    return KDFS[name].calibrate(target)
+
+def derive_key(name, params, salt, password):
+    """Формирует ключ мастер-пароля с кешированием в процессе.
+
+    Повторные вызовы с тем же мастер-паролем и хешем (например, при
+    сохранении многих паролей подряд) не выполняют медленную функцию
+    заново. Кеш хранит не мастер-пароль, а его HMAC секретом процесса, и
+    вытесняет самый старый ключ после KEY_CACHE_SIZE ключей.
+
+    Args:
+        name (str): Имя функции из KDFS.
+        params (str): Строка параметров функции.
+        salt (bytes): Соль мастер-пароля.
+        password (str): Мастер-пароль.
+
+    Returns:
+        bytes: Ключ длиной KEY_SIZE.
+
+    Raises:
+        ValueError: Если функция или ее параметры неизвестны.
+    """
+    if name not in KDFS:
+        raise ValueError(f"Неизвестная функция формирования ключа: {name}")
+    tag = hmac.new(_CACHE_SECRET, password.encode(), hashlib.sha256).digest()
+    cache_key = (name, params, salt, tag)
+    key = _key_cache.get(cache_key)
+    if key is None:
+        key = KDFS[name].from_params(params).derive(password, salt)
+        if len(_key_cache) >= KEY_CACHE_SIZE:
+            del _key_cache[next(iter(_key_cache))]
+        _key_cache[cache_key] = key
+    return key
+
+def clear_key_cache():
+    """Очищает кеш ключей мастер-пароля (см. derive_key)."""
+    _key_cache.clear()
+
+def _master_check(key):
+    """Вычисляет проверочное значение ключа мастер-пароля.
+
+    Args:
+        key (bytes): Ключ мастер-пароля.
+
+    Returns:
+        bytes: HMAC-SHA256 ключом от MASTER_CHECK.
+    """
+    return hmac.new(key, MASTER_CHECK, hashlib.sha256).digest()
+
+def new_master(master_password, kdf=None):
+    """Хеширует мастер-пароль со случайной солью и возвращает его ключ.
+
+    Args:
+        master_password (str): Мастер-пароль.
+        kdf: Функция формирования ключа. По умолчанию calibrate().
+
+    Returns:
+        tuple: Хеш мастер-пароля и ключ мастер-пароля.
+    """
+    kdf = kdf or calibrate()
+    salt = os.urandom(SALT_SIZE)
+    key = derive_key(kdf.name, kdf.params, salt, master_password)
+    return f'{kdf.name}${kdf.params}${salt.hex()}${_master_check(key).hex()}', key
+
+def hash_master(master_password, kdf=None):
+    """Хеширует мастер-пароль со случайной солью.
+
+    Args:
+        master_password (str): Мастер-пароль.
+        kdf: Функция формирования ключа. По умолчанию calibrate().
+
+    Returns:
+        str: Хеш мастер-пароля.
+    """
+    return new_master(master_password, kdf)[0]
+
+def _split_master_hash(master_hash):
+    """Разбирает хеш мастер-пароля.
+
+    Args:
+        master_hash (str): Хеш мастер-пароля (см. hash_master).
+
+    Returns:
+        tuple: Имя функции, строка параметров, соль и проверочное значение.
+
+    Raises:
+        ValueError: Если хеш имеет неизвестный формат.
+    """
+    parts = master_hash.split('$')
+    if len(parts) != 4:
+        raise ValueError("Неизвестный формат хеша мастер-пароля")
+    name, params, salt, check = parts
+    try:
+        return name, params, bytes.fromhex(salt), bytes.fromhex(check)
+    except ValueError:
+        raise ValueError("Неизвестный формат хеша мастер-пароля") from None
+
+def master_key(master_hash, master_password):
+    """Проверяет мастер-пароль по хешу и возвращает его ключ.
+
+    Args:
+        master_hash (str): Хеш мастер-пароля (см. hash_master).
+        master_password (str): Мастер-пароль.
+
+    Returns:
+        bytes: Ключ мастер-пароля или None, если мастер-пароль неверен.
+
+    Raises:
+        ValueError: Если хеш имеет неизвестный формат.
+    """
+    name, params, salt, check = _split_master_hash(master_hash)
+    key = derive_key(name, params, salt, master_password)
+    return key if hmac.compare_digest(_master_check(key), check) else None
+
+def check_key(master_hash, key):
+    """Проверяет, что ключ сформирован из мастер-пароля с этим хешем.
+
+    В отличие от master_key, не выполняет медленную функцию.
+
+    Args:
+        master_hash (str): Хеш мастер-пароля (см. hash_master).
+        key (bytes): Ключ мастер-пароля.
+
+    Returns:
+        bool: True, если ключ соответствует хешу.
+
+    Raises:
+        ValueError: Если хеш имеет неизвестный формат.
+    """
+    check = _split_master_hash(master_hash)[3]
+    return hmac.compare_digest(_master_check(key), check)
+
+def legacy_hash(password):
+    """Хеширует пароль в прежнем формате: SHA-256 без соли.
+
+    Args:
+        password (str): Пароль.
+
+    Returns:
+        str: Хеш пароля в шестнадцатеричном формате.
+    """
+    return hashlib.sha256(password.encode()).hexdigest()
+
+def join_entry_hash(salt, digest):
+    """Составляет строку хеша пароля сервиса.
+
+    Args:
+        salt (bytes): Соль записи или None для хеша прежнего формата.
+        digest (bytes): Дайджест.
+
+    Returns:
+        str: Хеш пароля.
+    """
+    if salt is None:
+        return digest.hex()
+    return f'{ENTRY_PREFIX}{salt.hex()}${digest.hex()}'
+
+def split_entry_hash(password_hash):
+    """Разбирает строку хеша пароля сервиса на соль и дайджест.
+
+    Args:
+        password_hash (str): Хеш пароля.
+
+    Returns:
+        tuple: Соль (None для хеша прежнего формата) и дайджест или None,
+               если строка не является хешем в каноническом виде.
+    """
+    if type(password_hash) is not str:
+        return None
+    salt = None
+    hex_digest = password_hash
+    if password_hash.startswith(ENTRY_PREFIX):
+        hex_salt, _, hex_digest = password_hash[len(ENTRY_PREFIX):].partition('$')
+        if len(hex_salt) != 2 * SALT_SIZE:
+            return None
+        try:
+            salt = bytes.fromhex(hex_salt)
+        except ValueError:
+            return None
+    if len(hex_digest) != 2 * DIGEST_SIZE:
+        return None
+    try:
+        digest = bytes.fromhex(hex_digest)
+    except ValueError:
+        return None
+    if join_entry_hash(salt, digest) != password_hash:
+        return None
+    return salt, digest
+
+def is_legacy_hash(password_hash):
+    """Проверяет, что хеш имеет прежний формат SHA-256 без соли.
+
+    Args:
+        password_hash (str): Хеш пароля или мастер-пароля.
+
+    Returns:
+        bool: True для хеша прежнего формата.
+    """
+    parsed = split_entry_hash(password_hash)
+    return parsed is not None and parsed[0] is None
+
+def _entry_digest(key, salt, password):
+    """Вычисляет дайджест пароля сервиса.
+
+    Args:
+        key (bytes): Ключ мастер-пароля.
+        salt (bytes): Соль записи.
+        password (str): Пароль.
+
+    Returns:
+        bytes: HMAC-SHA256 ключом от соли и пароля.
+    """
+    return hmac.new(key, salt + password.encode(), hashlib.sha256).digest()
+
+def hash_entry(key, password, salt=None):
+    """Хеширует пароль сервиса ключом мастер-пароля.
+
+    Args:
+        key (bytes): Ключ мастер-пароля.
+        password (str): Пароль.
+        salt (bytes): Соль записи. По умолчанию случайная.
+
+    Returns:
+        str: Хеш пароля.
+    """
+    salt = salt or os.urandom(SALT_SIZE)
+    return join_entry_hash(salt, _entry_digest(key, salt, password))
+
+def verify_entry(key, password, password_hash):
+    """Проверяет пароль сервиса по хешу нового или прежнего формата.
+
+    Args:
+        key (bytes): Ключ мастер-пароля.
+        password (str): Пароль.
+        password_hash (str): Хеш пароля.
+
+    Returns:
+        bool: True, если пароль соответствует хешу.
+    """
+    parsed = split_entry_hash(password_hash)
+    if parsed is None:
+        return False
+    salt, digest = parsed
+    if salt is None:
+        expected = hashlib.sha256(password.encode()).digest()
+    else:
+        expected = _entry_digest(key, salt, password)
+    return hmac.compare_digest(expected, digest)
+
+def entry_matcher(key, entries):
+    """Создает функцию поиска пароля среди хешей паролей сервисов с солью.
+
+    Состояние HMAC после ключа и соли каждой записи вычисляется один раз,
+    поэтому проверка пароля по каждой записи хеширует только сам пароль.
+    Соль у каждой записи своя, поэтому проверка одного пароля выполняет
+    по сравнению на запись; вызывающий ограничивает общее количество
+    сравнений (см. MAX_ENTRY_MATCHES).
+
+    Args:
+        key (bytes): Ключ мастер-пароля.
+        entries (iterable): Пары (соль, дайджест) хешей с солью (см. split_entry_hash).
+
+    Returns:
+        callable: Функция пароля, возвращающая True, если он соответствует
+                  хотя бы одному из хешей.
+    """
+    base = hmac.new(key, digestmod=hashlib.sha256)
+    states = []
+    for salt, digest in entries:
+        state = base.copy()
+        state.update(salt)
+        states.append((state, digest))
+
+    def matches(password):
+        data = password.encode()
+        for state, digest in states:
+            candidate = state.copy()
+            candidate.update(data)
+            if hmac.compare_digest(candidate.digest(), digest):
+                return True
+        return False
+
+    return matches
@@ -5,7 +5,14 @@
 """
 
 import argparse
+from agent import AGENT_TIMEOUT
+from backends import BACKENDS
 from commands import PasswordCommands
+from completion import COMPLETE_LIMIT, SHELLS
+from fuzzy import FUZZY_LIMIT
+from storage import DEFAULT_BACKEND
+from generator import DEFAULT_WORDLIST, DEFAULT_CORPUS
+from utils import valid_count, valid_minimum, valid_offset, valid_seconds
 
 
 def main():
@@ -18,6 +25,10 @@ def main():
     """
     
     parser = argparse.ArgumentParser(description='CLI Password Generator - генератор и менеджер паролей')
+    parser.add_argument('--backend', choices=list(BACKENDS), default=DEFAULT_BACKEND,
+                        help=f'Движок хранилища (по умолчанию {DEFAULT_BACKEND})')
+    parser.add_argument('--storage', help='Файл хранилища (по умолчанию passwords.json, '
+                                          'для sqlite - passwords.db, для binary - passwords.vault)')
     subparsers = parser.add_subparsers(dest='command', help='Доступные команды')
     
     #Команда генерации
@@ -26,20 +37,105 @@ def main():
     gen_parser.add_argument('--no-uppercase', dest='uppercase', action='store_false', help='Без заглавных букв')
     gen_parser.add_argument('--no-digits', dest='digits', action='store_false', help='Без цифр')
     gen_parser.add_argument('--no-special', dest='special', action='store_false', help='Без спец символов')
+    gen_parser.add_argument('--min-lowercase', type=valid_minimum, default=1,
+                            help='Минимум строчных букв (по умолчанию 1)')
+    gen_parser.add_argument('--min-uppercase', type=valid_minimum, default=1,
+                            help='Минимум заглавных букв (по умолчанию 1)')
+    gen_parser.add_argument('--min-digits', type=valid_minimum, default=1,
+                            help='Минимум цифр (по умолчанию 1)')
+    gen_parser.add_argument('--min-special', type=valid_minimum, default=1,
+                            help='Минимум спец символов (по умолчанию 1)')
+    gen_parser.add_argument('--exclude', default='', help='Символы, которые не должны попадать в пароль')
+    gen_parser.add_argument('--exclude-ambiguous', action='store_true',
+                            help='Исключить похожие символы (0, O, 1, l, I, |)')
+    gen_parser.add_argument('--max-repeat', type=valid_count,
+                            help='Максимум одинаковых символов подряд')
+    gen_parser.add_argument('--words', type=valid_count,
+                            help='Сгенерировать парольную фразу из указанного количества слов')
+    gen_parser.add_argument('--wordlist', default=DEFAULT_WORDLIST,
+                            help=f'Файл со списком слов для парольных фраз (по умолчанию {DEFAULT_WORDLIST})')
+    gen_parser.add_argument('--separator', default='-', help='Разделитель слов парольной фразы (по умолчанию -)')
+    gen_parser.add_argument('--pronounceable', action='store_true',
+                            help='Сгенерировать произносимый пароль по марковской модели корпуса')
+    gen_parser.add_argument('--corpus', default=DEFAULT_CORPUS,
+                            help=f'Корпус слов для произносимых паролей (по умолчанию {DEFAULT_CORPUS})')
     gen_parser.add_argument('--save', action='store_true', help='Сохранить пароль в хранилище')
+    gen_parser.add_argument('-n', '--count', type=valid_count,
+                            help='Количество паролей (по умолчанию 1, в режиме --stream без ограничения)')
+    gen_parser.add_argument('-w', '--workers', type=valid_count, default=1,
+                            help='Количество процессов для генерации в файл (по умолчанию 1)')
+    gen_parser.add_argument('-o', '--output', help='Файл для записи сгенерированных паролей')
+    gen_parser.add_argument('--stream', action='store_true',
+                            help='Выводить поток паролей до --count, --time-limit или закрытия вывода')
+    gen_parser.add_argument('--time-limit', type=valid_seconds,
+                            help='Ограничение потока по времени в секундах')
+    gen_parser.add_argument('--unique', action='store_true',
+                            help='Гарантировать отсутствие повторов в пакете')
+    gen_parser.add_argument('--unique-vault', action='store_true',
+                            help='Исключить повторы в пакете и совпадения с паролями из хранилища'
+                                 ' (для паролей с солью запрашивается мастер-пароль)')
+    gen_parser.add_argument('--seed',
+                            help='Зерно воспроизводимой генерации для тестовых данных (не для настоящих паролей)')
+    gen_parser.add_argument('--seed-offset', type=valid_offset, default=0,
+                            help='Номер первого пароля при генерации с --seed (по умолчанию 0)')
+    gen_parser.add_argument('--format', choices=['plain', 'jsonl'], default='plain',
+                            help='Формат пакетного вывода (по умолчанию plain)')
     
     
     #Команда поиска
     find_parser = subparsers.add_parser('find', help='Найти сервис')
     find_parser.add_argument('service', help='Название сервиса для поиска')
+    find_parser.add_argument('--fuzzy', action='store_true',
+                             help='Искать похожие названия с учетом опечаток')
+    find_parser.add_argument('--limit', type=valid_count, default=FUZZY_LIMIT,
+                             help=f'Количество результатов с --fuzzy (по умолчанию {FUZZY_LIMIT})')
     
     #Команда проверки
     verify_parser = subparsers.add_parser('verify', help='Проверить пароль')
-    verify_parser.add_argument('service', help='Название сервиса')
+    verify_parser.add_argument('service', nargs='?', help='Название сервиса')
+    verify_parser.add_argument('--batch', metavar='FILE',
+                               help='Проверить пары из файла CSV или JSONL с полями service, password '
+                                    '(- для stdin) и вывести результаты в JSONL')
+    verify_parser.add_argument('--format', choices=['csv', 'jsonl'],
+                               help='Формат файла --batch (по умолчанию по расширению)')
+    
+    #Команда импорта
+    import_parser = subparsers.add_parser('import', help='Импортировать пароли из файла CSV или JSONL')
+    import_parser.add_argument('file', help='Файл с полями service, username, password')
+    import_parser.add_argument('--format', choices=['csv', 'jsonl'],
+                               help='Формат файла (по умолчанию по расширению)')
+    
+    #Команда переноса хранилища
+    migrate_parser = subparsers.add_parser('migrate', help='Перенести хранилище на другой движок')
+    migrate_parser.add_argument('--to', choices=list(BACKENDS), default='sqlite',
+                                help='Движок нового хранилища (по умолчанию sqlite)')
+    migrate_parser.add_argument('--target', help='Файл нового хранилища (по умолчанию файл движка)')
+    
+    #Команда агента хранилища
+    agent_parser = subparsers.add_parser('agent', help='Запустить агент, который держит хранилище открытым '
+                                                       'для find, verify и generate --save')
+    agent_parser.add_argument('--timeout', type=valid_seconds, default=AGENT_TIMEOUT,
+                              help=f'Завершить агент после стольких секунд без запросов '
+                                   f'(по умолчанию {AGENT_TIMEOUT:g})')
+    agent_parser.add_argument('--foreground', action='store_true', help='Не переходить в фоновый режим')
+    agent_parser.add_argument('--stop', action='store_true', help='Остановить запущенный агент')
+    
+    #Скрытая команда автодополнения для сценариев bash и zsh
+    command_names = list(subparsers.choices)
+    subparsers.metavar = '{' + ','.join(command_names) + '}'
+    complete_parser = subparsers.add_parser('complete')
+    complete_parser.add_argument('prefix', nargs='?', default='', help='Начало названия сервиса')
+    complete_parser.add_argument('--limit', type=valid_count, default=COMPLETE_LIMIT,
+                                 help=f'Количество вариантов (по умолчанию {COMPLETE_LIMIT})')
+    complete_parser.add_argument('--shell', choices=SHELLS,
+                                 help='Вывести сценарий автодополнения для оболочки')
+    complete_parser.set_defaults(commands=command_names)
     
     
     args = parser.parse_args()
-    commands = PasswordCommands()
+    if args.command == 'verify' and (args.service is None) == (args.batch is None):
+        verify_parser.error('укажите название сервиса или --batch')
+    commands = PasswordCommands(args.storage, args.backend)
     
     
     if args.command == 'generate':
@@ -48,6 +144,14 @@ def main():
         commands.find_command(args)
     elif args.command == 'verify':
         commands.verify_command(args)
+    elif args.command == 'import':
+        commands.import_command(args)
+    elif args.command == 'migrate':
+        commands.migrate_command(args)
+    elif args.command == 'agent':
+        commands.agent_command(args)
+    elif args.command == 'complete':
+        commands.complete_command(args)
     else:
         parser.print_help()
     
@@ -0,0 +1,262 @@
+"""Модуль марковской модели для произносимых паролей.
+
+Содержит класс MarkovModel: символьную марковскую цепь, обученную на
+локальном корпусе слов. Обученная таблица переходов сохраняется в компактный
+двоичный файл из массивов с накопленными частотами, который загружается за
+миллисекунды и позволяет выбирать каждый следующий символ за O(log k).
+"""
+
+import os
+import struct
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+
+MODEL_SUFFIX = '.markov'
+MODEL_MAGIC = b'MKV1'
+DEFAULT_ORDER = 2
+START_CHAR = '^'
+# Сигнатура, порядок, размер алфавита, число состояний, число переходов,
+# размер и время изменения корпуса.
+MODEL_HEADER = struct.Struct('<4sHHIIQQ')
+
+
+class MarkovModel():
+    """Символьная марковская цепь для генерации произносимых строк.
+
+    Состояние - последние order символов (в начале слова дополняются
+    START_CHAR). Переходы каждого состояния хранятся подряд в общих массивах:
+    номер символа (или конца слова) и накопленная частота.
+
+    Attributes:
+        order (int): Порядок цепи - длина контекста.
+        alphabet (str): Символы, встречающиеся в корпусе.
+    """
+    def __init__(self, order, alphabet, contexts, offsets, symbols, cumulative):
+        """Создает модель из готовых таблиц.
+
+        Args:
+            order (int): Порядок цепи.
+            alphabet (str): Алфавит модели.
+            contexts (list): Контексты состояний в порядке номеров.
+            offsets (array): Начало переходов каждого состояния и конец последнего.
+            symbols (array): Номера символов переходов; len(alphabet) - конец слова.
+            cumulative (array): Накопленные частоты переходов внутри состояния.
+        """
+        self.order = order
+        self.alphabet = alphabet
+        self._contexts = contexts
+        self._states = {context: i for i, context in enumerate(contexts)}
+        self._offsets = offsets
+        self._symbols = symbols
+        self._cumulative = cumulative
+
+    @classmethod
+    def train(cls, corpus_path, order=DEFAULT_ORDER):
+        """Обучает модель на корпусе.
+
+        Корпус приводится к нижнему регистру и разбивается на слова из
+        латинских букв, остальные символы считаются разделителями.
+
+        Args:
+            corpus_path (str): Путь к текстовому корпусу.
+            order (int): Порядок цепи. По умолчанию DEFAULT_ORDER.
+
+        Returns:
+            MarkovModel: Обученная модель.
+
+        Raises:
+            ValueError: Если в корпусе нет ни одного слова.
+        """
+        counts = defaultdict(lambda: defaultdict(int))
+        start = START_CHAR * order
+        with open(corpus_path, encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                word = []
+                for char in line.lower() + ' ':
+                    if 'a' <= char <= 'z':
+                        word.append(char)
+                        continue
+                    if word:
+                        context = start
+                        for letter in word:
+                            counts[context][letter] += 1
+                            context = (context + letter)[-order:]
+                        counts[context][None] += 1
+                        word = []
+        if not counts:
+            raise ValueError(f"В корпусе {corpus_path} нет слов")
+
+        alphabet = ''.join(sorted({c for nexts in counts.values() for c in nexts if c}))
+        end_symbol = len(alphabet)
+        contexts = sorted(counts)
+        offsets, symbols, cumulative = array('I', [0]), array('B'), array('I')
+        for context in contexts:
+            total = 0
+            for char, count in sorted(counts[context].items(), key=lambda item: item[0] or ''):
+                total += count
+                symbols.append(end_symbol if char is None else alphabet.index(char))
+                cumulative.append(total)
+            offsets.append(len(symbols))
+        return cls(order, alphabet, contexts, offsets, symbols, cumulative)
+
+    @classmethod
+    def load_or_train(cls, corpus_path, model_path=None, order=DEFAULT_ORDER):
+        """Загружает сохраненную модель или обучает и сохраняет новую.
+
+        Сохраненная модель используется, только если она обучена на корпусе
+        с теми же размером и временем изменения.
+
+        Args:
+            corpus_path (str): Путь к текстовому корпусу.
+            model_path (str): Путь к файлу модели. По умолчанию корпус + MODEL_SUFFIX.
+            order (int): Порядок цепи для нового обучения. По умолчанию DEFAULT_ORDER.
+
+        Returns:
+            MarkovModel: Модель.
+
+        Raises:
+            FileNotFoundError: Если корпус не существует.
+        """
+        model_path = model_path or corpus_path + MODEL_SUFFIX
+        stat = os.stat(corpus_path)
+        try:
+            return cls.load(model_path, stat)
+        except (OSError, ValueError, struct.error):
+            model = cls.train(corpus_path, order)
+            try:
+                model.save(model_path, stat)
+            except OSError:
+                pass
+            return model
+
+    @classmethod
+    def load(cls, model_path, corpus_stat=None):
+        """Загружает модель из двоичного файла.
+
+        Args:
+            model_path (str): Путь к файлу модели.
+            corpus_stat (os.stat_result): Сведения о корпусе для проверки
+                                          актуальности. По умолчанию не проверяется.
+
+        Returns:
+            MarkovModel: Загруженная модель.
+
+        Raises:
+            ValueError: Если файл поврежден или модель устарела.
+        """
+        with open(model_path, 'rb') as f:
+            data = f.read()
+        magic, order, alphabet_size, n_states, n_transitions, size, mtime = \
+            MODEL_HEADER.unpack_from(data)
+        if magic != MODEL_MAGIC:
+            raise ValueError(f"Файл {model_path} не является моделью")
+        if corpus_stat is not None and (size, mtime) != (corpus_stat.st_size,
+                                                          corpus_stat.st_mtime_ns):
+            raise ValueError(f"Модель {model_path} устарела")
+
+        position = MODEL_HEADER.size
+        alphabet = data[position:position + alphabet_size].decode('ascii')
+        position += alphabet_size
+        raw_contexts = data[position:position + n_states * order].decode('ascii')
+        contexts = [raw_contexts[i * order:(i + 1) * order] for i in range(n_states)]
+        position += n_states * order
+
+        tables = []
+        for typecode, length in (('I', n_states + 1), ('B', n_transitions), ('I', n_transitions)):
+            table = array(typecode)
+            end = position + length * table.itemsize
+            table.frombytes(data[position:end])
+            tables.append(table)
+            position = end
+        if position != len(data):
+            raise ValueError(f"Файл модели {model_path} поврежден")
+        return cls(order, alphabet, contexts, *tables)
+
+    def save(self, model_path, corpus_stat=None):
+        """Сохраняет модель в двоичный файл.
+
+        Args:
+            model_path (str): Путь к файлу модели.
+            corpus_stat (os.stat_result): Сведения о корпусе, сохраняемые для
+                                          проверки актуальности.
+        """
+        size, mtime = (corpus_stat.st_size, corpus_stat.st_mtime_ns) if corpus_stat else (0, 0)
+        header = MODEL_HEADER.pack(MODEL_MAGIC, self.order, len(self.alphabet),
+                                   len(self._contexts), len(self._symbols), size, mtime)
+        temp_path = f'{model_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            f.write(self.alphabet.encode('ascii'))
+            f.write(''.join(self._contexts).encode('ascii'))
+            for table in (self._offsets, self._symbols, self._cumulative):
+                f.write(table.tobytes())
+        os.replace(temp_path, model_path)
+
+    def count_strings(self, length):
+        """Оценивает сверху количество различных строк, которые выдает sample.
+
+        Считаются пути по цепи с теми же переходами, что у sample (включая
+        переход в начало нового слова). Каждая строка получается хотя бы
+        одним путем, поэтому различных строк не больше, чем путей.
+
+        Args:
+            length (int): Длина строки.
+
+        Returns:
+            int: Верхняя оценка количества различных строк.
+        """
+        start = START_CHAR * self.order
+        end_symbol = len(self.alphabet)
+        ways = {start: 1}
+        for _ in range(length):
+            following = defaultdict(int)
+            for context, count in ways.items():
+                state = self._states.get(context)
+                if state is None:
+                    sources = [start]
+                else:
+                    sources = [context]
+                    if context != start and end_symbol in self._symbols[
+                            self._offsets[state]:self._offsets[state + 1]]:
+                        sources.append(start)
+                for source in sources:
+                    state = self._states[source]
+                    for symbol in self._symbols[self._offsets[state]:self._offsets[state + 1]]:
+                        if symbol != end_symbol:
+                            following[(source + self.alphabet[symbol])[-self.order:]] += count
+            ways = following
+        return sum(ways.values())
+
+    def sample(self, pool, length):
+        """Генерирует произносимую строку заданной длины.
+
+        Если цепь доходит до конца слова, генерация продолжается с начала
+        нового слова, поэтому строка может состоять из нескольких слогов-слов.
+
+        Args:
+            pool (EntropyPool): Источник случайных чисел.
+            length (int): Длина строки.
+
+        Returns:
+            str: Строка из символов алфавита модели.
+        """
+        start = START_CHAR * self.order
+        end_symbol = len(self.alphabet)
+        context = start
+        result = []
+        while len(result) < length:
+            state = self._states.get(context)
+            if state is None:
+                context = start
+                continue
+            lo, hi = self._offsets[state], self._offsets[state + 1]
+            choice = bisect_right(self._cumulative, pool.randbelow(self._cumulative[hi - 1]), lo, hi)
+            symbol = self._symbols[choice]
+            if symbol == end_symbol:
+                context = start
+                continue
+            char = self.alphabet[symbol]
+            result.append(char)
+            context = (context + char)[-self.order:]
+        return ''.join(result)
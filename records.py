@@ -0,0 +1,213 @@
+"""Модуль компактного хранения записей паролей в памяти.
+
+Содержит класс RecordTable - отображение названий сервисов на записи
+``{'username': ..., 'password_hash': ...}``, которое хранит записи по
+столбцам: имена пользователей - в списке интернированных строк, а хеши
+паролей - в виде 32-байтных дайджестов и 16-байтных солей (см. модуль kdf)
+в двух массивах bytearray. Нулевая соль обозначает хеш прежнего формата
+SHA-256 без соли.
+Словарь для каждой записи создается только при обращении к ней, поэтому
+хранилище на миллион записей занимает в памяти в несколько раз меньше,
+чем словари, полученные из JSON.
+"""
+
+import json
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+from kdf import DIGEST_SIZE, SALT_SIZE, join_entry_hash, split_entry_hash
+
+ZERO_SALT = bytes(SALT_SIZE)
+# Размеры списка названий сервисов, списка имен пользователей и записей
+# нестандартного вида в JSON, количество записей.
+TABLE_HEADER = struct.Struct('<QQQQ')
+
+
+def pack_record(record):
+    """Разбирает запись на имя пользователя, дайджест и соль хеша пароля.
+
+    Args:
+        record (dict): Запись сервиса.
+
+    Returns:
+        tuple: Имя пользователя, дайджест и соль (ZERO_SALT для хеша
+               прежнего формата) или None, если запись нельзя хранить
+               компактно (другие поля, хеш не в формате kdf).
+    """
+    if not isinstance(record, dict) or record.keys() != {'username', 'password_hash'}:
+        return None
+    username = record['username']
+    if type(username) is not str:
+        return None
+    parsed = split_entry_hash(record['password_hash'])
+    if parsed is None or parsed[0] == ZERO_SALT:
+        return None
+    salt, digest = parsed
+    return sys.intern(username), digest, salt or ZERO_SALT
+
+
+class RecordTable(Mapping):
+    """Компактная таблица записей паролей с интерфейсом словаря.
+
+    Поддерживает чтение как dict (``table[service]``, ``get``, ``in``,
+    ``len``, перебор в порядке добавления) и запись через
+    ``table[service] = record``. Каждое обращение к записи возвращает новый
+    словарь, поэтому изменение полученной записи не меняет таблицу.
+    Записи, которые нельзя хранить компактно, хранятся как есть.
+    """
+
+    def __init__(self, records=None):
+        """Создает таблицу.
+
+        Args:
+            records (dict): Начальные записи по названиям сервисов.
+        """
+        self._rows = {}
+        self._usernames = []
+        self._digests = bytearray()
+        self._salts = bytearray()
+        self._other = {}
+        if records is not None:
+            for service, record in records.items():
+                self[service] = record
+
+    def __getitem__(self, service):
+        """Возвращает запись сервиса.
+
+        Args:
+            service (str): Название сервиса.
+
+        Returns:
+            dict: Запись сервиса.
+
+        Raises:
+            KeyError: Если сервис не найден.
+        """
+        row = self._rows[service]
+        if row in self._other:
+            return dict(self._other[row])
+        start = row * DIGEST_SIZE
+        salt_start = row * SALT_SIZE
+        salt = bytes(self._salts[salt_start:salt_start + SALT_SIZE])
+        return {'username': self._usernames[row],
+                'password_hash': join_entry_hash(salt if salt != ZERO_SALT else None,
+                                                 self._digests[start:start + DIGEST_SIZE])}
+
+    def __setitem__(self, service, record):
+        """Сохраняет запись сервиса, заменяя прежнюю с сохранением ее позиции.
+
+        Args:
+            service (str): Название сервиса.
+            record (dict): Запись сервиса.
+        """
+        row = self._rows.get(service)
+        if row is None:
+            row = len(self._usernames)
+            self._rows[service] = row
+            self._usernames.append(None)
+            self._digests.extend(bytes(DIGEST_SIZE))
+            self._salts.extend(ZERO_SALT)
+
+        packed = pack_record(record)
+        if packed is None:
+            self._usernames[row] = None
+            self._other[row] = dict(record)
+            return
+        self._other.pop(row, None)
+        start = row * DIGEST_SIZE
+        salt_start = row * SALT_SIZE
+        (self._usernames[row], self._digests[start:start + DIGEST_SIZE],
+         self._salts[salt_start:salt_start + SALT_SIZE]) = packed
+
+    def __contains__(self, service):
+        """Проверяет наличие сервиса без создания записи.
+
+        Args:
+            service (str): Название сервиса.
+
+        Returns:
+            bool: True, если сервис есть в таблице.
+        """
+        return service in self._rows
+
+    def __iter__(self):
+        """Перебирает названия сервисов в порядке добавления.
+
+        Returns:
+            iterator: Итератор названий сервисов.
+        """
+        return iter(self._rows)
+
+    def __len__(self):
+        """Возвращает количество записей.
+
+        Returns:
+            int: Количество записей.
+        """
+        return len(self._rows)
+
+    def to_bytes(self):
+        """Сериализует таблицу для быстрой загрузки (см. from_bytes).
+
+        Названия сервисов и различные имена пользователей записываются
+        списками JSON, номера имен пользователей - массивом, а дайджесты и
+        соли - как есть.
+
+        Returns:
+            bytes: Сериализованная таблица.
+        """
+        names = {}
+        index = array('I', (names.setdefault(username, len(names)) for username in self._usernames))
+        services = json.dumps(list(self._rows), separators=(',', ':')).encode()
+        usernames = json.dumps(list(names), separators=(',', ':')).encode()
+        other = json.dumps(self._other, separators=(',', ':')).encode()
+        header = TABLE_HEADER.pack(len(services), len(usernames), len(other), len(self._rows))
+        return b''.join([header, services, usernames, other, index.tobytes(), self._digests,
+                         self._salts])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Восстанавливает таблицу, сериализованную методом to_bytes.
+
+        Args:
+            data (bytes): Сериализованная таблица.
+
+        Returns:
+            RecordTable: Таблица.
+
+        Raises:
+            ValueError: Если данные повреждены.
+        """
+        services_size, usernames_size, other_size, count = TABLE_HEADER.unpack_from(data)
+        position = TABLE_HEADER.size
+        parts = []
+        for size in (services_size, usernames_size, other_size, 4 * count, DIGEST_SIZE * count,
+                     SALT_SIZE * count):
+            parts.append(data[position:position + size])
+            position += size
+        if position != len(data):
+            raise ValueError("Данные таблицы повреждены")
+        services, usernames, other, index_data, digests, salts = parts
+
+        index = array('I')
+        index.frombytes(index_data)
+        names = [name if name is None else sys.intern(name) for name in json.loads(usernames)]
+        table = cls()
+        table._rows = dict(zip(json.loads(services), range(count)))
+        table._usernames = list(map(names.__getitem__, index))
+        table._digests = bytearray(digests)
+        table._salts = bytearray(salts)
+        table._other = {int(row): record for row, record in json.loads(other).items()}
+        if len(table._rows) != count:
+            raise ValueError("Данные таблицы повреждены")
+        return table
+
+    def __repr__(self):
+        """Возвращает представление таблицы в виде словаря.
+
+        Returns:
+            str: Представление таблицы.
+        """
+        return f'RecordTable({dict(self)!r})'
@@ -4,49 +4,365 @@
 с использованием хеширования и мастер-пароля.
 """
 
-import hashlib
-import json
+import contextlib
 import os
+import sqlite3
 from getpass import getpass
+from itertools import islice
+
+from backends import BACKENDS, DEFAULT_FILES, open_backend
+from completion import COMPLETE_LIMIT, CompletionIndex
+from fuzzy import FUZZY_LIMIT, FuzzyIndex
+from kdf import (check_key, hash_entry, is_legacy_hash, legacy_hash, master_key, new_master,
+                 split_entry_hash, verify_entry)
+from trigram import TRIGRAM_SIZE, TrigramIndex
+
+DEFAULT_BACKEND = 'json'
+IMPORT_BATCH_SIZE = 10000
+SERVICE_INDEXES = (TrigramIndex, FuzzyIndex, CompletionIndex)
 
 class PasswordStorage():
-    """Класс для безопасного хранения паролей с мастер-паролем."""
-    def __init__(self, storage_file='passwords.json'):
+    """Класс для безопасного хранения паролей с мастер-паролем.
+    
+    Чтение и запись данных выполняет движок хранения из модуля backends.
+    Поиск по подстроке использует триграммный индекс (модуль trigram), а
+    нечеткий поиск - индекс удалений (модуль fuzzy), автодополнение -
+    отсортированный индекс названий (модуль completion). Индексы хранятся
+    в файлах ``<storage_file>.trigram``, ``<storage_file>.fuzzy`` и
+    ``<storage_file>.complete``, строятся при первом поиске (индекс
+    автодополнения - при первой записи) и дополняются при сохранении паролей.
+    
+    Несколько процессов могут сохранять пароли в одно хранилище
+    одновременно: движок фиксирует изменения под блокировкой записи и
+    заново применяет их к состоянию, сохраненному другими процессами, а
+    индексы обновляются под той же блокировкой.
+    
+    Мастер-пароль хешируется медленной функцией формирования ключа, а
+    пароли сервисов - HMAC с солью на ключе мастер-пароля (модуль kdf).
+    
+    Attributes:
+        storage_file (str): Путь к файлу хранилища.
+        backend: Движок хранения.
+        kdf: Функция формирования ключа для новых хешей мастер-пароля или
+             None для kdf.DEFAULT_KDF с параметрами, подобранными kdf.calibrate.
+    """
+    def __init__(self, storage_file=None, backend=DEFAULT_BACKEND, kdf=None):
         """Инициализирует хранилище паролей.
         
         Args:
-            storage_file (str): Путь к файлу для хранения паролей. 
-                               По умолчанию 'passwords.json'.
+            storage_file (str): Путь к файлу для хранения паролей. По умолчанию
+                               файл движка из backends.DEFAULT_FILES
+                               ('passwords.json', 'passwords.db' или 'passwords.vault').
+            backend (str): Имя движка хранения (см. backends.BACKENDS).
+                           По умолчанию DEFAULT_BACKEND.
+            kdf: Функция формирования ключа из kdf.KDFS для новых хешей
+                 мастер-пароля. По умолчанию подбирается kdf.calibrate.
+        
+        Raises:
+            ValueError: Если движок хранения неизвестен.
+        """
+        self.storage_file = storage_file or DEFAULT_FILES.get(backend, 'passwords.json')
+        self.backend = open_backend(backend, self.storage_file)
+        self.backend.commit_hook = self._committed
+        self.kdf = kdf
+        self._indexes = {}
+        self._added = None
+    
+    @property
+    def data(self):
+        """dict: Данные хранилища в формате passwords.json."""
+        return self.backend.data
+    
+    def close(self):
+        """Закрывает движок хранения и файлы индексов."""
+        self._drop_indexes()
+        self.backend.close()
+    
+    @contextlib.contextmanager
+    def batch(self):
+        """Группирует изменения хранилища в одну запись на диск.
+        
+        Пример::
+        
+            key = storage.unlock(master_password)
+            with storage.batch():
+                for service, username, password in accounts:
+                    storage.store_with_key(service, username, password, key)
+        
+        Внутри блока сохраненные пароли сразу доступны для проверки и поиска,
+        а на диск все изменения записываются один раз при выходе из блока.
+        Если блок завершается исключением, все его изменения отменяются.
+        При фиксации новые сервисы дописываются в файлы индексов поиска.
         """
-        self.storage_file = storage_file
-        self.data = self._load_data()
+        if self._added is not None:
+            with self.backend.batch():
+                yield self
+            return
         
-    def _load_data(self):
-        """Загружает данные из файла хранилища.
+        self._added = []
+        try:
+            with self.backend.batch():
+                yield self
+        except BaseException:
+            self._drop_indexes()
+            raise
+        finally:
+            self._added = None
+    
+    def sync(self):
+        """Загружает изменения, сохраненные другими процессами.
+        
+        Нужен, когда хранилище долго остается открытым (агент, модуль
+        agentd). Если хранилище изменилось, индексы поиска в памяти
+        закрываются и при следующем поиске загружаются заново.
+        """
+        if self.backend.sync():
+            self._drop_indexes()
+    
+    def _committed(self, fingerprint, refreshed):
+        """Обновляет индексы после фиксации, пока движок удерживает блокировку записи.
+        
+        Если перед фиксацией движок загрузил изменения другого процесса,
+        индексы в памяти не содержат его сервисов и закрываются.
+        
+        Args:
+            fingerprint (str): Отпечаток хранилища до фиксации.
+            refreshed (bool): Загружал ли движок изменения другого процесса.
+        """
+        if refreshed:
+            self._drop_indexes()
+        if self._added:
+            added, self._added = self._added, []
+            self._update_indexes(fingerprint, added)
+    
+    def _index_path(self, index_class):
+        """Возвращает путь к файлу индекса названий сервисов.
+        
+        Args:
+            index_class: Класс индекса из SERVICE_INDEXES.
         
         Returns:
-            dict: Загруженные данные или пустой словарь, если файл не существует.
+            str: Путь к файлу индекса.
+        """
+        return self.storage_file + index_class.SUFFIX
+    
+    def _drop_indexes(self):
+        """Закрывает индексы в памяти, чтобы при следующем поиске загрузить их заново."""
+        for index in self._indexes.values():
+            index.close()
+        self._indexes = {}
+    
+    def _service_index(self, index_class):
+        """Возвращает индекс названий сервисов, загружая или строя его при первом вызове.
+        
+        Сохраненный индекс используется, если его отпечаток совпадает с
+        отпечатком хранилища, иначе индекс строится заново по всем записям и
+        сохраняется. Индекс, построенный внутри блока batch, содержит еще не
+        сохраненные изменения и записывается только после фиксации.
+        
+        Args:
+            index_class: Класс индекса из SERVICE_INDEXES.
+        
+        Returns:
+            trigram.ServiceIndex: Индекс названий сервисов.
+        """
+        if index_class not in self._indexes:
+            path = self._index_path(index_class)
+            fingerprint = self.backend.fingerprint()
+            index = index_class.load(path, fingerprint)
+            if index is not None:
+                for service in self._added or ():
+                    index.add(service)
+                save = index.needs_compaction and not self._added
+            else:
+                index = index_class.build(service for service, _ in self.backend.records())
+                save = not self._added
+            if save:
+                try:
+                    index.save(path, fingerprint)
+                except OSError:
+                    pass
+            self._indexes[index_class] = index
+        return self._indexes[index_class]
+    
+    def _update_indexes(self, fingerprint, services):
+        """Дописывает сохраненные сервисы в файлы индексов.
+        
+        Если файл индекса отсутствует или устарел, а индекс загружен в
+        память или должен поддерживаться при каждой записи (EAGER), файл
+        перезаписывается целиком. Ошибки записи индекса не прерывают
+        работу: устаревший индекс будет построен заново.
+        
+        Args:
+            fingerprint (str): Отпечаток хранилища до фиксации.
+            services (list): Названия сохраненных сервисов.
+        """
+        new_fingerprint = self.backend.fingerprint()
+        for index_class in SERVICE_INDEXES:
+            path = self._index_path(index_class)
+            try:
+                if not index_class.append(path, fingerprint, new_fingerprint, services):
+                    if index_class in self._indexes:
+                        self._indexes[index_class].save(path, new_fingerprint)
+                    elif index_class.EAGER:
+                        self._service_index(index_class)
+            except OSError:
+                pass
+    
+    def _added_service(self, service):
+        """Учитывает сервис, сохраненный в текущем блоке batch.
+        
+        Args:
+            service (str): Название сервиса.
         """
-        if os.path.exists(self.storage_file):
-            with open(self.storage_file, 'r') as f:
-                return json.load(f)
-        return {}
+        self._added.append(service)
+        for index in self._indexes.values():
+            index.add(service)
     
-    def _save_data(self):
-        """Сохраняет данные в файл хранилища."""
-        with open(self.storage_file, 'w') as f:
-            json.dump(self.data, f, indent=2)
+    def migrate(self, storage_file, backend):
+        """Переносит все данные в новое хранилище с другим движком.
+        
+        Все записи переносятся одним вызовом движка, то есть для SQLite
+        одной транзакцией.
+        
+        Args:
+            storage_file (str): Путь к файлу нового хранилища или None для
+                               файла движка по умолчанию.
+            backend (str): Имя движка нового хранилища.
+        
+        Returns:
+            PasswordStorage: Новое хранилище.
+        
+        Raises:
+            ValueError: Если новое хранилище уже содержит данные или
+                      движок неизвестен.
+        """
+        target = PasswordStorage(storage_file, backend)
+        if target.backend.master_hash() is not None:
+            target.close()
+            raise ValueError(f"Хранилище {target.storage_file} уже содержит данные")
+        
+        mutations = []
+        master_hash = self.backend.master_hash()
+        if master_hash is not None:
+            mutations.append(('master', master_hash))
+        mutations.extend(('put', service, record) for service, record in self.backend.records())
+        target.backend.apply(mutations)
+        return target
             
     def _hash_password(self, password):
         """Хеширует пароль с использованием SHA-256.
         
+        Так хешировались пароли и мастер-пароль до перехода на функции
+        формирования ключа (модуль kdf); хеши этого формата проверяются при
+        чтении старых хранилищ.
+        
         Args:
             password (str): Пароль для хеширования.
         
         Returns:
             str: Хеш пароля в шестнадцатеричном формате.
         """
-        return hashlib.sha256(password.encode()).hexdigest()
+        return legacy_hash(password)
+    
+    def _authenticate(self, master_password, create=False):
+        """Проверяет мастер-пароль и возвращает ключ для хешей паролей.
+        
+        Новый хеш мастер-пароля (при create для пустого хранилища или вместо
+        хеша прежнего формата SHA-256) сохраняется сразу, до хешей паролей,
+        сформированных его ключом, а внутри блока batch - вместе с ними.
+        Если другой процесс успел задать свой хеш, мастер-пароль проверяется
+        по нему. Ошибка записи при проверке (create=False) не прерывает ее.
+        
+        Args:
+            master_password (str): Мастер-пароль.
+            create (bool): Задать мастер-пароль, если хранилище пусто.
+        
+        Returns:
+            bytes: Ключ мастер-пароля или None, если мастер-пароль неверен
+                   или не задан.
+        
+        Raises:
+            ValueError: Если хеш мастер-пароля имеет неизвестный формат.
+        """
+        stored_master = self.backend.master_hash()
+        if stored_master is None:
+            if not create:
+                return None
+        elif not is_legacy_hash(stored_master):
+            return master_key(stored_master, master_password)
+        elif stored_master != self._hash_password(master_password):
+            return None
+        
+        master_hash, key = new_master(master_password, self.kdf)
+        try:
+            with self.batch():
+                self.backend.apply([('master', master_hash, stored_master)])
+        except ValueError:
+            if self.backend.master_hash() == stored_master:
+                raise
+            return self._authenticate(master_password, create)
+        except (OSError, sqlite3.Error):
+            # Проверке пароля замена хеша не нужна: хранилище, доступное
+            # только для чтения, проверяется без нее.
+            if create:
+                raise
+        return key
+    
+    def _check_key(self, key):
+        """Проверяет ключ мастер-пароля по хешу мастер-пароля хранилища.
+        
+        Ключ, полученный unlock, становится недействительным, если другой
+        процесс заменил хранилище или его мастер-пароль.
+        
+        Args:
+            key (bytes): Ключ мастер-пароля.
+        
+        Raises:
+            ValueError: Если ключ не соответствует мастер-паролю хранилища.
+        """
+        master_hash = self.backend.master_hash()
+        if master_hash is None or is_legacy_hash(master_hash) or not check_key(master_hash, key):
+            raise ValueError("Неверный мастер-пароль")
+    
+    def unlock(self, master_password):
+        """Проверяет мастер-пароль и формирует его ключ.
+        
+        Для пустого хранилища мастер-пароль задается. Операции с ключом
+        (store_with_key, verify_with_key) не выполняют медленную функцию
+        формирования ключа, и вызывающему не нужно хранить мастер-пароль.
+        
+        Args:
+            master_password (str): Мастер-пароль.
+        
+        Returns:
+            bytes: Ключ мастер-пароля.
+        
+        Raises:
+            ValueError: Если мастер-пароль неверен.
+        """
+        key = self._authenticate(master_password, create=True)
+        if key is None:
+            raise ValueError("Неверный мастер-пароль")
+        return key
+    
+    def _upgrade(self, mutations):
+        """Сохраняет замену хешей паролей прежнего формата, найденных при проверке.
+        
+        Замена не обязательна для результата проверки, поэтому ошибки ее
+        записи (например, файл хранилища только для чтения) не прерывают
+        проверку.
+        
+        Args:
+            mutations (list): Мутации замены хешей.
+        """
+        if not mutations:
+            return
+        try:
+            with self.batch():
+                self.backend.apply(mutations)
+        except (OSError, ValueError, sqlite3.Error):
+            pass
     
     def store_password(self, service, username, password, master_password): #Хешируем мастер-пароль для проверки
         """Сохраняет пароль для указанного сервиса.
@@ -60,32 +376,108 @@ class PasswordStorage():
         Raises:
             ValueError: Если мастер-пароль неверен.
         """
-        master_hash = self._hash_password(master_password)
-        
-        if 'master_hash' not in self.data:
-            self.data['master_hash'] = master_hash
-        elif self.data['master_hash'] != master_hash:
+        key = self._authenticate(master_password, create=True)
+        if key is None:
             raise ValueError("Неверный мастер-пароль")
+        self._store(service, username, password, key)
+    
+    def store_with_key(self, service, username, password, key):
+        """Сохраняет пароль для указанного сервиса ключом мастер-пароля.
+        
+        Args:
+            service (str): Название сервиса.
+            username (str): Имя пользователя.
+            password (str): Пароль для сохранения.
+            key (bytes): Ключ мастер-пароля (см. unlock).
+        
+        Raises:
+            ValueError: Если ключ не соответствует мастер-паролю хранилища.
+        """
+        self._check_key(key)
+        self._store(service, username, password, key)
+    
+    def _store(self, service, username, password, key):
+        """Сохраняет пароль сервиса с проверенным ключом мастер-пароля.
         
-        if 'passwords' in self.data and service in self.data['passwords']:
+        Args:
+            service (str): Название сервиса.
+            username (str): Имя пользователя.
+            password (str): Пароль для сохранения.
+            key (bytes): Ключ мастер-пароля.
+        
+        Raises:
+            ValueError: Если сервис уже существует.
+        """
+        if self.backend.get(service) is not None:
             raise ValueError(f"Сервис '{service}' уже существует")
         
-        password_hash = self._hash_password(password) #Хешируем и сохраняем пароль
+        password_hash = hash_entry(key, password) #Хешируем и сохраняем пароль
         
-        if 'passwords' not in self.data:
-            self.data['passwords'] = {}
-            
-        self.data['passwords'][service] = {
-            'username': username,
-            'password_hash': password_hash
-        }
+        with self.batch():
+            self.backend.apply([('add', service, {
+                'username': username,
+                'password_hash': password_hash
+            })])
+            self._added_service(service)
+    
+    def store_many(self, entries, master_password, progress=None, batch_size=IMPORT_BATCH_SIZE):
+        """Сохраняет пароли из потока записей одной групповой фиксацией.
         
-        self._save_data()
+        Мастер-пароль проверяется и его ключ формируется один раз, записи
+        обрабатываются пакетами по batch_size штук, а на диск все изменения
+        записываются одной групповой фиксацией. Если чтение записей
+        прерывается ошибкой, ни одна запись не сохраняется. Записи для уже
+        существующих сервисов пропускаются.
+        
+        Args:
+            entries (iterable): Тройки (сервис, имя пользователя, пароль).
+            master_password (str): Мастер-пароль для доступа к хранилищу.
+            progress (callable): Функция, вызываемая после каждого пакета
+                                 с количеством сохраненных и пропущенных записей.
+            batch_size (int): Размер пакета. По умолчанию IMPORT_BATCH_SIZE.
+        
+        Returns:
+            tuple: Количество сохраненных и пропущенных записей.
+        
+        Raises:
+            ValueError: Если мастер-пароль неверен или один из сервисов
+                        сохранил другой процесс до фиксации.
+        """
+        stored = skipped = 0
+        entries = iter(entries)
+        with self.batch():
+            key = self._authenticate(master_password, create=True)
+            if key is None:
+                raise ValueError("Неверный мастер-пароль")
+            while True:
+                chunk = list(islice(entries, batch_size))
+                if not chunk:
+                    break
+                mutations = []
+                services = set()
+                for service, username, password in chunk:
+                    if service in services or self.backend.get(service) is not None:
+                        skipped += 1
+                        continue
+                    services.add(service)
+                    self._added_service(service)
+                    mutations.append(('add', service, {
+                        'username': username,
+                        'password_hash': hash_entry(key, password)
+                    }))
+                self.backend.stage(mutations)
+                stored += len(mutations)
+                if progress is not None:
+                    progress(stored, skipped)
+        return stored, skipped
         
     
     def verify_password(self, service, password, master_password):
         """Проверяет правильность пароля для указанного сервиса.
         
+        Хеши прежнего формата (SHA-256 без соли) мастер-пароля и пароля
+        сервиса при успешной проверке заменяются хешами модуля kdf.
+        
         Args:
             service (str): Название сервиса.
             password (str): Пароль для проверки.
@@ -94,15 +486,115 @@ class PasswordStorage():
         Returns:
             bool: True если пароль верный, False в противном случае.
         """
-        master_hash = self._hash_password(master_password)
-        if self.data.get('master_hash') != master_hash:
+        key = self._authenticate(master_password)
+        if key is None:
             return False
+        return self._verify(service, password, key)
+    
+    def verify_with_key(self, service, password, key):
+        """Проверяет правильность пароля для указанного сервиса ключом мастер-пароля.
+        
+        Args:
+            service (str): Название сервиса.
+            password (str): Пароль для проверки.
+            key (bytes): Ключ мастер-пароля (см. unlock).
+        
+        Returns:
+            bool: True если пароль верный, False в противном случае.
+        
+        Raises:
+            ValueError: Если ключ не соответствует мастер-паролю хранилища.
+        """
+        self._check_key(key)
+        return self._verify(service, password, key)
+    
+    def _verify(self, service, password, key):
+        """Проверяет пароль сервиса с проверенным ключом мастер-пароля.
         
-        stored_hash = self.data['passwords'].get(service, {}).get('password_hash')
-        return stored_hash == self._hash_password(password)
+        Args:
+            service (str): Название сервиса.
+            password (str): Пароль для проверки.
+            key (bytes): Ключ мастер-пароля.
+        
+        Returns:
+            bool: True если пароль верный, False в противном случае.
+        """
+        record = self.backend.get(service)
+        valid = record is not None and verify_entry(key, password, record.get('password_hash'))
+        if valid and is_legacy_hash(record['password_hash']):
+            self._upgrade([('put', service, dict(record, password_hash=hash_entry(key, password)))])
+        return valid
+    
+    def verify_many(self, pairs, master_password):
+        """Проверяет пароли из потока пар, проверяя мастер-пароль один раз.
+        
+        Пары читаются по мере проверки, поэтому расход памяти не зависит от
+        их количества. Как и в verify_password, хеши прежнего формата
+        заменяются при успешной проверке; замены сохраняются пакетами по
+        IMPORT_BATCH_SIZE и после последней пары.
+        
+        Args:
+            pairs (iterable): Пары (название сервиса, пароль).
+            master_password (str): Мастер-пароль для доступа к хранилищу.
+        
+        Yields:
+            tuple: Название сервиса и True, если пароль верный, или False,
+                   если он неверный или сервис не найден.
+        
+        Raises:
+            ValueError: Если мастер-пароль неверен.
+        """
+        key = self._authenticate(master_password)
+        if key is None:
+            raise ValueError("Неверный мастер-пароль")
+        
+        upgrades = []
+        get = self.backend.get
+        for service, password in pairs:
+            record = get(service)
+            valid = record is not None and verify_entry(key, password, record.get('password_hash'))
+            if valid and is_legacy_hash(record['password_hash']):
+                upgrades.append(('put', service, dict(record, password_hash=hash_entry(key, password))))
+                if len(upgrades) >= IMPORT_BATCH_SIZE:
+                    self._upgrade(upgrades)
+                    upgrades = []
+            yield service, valid
+        self._upgrade(upgrades)
+    
+    def iter_password_hashes(self):
+        """Перебирает хеши сохраненных паролей прежнего формата.
+        
+        Хеши с солью (модуль kdf) различны даже для одинаковых паролей и
+        без ключа мастер-пароля не сравниваются, поэтому перебираются
+        отдельно (см. iter_salted_hashes).
+        
+        Yields:
+            str: Хеш SHA-256 пароля в шестнадцатеричном формате.
+        """
+        for _, record in self.backend.records():
+            if is_legacy_hash(record.get('password_hash')):
+                yield record['password_hash']
+    
+    def iter_salted_hashes(self):
+        """Перебирает хеши сохраненных паролей с солью.
+        
+        Пароль сравнивается с ними ключом мастер-пароля (см. kdf.entry_matcher).
+        
+        Yields:
+            tuple: Соль и дайджест хеша.
+        """
+        for _, record in self.backend.records():
+            parsed = split_entry_hash(record.get('password_hash'))
+            if parsed is not None and parsed[0] is not None:
+                yield parsed
     
     def find_service(self, service_name):
-        """Находит сервисы по частичному совпадению названия.
+        """Находит сервисы по частичному совпадению названия без учета регистра.
+        
+        Запросы не короче TRIGRAM_SIZE символов выполняются по триграммному
+        индексу. Более короткие запросы и запросы, совпадающие с большой
+        долей сервисов, выполняются просмотром всех записей движком
+        хранения. Результат в обоих случаях одинаков.
         
         Args:
             service_name (str): Название сервиса или его часть для поиска.
@@ -111,5 +603,68 @@ class PasswordStorage():
             dict: Словарь найденных сервисов, где ключ - полное название, 
                   значение - данные сервиса.
         """
-        return {k: v for k, v in self.data.get('passwords', {}).items()
-                if service_name.lower() in k.lower()}
\ No newline at end of file
+        services = None
+        if len(service_name.lower()) >= TRIGRAM_SIZE:
+            services = self._service_index(TrigramIndex).search(service_name)
+        if services is None:
+            return self.backend.find(service_name)
+        return {service: self.backend.get(service) for service in services}
+    
+    def find_fuzzy(self, service_name, limit=FUZZY_LIMIT):
+        """Находит сервисы, название которых отличается от запроса не более чем на две правки.
+        
+        Поиск выполняется по индексу удалений (модуль fuzzy) без учета
+        регистра и не просматривает все записи.
+        
+        Args:
+            service_name (str): Название сервиса, возможно с опечатками.
+            limit (int): Максимальное количество результатов. По умолчанию FUZZY_LIMIT.
+        
+        Returns:
+            list: Тройки (название, расстояние редактирования, данные сервиса),
+                  от ближайшего сервиса к дальнему.
+        """
+        matches = self._service_index(FuzzyIndex).search(service_name, limit)
+        return [(service, distance, self.backend.get(service)) for service, distance in matches]
+
+
+def complete_services(prefix, storage_file=None, backend=DEFAULT_BACKEND, limit=COMPLETE_LIMIT):
+    """Возвращает названия сервисов, начинающиеся с префикса, для автодополнения.
+    
+    Индекс автодополнения загружается без открытия хранилища: отпечаток
+    хранилища вычисляется по его файлам (см. backends.Backend.read_fingerprint).
+    Хранилище читается, только если индекс отсутствует или устарел, чтобы
+    построить и сохранить его заново.
+    
+    Args:
+        prefix (str): Начало названия сервиса.
+        storage_file (str): Путь к файлу хранилища. По умолчанию файл движка.
+        backend (str): Имя движка хранения. По умолчанию DEFAULT_BACKEND.
+        limit (int): Максимальное количество результатов. По умолчанию COMPLETE_LIMIT.
+    
+    Returns:
+        list: Названия сервисов в порядке сортировки без учета регистра.
+    
+    Raises:
+        ValueError: Если движок хранения неизвестен.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Неизвестный движок хранения: {backend}")
+    storage_file = storage_file or DEFAULT_FILES[backend]
+    backend_class = BACKENDS[backend]
+    if not any(os.path.exists(path) for path in backend_class.files(storage_file)):
+        return []
+    
+    index = CompletionIndex.load(storage_file + CompletionIndex.SUFFIX,
+                                 backend_class.read_fingerprint(storage_file))
+    if index is not None:
+        try:
+            return index.complete(prefix, limit)
+        finally:
+            index.close()
+    
+    storage = PasswordStorage(storage_file, backend)
+    try:
+        return storage._service_index(CompletionIndex).complete(prefix, limit)
+    finally:
+        storage.close()
@@ -0,0 +1,82 @@
+"""Модуль тестирования для agent.py.
+
+Содержит unit-тесты клиента агента хранилища: подключения к
+отсутствующему и оставшемуся от завершенного агента сокету и обмена
+строками JSON.
+"""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from agent import AGENT_SUFFIX, AgentClient, agent_path
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Сокеты Unix недоступны")
+class TestAgentClient(unittest.TestCase):
+    """Тестовый класс для проверки клиента агента.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для сокета.
+        path (str): Путь к сокету.
+    """
+
+    def setUp(self):
+        """Создает временный каталог для сокета."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = agent_path(os.path.join(self.temp_dir.name, 'vault.json'))
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def test_connect_without_agent(self):
+        """Тестирует, что без запущенного агента клиент не создается."""
+        self.assertTrue(self.path.endswith('vault.json' + AGENT_SUFFIX))
+        self.assertIsNone(AgentClient.connect(self.path), "Без сокета агента клиент не создается")
+
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertIsNone(AgentClient.connect(self.path),
+                          "Сокет завершенного агента не должен приниматься за агент")
+
+    def test_request(self):
+        """Тестирует обмен запросами и ответами со слушающим сокетом."""
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen()
+        requests = []
+
+        def serve():
+            connection, _ = server.accept()
+            with connection, connection.makefile('rb') as reader:
+                for response in ({'result': {'github': 'user'}}, {'error': "Ошибка"}):
+                    requests.append(json.loads(reader.readline()))
+                    connection.sendall(json.dumps(response).encode() + b'\n')
+                reader.readline()
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        client = AgentClient.connect(self.path)
+        try:
+            self.assertEqual(client.request('find', service='git'), {'github': 'user'})
+            with self.assertRaises(ValueError, msg="Ошибка агента должна возбуждать ValueError"):
+                client.request('verify', service='github', password='p')
+            client._socket.shutdown(socket.SHUT_WR)
+            thread.join()
+            with self.assertRaises(OSError, msg="Закрытое соединение должно возбуждать OSError"):
+                client.request('find', service='git')
+        finally:
+            client.close()
+            server.close()
+            thread.join()
+        self.assertEqual(requests, [{'op': 'find', 'service': 'git'},
+                                    {'op': 'verify', 'service': 'github', 'password': 'p'}])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
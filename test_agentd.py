@@ -0,0 +1,173 @@
+"""Модуль тестирования для agentd.py.
+
+Содержит unit-тесты агента хранилища: выполнения запросов клиентов,
+загрузки изменений других процессов, завершения по запросу и по
+времени простоя.
+"""
+
+import asyncio
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from agent import AgentClient, agent_path
+from agentd import VaultAgent, listen
+from kdf import ScryptKdf
+from storage import PasswordStorage
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Сокеты Unix недоступны")
+class TestVaultAgent(unittest.TestCase):
+    """Тестовый класс для проверки агента хранилища.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов хранилища.
+        path (str): Путь к файлу хранилища.
+    """
+
+    def setUp(self):
+        """Создает хранилище с двумя сервисами во временном каталоге."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'vault.json')
+        storage = PasswordStorage(self.path, kdf=ScryptKdf(1 << 10))
+        storage.store_password('github', 'user', 'pass1', 'master')
+        storage.store_password('gitlab', 'admin', 'pass2', 'master')
+        storage.close()
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def _start(self, backend='json', timeout=None):
+        """Запускает агент в отдельном потоке.
+
+        Хранилище открывается в потоке агента: соединение SQLite можно
+        использовать только в создавшем его потоке. VaultAgent.run
+        устанавливает обработчик SIGTERM, что возможно только в главном
+        потоке, поэтому цикл агента запускается напрямую.
+
+        Args:
+            backend (str): Имя движка хранения.
+            timeout (float): Время простоя агента в секундах или None.
+
+        Returns:
+            tuple: Агент и его поток.
+        """
+        sock = listen(agent_path(self.path))
+        agents = queue.Queue()
+
+        def serve():
+            storage = PasswordStorage(self.path, backend)
+            agent = VaultAgent(storage, storage.unlock('master'), timeout, sock)
+            agents.put(agent)
+            asyncio.run(agent.serve())
+            agent.storage.close()
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        return agents.get(timeout=30), thread
+
+    def test_requests(self):
+        """Тестирует поиск, проверку и сохранение паролей через агент."""
+        agent, thread = self._start()
+        client = AgentClient.connect(agent_path(self.path))
+        try:
+            self.assertEqual(client.request('find', service='git'), {'github': 'user', 'gitlab': 'admin'})
+            self.assertEqual(client.request('fuzzy', service='githib', limit=1), [['github', 1, 'user']])
+            self.assertTrue(client.request('verify', service='github', password='pass1'))
+            self.assertFalse(client.request('verify', service='github', password='wrong'))
+
+            self.assertIsNone(client.request('store', service='yandex', username='u', password='pass3'))
+            self.assertTrue(client.request('verify', service='yandex', password='pass3'))
+            with self.assertRaises(ValueError, msg="Ошибки хранилища должны передаваться клиенту"):
+                client.request('store', service='yandex', username='u', password='pass3')
+            for op, params in (('unknown', {}), ('find', {'name': 'git'})):
+                with self.assertRaises(ValueError):
+                    client.request(op, **params)
+            self.assertTrue(client.request('verify', service='github', password='pass1'),
+                            "После ошибки агент должен продолжать работу")
+        finally:
+            client.close()
+            agent.stop()
+            thread.join()
+
+        storage = PasswordStorage(self.path)
+        self.assertTrue(storage.verify_password('yandex', 'pass3', 'master'),
+                        "Пароль, сохраненный агентом, должен записываться на диск")
+        storage.close()
+        self.assertFalse(os.path.exists(agent_path(self.path)),
+                         "При завершении агента сокет должен удаляться")
+
+    def test_sync_external_changes(self):
+        """Тестирует, что агент видит изменения, сохраненные другими процессами."""
+        for backend in ('json', 'sqlite'):
+            with self.subTest(backend=backend):
+                if backend == 'sqlite':
+                    self.path = os.path.join(self.temp_dir.name, 'vault.db')
+                    storage = PasswordStorage(self.path, backend)
+                    storage.store_password('github', 'user', 'pass1', 'master')
+                    storage.close()
+                agent, thread = self._start(backend)
+                client = AgentClient.connect(agent_path(self.path))
+                try:
+                    self.assertEqual(client.request('find', service='bitbucket'), {})
+                    storage = PasswordStorage(self.path, backend)
+                    storage.store_password('bitbucket', 'other', 'pass4', 'master')
+                    storage.close()
+                    self.assertEqual(client.request('find', service='bitbucket'), {'bitbucket': 'other'},
+                                     "Агент должен загружать изменения других процессов")
+                    self.assertTrue(client.request('verify', service='bitbucket', password='pass4'))
+                finally:
+                    client.close()
+                    agent.stop()
+                    thread.join()
+
+    def test_keeps_only_key(self):
+        """Тестирует, что агент хранит ключ, а не мастер-пароль, и проверяет его."""
+        agent, thread = self._start()
+        client = AgentClient.connect(agent_path(self.path))
+        try:
+            self.assertNotIn('master', vars(agent).values(), "Агент не должен хранить мастер-пароль")
+            os.remove(self.path)
+            storage = PasswordStorage(self.path, kdf=ScryptKdf(1 << 10))
+            storage.store_password('github', 'user', 'pass1', 'other')
+            storage.close()
+            for op, params in (('verify', {'password': 'pass1'}),
+                               ('store', {'username': 'u', 'password': 'pass3'})):
+                with self.assertRaises(ValueError, msg="Ключ прежнего мастер-пароля должен отклоняться"):
+                    client.request(op, service='github', **params)
+        finally:
+            client.close()
+            agent.stop()
+            thread.join()
+
+    def test_listen_and_stop(self):
+        """Тестирует запрет второго агента и завершение по запросу stop."""
+        agent, thread = self._start()
+        with self.assertRaises(ValueError, msg="Второй агент того же хранилища не должен запускаться"):
+            listen(agent_path(self.path))
+        client = AgentClient.connect(agent_path(self.path))
+        client.request('stop')
+        client.close()
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive(), "Запрос stop должен завершать агент")
+        listen(agent_path(self.path)).close()
+
+    def test_idle_timeout(self):
+        """Тестирует завершение агента после времени простоя."""
+        agent, thread = self._start(timeout=0.3)
+        client = AgentClient.connect(agent_path(self.path))
+        start = time.monotonic()
+        time.sleep(0.2)
+        self.assertEqual(client.request('find', service='github'), {'github': 'user'})
+        thread.join(timeout=10)
+        client.close()
+        self.assertFalse(thread.is_alive(), "Агент должен завершаться после времени простоя")
+        self.assertGreaterEqual(time.monotonic() - start, 0.5, "Запрос должен продлевать работу агента")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
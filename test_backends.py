@@ -0,0 +1,476 @@
+"""Модуль тестирования для backends.py.
+
+Содержит unit-тесты движков хранения данных хранилища паролей.
+"""
+
+import json
+import os
+import tempfile
+import sqlite3
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+import backends
+from backends import (BinaryBackend, JsonBackend, JournalBackend, SqliteBackend, encode_record,
+                      iter_records, open_backend, write_atomic)
+from kdf import ScryptKdf
+from storage import PasswordStorage, complete_services
+
+
+class TestJournalBackend(unittest.TestCase):
+    """Тестовый класс для проверки движка с журналом изменений.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов хранилища.
+        path (str): Путь к файлу снимка.
+    """
+
+    def setUp(self):
+        """Создает временный каталог для файлов хранилища."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'vault.json')
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def test_records_roundtrip(self):
+        """Тестирует кодирование записей журнала и остановку на поврежденной записи."""
+        mutations = [('master', 'abc'), ('put', 'github', {'username': 'u', 'password_hash': 'h'})]
+        journal = b''.join(encode_record(m) for m in mutations)
+
+        self.assertEqual([m for m, _ in iter_records(journal)], mutations,
+                        "Записи должны декодироваться в исходные мутации")
+        self.assertEqual([m for m, _ in iter_records(journal[:-1])], mutations[:1],
+                        "Неполная запись должна отбрасываться")
+        corrupted = bytearray(journal)
+        corrupted[-2] ^= 0xFF
+        self.assertEqual([m for m, _ in iter_records(bytes(corrupted))], mutations[:1],
+                        "Запись с неверной контрольной суммой должна отбрасываться")
+
+    def test_append_only_writes(self):
+        """Тестирует запись изменений в журнал без перезаписи снимка.
+
+        Проверяет, что данные восстанавливаются из журнала в новом экземпляре.
+        """
+        storage = PasswordStorage(self.path, backend='journal')
+        storage.store_password('github', 'user', 'pass', 'master')
+        storage.store_password('gitlab', 'user2', 'pass2', 'master')
+        storage.close()
+
+        self.assertFalse(os.path.exists(self.path), "Снимок не должен создаваться до сжатия")
+        reopened = PasswordStorage(self.path, backend='journal')
+        self.assertTrue(reopened.verify_password('gitlab', 'pass2', 'master'),
+                       "Данные должны восстанавливаться из журнала")
+        self.assertEqual(set(reopened.find_service('git')), {'github', 'gitlab'},
+                        "Поиск должен работать по воспроизведенным данным")
+        reopened.close()
+
+    def test_torn_tail_is_discarded(self):
+        """Тестирует восстановление после оборванной последней записи журнала."""
+        backend = JournalBackend(self.path)
+        backend.apply([('master', 'm'), ('put', 'a', {'username': 'u', 'password_hash': 'h'})])
+        backend.close()
+        with open(backend.journal_path, 'ab') as f:
+            f.write(encode_record(('put', 'b', {'username': 'u', 'password_hash': 'h'}))[:-3])
+
+        backend = JournalBackend(self.path)
+        self.assertEqual(set(backend.data['passwords']), {'a'},
+                        "Оборванная запись не должна применяться")
+        backend.apply([('put', 'c', {'username': 'u', 'password_hash': 'h'})])
+        backend.close()
+        self.assertEqual(set(JournalBackend(self.path).data['passwords']), {'a', 'c'},
+                        "Новые записи должны дописываться после отброшенного хвоста")
+
+    def test_compaction(self):
+        """Тестирует сжатие журнала в снимок, совместимый с JSON-движком."""
+        original = backends.COMPACT_MIN_SIZE
+        backends.COMPACT_MIN_SIZE = 0
+        try:
+            backend = JournalBackend(self.path)
+            backend.apply([('master', 'm')])
+            for i in range(20):
+                backend.apply([('put', f'service{i}', {'username': 'u', 'password_hash': 'h'})])
+            backend.close()
+        finally:
+            backends.COMPACT_MIN_SIZE = original
+
+        self.assertLess(os.path.getsize(backend.journal_path), os.path.getsize(self.path),
+                       "После сжатия журнал должен быть меньше снимка")
+        self.assertEqual(JournalBackend(self.path).data, backend.data,
+                        "Снимок и журнал должны давать те же данные")
+        self.assertEqual(JsonBackend(self.path).data['master_hash'], 'm',
+                        "Снимок должен читаться JSON-движком")
+
+    def test_open_backend(self):
+        """Тестирует выбор движка по имени."""
+        self.assertIsInstance(open_backend('json', self.path), JsonBackend,
+                             "По имени json должен создаваться JsonBackend")
+        with self.assertRaises(ValueError):
+            open_backend('unknown', self.path)
+
+    def test_json_backend_format(self):
+        """Тестирует сохранение JSON-движком всего файла в прежнем формате."""
+        backend = JsonBackend(self.path)
+        backend.apply([('master', 'm'), ('put', 'a', {'username': 'u', 'password_hash': 'h'})])
+
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {'master_hash': 'm',
+                                            'passwords': {'a': {'username': 'u',
+                                                                'password_hash': 'h'}}},
+                            "Файл должен содержать все данные хранилища")
+
+
+class TestDurability(unittest.TestCase):
+    """Тестовый класс для проверки атомарной записи и групповой фиксации.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов хранилища.
+    """
+
+    def setUp(self):
+        """Создает временный каталог для файлов хранилища."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def _path(self, name):
+        """Возвращает путь к файлу во временном каталоге.
+
+        Args:
+            name (str): Имя файла.
+
+        Returns:
+            str: Полный путь.
+        """
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_write_atomic_keeps_old_file_on_failure(self):
+        """Тестирует сохранение прежнего файла при сбое замены."""
+        path = self._path('vault.json')
+        write_atomic(path, b'old')
+        with patch('backends.os.replace', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                write_atomic(path, b'new')
+
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'old', "При сбое должен оставаться прежний файл")
+        self.assertEqual(os.listdir(self.temp_dir.name), ['vault.json'],
+                        "Временный файл должен удаляться при сбое")
+
+    def test_batch_single_write(self):
+        """Тестирует групповую фиксацию для движков на словаре.
+
+        Проверяет, что изменения видны внутри блока, а сохраняются один раз.
+        """
+        for name in ('json', 'journal'):
+            with self.subTest(backend=name):
+                storage = PasswordStorage(self._path(f'{name}.json'), backend=name,
+                                          kdf=ScryptKdf(1 << 10))
+                with patch.object(storage.backend, 'save',
+                                  wraps=storage.backend.save) as save:
+                    with storage.batch():
+                        for i in range(50):
+                            storage.store_password(f'service{i}', 'user', f'pass{i}', 'master')
+                        with self.assertRaises(ValueError):
+                            storage.store_password('service7', 'user', 'pass', 'master')
+                        self.assertTrue(storage.verify_password('service7', 'pass7', 'master'),
+                                       "Изменения должны быть видны внутри блока")
+                        self.assertEqual(save.call_count, 0,
+                                        "Внутри блока изменения не должны сохраняться")
+                self.assertEqual(save.call_count, 1,
+                                "Изменения блока должны сохраняться одной записью")
+                storage.close()
+
+                reopened = PasswordStorage(self._path(f'{name}.json'), backend=name)
+                self.assertEqual(len(reopened.data['passwords']), 50,
+                                "Все изменения блока должны сохраняться")
+                reopened.close()
+
+    def test_failed_save_is_retried(self):
+        """Тестирует, что мутации, которые не удалось записать, сохраняются следующей фиксацией."""
+        for backend_class in (JsonBackend, JournalBackend, BinaryBackend):
+            with self.subTest(backend=backend_class.__name__):
+                path = self._path(f'retry-{backend_class.__name__}')
+                backend = backend_class(path)
+                backend.apply([('master', 'm')])
+                with patch.object(backend, 'save', side_effect=OSError('disk full')):
+                    with self.assertRaises(OSError):
+                        backend.apply([('put', 'a', {'username': 'u', 'password_hash': 'h'})])
+                self.assertIsNone(backend_class(path).get('a'))
+
+                backend.apply([('put', 'b', {'username': 'u', 'password_hash': 'h'})])
+                self.assertEqual(set(dict(backend_class(path).records())), {'a', 'b'},
+                                 "Мутации неудавшейся записи должны сохраняться следующей фиксацией")
+
+                with patch.object(backend, 'save', side_effect=OSError('disk full')):
+                    with self.assertRaises(OSError):
+                        backend.apply([('put', 'c', {'username': 'u', 'password_hash': 'h'})])
+                backend.rollback()
+                self.assertIsNone(backend.get('c'), "rollback должен отменять несохраненные мутации")
+                backend.commit()
+                self.assertIsNone(backend_class(path).get('c'))
+
+    def test_sqlite_batch_single_transaction(self):
+        """Тестирует фиксацию блока SQLite одной транзакцией."""
+        path = self._path('vault.db')
+        storage = PasswordStorage(path, backend='sqlite')
+        reader = sqlite3.connect(path)
+        with storage.batch():
+            with storage.batch():
+                storage.store_password('github', 'user', 'pass', 'master')
+            storage.store_password('gitlab', 'user', 'pass', 'master')
+            self.assertEqual(reader.execute('SELECT COUNT(*) FROM passwords').fetchone()[0], 0,
+                            "До выхода из внешнего блока изменения не должны фиксироваться")
+        self.assertEqual(reader.execute('SELECT COUNT(*) FROM passwords').fetchone()[0], 2,
+                        "После выхода из блока изменения должны быть зафиксированы")
+        reader.close()
+        storage.close()
+
+    def test_batch_rollback(self):
+        """Тестирует отмену изменений блока, завершившегося исключением."""
+        for name in ('json', 'journal', 'sqlite', 'binary'):
+            with self.subTest(backend=name):
+                path = self._path(f'rollback-{name}')
+                storage = PasswordStorage(path, backend=name)
+                storage.store_password('kept', 'user', 'pass', 'master')
+                with self.assertRaises(RuntimeError):
+                    with storage.batch():
+                        storage.store_password('dropped', 'user', 'pass', 'master')
+                        raise RuntimeError('abort')
+
+                self.assertEqual(set(storage.find_service('')), {'kept'},
+                                "Изменения блока должны отменяться")
+                storage.close()
+                reopened = PasswordStorage(path, backend=name)
+                self.assertEqual(set(reopened.find_service('')), {'kept'},
+                                "Отмененные изменения не должны сохраняться")
+                reopened.close()
+
+
+class TestSqliteBackend(unittest.TestCase):
+    """Тестовый класс для проверки движка SQLite.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для базы данных.
+        path (str): Путь к файлу базы данных.
+    """
+
+    def setUp(self):
+        """Создает временный каталог и хранилище на SQLite."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'vault.db')
+        self.storage = PasswordStorage(self.path, backend='sqlite')
+
+    def tearDown(self):
+        """Закрывает хранилище и удаляет временный каталог."""
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    def test_schema(self):
+        """Тестирует режим WAL и наличие индексов по сервису и имени пользователя."""
+        connection = self.storage.backend._connection
+        self.assertEqual(connection.execute('PRAGMA journal_mode').fetchone()[0], 'wal',
+                        "База должна работать в режиме WAL")
+        indexes = {row[1] for row in connection.execute('PRAGMA index_list(passwords)')}
+        self.assertTrue({'passwords_service_key', 'passwords_username'} <= indexes,
+                       "Должны создаваться индексы по сервису и имени пользователя")
+
+    def test_store_verify_find(self):
+        """Тестирует работу PasswordStorage поверх SQLite и сохранение между сессиями."""
+        self.storage.store_password('GitHub', 'user1', 'pass1', 'master')
+        self.storage.store_password('gitlab', 'user2', 'pass2', 'master')
+        self.storage.store_password('yandex', 'user3', 'pass3', 'master')
+        with self.assertRaises(ValueError):
+            self.storage.store_password('gitlab', 'user4', 'pass4', 'master')
+        with self.assertRaises(ValueError):
+            self.storage.store_password('other', 'user5', 'pass5', 'wrong')
+        self.storage.close()
+
+        self.storage = PasswordStorage(self.path, backend='sqlite')
+        self.assertTrue(self.storage.verify_password('gitlab', 'pass2', 'master'),
+                       "Правильный пароль должен подтверждаться")
+        self.assertFalse(self.storage.verify_password('gitlab', 'pass1', 'master'),
+                        "Неправильный пароль должен отклоняться")
+        self.assertFalse(self.storage.verify_password('missing', 'pass1', 'master'),
+                        "Пароль несуществующего сервиса должен отклоняться")
+        self.assertEqual(set(self.storage.find_service('GIT')), {'GitHub', 'gitlab'},
+                        "Поиск должен работать по подстроке без учета регистра")
+        self.assertEqual(self.storage.find_service('none'), {},
+                        "Поиск несуществующего сервиса должен возвращать пустой результат")
+        self.assertEqual(len(self.storage.data['passwords']), 3,
+                        "Свойство data должно содержать все записи")
+
+    def test_migrate_from_json(self):
+        """Тестирует перенос JSON-хранилища в SQLite."""
+        source = PasswordStorage(os.path.join(self.temp_dir.name, 'vault.json'))
+        source.store_password('github', 'user', 'pass', 'master')
+        source.store_password('yandex', 'user2', 'pass2', 'master')
+
+        target = source.migrate(os.path.join(self.temp_dir.name, 'migrated.db'), 'sqlite')
+        self.assertIsInstance(target.backend, SqliteBackend, "Новое хранилище должно быть SQLite")
+        self.assertEqual(target.data, source.data, "Данные должны переноситься полностью")
+        self.assertTrue(target.verify_password('yandex', 'pass2', 'master'),
+                       "Пароли должны проверяться в новом хранилище")
+        target.close()
+
+        with self.assertRaises(ValueError):
+            source.migrate(os.path.join(self.temp_dir.name, 'migrated.db'), 'sqlite')
+
+
+def store_services(path, backend, worker, count):
+    """Сохраняет пароли в хранилище из отдельного процесса.
+
+    Args:
+        path (str): Путь к файлу хранилища.
+        backend (str): Имя движка хранения.
+        worker (int): Номер процесса, входящий в названия сервисов.
+        count (int): Количество паролей.
+    """
+    storage = PasswordStorage(path, backend)
+    key = storage.unlock('master')
+    for i in range(count):
+        with storage.batch():
+            storage.store_with_key(f'worker{worker}-{i}', 'user', f'pass{i}', key)
+            if i % 5 == 0:
+                storage.store_with_key(f'worker{worker}-{i}-extra', 'user', 'extra', key)
+    storage.close()
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    """Тестовый класс для проверки одновременной записи из нескольких процессов.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов хранилища.
+    """
+
+    def setUp(self):
+        """Создает временный каталог для файлов хранилища."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def test_no_lost_updates(self):
+        """Тестирует, что записи нескольких процессов не теряются и попадают в индексы."""
+        workers, count = 4, 30
+        for backend in ('json', 'journal', 'sqlite', 'binary'):
+            with self.subTest(backend=backend):
+                path = os.path.join(self.temp_dir.name, f'vault-{backend}')
+                # Хеш мастер-пароля со случайной солью задается до запуска
+                # процессов: иначе каждый процесс внутри batch задал бы свой.
+                storage = PasswordStorage(path, backend)
+                storage.store_many([], 'master')
+                storage.close()
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(store_services, path, backend, worker, count)
+                               for worker in range(workers)]
+                    for future in futures:
+                        future.result()
+
+                expected = {f'worker{worker}-{i}' for worker in range(workers) for i in range(count)}
+                expected |= {f'worker{worker}-{i}-extra' for worker in range(workers)
+                             for i in range(0, count, 5)}
+                storage = PasswordStorage(path, backend)
+                self.assertEqual(set(dict(storage.backend.records())), expected,
+                                 "Записи всех процессов должны сохраняться")
+                self.assertTrue(storage.verify_password('worker3-29', 'pass29', 'master'))
+                self.assertEqual(set(storage.find_service('worker')), expected,
+                                 "Индекс поиска должен содержать записи всех процессов")
+                storage.close()
+                self.assertEqual(set(complete_services('worker', path, backend, limit=len(expected))),
+                                 expected, "Индекс автодополнения должен быть актуальным")
+
+    def test_stale_writer_merges_changes(self):
+        """Тестирует повторное применение мутаций к состоянию, сохраненному другим движком."""
+        for backend_class in (JsonBackend, JournalBackend, BinaryBackend):
+            with self.subTest(backend=backend_class.__name__):
+                path = os.path.join(self.temp_dir.name, f'stale-{backend_class.__name__}')
+                first, second, third = (backend_class(path) for _ in range(3))
+                first.apply([('master', 'm'), ('put', 'a', {'username': 'u', 'password_hash': 'h'})])
+                second.apply([('master', 'm'), ('put', 'b', {'username': 'u', 'password_hash': 'h'})])
+                first.apply([('put', 'c', {'username': 'u', 'password_hash': 'h'})])
+                self.assertEqual(set(dict(first.records())), {'a', 'b', 'c'},
+                                 "Устаревший движок должен загружать чужие изменения")
+                reopened = backend_class(path)
+                self.assertEqual(set(dict(reopened.records())), {'a', 'b', 'c'})
+
+                with self.assertRaises(ValueError):
+                    third.apply([('master', 'other'),
+                                 ('put', 'd', {'username': 'u', 'password_hash': 'h'})])
+                self.assertEqual(third.master_hash(), 'm', "Конфликтующие мутации должны отменяться")
+                self.assertIsNone(third.get('d'))
+
+                first.apply([('master', 'new', 'm')])
+                with self.assertRaises(ValueError):
+                    second.apply([('master', 'newer', 'm')])
+                self.assertEqual(second.master_hash(), 'new',
+                                 "Замена уже замененного хеша должна отменяться")
+                for backend in (first, second, third, reopened):
+                    backend.close()
+
+    def test_concurrent_add_is_rejected(self):
+        """Тестирует отклонение добавления сервиса, сохраненного другим движком."""
+        for backend in ('json', 'journal', 'sqlite', 'binary'):
+            with self.subTest(backend=backend):
+                path = os.path.join(self.temp_dir.name, f'add-{backend}')
+                first, second = open_backend(backend, path), open_backend(backend, path)
+                first.apply([('master', 'm')])
+                second.sync()
+                first.apply([('add', 'a', {'username': 'u', 'password_hash': 'first'})])
+                with self.assertRaises(ValueError):
+                    second.apply([('put', 'b', {'username': 'u', 'password_hash': 'h'}),
+                                  ('add', 'a', {'username': 'u', 'password_hash': 'second'})])
+                self.assertEqual(second.get('a')['password_hash'], 'first',
+                                 "Запись другого процесса не должна перезаписываться")
+                self.assertIsNone(second.get('b'), "Конфликтующие мутации должны отменяться")
+                second.apply([('add', 'c', {'username': 'u', 'password_hash': 'h'})])
+                self.assertEqual(set(dict(open_backend(backend, path).records())), {'a', 'c'})
+                first.close()
+                second.close()
+
+    def test_concurrent_store_same_service(self):
+        """Тестирует, что одновременное сохранение сервиса не перезаписывает чужой пароль."""
+        for backend in ('json', 'journal', 'sqlite', 'binary'):
+            with self.subTest(backend=backend):
+                path = os.path.join(self.temp_dir.name, f'store-{backend}')
+                storage = PasswordStorage(path, backend)
+                storage.store_many([], 'master')
+                other = PasswordStorage(path, backend)
+                storage.store_password('mail', 'user', 'first', 'master')
+                with self.assertRaises(ValueError):
+                    other.store_password('mail', 'user', 'second', 'master')
+                self.assertEqual(other.store_many([('mail', 'user', 'second')], 'master'), (0, 1),
+                                 "После отклонения сервис другого процесса должен быть виден")
+                storage.close()
+                other.close()
+                storage = PasswordStorage(path, backend)
+                self.assertTrue(storage.verify_password('mail', 'first', 'master'),
+                                "Сохраняться должен пароль первого процесса")
+                storage.close()
+
+    def test_sync(self):
+        """Тестирует загрузку изменений другого движка без фиксации своих."""
+        for backend in ('json', 'journal', 'sqlite', 'binary'):
+            with self.subTest(backend=backend):
+                path = os.path.join(self.temp_dir.name, f'sync-{backend}')
+                reader, writer = open_backend(backend, path), open_backend(backend, path)
+                self.assertFalse(reader.sync(), "Без изменений данные не должны загружаться")
+                writer.apply([('master', 'm'), ('put', 'a', {'username': 'u', 'password_hash': 'h'})])
+                self.assertTrue(reader.sync())
+                self.assertEqual(reader.get('a'), {'username': 'u', 'password_hash': 'h'})
+                self.assertFalse(reader.sync(), "Загруженные изменения не должны загружаться повторно")
+                writer.apply([('put', 'b', {'username': 'u', 'password_hash': 'h'})])
+                with reader.batch():
+                    self.assertFalse(reader.sync(), "Внутри batch изменения не должны загружаться")
+                self.assertTrue(reader.sync())
+                self.assertEqual(set(dict(reader.records())), {'a', 'b'})
+                reader.close()
+                writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
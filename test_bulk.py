@@ -0,0 +1,175 @@
+"""Модуль тестирования для bulk.py.
+
+Содержит unit-тесты для массовой генерации паролей в файл.
+Тесты проверяют разбиение работы между процессами, запись шардов и их склейку.
+"""
+
+import os
+import tempfile
+import unittest
+from itertools import product
+from bulk import split_count, write_shard, concatenate_shards, generate_to_file, keyspace
+from generator import CHAR_SETS, PasswordGenerator, compile_policy
+
+
+class TestBulkGeneration(unittest.TestCase):
+    """Тестовый класс для проверки массовой генерации паролей.
+    
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов вывода.
+    """
+    
+    def setUp(self):
+        """Настройка тестового окружения перед каждым тестом.
+        
+        Создает временный каталог для файлов вывода.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """Очистка тестового окружения после каждого теста.
+        
+        Удаляет временный каталог вместе с содержимым.
+        """
+        self.temp_dir.cleanup()
+    
+    def _path(self, name):
+        """Возвращает путь к файлу во временном каталоге.
+        
+        Args:
+            name (str): Имя файла.
+        
+        Returns:
+            str: Полный путь к файлу.
+        """
+        return os.path.join(self.temp_dir.name, name)
+    
+    def test_split_count(self):
+        """Тестирует разбиение количества паролей между процессами.
+        
+        Проверяет, что части отличаются не более чем на 1 и в сумме дают исходное число.
+        """
+        self.assertEqual(split_count(10, 3), [4, 3, 3],
+                        "Остаток должен распределяться по первым процессам")
+        self.assertEqual(split_count(2, 4), [1, 1],
+                        "Процессы без работы не должны создаваться")
+    
+    def test_write_shard(self):
+        """Тестирует запись шарда с паролями.
+        
+        Проверяет количество строк и параметры паролей в шарде.
+        """
+        path = self._path('shard.txt')
+        write_shard(path, 25, {'length': 10, 'use_special': False})
+        
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        
+        self.assertEqual(len(lines), 25,
+                        "Шард должен содержать указанное количество паролей")
+        self.assertTrue(all(len(line) == 10 and line.isalnum() for line in lines),
+                       "Пароли в шарде должны соответствовать параметрам генерации")
+    
+    def test_concatenate_shards(self):
+        """Тестирует склейку шардов в итоговый файл.
+        
+        Проверяет порядок строк и удаление шардов после склейки.
+        """
+        shard_paths = []
+        for i in range(3):
+            path = self._path(f'shard-{i}.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"a{i}\nb{i}\n")
+            shard_paths.append(path)
+        
+        output = self._path('out.txt')
+        concatenate_shards(shard_paths, output)
+        
+        with open(output, encoding='utf-8') as f:
+            self.assertEqual(f.read().split(), ['a0', 'b0', 'a1', 'b1', 'a2', 'b2'],
+                            "Шарды должны склеиваться по порядку")
+        self.assertFalse(any(os.path.exists(p) for p in shard_paths),
+                        "Шарды должны удаляться после склейки")
+    
+    def test_generate_to_file_with_workers(self):
+        """Тестирует параллельную генерацию паролей в файл.
+        
+        Проверяет количество и уникальность паролей при нескольких процессах.
+        """
+        output = self._path('passwords.txt')
+        generate_to_file(output, 1001, workers=3, length=16)
+        
+        with open(output, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        
+        self.assertEqual(len(lines), 1001,
+                        "Файл должен содержать все сгенерированные пароли")
+        self.assertEqual(len(set(lines)), 1001,
+                        "Процессы должны использовать независимые источники энтропии")
+        self.assertEqual(os.listdir(self.temp_dir.name), ['passwords.txt'],
+                        "Временные шарды не должны оставаться после генерации")
+    
+    def test_generate_to_file_seeded(self):
+        """Тестирует независимость файла от числа процессов при генерации с зерном."""
+        single = self._path('single.txt')
+        parallel = self._path('parallel.txt')
+        generate_to_file(single, 1000, workers=1, seed=7, start=10)
+        generate_to_file(parallel, 1000, workers=3, seed=7, start=10)
+        
+        with open(single, encoding='utf-8') as f:
+            expected = f.read()
+        with open(parallel, encoding='utf-8') as f:
+            self.assertEqual(f.read(), expected,
+                            "Содержимое файла не должно зависеть от числа процессов")
+        self.assertEqual(expected.splitlines(), PasswordGenerator(seed=7).generate_many(1010)[10:],
+                        "Файл должен начинаться с пароля с номером start")
+    
+    def test_keyspace(self):
+        """Тестирует оценку пространства паролей для всех режимов генерации."""
+        wordlist = self._path('words.txt')
+        with open(wordlist, 'w', encoding='utf-8') as f:
+            f.write("alpha\nbeta\ngamma\n")
+        corpus = self._path('corpus.txt')
+        with open(corpus, 'w', encoding='utf-8') as f:
+            f.write("ab ab\n")
+        generator = PasswordGenerator()
+        
+        self.assertEqual(keyspace(generator, 'passphrase',
+                                  {'words': 2, 'wordlist': wordlist, 'separator': '-'}), 9)
+        self.assertEqual(keyspace(generator, 'password', {
+            'length': 3, 'use_uppercase': False, 'use_digits': False, 'use_special': False}), 26 ** 3)
+        self.assertEqual(keyspace(generator, 'pronounceable', {
+            'length': 4, 'use_uppercase': True, 'use_digits': True, 'use_special': False,
+            'min_digits': 2, 'min_special': 1, 'corpus': corpus}), 100,
+                        "Корпус из одного слова дает одну буквенную часть")
+        self.assertEqual(keyspace(generator, 'password', {
+            'length': 2, 'use_digits': False, 'use_special': False}), 2 * 26 * 26,
+                        "Пароли без заглавной или строчной буквы не должны учитываться")
+        self.assertEqual(keyspace(generator, 'password', {
+            'length': 4, 'use_uppercase': False, 'use_digits': False, 'use_special': False,
+            'exclude': CHAR_SETS['lowercase'][3:], 'max_repeat': 1}), 3 * 2 ** 3,
+                        "Пароли с повторами подряд не должны учитываться")
+        policy = compile_policy(length=5, use_digits=False, use_special=False, min_uppercase=3,
+                                exclude=CHAR_SETS['lowercase'][3:] + CHAR_SETS['uppercase'][3:],
+                                max_repeat=2)
+        allowed = sum(1 for chars in product(policy.alphabet, repeat=5)
+                      if sum(c.isupper() for c in chars) >= 3
+                      and not policy.repeat_pattern.search(''.join(chars)))
+        self.assertGreaterEqual(keyspace(generator, 'password', {}, policy), allowed,
+                                "Оценка не должна быть меньше числа допустимых паролей")
+        with self.assertRaises(ValueError):
+            keyspace(generator, 'unknown', {})
+    
+    def test_generate_to_file_invalid_arguments(self):
+        """Тестирует отклонение некорректных параметров.
+        
+        Проверяет, что нулевое количество паролей или процессов вызывает ValueError.
+        """
+        with self.assertRaises(ValueError):
+            generate_to_file(self._path('out.txt'), 0)
+        with self.assertRaises(ValueError):
+            generate_to_file(self._path('out.txt'), 10, workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
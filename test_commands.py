@@ -4,8 +4,11 @@
 Тесты проверяют функциональность генерации паролей, поиска сервисов и управления хранилищем.
 """
 
+import json
 import os
+import subprocess
 import sys
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from io import StringIO
@@ -15,7 +18,12 @@ from io import StringIO
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from commands import PasswordCommands
+from generator import PasswordGenerator
 from storage import PasswordStorage
+from backends import LOCK_SUFFIX
+from completion import COMPLETE_SUFFIX
+from fuzzy import FUZZY_SUFFIX
+from trigram import INDEX_SUFFIX
 
 
 class TestPasswordCommands(unittest.TestCase):
@@ -43,6 +51,8 @@ class TestPasswordCommands(unittest.TestCase):
     def _cleanup_test_files(self):
         """Удаляет тестовые файлы паролей."""
         test_files = ['test_passwords.json', 'passwords.json', 'test_multiple_operations.json']
+        test_files += [file + suffix for file in test_files for suffix in (INDEX_SUFFIX, FUZZY_SUFFIX,
+                                                                            COMPLETE_SUFFIX, LOCK_SUFFIX)]
         for file in test_files:
             if os.path.exists(file):
                 os.remove(file)
@@ -247,7 +257,474 @@ class TestPasswordCommands(unittest.TestCase):
         output = mock_stdout.getvalue()
         self.assertIn("github", output.lower(), 
                      "Поиск должен работать без учета регистра")
+    
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_find_command_fuzzy(self, mock_stdout):
+        """Тестирует нечеткий поиск сервисов с опечатками.
+        
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+        """
+        self.commands.storage.store_password("GitHub", "Andrew09127", "GitHubPassQwerty", "master123")
+        self.commands.storage.store_password("gitlab", "user", "GitLabPass", "master123")
+        self.commands.storage.store_password("yandex", "user", "YandexPass456", "master123")
+        
+        args = MagicMock()
+        args.service = "githib"
+        args.fuzzy = True
+        args.limit = 5
+        
+        self.commands.find_command(args)
+        
+        output = mock_stdout.getvalue()
+        self.assertIn("GitHub: Andrew09127 (расстояние 1)", output,
+                     "Должен находиться сервис с одной опечаткой")
+        self.assertIn("gitlab: user (расстояние 2)", output,
+                     "Сервисы должны выводиться с расстоянием")
+        self.assertLess(output.index("GitHub"), output.index("gitlab"),
+                       "Ближайший сервис должен выводиться первым")
+        self.assertNotIn("yandex", output, "Далекие сервисы не должны находиться")
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_complete_command(self, mock_stdout):
+        """Тестирует скрытую команду автодополнения названий сервисов.
+        
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+        """
+        self.commands.storage.store_password("GitHub", "Andrew09127", "GitHubPassQwerty", "master123")
+        self.commands.storage.store_password("gitlab", "user", "GitLabPass", "master123")
+        self.commands.storage.store_password("yandex", "user", "YandexPass456", "master123")
+        
+        args = MagicMock()
+        args.prefix = "git"
+        args.shell = None
+        args.limit = 10
+        commands = PasswordCommands(self.commands.storage_file)
+        commands.complete_command(args)
+        
+        self.assertEqual(mock_stdout.getvalue(), "GitHub\ngitlab\n",
+                         "Должны выводиться названия сервисов с префиксом")
+        self.assertNotIn('storage', vars(commands), "Хранилище не должно открываться")
+        
+        mock_stdout.truncate(0)
+        mock_stdout.seek(0)
+        args.shell = "bash"
+        args.commands = ["generate", "find"]
+        commands.complete_command(args)
+        self.assertIn("complete -F _pwgen pwgen", mock_stdout.getvalue())
 
+    
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_generate_command_count(self, mock_stdout):
+        """Тестирует пакетную генерацию паролей через команду.
+        
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+        """
+        args = MagicMock()
+        args.length = 14
+        args.uppercase = True
+        args.digits = True
+        args.special = True
+        args.save = False
+        args.count = 5
+        
+        self.commands.generate_command(args)
+        
+        lines = mock_stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 5,
+                        "Должно выводиться по одному паролю на строку")
+        self.assertTrue(all(len(line) == 14 for line in lines),
+                       "Каждый пароль должен иметь указанную длину")
+    
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_generate_command_stream_count(self, mock_stdout):
+        """Тестирует потоковый вывод паролей в формате JSONL.
+        
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+        """
+        args = MagicMock()
+        args.length = 12
+        args.uppercase = True
+        args.digits = True
+        args.special = True
+        args.save = False
+        args.stream = True
+        args.count = 7
+        args.time_limit = None
+        args.format = 'jsonl'
+        
+        self.commands.generate_command(args)
+        
+        lines = mock_stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 7,
+                        "Поток должен останавливаться после указанного количества")
+        self.assertTrue(all(line.startswith('{"password": ') for line in lines),
+                       "Строки потока должны быть в формате JSONL")
+    
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_generate_command_constraints(self, mock_stdout):
+        """Тестирует генерацию с ограничениями и вывод ошибки для невыполнимых.
+        
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+        """
+        args = MagicMock()
+        args.length = 12
+        args.uppercase = True
+        args.digits = True
+        args.special = True
+        args.save = False
+        args.count = 20
+        args.min_digits = 4
+        args.exclude_ambiguous = True
+        
+        self.commands.generate_command(args)
+        
+        lines = mock_stdout.getvalue().splitlines()
+        self.assertTrue(all(sum(c.isdigit() for c in line) >= 4 for line in lines),
+                       "Каждый пароль должен содержать не менее 4 цифр")
+        
+        args.length = 5
+        self.commands.generate_command(args)
+        self.assertIn("Ошибка генерации", mock_stdout.getvalue(),
+                     "Невыполнимые ограничения должны выводиться как ошибка")
+    
+    @patch('getpass.getpass')
+    def test_deduplicate_with_vault(self, mock_getpass):
+        """Тестирует исключение повторов и паролей, уже сохраненных в хранилище.
+        
+        Хеши с солью сравниваются ключом мастер-пароля, поэтому при их наличии
+        запрашивается мастер-пароль.
+        
+        Args:
+            mock_getpass: Mock объект для имитации ввода мастер-пароля.
+        """
+        storage = self.commands.storage
+        storage.backend.apply([('put', 'legacy', {
+            'username': 'user', 'password_hash': storage._hash_password('stored')})])
+        
+        args = MagicMock()
+        args.unique_vault = True
+        
+        passwords = self.commands._deduplicate(args, iter(["stored", "x", "x", "y"]), 3)
+        self.assertEqual(list(passwords), ["x", "y"])
+        mock_getpass.assert_not_called()
+        
+        storage.store_password("github", "user", "salted", "master123")
+        mock_getpass.return_value = "master123"
+        passwords = self.commands._deduplicate(args, iter(["stored", "salted", "x", "x", "y"]), 3)
+        self.assertEqual(list(passwords), ["x", "y"],
+                        "Должны исключаться повторы и пароли из хранилища")
+        
+        mock_getpass.return_value = "wrong"
+        with self.assertRaises(ValueError):
+            self.commands._deduplicate(args, iter(["x"]), 1)
+        
+        mock_getpass.reset_mock()
+        with patch('commands.MAX_ENTRY_MATCHES', 2):
+            for count in (3, None):
+                with self.assertRaises(ValueError, msg="Слишком долгое сравнение должно отклоняться"):
+                    self.commands._deduplicate(args, iter(["x"]), count)
+        mock_getpass.assert_not_called()
+    
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_generate_command_unique(self, mock_stdout):
+        """Тестирует генерацию уникального пакета и отказ для малого пространства паролей.
+        
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+        """
+        args = MagicMock()
+        args.length = 8
+        args.uppercase = False
+        args.digits = False
+        args.special = False
+        args.save = False
+        args.count = 500
+        args.unique = True
+        
+        self.commands.generate_command(args)
+        lines = mock_stdout.getvalue().splitlines()
+        self.assertEqual(len(set(lines)), 500, "Все пароли пакета должны быть уникальными")
+        
+        args.length = 2
+        args.count = 1000
+        self.commands.generate_command(args)
+        self.assertIn("невозможно", mock_stdout.getvalue(),
+                     "Должна сообщаться невозможность получить столько уникальных паролей")
+        
+        # 52 ** 2 паролей больше 2000, но строчную и заглавную букву
+        # содержат только 2 * 26 * 26 из них.
+        args.uppercase = True
+        args.count = 2000
+        mock_stdout.truncate(0)
+        mock_stdout.seek(0)
+        self.commands.generate_command(args)
+        self.assertIn("невозможно", mock_stdout.getvalue(),
+                     "Оценка пространства должна учитывать минимумы типов символов")
+        args.uppercase = False
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            args.words = 1
+            args.wordlist = os.path.join(temp_dir, 'words.txt')
+            args.separator = '-'
+            args.count = 5
+            args.output = None
+            with open(args.wordlist, 'w', encoding='utf-8') as f:
+                f.write("alpha\nbeta\ngamma\n")
+            mock_stdout.truncate(0)
+            mock_stdout.seek(0)
+            self.commands.generate_command(args)
+        self.assertIn("невозможно", mock_stdout.getvalue(),
+                     "Пакет парольных фраз больше списка слов должен отклоняться без зависания")
+    
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_generate_command_seed(self, mock_stdout):
+        """Тестирует воспроизводимую генерацию с зерном и запрет ее сохранения.
+        
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+        """
+        args = MagicMock()
+        args.length = 12
+        args.uppercase = True
+        args.digits = True
+        args.special = True
+        args.save = False
+        args.count = 5
+        args.seed = 'load-test'
+        args.seed_offset = 2
+        
+        self.commands.generate_command(args)
+        self.assertEqual(mock_stdout.getvalue().splitlines(),
+                        PasswordGenerator(seed='load-test').generate_many(7)[2:],
+                        "Пароли должны воспроизводиться по зерну начиная с номера")
+        
+        args.count = 1
+        args.save = True
+        self.commands.generate_command(args)
+        self.assertIn("не сохраняются", mock_stdout.getvalue(),
+                     "Пароли с зерном не должны сохраняться")
+    
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_generate_does_not_open_storage(self, mock_stdout):
+        """Тестирует, что генерация без сохранения не открывает хранилище.
+        
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+        """
+        commands = PasswordCommands('test_passwords.json')
+        args = MagicMock()
+        args.length = 12
+        args.uppercase = True
+        args.digits = True
+        args.special = True
+        args.save = False
+        
+        with patch('commands.PasswordStorage') as storage_class:
+            commands.generate_command(args)
+            storage_class.assert_not_called()
+            
+            commands.storage.find_service("github")
+            storage_class.assert_called_once_with('test_passwords.json', 'json')
+    
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_migrate_command(self, mock_stdout):
+        """Тестирует перенос хранилища на другой движок через команду.
+        
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+        """
+        self.commands.storage.store_password("github", "user", "pass", "master123")
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            args = MagicMock()
+            args.to = 'sqlite'
+            args.target = os.path.join(temp_dir, 'vault.db')
+            self.commands.migrate_command(args)
+            
+            migrated = PasswordStorage(args.target, backend='sqlite')
+            self.assertTrue(migrated.verify_password("github", "pass", "master123"),
+                           "Записи должны переноситься в новое хранилище")
+            migrated.close()
+            self.assertIn("Перенесено 1 записей", mock_stdout.getvalue(),
+                         "Должно выводиться количество перенесенных записей")
+            
+            self.commands.migrate_command(args)
+            self.assertIn("Ошибка переноса", mock_stdout.getvalue(),
+                         "Перенос в непустое хранилище должен выводиться как ошибка")
+    
+    @patch('sys.stderr', new_callable=StringIO)
+    @patch('getpass.getpass', return_value='master123')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_import_command(self, mock_stdout, mock_getpass, mock_stderr):
+        """Тестирует импорт паролей из файла CSV через команду.
+        
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+            mock_getpass: Mock объект для функции getpass.
+            mock_stderr: Mock объект для перехвата вывода хода импорта.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            args = MagicMock()
+            args.file = os.path.join(temp_dir, 'accounts.csv')
+            args.format = None
+            with open(args.file, 'w', encoding='utf-8') as f:
+                f.write('service,username,password\ngithub,user,pass1\nyandex,user,pass2\n')
+            
+            self.commands.import_command(args)
+        
+        self.assertEqual(mock_getpass.call_count, 1, "Мастер-пароль должен запрашиваться один раз")
+        self.assertIn("Импортировано 2 записей", mock_stdout.getvalue(),
+                     "Должно выводиться количество импортированных записей")
+        self.assertTrue(self.commands.storage.verify_password("yandex", "pass2", "master123"),
+                       "Импортированные пароли должны проверяться")
+        
+        args.file = 'missing.csv'
+        self.commands.import_command(args)
+        self.assertIn("Ошибка импорта", mock_stderr.getvalue(),
+                     "Отсутствующий файл должен выводиться как ошибка")
+    
+    @patch('sys.stderr', new_callable=StringIO)
+    @patch('getpass.getpass', return_value='master123')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_verify_batch_command(self, mock_stdout, mock_getpass, mock_stderr):
+        """Тестирует пакетную проверку паролей из файла JSONL через команду.
+        
+        Args:
+            mock_stdout: Mock объект для перехвата результатов JSONL.
+            mock_getpass: Mock объект для функции getpass.
+            mock_stderr: Mock объект для перехвата итога проверки.
+        """
+        self.commands.storage.store_password("github", "user", "pass1", "master123")
+        self.commands.storage.store_password("yandex", "user", "pass2", "master123")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            args = MagicMock()
+            args.batch = os.path.join(temp_dir, 'audit.jsonl')
+            args.format = None
+            with open(args.batch, 'w', encoding='utf-8') as f:
+                f.write('{"service": "github", "password": "pass1"}\n'
+                        '{"service": "yandex", "password": "wrong"}\n'
+                        '{"service": "missing", "password": "pass1"}\n')
+            
+            self.commands.verify_command(args)
+        
+        self.assertEqual(mock_getpass.call_count, 1, "Мастер-пароль должен запрашиваться один раз")
+        results = [json.loads(line) for line in mock_stdout.getvalue().splitlines()]
+        self.assertEqual(results, [{'service': 'github', 'valid': True},
+                                   {'service': 'yandex', 'valid': False},
+                                   {'service': 'missing', 'valid': False}],
+                        "Результат каждой пары должен выводиться строкой JSONL")
+        self.assertIn("Проверено 3 паролей, верных 1", mock_stderr.getvalue())
+        self.assertIn("проверок/с", mock_stderr.getvalue(), "Должна выводиться скорость проверки")
+        
+        mock_getpass.return_value = 'wrong'
+        self.commands.verify_command(args)
+        self.assertIn("Неверный мастер-пароль", mock_stderr.getvalue(),
+                     "Неверный мастер-пароль должен выводиться как ошибка")
+    
+    @patch('getpass.getpass')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_commands_use_agent(self, mock_stdout, mock_getpass):
+        """Тестирует выполнение find и verify через запущенный агент хранилища.
+
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+            mock_getpass: Mock объект для функции getpass.
+        """
+        agent = MagicMock()
+        agent.request.side_effect = [{'github': 'user'}, [['github', 1, 'user']], True]
+        self.commands.agent = agent
+        mock_getpass.return_value = 'pass1'
+
+        args = MagicMock()
+        args.service = 'git'
+        args.fuzzy = False
+        self.commands.find_command(args)
+        args.service = 'githib'
+        args.fuzzy = True
+        args.limit = 5
+        self.commands.find_command(args)
+        args.batch = None
+        args.service = 'github'
+        self.commands.verify_command(args)
+
+        output = mock_stdout.getvalue()
+        self.assertIn("github: user", output)
+        self.assertIn("github: user (расстояние 1)", output)
+        self.assertIn("Пароль верный!", output)
+        self.assertEqual(mock_getpass.call_count, 1, "С агентом мастер-пароль не должен запрашиваться")
+        agent.request.assert_called_with('verify', service='github', password='pass1')
+        self.assertNotIn('storage', vars(self.commands), "С агентом хранилище не должно открываться")
+
+        agent.request.side_effect = ConnectionError
+        mock_getpass.side_effect = ['pass1', 'master123']
+        self.commands.verify_command(args)
+        self.assertIsNone(self.commands.agent, "Разорванное соединение с агентом должно закрываться")
+        self.assertIn("Пароль неверный!", mock_stdout.getvalue(),
+                     "Без агента команда должна проверять пароль по хранилищу")
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_agent_command_stop_without_agent(self, mock_stdout):
+        """Тестирует остановку агента, когда он не запущен.
+
+        Args:
+            mock_stdout: Mock объект для перехвата вывода в stdout.
+        """
+        args = MagicMock()
+        args.stop = True
+        self.commands.agent_command(args)
+        self.assertIn("Агент не запущен", mock_stdout.getvalue())
+
+    def test_generate_stream_broken_pipe(self):
+        """Тестирует завершение неограниченного потока при закрытии канала.
+        
+        Проверяет, что чтение нескольких строк и закрытие канала не приводит к трассировке.
+        """
+        main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+        process = subprocess.Popen([sys.executable, main_path, 'generate', '--stream'],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        lines = [process.stdout.readline() for _ in range(5)]
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        process.wait(timeout=30)
+        
+        self.assertTrue(all(len(line.strip()) == 12 for line in lines),
+                       "Поток должен выдавать пароли по одному на строку")
+        self.assertNotIn(b"Traceback", stderr,
+                        "Закрытие канала не должно приводить к трассировке")
+
+    def test_generate_pronounceable_seed_cli(self):
+        """Тестирует, что произносимые пароли с зерном в CLI совпадают с API.
+        
+        Проверка параметров не должна расходовать номер пароля ни при выводе,
+        ни при записи в файл.
+        """
+        main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            corpus = os.path.join(temp_dir, 'corpus.txt')
+            output = os.path.join(temp_dir, 'passwords.txt')
+            with open(corpus, 'w', encoding='utf-8') as f:
+                f.write("apple banana cherry grape lemon mango melon orange peach berry\n")
+            expected = PasswordGenerator(7).generate_pronounceable_many(4, corpus=corpus)
+            
+            command = [sys.executable, main_path, 'generate', '--pronounceable',
+                       '--corpus', corpus, '--seed', '7', '-n', '3']
+            for extra, passwords in (([], expected[:3]), (['--seed-offset', '1'], expected[1:])):
+                with self.subTest(extra=extra):
+                    result = subprocess.run(command + extra, capture_output=True, text=True,
+                                            timeout=60)
+                    self.assertEqual(result.stdout.splitlines(), passwords,
+                                    "Пароли CLI должны совпадать с паролями API с тем же зерном")
+            
+            subprocess.run(command + ['--output', output], capture_output=True, timeout=60)
+            with open(output, encoding='utf-8') as f:
+                self.assertEqual(f.read().splitlines(), expected[:3],
+                                "Файл должен начинаться с первого пароля зерна")
 
 def test_password_strength_display():
     """Тестирует отображение информации о сложности пароля."""
@@ -293,8 +770,11 @@ def test_multiple_operations():
         assert "service_3" in output.lower(), "Должен находиться service_3"
     
     # Очистка
-    if os.path.exists('test_multiple_operations.json'):
-        os.remove('test_multiple_operations.json')
+    for file in ['test_multiple_operations.json', 'test_multiple_operations.json' + INDEX_SUFFIX,
+                 'test_multiple_operations.json' + COMPLETE_SUFFIX,
+                 'test_multiple_operations.json' + LOCK_SUFFIX]:
+        if os.path.exists(file):
+            os.remove(file)
 
 
 def run_all_commands_tests():
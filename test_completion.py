@@ -0,0 +1,188 @@
+"""Модуль тестирования для completion.py.
+
+Содержит unit-тесты индекса автодополнения, его поддержки хранилищем
+паролей и сценариев автодополнения для командной оболочки.
+"""
+
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+from backends import BACKENDS
+from completion import COMPLETE_SUFFIX, CompletionIndex, completion_script
+from storage import PasswordStorage, complete_services
+
+
+def prefix_search(services, prefix):
+    """Находит сервисы по префиксу просмотром всех названий.
+
+    Args:
+        services (list): Названия сервисов.
+        prefix (str): Начало названия.
+
+    Returns:
+        list: Найденные названия в порядке сортировки без учета регистра.
+    """
+    prefix = prefix.lower()
+    return sorted((service for service in services if service.lower().startswith(prefix)),
+                  key=lambda service: (service.lower(), service))
+
+
+class TestCompletionIndex(unittest.TestCase):
+    """Тестовый класс для проверки индекса автодополнения.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов индекса.
+        path (str): Путь к файлу индекса.
+        services (list): Названия сервисов для индекса.
+    """
+
+    def setUp(self):
+        """Создает временный каталог и набор названий сервисов."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'vault.json' + COMPLETE_SUFFIX)
+        rng = random.Random(18)
+        self.services = sorted({''.join(rng.choice('abAB-.Яя') for _ in range(rng.randint(1, 8)))
+                                for _ in range(500)})
+        rng.shuffle(self.services)
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def assertMatchesPrefixSearch(self, index, services):
+        """Проверяет, что автодополнение совпадает с просмотром всех названий.
+
+        Args:
+            index (CompletionIndex): Индекс.
+            services (list): Названия сервисов в индексе.
+        """
+        prefixes = ['', 'zz', 'A', 'я'] + [service[:3].upper() for service in services[:50]]
+        for prefix in prefixes:
+            with self.subTest(prefix=prefix):
+                self.assertEqual(index.complete(prefix, limit=len(services)),
+                                 prefix_search(services, prefix),
+                                 "Результаты должны совпадать с просмотром")
+
+    def test_complete_matches_prefix_search(self):
+        """Тестирует совпадение автодополнения с просмотром и ограничение количества."""
+        index = CompletionIndex.build(self.services)
+        self.assertMatchesPrefixSearch(index, self.services)
+
+        index = CompletionIndex.build(['gitlab', 'GitHub', 'github', 'yandex'])
+        self.assertEqual(index.complete('GIT'), ['GitHub', 'github', 'gitlab'])
+        self.assertEqual(index.complete('git', limit=1), ['GitHub'])
+        self.assertEqual(index.complete('amazon'), [])
+
+    def test_save_load_and_append(self):
+        """Тестирует сохранение, дозапись в хвост и сжатие индекса."""
+        CompletionIndex.build(self.services[:300]).save(self.path, 'state-1')
+        self.assertTrue(CompletionIndex.append(self.path, 'state-1', 'state-2', self.services[300:]))
+        self.assertIsNone(CompletionIndex.load(self.path, 'state-1'),
+                          "Индекс для другого состояния хранилища не должен загружаться")
+
+        loaded = CompletionIndex.load(self.path, 'state-2')
+        try:
+            self.assertMatchesPrefixSearch(loaded, self.services)
+            loaded.save(self.path, 'state-3')
+        finally:
+            loaded.close()
+
+        loaded = CompletionIndex.load(self.path, 'state-3')
+        try:
+            self.assertEqual(loaded._added, [], "Сохраненный индекс не должен иметь хвоста")
+            self.assertMatchesPrefixSearch(loaded, self.services)
+        finally:
+            loaded.close()
+
+
+class TestStorageCompletion(unittest.TestCase):
+    """Тестовый класс для проверки автодополнения по хранилищу.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов хранилища.
+    """
+
+    def setUp(self):
+        """Создает временный каталог."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def test_index_is_updated_on_write(self):
+        """Тестирует обновление индекса при записи и автодополнение без чтения хранилища."""
+        for backend in ('json', 'journal', 'sqlite', 'binary'):
+            with self.subTest(backend=backend):
+                path = os.path.join(self.temp_dir.name, f'vault-{backend}')
+                storage = PasswordStorage(path, backend)
+                self.assertEqual(BACKENDS[backend].read_fingerprint(path),
+                                 storage.backend.fingerprint(),
+                                 "Отпечаток по файлам должен совпадать с отпечатком движка")
+                storage.store_many([(f'service-{i}', 'user', 'pass') for i in range(20)], 'master')
+                self.assertTrue(os.path.exists(path + COMPLETE_SUFFIX),
+                                "Индекс должен сохраняться при первой записи")
+                storage.store_password('GitHub', 'user', 'pass', 'master')
+                storage.store_password('gitlab', 'user', 'pass', 'master')
+                self.assertEqual(BACKENDS[backend].read_fingerprint(path),
+                                 storage.backend.fingerprint())
+                storage.close()
+
+                with patch('storage.PasswordStorage') as mock_storage:
+                    self.assertEqual(complete_services('GIT', path, backend), ['GitHub', 'gitlab'])
+                    self.assertEqual(complete_services('service-1', path, backend, limit=3),
+                                     ['service-1', 'service-10', 'service-11'])
+                mock_storage.assert_not_called()
+
+    def test_stale_index_is_rebuilt(self):
+        """Тестирует перестроение индекса после изменения хранилища без него."""
+        path = os.path.join(self.temp_dir.name, 'vault.json')
+        storage = PasswordStorage(path)
+        storage.store_password('github', 'user', 'pass', 'master')
+        storage.backend.apply([('put', 'gitlab', {'username': 'u', 'password_hash': 'h'})])
+        storage.close()
+
+        self.assertEqual(complete_services('git', path), ['github', 'gitlab'],
+                         "Устаревший индекс должен строиться заново")
+        with patch('storage.PasswordStorage') as mock_storage:
+            self.assertEqual(complete_services('git', path), ['github', 'gitlab'])
+        mock_storage.assert_not_called()
+
+    def test_missing_storage(self):
+        """Тестирует, что автодополнение не создает отсутствующее хранилище."""
+        for backend in ('json', 'journal', 'sqlite', 'binary'):
+            with self.subTest(backend=backend):
+                path = os.path.join(self.temp_dir.name, f'missing-{backend}')
+                self.assertEqual(complete_services('git', path, backend), [])
+                self.assertEqual(os.listdir(self.temp_dir.name), [])
+        with self.assertRaises(ValueError):
+            complete_services('git', backend='unknown')
+
+
+class TestCompletionScript(unittest.TestCase):
+    """Тестовый класс для проверки сценариев автодополнения."""
+
+    def test_scripts(self):
+        """Тестирует подстановку команды запуска и синтаксис сценариев."""
+        command = ['/usr/bin/python3', '/opt/password generator/main.py']
+        for shell in ('bash', 'zsh'):
+            with self.subTest(shell=shell):
+                script = completion_script(shell, command, ['generate', 'find'])
+                self.assertIn("/usr/bin/python3 '/opt/password generator/main.py' \"$@\"", script)
+                self.assertIn('generate find', script)
+                self.assertNotIn('@', script.replace('"$@"', '').replace('${options[@]}', ''),
+                                 "Все подстановки должны быть выполнены")
+                executable = shutil.which(shell)
+                if executable is not None:
+                    result = subprocess.run([executable, '-n'], input=script, text=True)
+                    self.assertEqual(result.returncode, 0, "Сценарий должен быть корректным")
+        with self.assertRaises(ValueError):
+            completion_script('fish', command, [])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,110 @@
+"""Модуль тестирования для dedup.py.
+
+Содержит unit-тесты для точного дедупликатора и фильтра Блума.
+Тесты проверяют отсутствие повторов и совместимость с хешами хранилища.
+"""
+
+import itertools
+import unittest
+from dedup import (ExactDeduplicator, BloomDeduplicator, ScalableBloomDeduplicator,
+                   make_deduplicator, password_digest, unique_passwords)
+from storage import PasswordStorage
+
+
+class TestDeduplication(unittest.TestCase):
+    """Тестовый класс для проверки дедупликаторов."""
+    
+    def test_exact_deduplicator(self):
+        """Тестирует точный дедупликатор.
+        
+        Проверяет, что повторный пароль отклоняется, а новый принимается.
+        """
+        deduplicator = ExactDeduplicator()
+        
+        self.assertTrue(deduplicator.add("alpha"), "Новый пароль должен приниматься")
+        self.assertFalse(deduplicator.add("alpha"), "Повторный пароль должен отклоняться")
+        self.assertTrue(deduplicator.add("beta"), "Другой пароль должен приниматься")
+    
+    def test_bloom_has_no_false_negatives(self):
+        """Тестирует отсутствие ложноотрицательных ответов фильтра Блума.
+        
+        Проверяет, что каждый повторно добавленный пароль отклоняется,
+        а доля ложных срабатываний близка к расчетной.
+        """
+        deduplicator = BloomDeduplicator(capacity=20000, error_rate=0.01)
+        passwords = [f"password-{i}" for i in range(20000)]
+        
+        accepted = sum(deduplicator.add(p) for p in passwords)
+        self.assertGreater(accepted, 19600,
+                          "Доля ложных срабатываний должна быть близка к расчетной")
+        self.assertFalse(any(deduplicator.add(p) for p in passwords),
+                        "Повторно добавленные пароли должны отклоняться")
+    
+    def test_make_deduplicator(self):
+        """Тестирует выбор дедупликатора по размеру пакета.
+        
+        Проверяет выбор точного множества для малых пакетов и фильтра Блума для больших.
+        """
+        self.assertIsInstance(make_deduplicator(10), ExactDeduplicator)
+        self.assertIsInstance(make_deduplicator(10, exact_limit=5), BloomDeduplicator)
+        self.assertIsInstance(make_deduplicator(None), ScalableBloomDeduplicator,
+                             "Для неограниченного потока фильтр Блума должен расти")
+    
+    def test_scalable_bloom_grows(self):
+        """Тестирует рост набора фильтров Блума сверх емкости первого фильтра.
+        
+        Проверяет, что доля ложных срабатываний остается близкой к расчетной
+        для потока в десятки раз больше емкости первого фильтра.
+        """
+        deduplicator = ScalableBloomDeduplicator(capacity=1000, error_rate=0.01)
+        passwords = [f"password-{i}" for i in range(30000)]
+        
+        accepted = sum(deduplicator.add(p) for p in passwords)
+        self.assertGreater(len(deduplicator.filters), 1, "Должны добавляться новые фильтры")
+        self.assertGreater(accepted, 29400,
+                          "Доля ложных срабатываний не должна расти вместе с потоком")
+        self.assertFalse(any(deduplicator.add(p) for p in passwords),
+                        "Повторно добавленные пароли должны отклоняться")
+    
+    def test_unique_passwords(self):
+        """Тестирует фильтрацию повторов в потоке паролей.
+        
+        Проверяет сохранение порядка первых вхождений.
+        """
+        stream = iter(["a", "b", "a", "c", "b", "d"])
+        self.assertEqual(list(unique_passwords(stream, ExactDeduplicator())),
+                        ["a", "b", "c", "d"],
+                        "Должны оставаться только первые вхождения паролей")
+    
+    def test_unique_passwords_exhausted(self):
+        """Тестирует отказ вместо бесконечного ожидания нового пароля.
+        
+        Проверяет, что поток из одних повторов завершается ошибкой.
+        """
+        stream = itertools.cycle(["a", "b", "c"])
+        passwords = unique_passwords(stream, ExactDeduplicator(), max_duplicate_run=100)
+        self.assertEqual([next(passwords) for _ in range(3)], ["a", "b", "c"])
+        with self.assertRaises(ValueError, msg="Исчерпанный поток должен завершаться ошибкой"):
+            next(passwords)
+    
+    def test_digest_matches_storage_hash(self):
+        """Тестирует совместимость дайджеста с хешами хранилища.
+        
+        Проверяет, что хранилище можно использовать для предзаполнения дедупликатора.
+        """
+        storage = PasswordStorage.__new__(PasswordStorage)
+        password = "Sup3r$ecret"
+        
+        self.assertEqual(password_digest(password).hex(), storage._hash_password(password),
+                        "Дайджест должен совпадать с хешем пароля в хранилище")
+        
+        for deduplicator in (ExactDeduplicator(), BloomDeduplicator(capacity=100),
+                             ScalableBloomDeduplicator(capacity=100)):
+            with self.subTest(deduplicator=type(deduplicator).__name__):
+                deduplicator.add_digest(bytes.fromhex(storage._hash_password(password)))
+                self.assertFalse(deduplicator.add(password),
+                                "Пароль из хранилища должен считаться повтором")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,198 @@
+"""Модуль тестирования для fuzzy.py.
+
+Содержит unit-тесты расстояния редактирования, индекса удалений и
+нечеткого поиска сервисов в хранилище паролей.
+"""
+
+import os
+import random
+import tempfile
+import unittest
+from fuzzy import FUZZY_SUFFIX, MAX_DISTANCE, FuzzyIndex, deletes, edit_distance
+from storage import PasswordStorage
+
+
+def levenshtein(first, second):
+    """Вычисляет расстояние Левенштейна без отсечения.
+
+    Args:
+        first (str): Первая строка.
+        second (str): Вторая строка.
+
+    Returns:
+        int: Расстояние.
+    """
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, 1):
+        current = [i]
+        for j, other in enumerate(second, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char != other)))
+        previous = current
+    return previous[-1]
+
+
+def brute_force(services, query, limit):
+    """Находит ближайшие сервисы просмотром всех названий.
+
+    Args:
+        services (list): Названия сервисов.
+        query (str): Запрос.
+        limit (int): Максимальное количество результатов.
+
+    Returns:
+        list: Пары (название, расстояние) в порядке индекса.
+    """
+    matches = [(levenshtein(query.lower(), service.lower()), number, service)
+               for number, service in enumerate(services)]
+    matches = sorted(match for match in matches if match[0] <= MAX_DISTANCE)
+    return [(service, distance) for distance, _, service in matches[:limit]]
+
+
+def typo(rng, word):
+    """Вносит в строку до трех случайных правок.
+
+    Args:
+        rng (random.Random): Генератор случайных чисел.
+        word (str): Исходная строка.
+
+    Returns:
+        str: Строка с опечатками.
+    """
+    for _ in range(rng.randint(0, 3)):
+        position = rng.randrange(len(word) + 1)
+        kind = rng.choice('ids')
+        if kind == 'i':
+            word = word[:position] + rng.choice('abcxyz') + word[position:]
+        elif kind == 'd':
+            word = word[:position] + word[position + 1:]
+        else:
+            word = word[:position] + rng.choice('abcxyz') + word[position + 1:]
+    return word
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    """Тестовый класс для проверки индекса удалений.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов индекса.
+        path (str): Путь к файлу индекса.
+        services (list): Названия сервисов для индекса.
+    """
+
+    def setUp(self):
+        """Создает временный каталог и набор названий сервисов."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'vault.json' + FUZZY_SUFFIX)
+        rng = random.Random(17)
+        self.services = sorted({''.join(rng.choice('abcxyzAB.') for _ in range(rng.randint(2, 14)))
+                                for _ in range(400)})
+        rng.shuffle(self.services)
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def assertMatchesBruteForce(self, index, services):
+        """Проверяет, что поиск по индексу совпадает с полным просмотром.
+
+        Args:
+            index (FuzzyIndex): Индекс.
+            services (list): Названия сервисов в индексе.
+        """
+        rng = random.Random(71)
+        for service in rng.sample(services, 100):
+            query = typo(rng, service)
+            with self.subTest(query=query):
+                self.assertEqual(index.search(query, limit=50), brute_force(services, query, 50),
+                                 "Результаты должны совпадать с полным просмотром")
+
+    def test_deletes(self):
+        """Тестирует построение строк удалений."""
+        self.assertEqual(deletes('abc', 1), {'abc', 'bc', 'ac', 'ab'})
+        self.assertEqual(len(deletes('abcd', 2)), 1 + 4 + 6, "Удаления без повторов")
+
+    def test_edit_distance(self):
+        """Тестирует расстояние редактирования с отсечением по пределу."""
+        rng = random.Random(7)
+        for _ in range(300):
+            first = typo(rng, 'service')
+            second = typo(rng, first)
+            expected = levenshtein(first, second)
+            self.assertEqual(edit_distance(first, second), min(expected, MAX_DISTANCE + 1))
+            self.assertEqual(edit_distance(first, second, limit=10), expected)
+
+    def test_search_matches_brute_force(self):
+        """Тестирует совпадение поиска с полным просмотром и ранжирование."""
+        index = FuzzyIndex.build(self.services)
+        self.assertMatchesBruteForce(index, self.services)
+
+        index = FuzzyIndex.build(['gitlab', 'GitHub', 'github-enterprise', 'yandex'])
+        self.assertEqual(index.search('githib'), [('GitHub', 1), ('gitlab', 2)],
+                         "Результаты упорядочиваются по расстоянию")
+        self.assertEqual(index.search('githib', limit=1), [('GitHub', 1)])
+        self.assertEqual(index.search('amazon'), [])
+
+    def test_save_load_and_append(self):
+        """Тестирует сохранение, дозапись в хвост и загрузку индекса."""
+        FuzzyIndex.build(self.services[:300]).save(self.path, 'state-1')
+        self.assertTrue(FuzzyIndex.append(self.path, 'state-1', 'state-2', self.services[300:]))
+        self.assertIsNone(FuzzyIndex.load(self.path, 'state-1'),
+                          "Индекс для другого состояния хранилища не должен загружаться")
+
+        loaded = FuzzyIndex.load(self.path, 'state-2')
+        try:
+            self.assertMatchesBruteForce(loaded, self.services)
+            loaded.add('githab')
+            loaded.save(self.path, 'state-3')
+        finally:
+            loaded.close()
+
+        loaded = FuzzyIndex.load(self.path, 'state-3')
+        try:
+            self.assertEqual(loaded.search('github'), [('githab', 1)])
+        finally:
+            loaded.close()
+
+
+class TestStorageFuzzySearch(unittest.TestCase):
+    """Тестовый класс для проверки нечеткого поиска в хранилище.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов хранилища.
+    """
+
+    def setUp(self):
+        """Создает временный каталог."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def test_find_fuzzy(self):
+        """Тестирует нечеткий поиск и дозапись новых сервисов в индекс."""
+        for backend in ('json', 'journal', 'sqlite', 'binary'):
+            with self.subTest(backend=backend):
+                path = os.path.join(self.temp_dir.name, f'vault-{backend}')
+                storage = PasswordStorage(path, backend)
+                storage.store_password('GitHub', 'user', 'pass', 'master')
+                self.assertEqual(storage.find_fuzzy('githib'),
+                                 [('GitHub', 1, storage.backend.get('GitHub'))])
+                self.assertTrue(os.path.exists(path + FUZZY_SUFFIX),
+                                "Индекс должен сохраняться при первом поиске")
+
+                storage.store_password('gitlab', 'admin', 'pass', 'master')
+                storage.close()
+
+                storage = PasswordStorage(path, backend)
+                self.assertEqual([match[:2] for match in storage.find_fuzzy('gitlob')],
+                                 [('gitlab', 1), ('GitHub', 2)],
+                                 "Новый сервис должен находиться по дописанному индексу")
+                self.assertEqual(len(storage._service_index(FuzzyIndex)._added), 1,
+                                 "Новые сервисы должны дописываться в хвост индекса")
+                storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
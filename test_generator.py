@@ -4,8 +4,14 @@
 Тесты проверяют функциональность генерации паролей с различными параметрами.
 """
 
+import math
+import os
+import tempfile
 import unittest
-from generator import PasswordGenerator
+from collections import Counter
+from itertools import islice
+from generator import (PasswordGenerator, EntropyPool, SeededEntropyPool, PasswordPolicy,
+                       compile_policy, AMBIGUOUS_CHARS, CHAR_SETS)
 
 
 class TestPasswordGenerator(unittest.TestCase):
@@ -152,6 +158,399 @@ class TestPasswordGenerator(unittest.TestCase):
                 self.assertGreater(len(self.generator.chars_sets[char_set]), 0,
                                  f"Набор символов '{char_set}' не должен быть пустым")
 
+    
+    def test_generate_many_count_and_length(self):
+        """Тестирует пакетную генерацию паролей.
+        
+        Проверяет количество, длину и наличие обязательных типов символов.
+        """
+        passwords = self.generator.generate_many(50, length=16)
+        
+        self.assertEqual(len(passwords), 50,
+                        "Должно быть сгенерировано ровно 50 паролей")
+        for password in passwords:
+            with self.subTest(password=password):
+                self.assertEqual(len(password), 16,
+                                "Каждый пароль должен иметь длину 16 символов")
+                self.assertTrue(any(c.isupper() for c in password),
+                               "Пароль должен содержать заглавные буквы")
+                self.assertTrue(any(c.isdigit() for c in password),
+                               "Пароль должен содержать цифры")
+                self.assertTrue(any(not c.isalnum() for c in password),
+                               "Пароль должен содержать специальные символы")
+    
+    def test_generate_many_respects_disabled_types(self):
+        """Тестирует пакетную генерацию с отключенными типами символов.
+        
+        Проверяет, что отключенные типы символов не попадают в пароли.
+        """
+        passwords = self.generator.generate_many(20, use_uppercase=False,
+                                                 use_digits=False, use_special=False)
+        
+        self.assertTrue(all(p.islower() and p.isalpha() for p in passwords),
+                       "Пароли должны состоять только из строчных букв")
+    
+    def test_generate_many_zero_and_negative(self):
+        """Тестирует граничные значения количества паролей.
+        
+        Проверяет, что нулевое количество дает пустой список, а отрицательное - ошибку.
+        """
+        self.assertEqual(self.generator.generate_many(0), [],
+                        "При нулевом количестве должен возвращаться пустой список")
+        with self.assertRaises(ValueError,
+                              msg="Отрицательное количество должно вызывать ошибку"):
+            self.generator.generate_many(-1)
+    
+    def test_iter_passwords_stream(self):
+        """Тестирует потоковую генерацию паролей.
+        
+        Проверяет, что поток выдает пароли дольше одного пакета с заданными параметрами.
+        """
+        stream = self.generator.iter_passwords(length=10, use_special=False, batch_size=7)
+        passwords = list(islice(stream, 30))
+        
+        self.assertEqual(len(passwords), 30,
+                        "Поток должен выдавать пароли за пределами одного пакета")
+        self.assertTrue(all(len(p) == 10 and p.isalnum() for p in passwords),
+                       "Пароли потока должны соответствовать параметрам генерации")
+    
+    def test_generate_passphrases(self):
+        """Тестирует генерацию парольных фраз из списка слов.
+        
+        Проверяет количество слов, разделитель и использование одного отображения списка.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'words.txt')
+            words = [f"word{i}" for i in range(100)]
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(words))
+            
+            phrases = self.generator.generate_passphrases(50, words=5, wordlist=path, separator=' ')
+            phrase = self.generator.generate_passphrase(words=3, wordlist=path)
+            
+            self.assertEqual(len(phrases), 50,
+                            "Должно быть сгенерировано указанное количество фраз")
+            for item in phrases:
+                parts = item.split(' ')
+                self.assertEqual(len(parts), 5, "Фраза должна состоять из 5 слов")
+                self.assertTrue(set(parts) <= set(words), "Слова должны браться из списка")
+            self.assertEqual(len(phrase.split('-')), 3,
+                            "По умолчанию слова должны разделяться дефисом")
+            self.assertEqual(len(self.generator._wordlists), 1,
+                            "Все фразы должны использовать одно отображение списка")
+            
+            for wordlist in self.generator._wordlists.values():
+                wordlist.close()
+        
+        with self.assertRaises(FileNotFoundError):
+            self.generator.generate_passphrase(wordlist='missing-wordlist.txt')
+    
+    def test_generate_pronounceable(self):
+        """Тестирует генерацию произносимых паролей по корпусу.
+        
+        Проверяет длину, заглавную первую букву и добавленные цифры и спецсимволы.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            corpus = os.path.join(temp_dir, 'corpus.txt')
+            with open(corpus, 'w', encoding='utf-8') as f:
+                f.write("river garden castle dragon silver mirror pencil rabbit")
+            
+            passwords = self.generator.generate_pronounceable_many(100, length=12, min_digits=2,
+                                                                   corpus=corpus)
+            
+            for password in passwords:
+                with self.subTest(password=password):
+                    self.assertEqual(len(password), 12, "Пароль должен иметь длину 12 символов")
+                    self.assertTrue(password[0].isupper(), "Пароль должен начинаться с заглавной")
+                    self.assertTrue(password[1:9].islower() and password[:9].isalpha(),
+                                   "Буквенная часть должна состоять из букв корпуса")
+                    self.assertTrue(password[9:11].isdigit(), "После букв должны идти 2 цифры")
+                    self.assertFalse(password[11].isalnum(), "Последним должен быть спецсимвол")
+            
+            plain = self.generator.generate_pronounceable(length=8, use_uppercase=False,
+                                                          use_digits=False, use_special=False,
+                                                          corpus=corpus)
+            self.assertTrue(plain.isalpha() and plain.islower(),
+                           "Без дополнительных типов пароль должен состоять из строчных букв")
+            with self.assertRaises(ValueError):
+                self.generator.generate_pronounceable(length=2, corpus=corpus)
+
+
+class TestPasswordPolicy(unittest.TestCase):
+    """Тестовый класс для проверки скомпилированных политик PasswordPolicy."""
+    
+    def test_compile_policy_is_memoized(self):
+        """Тестирует кеширование скомпилированных политик.
+        
+        Проверяет, что одинаковые параметры дают один и тот же объект.
+        """
+        policy_1 = compile_policy(16, True, False, True)
+        policy_2 = compile_policy(16, True, False, True)
+        
+        self.assertIs(policy_1, policy_2,
+                     "Политика с одинаковыми параметрами должна браться из кеша")
+        self.assertIsNot(policy_1, compile_policy(16, True, True, True),
+                        "Разные параметры должны давать разные политики")
+    
+    def test_policy_precomputes_alphabet(self):
+        """Тестирует предвычисленный алфавит и обязательные символы политики.
+        
+        Проверяет учет исключенных символов и отключенных типов.
+        """
+        policy = compile_policy(12, use_special=False, exclude='abc012')
+        
+        self.assertFalse(set('abc012') & set(policy.alphabet),
+                        "Исключенные символы не должны попадать в алфавит")
+        self.assertFalse(any(not c.isalnum() for c in policy.alphabet),
+                        "Отключенный тип символов не должен попадать в алфавит")
+        self.assertEqual(policy.required_count, 3,
+                        "Обязательными должны быть строчная, заглавная буквы и цифра")
+    
+    def test_policy_validation(self):
+        """Тестирует отклонение невыполнимых политик.
+        
+        Проверяет слишком короткую длину и полностью исключенный тип символов.
+        """
+        with self.assertRaises(ValueError):
+            compile_policy(2)
+        with self.assertRaises(ValueError):
+            PasswordPolicy(8, (('digits', '0123456789', 1),), exclude='0123456789')
+    
+    def test_generate_with_policy(self):
+        """Тестирует генерацию паролей по готовой политике.
+        
+        Проверяет, что параметры политики имеют приоритет и исключения соблюдаются.
+        """
+        generator = PasswordGenerator()
+        policy = compile_policy(20, exclude='0Oo1lI')
+        
+        passwords = generator.generate_many(200, length=8, policy=policy)
+        
+        self.assertTrue(all(len(p) == 20 for p in passwords),
+                       "Длина пароля должна браться из политики")
+        self.assertFalse(any(set('0Oo1lI') & set(p) for p in passwords),
+                        "Исключенные символы не должны попадать в пароли")
+        self.assertEqual(len(generator.generate(policy=policy)), 20,
+                        "Одиночная генерация должна использовать политику")
+    
+    def test_minimum_counts(self):
+        """Тестирует соблюдение минимального количества символов каждого типа.
+        
+        Проверяет строгую политику, где обязательные символы занимают почти весь пароль.
+        """
+        generator = PasswordGenerator()
+        policy = compile_policy(10, min_lowercase=2, min_uppercase=2, min_digits=3, min_special=2)
+        
+        for password in generator.generate_many(500, policy=policy):
+            with self.subTest(password=password):
+                self.assertGreaterEqual(sum(c in CHAR_SETS['lowercase'] for c in password), 2)
+                self.assertGreaterEqual(sum(c in CHAR_SETS['uppercase'] for c in password), 2)
+                self.assertGreaterEqual(sum(c in CHAR_SETS['digits'] for c in password), 3)
+                self.assertGreaterEqual(sum(c in CHAR_SETS['special'] for c in password), 2)
+    
+    def test_exclude_ambiguous(self):
+        """Тестирует исключение похожих символов.
+        
+        Проверяет, что символы AMBIGUOUS_CHARS не попадают в пароли.
+        """
+        generator = PasswordGenerator()
+        policy = compile_policy(16, exclude_ambiguous=True)
+        
+        passwords = ''.join(generator.generate_many(500, policy=policy))
+        self.assertFalse(set(AMBIGUOUS_CHARS) & set(passwords),
+                        "Похожие символы не должны попадать в пароли")
+    
+    def test_max_repeat(self):
+        """Тестирует ограничение количества одинаковых символов подряд.
+        
+        Цифровой алфавит мал, поэтому без ограничения повторы встречались бы часто.
+        """
+        generator = PasswordGenerator()
+        policy = PasswordPolicy(30, (('digits', CHAR_SETS['digits'], 5),), max_repeat=1)
+        
+        for password in generator.generate_many(500, policy=policy):
+            self.assertTrue(all(a != b for a, b in zip(password, password[1:])),
+                           f"Пароль {password} не должен содержать повторов подряд")
+        
+        with self.assertRaises(ValueError):
+            PasswordPolicy(8, (('pair', 'ab', 1),), max_repeat=2)
+        with self.assertRaises(ValueError):
+            compile_policy(12, max_repeat=0)
+
+
+class TestEntropyPool(unittest.TestCase):
+    """Тестовый класс для проверки пула энтропии EntropyPool.
+    
+    Attributes:
+        pool (EntropyPool): Экземпляр тестируемого класса.
+    """
+    
+    def setUp(self):
+        """Настройка тестового окружения перед каждым тестом.
+        
+        Инициализирует пул с небольшим блоком, чтобы проверять пополнение.
+        """
+        self.pool = EntropyPool(block_size=1024)
+    
+    def _chi_square_limit(self, df, z=4.0):
+        """Вычисляет критическое значение хи-квадрат по приближению Уилсона-Хилферти.
+        
+        Args:
+            df (int): Число степеней свободы.
+            z (float): Квантиль нормального распределения.
+        
+        Returns:
+            float: Критическое значение статистики.
+        """
+        return df * (1 - 2 / (9 * df) + z * math.sqrt(2 / (9 * df))) ** 3
+    
+    def test_read_refills_lazily(self):
+        """Тестирует выдачу байтов с пополнением пула.
+        
+        Проверяет, что запросы больше размера блока выполняются полностью.
+        """
+        self.assertEqual(len(self.pool.read(10)), 10,
+                        "Должно возвращаться запрошенное количество байтов")
+        self.assertEqual(len(self.pool.read(5000)), 5000,
+                        "Запрос больше блока должен выполняться полностью")
+    
+    def test_randbelow_range(self):
+        """Тестирует диапазон значений randbelow.
+        
+        Проверяет границы для однобайтовых и многобайтовых значений.
+        """
+        for n in [1, 7, 256, 1000, 70000]:
+            with self.subTest(n=n):
+                values = [self.pool.randbelow(n) for _ in range(500)]
+                self.assertTrue(all(0 <= v < n for v in values),
+                               f"Значения должны лежать в диапазоне [0, {n})")
+        with self.assertRaises(ValueError,
+                              msg="Неположительная граница должна вызывать ошибку"):
+            self.pool.randbelow(0)
+    
+    def test_choices_uniformity(self):
+        """Тестирует равномерность распределения символов критерием хи-квадрат.
+        
+        Длина алфавита не делит 256, поэтому смещение по модулю было бы заметно.
+        """
+        generator = PasswordGenerator()
+        alphabet = ''.join(generator.chars_sets.values())
+        samples = 200000
+        
+        counts = Counter(self.pool.choices(alphabet, samples))
+        expected = samples / len(alphabet)
+        chi_square = sum((counts[c] - expected) ** 2 / expected for c in alphabet)
+        
+        self.assertEqual(set(counts), set(alphabet),
+                        "Должны встречаться только и все символы алфавита")
+        self.assertLess(chi_square, self._chi_square_limit(len(alphabet) - 1),
+                       "Распределение символов должно быть равномерным")
+    
+    def test_required_positions_uniformity(self):
+        """Тестирует равномерность позиций обязательных символов в пароле.
+        
+        Проверяет, что единственная цифра попадает на каждую позицию одинаково часто.
+        """
+        generator = PasswordGenerator()
+        length = 8
+        samples = 40000
+        
+        passwords = generator.generate_many(samples, length=length, use_uppercase=False,
+                                            use_special=False)
+        counts = Counter(i for p in passwords for i, c in enumerate(p) if c.isdigit())
+        total = sum(counts.values())
+        expected = total / length
+        chi_square = sum((counts[i] - expected) ** 2 / expected for i in range(length))
+        
+        self.assertLess(chi_square, self._chi_square_limit(length - 1),
+                       "Цифры должны равномерно распределяться по позициям")
+    
+    def test_randbelow_many_uniformity(self):
+        """Тестирует диапазон и равномерность пакетной выборки чисел.
+        
+        Граница 7776 (размер списка Diceware) не является степенью двойки.
+        """
+        n = 7776
+        values = self.pool.randbelow_many(n, 100000)
+        self.assertEqual(len(values), 100000,
+                        "Должно возвращаться запрошенное количество чисел")
+        self.assertTrue(all(0 <= v < n for v in values),
+                       "Значения должны лежать в диапазоне [0, n)")
+        
+        buckets = Counter(v * 16 // n for v in values)
+        expected = len(values) / 16
+        chi_square = sum((buckets[b] - expected) ** 2 / expected for b in range(16))
+        self.assertLess(chi_square, self._chi_square_limit(15),
+                       "Числа должны распределяться равномерно")
+    
+    def test_choices_rejects_non_ascii(self):
+        """Тестирует отклонение некорректных алфавитов.
+        
+        Проверяет, что пустой и не ASCII алфавиты вызывают ValueError.
+        """
+        for alphabet in ['', 'абв']:
+            with self.subTest(alphabet=alphabet):
+                with self.assertRaises(ValueError):
+                    self.pool.choices(alphabet, 5)
+
+class TestSeededGeneration(unittest.TestCase):
+    """Тестовый класс для проверки детерминированной генерации с зерном."""
+    
+    def test_seeded_pool_is_reproducible(self):
+        """Тестирует воспроизводимость и независимость потоков SeededEntropyPool.
+        
+        Проверяет, что одинаковые зерна дают одинаковые байты, а переход
+        к потоку не зависит от ранее прочитанных байтов.
+        """
+        first = SeededEntropyPool(42)
+        second = SeededEntropyPool('42')
+        self.assertEqual(first.read(100) + first.read(50), second.read(150),
+                        "Одинаковые зерна должны давать одинаковые байты")
+        self.assertNotEqual(SeededEntropyPool(43).read(150), SeededEntropyPool(42).read(150),
+                           "Разные зерна должны давать разные байты")
+        
+        first.jump(7)
+        self.assertEqual(first.read(80), SeededEntropyPool(42, stream=7).read(80),
+                        "Переход к потоку не должен зависеть от прочитанных байтов")
+        with self.assertRaises(ValueError):
+            first.jump(-1)
+    
+    def test_seeded_generator_sequence(self):
+        """Тестирует независимость последовательности паролей от размера пакетов."""
+        expected = PasswordGenerator(seed=1).generate_many(50)
+        generator = PasswordGenerator(seed=1)
+        passwords = generator.generate_many(20) + [generator.generate() for _ in range(30)]
+        
+        self.assertEqual(passwords, expected,
+                        "Последовательность не должна зависеть от размера пакетов")
+        self.assertEqual(list(islice(PasswordGenerator(seed=1).iter_passwords(batch_size=7), 50)),
+                        expected, "Поток должен выдавать ту же последовательность")
+        self.assertEqual(len(set(expected)), 50, "Пароли последовательности должны различаться")
+    
+    def test_seek_jumps_ahead(self):
+        """Тестирует переход к паролю по номеру без генерации предыдущих."""
+        expected = PasswordGenerator(seed='fixture').generate_many(100)
+        generator = PasswordGenerator(seed='fixture')
+        generator.seek(60)
+        
+        self.assertEqual(generator.generate_many(40), expected[60:],
+                        "После перехода должны выдаваться пароли с указанного номера")
+        self.assertEqual(generator.position, 100, "Номер должен сдвигаться на число паролей")
+        with self.assertRaises(ValueError):
+            PasswordGenerator().seek(10)
+    
+    def test_seeded_passphrases(self):
+        """Тестирует воспроизводимость парольных фраз с зерном."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'words.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(f'word{i}' for i in range(100)))
+            
+            expected = PasswordGenerator(seed=5).generate_passphrases(10, words=4, wordlist=path)
+            generator = PasswordGenerator(seed=5)
+            generator.seek(3)
+            self.assertEqual(generator.generate_passphrases(7, words=4, wordlist=path),
+                            expected[3:], "Парольные фразы должны воспроизводиться по номеру")
 
 def run_comprehensive_generator_test():
     """Запускает комплексное тестирование генератора паролей.
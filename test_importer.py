@@ -0,0 +1,97 @@
+"""Модуль тестирования для importer.py.
+
+Содержит unit-тесты чтения файлов импорта в форматах CSV и JSONL.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from importer import VERIFY_FIELDS, detect_format, read_entries
+
+
+class TestImporter(unittest.TestCase):
+    """Тестовый класс для проверки чтения файлов импорта.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов импорта.
+    """
+
+    def setUp(self):
+        """Создает временный каталог для файлов импорта."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def _write(self, name, content):
+        """Записывает файл во временный каталог.
+
+        Args:
+            name (str): Имя файла.
+            content (str): Содержимое файла.
+
+        Returns:
+            str: Путь к файлу.
+        """
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        return path
+
+    def test_detect_format(self):
+        """Тестирует определение формата по расширению."""
+        self.assertEqual(detect_format('accounts.CSV'), 'csv', "Расширение .csv - формат csv")
+        self.assertEqual(detect_format('accounts.ndjson'), 'jsonl',
+                        "Расширение .ndjson - формат jsonl")
+        with self.assertRaises(ValueError):
+            detect_format('accounts.txt')
+
+    def test_read_csv(self):
+        """Тестирует чтение CSV с дополнительными столбцами и кавычками."""
+        path = self._write('accounts.csv', 'url,service,username,password\r\n'
+                                           'x,github,user,"pa,ss"\r\n'
+                                           'y,yandex,user2,pass2\r\n')
+        self.assertEqual(list(read_entries(path)),
+                        [('github', 'user', 'pa,ss'), ('yandex', 'user2', 'pass2')],
+                        "Записи должны читаться по заголовку CSV")
+
+    def test_read_jsonl(self):
+        """Тестирует чтение JSONL с пропуском пустых строк."""
+        path = self._write('accounts.txt', '{"service": "github", "username": "u", "password": "p"}\n'
+                                           '\n'
+                                           '{"service": "gitlab", "username": "u", "password": "q"}\n')
+        self.assertEqual(list(read_entries(path, 'jsonl')),
+                        [('github', 'u', 'p'), ('gitlab', 'u', 'q')],
+                        "Записи должны читаться по одной на строку")
+
+    def test_read_verify_pairs(self):
+        """Тестирует чтение пар для проверки паролей из файла и стандартного ввода."""
+        path = self._write('pairs.csv', 'service,password\ngithub,p1\n')
+        self.assertEqual(list(read_entries(path, names=VERIFY_FIELDS)), [('github', 'p1')])
+        with patch('sys.stdin', io.StringIO('{"service": "gitlab", "password": "p2"}\n')):
+            self.assertEqual(list(read_entries('-', names=VERIFY_FIELDS)), [('gitlab', 'p2')],
+                            "Путь '-' должен читаться из стандартного ввода как JSONL")
+        with self.assertRaises(ValueError):
+            list(read_entries(self._write('bad.jsonl', '{"service": "a"}\n'), names=VERIFY_FIELDS))
+
+    def test_invalid_rows(self):
+        """Тестирует сообщения об ошибках для некорректных файлов."""
+        cases = [
+            ('missing.csv', 'service,username\nsite,user\n', 'password'),
+            ('short.csv', 'service,username,password\nsite,user\n', 'Строка 2'),
+            ('bad.jsonl', '{"service": "a", "username": "b", "password": "c"}\n{oops\n', 'Строка 2'),
+            ('list.jsonl', '["a", "b", "c"]\n', 'JSON-объект'),
+        ]
+        for name, content, message in cases:
+            with self.subTest(name=name):
+                with self.assertRaises(ValueError) as context:
+                    list(read_entries(self._write(name, content)))
+                self.assertIn(message, str(context.exception),
+                             "Сообщение должно указывать на ошибку в файле")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,115 @@
+"""Модуль тестирования для kdf.py.
+
+Содержит unit-тесты функций формирования ключа, их подбора под целевое
+время, хешей мастер-пароля и хешей паролей сервисов.
+"""
+
+import hashlib
+import unittest
+from unittest.mock import patch
+import kdf as kdf_module
+from kdf import (ENTRY_PREFIX, KDFS, KEY_SIZE, PBKDF2_MIN_ITERATIONS, SCRYPT_MAX_N, SCRYPT_MIN_N,
+                 Pbkdf2Kdf, ScryptKdf, check_key, clear_key_cache, entry_matcher, hash_entry,
+                 hash_master, is_legacy_hash, legacy_hash, master_key, new_master,
+                 split_entry_hash, verify_entry)
+
+
+class TestKdf(unittest.TestCase):
+    """Тестовый класс для проверки функций формирования ключа."""
+
+    def test_params_roundtrip(self):
+        """Тестирует запись параметров в строку и их разбор."""
+        for kdf in (ScryptKdf(1 << 10, 4, 2), Pbkdf2Kdf(1000)):
+            with self.subTest(kdf=kdf.name):
+                restored = KDFS[kdf.name].from_params(kdf.params)
+                self.assertEqual(restored.params, kdf.params)
+                self.assertEqual(restored.derive('p', b'salt'), kdf.derive('p', b'salt'))
+                self.assertEqual(len(kdf.derive('p', b'salt')), KEY_SIZE)
+                self.assertNotEqual(kdf.derive('p', b'salt'), kdf.derive('p', b'pepper'))
+        with self.assertRaises(ValueError):
+            ScryptKdf.from_params('n=1024,p=1')
+        with self.assertRaises(ValueError):
+            Pbkdf2Kdf.from_params('i=abc')
+        self.assertEqual(Pbkdf2Kdf(1000).derive('p', b'salt'),
+                         hashlib.pbkdf2_hmac('sha256', b'p', b'salt', 1000, KEY_SIZE))
+
+    def test_calibrate(self):
+        """Тестирует подбор параметров по измеренному времени."""
+        with patch('kdf._elapsed', side_effect=lambda kdf: kdf.n / SCRYPT_MIN_N * 0.01):
+            self.assertEqual(ScryptKdf.calibrate(0.08).n, 8 * SCRYPT_MIN_N)
+            self.assertEqual(ScryptKdf.calibrate(0.001).n, SCRYPT_MIN_N)
+            self.assertEqual(ScryptKdf.calibrate(1000).n, SCRYPT_MAX_N,
+                             "Параметр n не должен превышать ограничение памяти")
+        with patch('kdf._elapsed', return_value=0.01):
+            self.assertEqual(Pbkdf2Kdf.calibrate(0.1).iterations, 10 * PBKDF2_MIN_ITERATIONS)
+            self.assertEqual(Pbkdf2Kdf.calibrate(0.0001).iterations, PBKDF2_MIN_ITERATIONS)
+
+    def test_master_hash(self):
+        """Тестирует хеш мастер-пароля, его проверку, кеш ключей и проверку ключа."""
+        kdf = ScryptKdf(1 << 10)
+        master_hash, key = new_master('master', kdf)
+        self.assertTrue(master_hash.startswith('scrypt$n=1024,r=8,p=1$'))
+        self.assertNotEqual(hash_master('master', kdf), master_hash, "Соль должна быть случайной")
+
+        with patch.object(ScryptKdf, 'derive') as mock_derive:
+            self.assertEqual(master_key(master_hash, 'master'), key,
+                             "Повторная проверка должна использовать кеш ключей")
+        mock_derive.assert_not_called()
+        self.assertEqual(len(key), KEY_SIZE)
+        self.assertIsNone(master_key(master_hash, 'wrong'))
+        self.assertFalse(any('master' in cache_key for cache_key in kdf_module._key_cache),
+                         "Кеш не должен хранить мастер-пароль")
+
+        clear_key_cache()
+        with patch.object(ScryptKdf, 'derive', wraps=kdf.derive) as mock_derive:
+            self.assertEqual(master_key(master_hash, 'master'), key)
+        mock_derive.assert_called_once()
+
+        with patch.object(ScryptKdf, 'derive') as mock_derive:
+            self.assertTrue(check_key(master_hash, key))
+            self.assertFalse(check_key(master_hash, bytes(KEY_SIZE)))
+        mock_derive.assert_not_called()
+
+        self.assertIsNotNone(master_key(hash_master('master', Pbkdf2Kdf(1000)), 'master'))
+        for invalid in ('scrypt$n=1024', 'scrypt$n=1024,r=8,p=1$zz$00', 'md5$n=1$00$00'):
+            with self.assertRaises(ValueError):
+                master_key(invalid, 'master')
+
+    def test_entry_hash(self):
+        """Тестирует хеши паролей сервисов нового и прежнего формата."""
+        key, other_key = bytes(KEY_SIZE), b'k' * KEY_SIZE
+        password_hash = hash_entry(key, 'pass')
+        self.assertTrue(password_hash.startswith(ENTRY_PREFIX))
+        self.assertNotEqual(hash_entry(key, 'pass'), password_hash, "Соль должна быть случайной")
+        self.assertTrue(verify_entry(key, 'pass', password_hash))
+        self.assertFalse(verify_entry(key, 'wrong', password_hash))
+        self.assertFalse(verify_entry(other_key, 'pass', password_hash),
+                         "Хеш должен зависеть от ключа мастер-пароля")
+        self.assertFalse(is_legacy_hash(password_hash))
+
+        old_hash = legacy_hash('pass')
+        self.assertEqual(old_hash, hashlib.sha256(b'pass').hexdigest())
+        self.assertTrue(is_legacy_hash(old_hash))
+        self.assertTrue(verify_entry(key, 'pass', old_hash))
+        self.assertFalse(verify_entry(key, 'wrong', old_hash))
+
+        for invalid in ('h', old_hash.upper(), password_hash.upper(), password_hash + '0', None):
+            with self.subTest(password_hash=invalid):
+                self.assertIsNone(split_entry_hash(invalid))
+                self.assertFalse(verify_entry(key, 'pass', invalid))
+
+    def test_entry_matcher(self):
+        """Тестирует поиск пароля среди хешей с солью."""
+        key, other_key = bytes(KEY_SIZE), b'k' * KEY_SIZE
+        entries = [split_entry_hash(hash_entry(key, password)) for password in ('a', 'b')]
+        matches = entry_matcher(key, entries)
+        self.assertTrue(matches('a'))
+        self.assertTrue(matches('b'))
+        self.assertFalse(matches('c'))
+        self.assertFalse(entry_matcher(other_key, entries)('a'),
+                         "Поиск должен использовать ключ мастер-пароля")
+        self.assertFalse(entry_matcher(key, [])('a'))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,125 @@
+"""Модуль тестирования для markov.py.
+
+Содержит unit-тесты для класса MarkovModel.
+Тесты проверяют обучение модели, сохранение в двоичный файл и выборку символов.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+from generator import EntropyPool
+from markov import MarkovModel, MODEL_SUFFIX
+
+
+class TestMarkovModel(unittest.TestCase):
+    """Тестовый класс для проверки функциональности MarkovModel.
+    
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для корпуса и модели.
+        corpus (str): Путь к тестовому корпусу.
+    """
+    
+    def setUp(self):
+        """Настройка тестового окружения перед каждым тестом.
+        
+        Создает небольшой корпус с предсказуемыми переходами.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.corpus = os.path.join(self.temp_dir.name, 'corpus.txt')
+        self._write("Banana, bandana! ANNA\n")
+    
+    def tearDown(self):
+        """Очистка тестового окружения после каждого теста."""
+        self.temp_dir.cleanup()
+    
+    def _write(self, content):
+        """Записывает содержимое тестового корпуса.
+        
+        Args:
+            content (str): Содержимое файла.
+        """
+        with open(self.corpus, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def test_train_and_sample(self):
+        """Тестирует обучение модели и генерацию строк.
+        
+        Проверяет, что строки имеют нужную длину и содержат только переходы из корпуса.
+        """
+        model = MarkovModel.train(self.corpus, order=1)
+        pool = EntropyPool()
+        
+        self.assertEqual(model.alphabet, 'abdn',
+                        "Алфавит должен состоять из букв корпуса в нижнем регистре")
+        for _ in range(200):
+            word = model.sample(pool, 15)
+            self.assertEqual(len(word), 15, "Строка должна иметь запрошенную длину")
+            self.assertTrue(set(word) <= set('abdn'),
+                           "Строка должна состоять из букв алфавита модели")
+            self.assertNotIn('bb', word, "В корпусе нет перехода b -> b")
+            self.assertNotIn('dd', word, "В корпусе нет перехода d -> d")
+    
+    def test_count_strings(self):
+        """Тестирует верхнюю оценку количества различных строк модели.
+        
+        Проверяет, что оценка не меньше числа различных сгенерированных строк.
+        """
+        model = MarkovModel.train(self.corpus, order=1)
+        pool = EntropyPool()
+        
+        bound = model.count_strings(3)
+        samples = {model.sample(pool, 3) for _ in range(2000)}
+        self.assertGreaterEqual(bound, len(samples),
+                               "Оценка не должна быть меньше числа различных строк")
+        self.assertLessEqual(bound, len(model.alphabet) ** 3 * 2,
+                            "Оценка должна учитывать только переходы корпуса")
+        self.assertEqual(model.count_strings(0), 1)
+    
+    def test_save_and_load_roundtrip(self):
+        """Тестирует сохранение модели в двоичный файл и ее загрузку.
+        
+        Проверяет, что загруженные таблицы совпадают с обученными.
+        """
+        model = MarkovModel.train(self.corpus)
+        path = os.path.join(self.temp_dir.name, 'model.bin')
+        model.save(path)
+        loaded = MarkovModel.load(path)
+        
+        self.assertEqual(loaded.order, model.order)
+        self.assertEqual(loaded.alphabet, model.alphabet)
+        self.assertEqual(loaded._contexts, model._contexts)
+        self.assertEqual(list(loaded._cumulative), list(model._cumulative),
+                        "Накопленные частоты должны сохраняться без изменений")
+        self.assertEqual(list(loaded._symbols), list(model._symbols))
+    
+    def test_load_or_train_cache(self):
+        """Тестирует кеширование обученной модели рядом с корпусом.
+        
+        Проверяет повторное использование модели и переобучение после изменения корпуса.
+        """
+        model_path = self.corpus + MODEL_SUFFIX
+        MarkovModel.load_or_train(self.corpus)
+        self.assertTrue(os.path.exists(model_path),
+                       "Обученная модель должна сохраняться рядом с корпусом")
+        
+        with unittest.mock.patch.object(MarkovModel, 'train') as mock_train:
+            MarkovModel.load_or_train(self.corpus)
+            mock_train.assert_not_called()
+        
+        time.sleep(0.01)
+        self._write("zebra zoo")
+        model = MarkovModel.load_or_train(self.corpus)
+        self.assertEqual(model.alphabet, 'abeorz',
+                        "После изменения корпуса модель должна переобучаться")
+    
+    def test_empty_corpus(self):
+        """Тестирует отклонение корпуса без слов."""
+        self._write("123 !!! 456")
+        with self.assertRaises(ValueError):
+            MarkovModel.train(self.corpus)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,150 @@
+"""Модуль тестирования для records.py.
+
+Содержит unit-тесты компактной таблицы записей паролей и ее
+использования движками хранения.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from backends import JournalBackend, JsonBackend
+from kdf import KEY_SIZE, hash_entry
+from records import DIGEST_SIZE, SALT_SIZE, RecordTable
+
+
+def make_record(username, password):
+    """Создает запись сервиса в формате passwords.json.
+
+    Args:
+        username (str): Имя пользователя.
+        password (str): Пароль.
+
+    Returns:
+        dict: Запись с SHA-256 хешем пароля.
+    """
+    return {'username': username, 'password_hash': hashlib.sha256(password.encode()).hexdigest()}
+
+
+class TestRecordTable(unittest.TestCase):
+    """Тестовый класс для проверки компактной таблицы записей."""
+
+    def test_behaves_like_dict(self):
+        """Тестирует чтение, замену и перебор записей как у словаря."""
+        records = {f'service{i}': make_record(f'user{i % 3}', str(i)) for i in range(10)}
+        table = RecordTable(records)
+        self.assertEqual(table, records, "Таблица должна совпадать со словарем")
+        self.assertEqual(records, table)
+        self.assertEqual(list(table), list(records), "Порядок добавления должен сохраняться")
+        self.assertEqual(len(table), 10)
+        self.assertIn('service3', table)
+        self.assertNotIn('service10', table)
+        self.assertIsNone(table.get('service10'))
+        with self.assertRaises(KeyError):
+            table['service10']
+
+        table['service0'] = make_record('admin', 'new')
+        self.assertEqual(list(table)[0], 'service0', "Замена не должна менять позицию")
+        self.assertEqual(table['service0'], make_record('admin', 'new'))
+
+        record = table['service1']
+        record['username'] = 'changed'
+        self.assertEqual(table['service1']['username'], 'user1',
+                         "Изменение полученной записи не должно менять таблицу")
+
+    def test_compact_storage(self):
+        """Тестирует хранение дайджестов и солей байтами и интернирование имен пользователей."""
+        table = RecordTable()
+        for i in range(100):
+            table[f'service{i}'] = json.loads(json.dumps(make_record('shared-user', str(i))))
+        salted = {'username': 'shared-user', 'password_hash': hash_entry(bytes(KEY_SIZE), 'p')}
+        table['salted'] = salted
+        self.assertEqual(table['salted'], salted)
+        self.assertEqual(table['service0'], make_record('shared-user', '0'),
+                         "Хеш без соли должен читаться в прежнем формате")
+        self.assertEqual(len(table._digests), 101 * DIGEST_SIZE)
+        self.assertEqual(len(table._salts), 101 * SALT_SIZE)
+        self.assertEqual(len({id(username) for username in table._usernames}), 1,
+                         "Одинаковые имена пользователей должны храниться одной строкой")
+        self.assertEqual(table._other, {})
+
+    def test_irregular_records(self):
+        """Тестирует, что записи нестандартного вида сохраняются без изменений."""
+        irregular = {
+            'short': {'username': 'u', 'password_hash': 'h'},
+            'upper': {'username': 'u', 'password_hash': 'AB' * DIGEST_SIZE},
+            'extra': dict(make_record('u', 'p'), note='text'),
+            'number': {'username': 42, 'password_hash': '00' * DIGEST_SIZE},
+            'zero-salt': {'username': 'u', 'password_hash': 'hmac-sha256$' + '00' * SALT_SIZE
+                                                          + '$' + '00' * DIGEST_SIZE},
+        }
+        table = RecordTable(irregular)
+        self.assertEqual(table, irregular)
+        table['short'] = make_record('u', 'p')
+        self.assertEqual(table['short'], make_record('u', 'p'))
+        self.assertNotIn(0, table._other, "Обычная запись должна храниться компактно")
+
+    def test_serialization(self):
+        """Тестирует сериализацию таблицы и отказ на поврежденных данных."""
+        records = {f'service{i}': make_record(f'user{i % 3}', str(i)) for i in range(10)}
+        records['extra'] = dict(make_record('u', 'p'), note='текст')
+        records['salted'] = {'username': 'u', 'password_hash': hash_entry(bytes(KEY_SIZE), 'p')}
+        data = RecordTable(records).to_bytes()
+        restored = RecordTable.from_bytes(data)
+        self.assertEqual(restored, records)
+        self.assertEqual(list(restored), list(records), "Порядок добавления должен сохраняться")
+        self.assertEqual(RecordTable.from_bytes(RecordTable().to_bytes()), {})
+        with self.assertRaises(ValueError):
+            RecordTable.from_bytes(data[:-1])
+
+
+class TestCompactBackends(unittest.TestCase):
+    """Тестовый класс для проверки компактных записей в движках на словаре.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов хранилища.
+        path (str): Путь к файлу хранилища.
+    """
+
+    def setUp(self):
+        """Создает временный каталог."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'vault.json')
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def test_file_format_is_unchanged(self):
+        """Тестирует, что JSON-файл и снимок журнала совпадают с прежним форматом."""
+        data = {'master_hash': hashlib.sha256(b'master').hexdigest(),
+                'passwords': {'github': make_record('user', 'p1'),
+                              'legacy': {'username': 'u', 'password_hash': 'h'}}}
+        for backend_class in (JsonBackend, JournalBackend):
+            with self.subTest(backend=backend_class.__name__):
+                backend = backend_class(self.path)
+                backend.apply([('master', data['master_hash'])] +
+                              [('put', service, record)
+                               for service, record in data['passwords'].items()])
+                self.assertIsInstance(backend.data['passwords'], RecordTable)
+                if isinstance(backend, JournalBackend):
+                    backend.compact()
+                    with open(self.path) as f:
+                        self.assertEqual(f.read(), json.dumps(data, separators=(',', ':')))
+                else:
+                    with open(self.path) as f:
+                        self.assertEqual(f.read(), json.dumps(data, indent=2))
+                backend.close()
+
+                reopened = backend_class(self.path)
+                self.assertIsInstance(reopened.data['passwords'], RecordTable)
+                self.assertEqual(reopened.data, data)
+                self.assertEqual(reopened.find('GIT'), {'github': make_record('user', 'p1')})
+                reopened.close()
+                for path in backend_class.files(self.path):
+                    os.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -9,6 +9,10 @@ import json
 import unittest
 from unittest.mock import patch
 from storage import PasswordStorage
+from backends import LOCK_SUFFIX
+from completion import COMPLETE_SUFFIX
+from kdf import DEFAULT_KDF, master_key, verify_entry
+from trigram import INDEX_SUFFIX
 
 
 class TestPasswordStorage(unittest.TestCase):
@@ -38,6 +42,8 @@ class TestPasswordStorage(unittest.TestCase):
     def _cleanup_test_files(self):
         """Удаляет тестовые файлы паролей."""
         test_files = [self.test_filename, 'test_persistence.json', 'passwords.json']
+        test_files += [file + suffix for file in test_files
+                       for suffix in (INDEX_SUFFIX, COMPLETE_SUFFIX, LOCK_SUFFIX)]
         for file in test_files:
             if os.path.exists(file):
                 os.remove(file)
@@ -232,8 +238,10 @@ class TestPasswordStorage(unittest.TestCase):
         
         self.assertEqual(service_data['username'], 'test_user',
                         "Имя пользователя должно сохраняться корректно")
-        self.assertEqual(len(service_data['password_hash']), 64,
-                        "Хеш пароля должен иметь правильную длину")
+        self.assertRegex(service_data['password_hash'], r'^hmac-sha256\$[0-9a-f]{32}\$[0-9a-f]{64}$',
+                        "Хеш пароля должен содержать соль и дайджест")
+        self.assertTrue(data['master_hash'].startswith(f'{DEFAULT_KDF}$'),
+                        "Хеш мастер-пароля должен содержать функцию формирования ключа")
     
     def test_master_password_verification(self):
         """Тестирует проверку мастер-пароля при сохранении.
@@ -248,6 +256,134 @@ class TestPasswordStorage(unittest.TestCase):
                               msg="Неправильный мастер-пароль должен вызывать ошибку"):
             self.storage.store_password("service2", "user2", "pass2", "wrong_master")
 
+    def test_verify_many(self):
+        """Тестирует пакетную проверку паролей с одной проверкой мастер-пароля.
+        
+        Проверяет порядок результатов, неверные пароли и отсутствующие сервисы.
+        """
+        self.storage.store_password("github", "user", "pass1", "master")
+        self.storage.store_password("gitlab", "user", "pass2", "master")
+        pairs = [("github", "pass1"), ("gitlab", "wrong"), ("missing", "pass1"), ("gitlab", "pass2")]
+        
+        with patch('storage.master_key', wraps=master_key) as mock_master, \
+                patch('storage.verify_entry', wraps=verify_entry) as mock_verify:
+            results = list(self.storage.verify_many(iter(pairs), "master"))
+        self.assertEqual(results, [("github", True), ("gitlab", False), ("missing", False),
+                                   ("gitlab", True)], "Результаты должны идти в порядке пар")
+        self.assertEqual(mock_master.call_count, 1, "Мастер-пароль должен проверяться один раз")
+        self.assertEqual(mock_verify.call_count, 3,
+                        "Пароли должны проверяться только для найденных сервисов")
+        
+        with self.assertRaises(ValueError):
+            list(self.storage.verify_many(pairs, "wrong_master"))
+    
+    def test_key_operations(self):
+        """Тестирует сохранение и проверку паролей ключом мастер-пароля.
+        
+        Ключ формируется один раз (unlock), а операции с ним не выполняют
+        медленную функцию и отклоняют ключ другого мастер-пароля.
+        """
+        with self.assertRaises(ValueError):
+            self.storage.verify_with_key("github", "pass1", bytes(32))
+        key = self.storage.unlock("master")
+        self.assertEqual(self.storage.unlock("master"), key)
+        with self.assertRaises(ValueError):
+            self.storage.unlock("wrong_master")
+        
+        with patch('storage.master_key') as mock_master:
+            self.storage.store_with_key("github", "user", "pass1", key)
+            self.assertTrue(self.storage.verify_with_key("github", "pass1", key))
+            self.assertFalse(self.storage.verify_with_key("github", "wrong", key))
+        mock_master.assert_not_called()
+        self.assertTrue(self.storage.verify_password("github", "pass1", "master"))
+        
+        with self.assertRaises(ValueError, msg="Ключ другого мастер-пароля должен отклоняться"):
+            self.storage.store_with_key("gitlab", "user", "pass2", bytes(32))
+        with self.assertRaises(ValueError):
+            self.storage.verify_with_key("github", "pass1", bytes(32))
+        with self.assertRaises(ValueError):
+            self.storage.store_with_key("github", "user", "pass1", key)
+    
+    def test_legacy_hashes_upgrade(self):
+        """Тестирует проверку хешей прежнего формата SHA-256 и их замену при проверке.
+        
+        Хеши заменяются только после успешной проверки, а пароли остаются верными.
+        """
+        legacy = self.storage._hash_password
+        with open(self.test_filename, 'w') as f:
+            json.dump({'master_hash': legacy('master'), 'passwords': {
+                name: {'username': 'user', 'password_hash': legacy(password)}
+                for name, password in (('github', 'pass1'), ('gitlab', 'pass2'), ('yandex', 'pass3'))
+            }}, f)
+        storage = PasswordStorage(self.test_filename)
+        
+        self.assertFalse(storage.verify_password("github", "pass1", "wrong_master"))
+        self.assertFalse(storage.verify_password("github", "wrong", "master"))
+        self.assertEqual(storage.backend.get("github")['password_hash'], legacy('pass1'),
+                        "Хеш неверного пароля не должен заменяться")
+        self.assertTrue(storage.backend.master_hash().startswith(f'{DEFAULT_KDF}$'),
+                       "Хеш мастер-пароля должен заменяться после его проверки")
+        
+        self.assertTrue(storage.verify_password("github", "pass1", "master"))
+        self.assertEqual(list(storage.verify_many([("gitlab", "pass2")], "master")),
+                        [("gitlab", True)])
+        storage.store_password("new", "user", "pass4", "master")
+        storage.close()
+        
+        with open(self.test_filename) as f:
+            passwords = json.load(f)['passwords']
+        self.assertTrue(passwords['github']['password_hash'].startswith('hmac-sha256$'),
+                       "Хеш должен заменяться после успешной проверки")
+        self.assertTrue(passwords['gitlab']['password_hash'].startswith('hmac-sha256$'))
+        self.assertEqual(passwords['yandex']['password_hash'], legacy('pass3'),
+                        "Непроверенные хеши должны сохраняться как есть")
+        reloaded = PasswordStorage(self.test_filename)
+        for service, password in (('github', 'pass1'), ('gitlab', 'pass2'), ('yandex', 'pass3'),
+                                  ('new', 'pass4')):
+            self.assertTrue(reloaded.verify_password(service, password, "master"))
+        self.assertFalse(reloaded.verify_password("github", "pass1", "wrong_master"))
+        reloaded.close()
+    
+    def test_store_many(self):
+        """Тестирует сохранение потока записей одной групповой фиксацией.
+        
+        Проверяет пропуск существующих сервисов и повторов, ход импорта
+        и проверку мастер-пароля.
+        """
+        self.storage.store_password("github", "user", "old", "master")
+        entries = [("github", "user", "new"), ("gitlab", "user", "pass1"),
+                   ("yandex", "user", "pass2"), ("gitlab", "user", "pass3")]
+        reports = []
+        
+        stored, skipped = self.storage.store_many(iter(entries), "master",
+                                                  lambda *counts: reports.append(counts),
+                                                  batch_size=3)
+        
+        self.assertEqual((stored, skipped), (2, 2),
+                        "Существующие сервисы и повторы должны пропускаться")
+        self.assertEqual(reports, [(2, 1), (2, 2)], "Ход должен сообщаться после каждого пакета")
+        reloaded = PasswordStorage(self.test_filename)
+        self.assertTrue(reloaded.verify_password("gitlab", "pass1", "master"),
+                       "Импортированные пароли должны сохраняться в файл")
+        self.assertTrue(reloaded.verify_password("github", "old", "master"),
+                       "Существующие записи не должны перезаписываться")
+        
+        with self.assertRaises(ValueError):
+            self.storage.store_many(entries, "wrong")
+    
+    def test_store_many_is_atomic(self):
+        """Тестирует отмену импорта при ошибке чтения записей."""
+        def entries():
+            yield ("github", "user", "pass")
+            raise ValueError("Строка 2: отсутствует поле password")
+        
+        with self.assertRaises(ValueError):
+            self.storage.store_many(entries(), "master")
+        
+        self.assertEqual(self.storage.data, {}, "Изменения должны отменяться в памяти")
+        self.assertFalse(os.path.exists(self.test_filename),
+                        "При ошибке импорта хранилище не должно записываться")
+
 
 def run_comprehensive_storage_test():
     """Запускает комплексное тестирование хранилища паролей.
@@ -258,6 +394,8 @@ def run_comprehensive_storage_test():
     
     # Очистка тестовых файлов
     test_files = ['test_passwords.json', 'passwords.json']
+    test_files += [file + suffix for file in test_files
+                   for suffix in (INDEX_SUFFIX, COMPLETE_SUFFIX, LOCK_SUFFIX)]
     for file in test_files:
         if os.path.exists(file):
             os.remove(file)
@@ -340,4 +478,4 @@ if __name__ == "__main__":
             print("python test_storage.py comprehensive # Только комплексное тестирование")
     else:
         # По умолчанию запускаем все тесты
-        run_all_storage_tests()
\ No newline at end of file
+        run_all_storage_tests()
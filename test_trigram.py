@@ -0,0 +1,216 @@
+"""Модуль тестирования для trigram.py.
+
+Содержит unit-тесты триграммного индекса и поиска сервисов по индексу
+в хранилище паролей.
+"""
+
+import os
+import random
+import tempfile
+import unittest
+from storage import PasswordStorage
+from trigram import INDEX_HEADER, INDEX_SUFFIX, TrigramIndex
+
+
+def linear_search(services, query):
+    """Находит сервисы по подстроке просмотром всех названий.
+
+    Args:
+        services (list): Названия сервисов.
+        query (str): Подстрока.
+
+    Returns:
+        list: Найденные названия в исходном порядке.
+    """
+    query = query.lower()
+    return [service for service in services if query in service.lower()]
+
+
+class TestTrigramIndex(unittest.TestCase):
+    """Тестовый класс для проверки триграммного индекса.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов индекса.
+        path (str): Путь к файлу индекса.
+        services (list): Названия сервисов для индекса.
+    """
+
+    def setUp(self):
+        """Создает временный каталог и набор названий сервисов."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'vault.json' + INDEX_SUFFIX)
+        rng = random.Random(16)
+        alphabet = 'abcAB-_.İßЯя12'
+        self.services = sorted({''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 10)))
+                                for _ in range(500)})
+        rng.shuffle(self.services)
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def _queries(self):
+        """Возвращает запросы: подстроки названий и случайные строки.
+
+        Returns:
+            list: Запросы длиной не менее трех символов.
+        """
+        rng = random.Random(61)
+        queries = ['aaa', 'İİİ', 'i̇ab', 'ССС', 'zzz']
+        for service in rng.sample(self.services, 100):
+            start = rng.randrange(len(service))
+            queries.append(service[start:start + rng.randint(3, 6)].upper())
+        return [query for query in queries if len(query.lower()) >= 3]
+
+    def assertMatchesLinear(self, index, services):
+        """Проверяет, что поиск по индексу совпадает с просмотром всех названий.
+
+        Args:
+            index (TrigramIndex): Индекс.
+            services (list): Названия сервисов в индексе.
+        """
+        for query in self._queries():
+            with self.subTest(query=query):
+                expected = linear_search(services, query)
+                result = index.search(query)
+                if result is None:
+                    self.assertGreater(len(expected), 0, "Просмотр нужен только для частых триграмм")
+                else:
+                    self.assertEqual(result, expected,
+                                     "Результаты поиска должны совпадать с просмотром")
+
+    def test_search_matches_linear_scan(self):
+        """Тестирует совпадение поиска по индексу с просмотром всех названий."""
+        index = TrigramIndex.build(self.services)
+        self.assertEqual(len(index), len(self.services), "Индекс должен содержать все сервисы")
+        self.assertMatchesLinear(index, self.services)
+        with self.assertRaises(ValueError):
+            index.search('ab')
+
+        common = TrigramIndex.build([f'service{i}' for i in range(100)])
+        self.assertIsNone(common.search('SERVICE'),
+                          "Для частых триграмм поиск должен уступать просмотру")
+        self.assertEqual(common.search('ice42'), ['service42'])
+
+    def test_save_and_load(self):
+        """Тестирует сохранение индекса и его загрузку с проверкой отпечатка."""
+        index = TrigramIndex.build(self.services[:300])
+        index.save(self.path, 'state-1')
+        for service in self.services[300:]:
+            index.add(service)
+        index.save(self.path, 'state-2')
+
+        self.assertIsNone(TrigramIndex.load(self.path, 'state-1'),
+                          "Индекс для другого состояния хранилища не должен загружаться")
+        loaded = TrigramIndex.load(self.path, 'state-2')
+        try:
+            self.assertMatchesLinear(loaded, self.services)
+        finally:
+            loaded.close()
+
+    def test_append_services(self):
+        """Тестирует дозапись сервисов в хвост сохраненного индекса."""
+        TrigramIndex.build(self.services[:400]).save(self.path, 'state-1')
+        size = os.path.getsize(self.path)
+
+        self.assertFalse(TrigramIndex.append(self.path, 'other', 'state-2', self.services[400:]),
+                         "Устаревший индекс не должен дополняться")
+        self.assertTrue(TrigramIndex.append(self.path, 'state-1', 'state-2', self.services[400:450]))
+        self.assertTrue(TrigramIndex.append(self.path, 'state-2', 'state-3', self.services[450:]))
+        self.assertGreater(os.path.getsize(self.path), size, "Сервисы дописываются в хвост")
+
+        loaded = TrigramIndex.load(self.path, 'state-3')
+        try:
+            self.assertMatchesLinear(loaded, self.services)
+            self.assertFalse(loaded.needs_compaction, "Короткий хвост не требует сжатия")
+        finally:
+            loaded.close()
+
+    def test_corrupted_file(self):
+        """Тестирует, что поврежденный индекс не загружается."""
+        TrigramIndex.build(self.services).save(self.path, 'state')
+        with open(self.path, 'r+b') as f:
+            f.truncate(INDEX_HEADER.size + 16)
+        self.assertIsNone(TrigramIndex.load(self.path, 'state'),
+                          "Обрезанный индекс не должен загружаться")
+        self.assertIsNone(TrigramIndex.load(self.path + '.missing', 'state'))
+
+
+class TestStorageSearch(unittest.TestCase):
+    """Тестовый класс для проверки поиска сервисов по индексу в хранилище.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов хранилища.
+    """
+
+    def setUp(self):
+        """Создает временный каталог."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def test_index_is_maintained_incrementally(self):
+        """Тестирует построение индекса при поиске и его дозапись при сохранении."""
+        for backend in ('json', 'journal', 'sqlite', 'binary'):
+            with self.subTest(backend=backend):
+                path = os.path.join(self.temp_dir.name, f'vault-{backend}')
+                storage = PasswordStorage(path, backend)
+                storage.store_many([(f'Service-{i}', 'user', 'pass') for i in range(100)], 'master')
+                self.assertEqual(list(storage.find_service('ice-4')), ['Service-4'] + [
+                    f'Service-{i}' for i in range(40, 50)])
+                self.assertTrue(os.path.exists(path + INDEX_SUFFIX),
+                                "Индекс должен сохраняться при первом поиске")
+
+                storage.store_password('GitHub', 'user', 'pass', 'master')
+                with storage.batch():
+                    storage.store_password('gitlab', 'user', 'pass', 'master')
+                    self.assertEqual(set(storage.find_service('GIT')), {'GitHub', 'gitlab'},
+                                     "Сервисы блока batch должны сразу находиться")
+                storage.close()
+
+                storage = PasswordStorage(path, backend)
+                index = storage._service_index(TrigramIndex)
+                self.assertEqual(len(index._added), 2,
+                                 "Новые сервисы должны дописываться в хвост индекса")
+                self.assertEqual(list(storage.find_service('git')), ['GitHub', 'gitlab'])
+                self.assertEqual(storage.find_service('hub')['GitHub']['username'], 'user')
+                self.assertEqual(storage.find_service('it'), storage.backend.find('it'),
+                                 "Короткие запросы выполняются просмотром")
+                storage.close()
+
+    def test_stale_index_is_rebuilt(self):
+        """Тестирует перестроение индекса после изменения хранилища без него."""
+        path = os.path.join(self.temp_dir.name, 'vault.json')
+        storage = PasswordStorage(path)
+        storage.store_password('github', 'user', 'pass', 'master')
+        self.assertEqual(list(storage.find_service('git')), ['github'])
+        storage.close()
+
+        other = PasswordStorage(path)
+        other.backend.apply([('put', 'gitlab', {'username': 'u', 'password_hash': 'h'})])
+        other.close()
+
+        storage = PasswordStorage(path)
+        self.assertEqual(list(storage.find_service('git')), ['github', 'gitlab'],
+                         "Устаревший индекс должен строиться заново")
+        storage.close()
+
+    def test_rollback_discards_indexed_services(self):
+        """Тестирует, что отмененные в batch сервисы не остаются в индексе."""
+        path = os.path.join(self.temp_dir.name, 'vault.json')
+        storage = PasswordStorage(path)
+        storage.store_password('github', 'user', 'pass', 'master')
+        storage.find_service('git')
+        with self.assertRaises(RuntimeError):
+            with storage.batch():
+                storage.store_password('gitlab', 'user', 'pass', 'master')
+                raise RuntimeError
+        self.assertEqual(list(storage.find_service('git')), ['github'],
+                         "Отмененный сервис не должен находиться")
+        storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
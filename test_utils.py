@@ -8,7 +8,9 @@ import unittest
 from unittest.mock import patch
 from io import StringIO
 import argparse
-from utils import valid_len, get_password_strength, print_password_information
+import json
+from utils import (valid_len, valid_count, valid_seconds, get_password_strength,
+                   print_password_information, write_passwords)
 
 
 class TestUtils(unittest.TestCase):
@@ -234,6 +236,61 @@ class TestUtils(unittest.TestCase):
                 self.assertEqual(actual_strength, expected_strength,
                                f"Пароль '{password}' должен иметь оценку {expected_strength}")
 
+    
+    def test_valid_count(self):
+        """Тестирует валидацию количества паролей.
+        
+        Проверяет преобразование строки в число и отклонение некорректных значений.
+        """
+        self.assertEqual(valid_count("5"), 5,
+                        "Корректное количество должно преобразовываться в число")
+        for value in ["0", "-3", "abc"]:
+            with self.subTest(value=value):
+                with self.assertRaises(argparse.ArgumentTypeError,
+                                      msg=f"Значение {value} должно вызывать ошибку"):
+                    valid_count(value)
+    
+    def test_write_passwords(self):
+        """Тестирует буферизованный вывод паролей.
+        
+        Проверяет, что каждый пароль выводится на отдельной строке.
+        """
+        stream = StringIO()
+        passwords = [f"pass{i}" for i in range(25)]
+        
+        with patch('utils.WRITE_CHUNK_SIZE', 10):
+            written = write_passwords(passwords, stream)
+        
+        self.assertEqual(written, 25,
+                        "Должно возвращаться количество выведенных паролей")
+        self.assertEqual(stream.getvalue().splitlines(), passwords,
+                        "Пароли должны выводиться по одному на строку в исходном порядке")
+    
+    def test_valid_seconds(self):
+        """Тестирует валидацию ограничения по времени.
+        
+        Проверяет преобразование строки в число и отклонение некорректных значений.
+        """
+        self.assertEqual(valid_seconds("1.5"), 1.5,
+                        "Корректное значение должно преобразовываться в число")
+        for value in ["0", "-1", "abc"]:
+            with self.subTest(value=value):
+                with self.assertRaises(argparse.ArgumentTypeError):
+                    valid_seconds(value)
+    
+    def test_write_passwords_jsonl(self):
+        """Тестирует вывод паролей в формате JSONL.
+        
+        Проверяет, что каждая строка является JSON-объектом с паролем.
+        """
+        stream = StringIO()
+        write_passwords(iter(["a\"b", "c"]), stream, output_format='jsonl')
+        
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(records, [{'password': 'a"b'}, {'password': 'c'}],
+                        "Каждая строка должна содержать JSON-объект с паролем")
+        with self.assertRaises(ValueError):
+            write_passwords([], stream, output_format='xml')
 
 def run_comprehensive_utils_test():
     """Запускает комплексное тестирование утилит.
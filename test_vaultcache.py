@@ -0,0 +1,161 @@
+"""Модуль тестирования для vaultcache.py.
+
+Содержит unit-тесты кеша разобранного JSON-файла хранилища и его
+использования движками json и journal.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from backends import JournalBackend, JsonBackend
+from kdf import KEY_SIZE, hash_entry
+from records import RecordTable
+from vaultcache import CACHE_SUFFIX, load_json_vault
+
+
+def make_record(username, password):
+    """Создает запись сервиса в формате passwords.json.
+
+    Args:
+        username (str): Имя пользователя.
+        password (str): Пароль.
+
+    Returns:
+        dict: Запись с SHA-256 хешем пароля.
+    """
+    return {'username': username, 'password_hash': hashlib.sha256(password.encode()).hexdigest()}
+
+
+@patch('vaultcache.CACHE_MIN_SIZE', 0)
+class TestVaultCache(unittest.TestCase):
+    """Тестовый класс для проверки кеша разобранного хранилища.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов хранилища.
+        path (str): Путь к файлу хранилища.
+        data (dict): Данные хранилища.
+    """
+
+    def setUp(self):
+        """Создает временный каталог и файл хранилища с устоявшимся временем изменения."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'passwords.json')
+        passwords = {f'service{i}': make_record(f'user{i % 3}', str(i)) for i in range(100)}
+        passwords['legacy'] = {'username': 'u', 'password_hash': 'h'}
+        passwords['salted'] = {'username': 'u', 'password_hash': hash_entry(bytes(KEY_SIZE), 'p')}
+        passwords['Яндекс'] = dict(make_record('u', 'p'), note='текст')
+        self.data = {'master_hash': 'master', 'passwords': passwords}
+        self.write(self.data)
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def write(self, data, age=10):
+        """Записывает файл хранилища и сдвигает время его изменения в прошлое.
+
+        Args:
+            data (dict): Данные хранилища.
+            age (int): На сколько секунд сдвинуть время изменения.
+        """
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=2)
+        past = time.time() - age
+        os.utime(self.path, (past, past))
+
+    def load_without_parsing(self):
+        """Загружает хранилище, проверяя, что JSON-файл не разбирается.
+
+        Returns:
+            dict: Данные хранилища.
+        """
+        with patch('vaultcache.RecordTable', side_effect=AssertionError) as mock_table:
+            mock_table.from_bytes = RecordTable.from_bytes
+            return load_json_vault(self.path)
+
+    def test_cache_is_created_and_used(self):
+        """Тестирует создание кеша при первой загрузке и чтение из него при следующей."""
+        data = load_json_vault(self.path)
+        self.assertIsInstance(data['passwords'], RecordTable)
+        self.assertEqual(data, self.data)
+        self.assertTrue(os.path.exists(self.path + CACHE_SUFFIX), "Кеш должен создаваться")
+
+        with patch('vaultcache._file_digest') as mock_digest:
+            cached = self.load_without_parsing()
+        mock_digest.assert_not_called()
+        self.assertEqual(cached, self.data, "Кеш должен возвращать те же данные")
+        self.assertEqual(list(cached['passwords']), list(self.data['passwords']),
+                         "Порядок записей должен сохраняться")
+
+    def test_stale_cache_is_rebuilt(self):
+        """Тестирует перестроение кеша после изменения хранилища."""
+        load_json_vault(self.path)
+        self.data['passwords']['service5'] = make_record('admin', 'new')
+        self.write(self.data, age=5)
+        self.assertEqual(load_json_vault(self.path), self.data)
+        self.assertEqual(self.load_without_parsing(), self.data, "Кеш должен перестраиваться")
+
+    def test_racy_change_is_detected(self):
+        """Тестирует изменение файла без изменения размера и времени изменения."""
+        self.write(self.data, age=0)
+        stat = os.stat(self.path)
+        load_json_vault(self.path)
+        with open(self.path, 'r+') as f:
+            content = f.read().replace('"master"', '"MASTER"')
+            f.seek(0)
+            f.write(content)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertEqual(load_json_vault(self.path)['master_hash'], 'MASTER',
+                         "Изменение в пределах точности времени должно обнаруживаться")
+
+    def test_copied_file_and_corrupted_cache(self):
+        """Тестирует проверку по содержимому и поврежденный кеш."""
+        load_json_vault(self.path)
+        shutil.copy2(self.path, self.path + '.bak')
+        os.replace(self.path + '.bak', self.path)
+        self.assertEqual(self.load_without_parsing(), self.data,
+                         "Кеш с тем же содержимым должен использоваться")
+        with patch('vaultcache._file_digest') as mock_digest:
+            self.load_without_parsing()
+        mock_digest.assert_not_called()
+
+        with open(self.path + CACHE_SUFFIX, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path + CACHE_SUFFIX) - 16)
+        self.assertEqual(load_json_vault(self.path), self.data,
+                         "Поврежденный кеш должен игнорироваться")
+        self.assertEqual(self.load_without_parsing(), self.data)
+
+    def test_missing_file_and_small_vault(self):
+        """Тестирует отсутствующий файл и хранилище меньше CACHE_MIN_SIZE."""
+        os.remove(self.path)
+        self.assertEqual(load_json_vault(self.path), {})
+        with patch('vaultcache.CACHE_MIN_SIZE', 1 << 30):
+            self.write(self.data)
+            self.assertEqual(load_json_vault(self.path), self.data)
+        self.assertFalse(os.path.exists(self.path + CACHE_SUFFIX),
+                         "Для небольших хранилищ кеш не нужен")
+
+    def test_backends_use_cache(self):
+        """Тестирует загрузку движков json и journal через кеш."""
+        for backend_class in (JsonBackend, JournalBackend):
+            with self.subTest(backend=backend_class.__name__):
+                backend = backend_class(self.path)
+                backend.apply([('put', 'github', make_record('user', 'p'))])
+                backend.close()
+                expected = backend.data
+                reopened = backend_class(self.path)
+                self.assertEqual(reopened.data, expected)
+                reopened.close()
+                reopened = backend_class(self.path)
+                self.assertEqual(reopened.data, expected, "Данные из кеша должны совпадать")
+                reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,181 @@
+"""Модуль тестирования для vaultfile.py.
+
+Содержит unit-тесты двоичного формата файла хранилища и движка
+BinaryBackend, который его использует.
+"""
+
+import hashlib
+import os
+import random
+import tempfile
+import unittest
+from backends import JOURNAL_SUFFIX, BinaryBackend
+from kdf import KEY_SIZE, hash_entry
+from storage import PasswordStorage
+from vaultfile import VAULT_HEADER, VaultFile, encode_vault
+
+
+def make_record(username, password):
+    """Создает запись сервиса в формате passwords.json.
+
+    Args:
+        username (str): Имя пользователя.
+        password (str): Пароль.
+
+    Returns:
+        dict: Запись с SHA-256 хешем пароля.
+    """
+    return {'username': username, 'password_hash': hashlib.sha256(password.encode()).hexdigest()}
+
+
+class TestVaultFile(unittest.TestCase):
+    """Тестовый класс для проверки двоичного файла хранилища.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов хранилища.
+        path (str): Путь к файлу хранилища.
+        records (dict): Записи для файла.
+    """
+
+    def setUp(self):
+        """Создает временный каталог и набор записей."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'passwords.vault')
+        rng = random.Random(20)
+        self.records = {}
+        for i in range(300):
+            service = ''.join(rng.choice('abcЯя-.') for _ in range(rng.randint(1, 10))) + str(i)
+            self.records[service] = make_record(f'user{i % 7}', service)
+        self.records['legacy'] = {'username': 'u', 'password_hash': 'h'}
+        self.records['salted'] = {'username': 'u', 'password_hash': hash_entry(bytes(KEY_SIZE), 'p')}
+        self.records['extra'] = dict(make_record('u', 'p'), note='текст')
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def write(self, master_hash, records):
+        """Записывает файл хранилища.
+
+        Args:
+            master_hash (str): Хеш мастер-пароля или None.
+            records (dict): Записи по названиям сервисов.
+        """
+        with open(self.path, 'wb') as f:
+            f.write(encode_vault(master_hash, records.items()))
+
+    def test_roundtrip(self):
+        """Тестирует запись и чтение записей, порядок и поиск по названию."""
+        self.write('master', self.records)
+        vault = VaultFile(self.path)
+        try:
+            self.assertEqual(vault.master_hash, 'master')
+            self.assertEqual(len(vault), len(self.records))
+            self.assertEqual(list(vault), list(self.records), "Порядок добавления должен сохраняться")
+            self.assertEqual(dict(vault.items()), self.records)
+            for service, record in self.records.items():
+                self.assertEqual(vault.get(service), record)
+            self.assertIsNone(vault.get('missing'))
+            self.assertNotIn('missing', vault)
+        finally:
+            vault.close()
+
+    def test_empty_and_missing(self):
+        """Тестирует пустое хранилище и отсутствующий файл."""
+        vault = VaultFile(self.path)
+        self.assertEqual((vault.master_hash, len(vault), vault.get('a')), (None, 0, None))
+        vault.close()
+
+        self.write(None, {})
+        vault = VaultFile(self.path)
+        self.assertEqual((vault.master_hash, len(vault), list(vault.items())), (None, 0, []))
+        vault.close()
+
+    def test_corrupted_file(self):
+        """Тестирует, что поврежденный файл не открывается."""
+        self.write('master', self.records)
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 8)
+        with self.assertRaises(ValueError):
+            VaultFile(self.path)
+
+        with open(self.path, 'wb') as f:
+            f.write(b'{"passwords": {}}' + bytes(VAULT_HEADER.size))
+        with self.assertRaises(ValueError):
+            VaultFile(self.path)
+
+
+class TestBinaryBackend(unittest.TestCase):
+    """Тестовый класс для проверки движка с двоичным файлом хранилища.
+
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для файлов хранилища.
+        path (str): Путь к файлу хранилища.
+    """
+
+    def setUp(self):
+        """Создает временный каталог."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'passwords.vault')
+
+    def tearDown(self):
+        """Удаляет временный каталог."""
+        self.temp_dir.cleanup()
+
+    def test_journal_and_compaction(self):
+        """Тестирует изменения поверх снимка, сжатие журнала и повторное открытие."""
+        backend = BinaryBackend(self.path)
+        backend.apply([('master', 'm')] + [('put', f'service{i}', make_record('u', str(i)))
+                                           for i in range(10)])
+        backend.compact()
+        self.assertEqual(os.path.getsize(self.path + JOURNAL_SUFFIX), 0, "Журнал должен очищаться")
+
+        backend.apply([('put', 'service3', make_record('admin', 'new')),
+                       ('put', 'github', make_record('user', 'p'))])
+        expected = {'master_hash': 'm',
+                    'passwords': {f'service{i}': make_record('u', str(i)) for i in range(10)}}
+        expected['passwords']['service3'] = make_record('admin', 'new')
+        expected['passwords']['github'] = make_record('user', 'p')
+        self.assertEqual(backend.data, expected)
+        self.assertEqual(list(backend.find('SERVICE3')), ['service3'])
+        backend.close()
+
+        reopened = BinaryBackend(self.path)
+        self.assertEqual(reopened.data, expected, "Журнал должен воспроизводиться поверх снимка")
+        reopened.compact()
+        reopened.close()
+        reopened = BinaryBackend(self.path)
+        self.assertEqual(reopened.data, expected, "Сжатие не должно менять данные")
+        reopened.close()
+
+    def test_batch_rollback(self):
+        """Тестирует отмену изменений блока batch."""
+        backend = BinaryBackend(self.path)
+        backend.apply([('master', 'm'), ('put', 'a', make_record('u', 'a'))])
+        with self.assertRaises(RuntimeError):
+            with backend.batch():
+                backend.stage([('put', 'b', make_record('u', 'b'))])
+                self.assertIsNotNone(backend.get('b'))
+                raise RuntimeError
+        self.assertIsNone(backend.get('b'), "Изменения блока должны отменяться")
+        self.assertEqual(list(dict(backend.records())), ['a'])
+        backend.close()
+
+    def test_convert_from_and_to_json(self):
+        """Тестирует перенос JSON-хранилища в двоичный формат и обратно."""
+        json_path = os.path.join(self.temp_dir.name, 'passwords.json')
+        source = PasswordStorage(json_path)
+        source.store_many([(f'service{i}', 'user', str(i)) for i in range(50)], 'master')
+        binary = source.migrate(self.path, 'binary')
+        binary.backend.compact()
+        self.assertTrue(binary.verify_password('service7', '7', 'master'))
+        self.assertEqual(binary.data, source.data)
+
+        back = binary.migrate(os.path.join(self.temp_dir.name, 'back.json'), 'json')
+        self.assertEqual(back.data, source.data, "Обратный перенос должен сохранять данные")
+        for storage in (source, binary, back):
+            storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,100 @@
+"""Модуль тестирования для wordlist.py.
+
+Содержит unit-тесты для класса Wordlist.
+Тесты проверяют разбор списка слов, построение и повторное использование индекса.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from wordlist import Wordlist
+
+
+class TestWordlist(unittest.TestCase):
+    """Тестовый класс для проверки функциональности Wordlist.
+    
+    Attributes:
+        temp_dir (TemporaryDirectory): Временный каталог для списков слов.
+        path (str): Путь к тестовому списку слов.
+    """
+    
+    def setUp(self):
+        """Настройка тестового окружения перед каждым тестом.
+        
+        Создает список слов в формате Diceware с пустыми строками и CRLF.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'words.txt')
+        self._write("11111\tapple\n11112\tbanana\r\n\n  cherry  \nдом")
+    
+    def tearDown(self):
+        """Очистка тестового окружения после каждого теста."""
+        self.temp_dir.cleanup()
+    
+    def _write(self, content):
+        """Записывает содержимое тестового списка слов.
+        
+        Args:
+            content (str): Содержимое файла.
+        """
+        with open(self.path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+    
+    def test_parse_words(self):
+        """Тестирует разбор слов из разных форматов строк.
+        
+        Проверяет поддержку формата Diceware, CRLF, пробелов и UTF-8.
+        """
+        with Wordlist(self.path) as wordlist:
+            self.assertEqual(len(wordlist), 4,
+                            "Пустые строки не должны считаться словами")
+            self.assertEqual([wordlist[i] for i in range(len(wordlist))],
+                            ['apple', 'banana', 'cherry', 'дом'],
+                            "Слова должны извлекаться без номеров и пробелов")
+    
+    def test_index_is_persisted_and_reused(self):
+        """Тестирует сохранение индекса и его повторное использование.
+        
+        Проверяет, что второй запуск загружает индекс из файла без разбора списка.
+        """
+        with Wordlist(self.path):
+            pass
+        self.assertTrue(os.path.exists(self.path + '.idx'),
+                       "Индекс должен сохраняться рядом со списком слов")
+        
+        with Wordlist(self.path) as wordlist:
+            self.assertIsInstance(wordlist._offsets, memoryview,
+                                 "Сохраненный индекс должен отображаться в память")
+            self.assertEqual(wordlist[3], 'дом',
+                            "Слова должны читаться через загруженный индекс")
+    
+    def test_stale_index_is_rebuilt(self):
+        """Тестирует перестроение индекса после изменения списка слов.
+        
+        Проверяет, что устаревший индекс не используется.
+        """
+        with Wordlist(self.path):
+            pass
+        time.sleep(0.01)
+        self._write("one\ntwo\n")
+        
+        with Wordlist(self.path) as wordlist:
+            self.assertEqual([wordlist[0], wordlist[1]], ['one', 'two'],
+                            "После изменения списка индекс должен перестраиваться")
+            self.assertEqual(len(wordlist), 2)
+    
+    def test_empty_wordlist(self):
+        """Тестирует отклонение пустого списка слов.
+        
+        Проверяет пустой файл и файл только из пустых строк.
+        """
+        for content in ["", "\n\n  \n"]:
+            with self.subTest(content=content):
+                self._write(content)
+                with self.assertRaises(ValueError):
+                    Wordlist(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,480 @@
+"""Модуль триграммного индекса для поиска сервисов по подстроке.
+
+Содержит базовый класс ServiceIndex сохраняемых индексов названий
+сервисов и класс TrigramIndex: для каждой триграммы (трех подряд идущих
+символов) названий сервисов в нижнем регистре хранится отсортированный
+список номеров сервисов. Поиск по подстроке сводится к пересечению списков
+триграмм запроса и проверке немногих оставшихся кандидатов.
+
+Индекс сохраняется в файл рядом с хранилищем и отображается в память при
+загрузке. Новые сервисы дописываются в конец файла (хвост), поэтому
+сохранение пароля не перестраивает индекс целиком. Заголовок файла хранит
+отпечаток хранилища, по которому устаревший индекс распознается и строится
+заново.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+
+from backends import write_atomic
+
+INDEX_SUFFIX = '.trigram'
+INDEX_MAGIC = b'TRG1'
+INDEX_VERSION = 2
+TRIGRAM_SIZE = 3
+# Сигнатура, версия, отпечаток хранилища, число названий в основной части,
+# размер блока названий, размер данных индекса, число названий в хвосте.
+INDEX_HEADER = struct.Struct('<4sI32sIQQI')
+# Число триграмм и общее число номеров в их списках.
+TRIGRAM_COUNTS = struct.Struct('<IQ')
+# Длина триграммы в байтах, триграмма в UTF-8, начало и длина ее списка.
+TRIGRAM_ENTRY = struct.Struct('<B12sQI')
+TAIL_RECORD = struct.Struct('<I')
+TAIL_COMPACT_MIN = 1024
+# Если самая редкая триграмма запроса встречается в большей доле названий,
+# просмотр всех записей быстрее проверки кандидатов по индексу.
+SCAN_FRACTION = 0.25
+# Список триграммы, который длиннее текущего множества кандидатов во столько
+# раз, не пересекается с ним: кандидаты проверяются непосредственно.
+INTERSECT_RATIO = 8
+
+
+def trigrams(text):
+    """Возвращает множество триграмм строки.
+
+    Args:
+        text (str): Строка.
+
+    Returns:
+        set: Триграммы строки.
+    """
+    return {text[i:i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+def _digest(fingerprint):
+    """Сжимает отпечаток хранилища до 32 байтов для заголовка индекса.
+
+    Args:
+        fingerprint (str): Отпечаток хранилища.
+
+    Returns:
+        bytes: SHA-256 отпечатка.
+    """
+    return hashlib.sha256(fingerprint.encode()).digest()
+
+
+def _tail_records(services):
+    """Кодирует названия сервисов в записи хвоста индекса.
+
+    Args:
+        services (iterable): Названия сервисов.
+
+    Returns:
+        bytes: Записи хвоста: длина названия и название в UTF-8.
+    """
+    chunks = []
+    for service in services:
+        encoded = service.encode('utf-8')
+        chunks.append(TAIL_RECORD.pack(len(encoded)))
+        chunks.append(encoded)
+    return b''.join(chunks)
+
+
+class ServiceIndex():
+    """Базовый класс индексов названий сервисов, сохраняемых в файл.
+
+    Сервисы нумеруются в порядке добавления. Файл индекса состоит из
+    заголовка INDEX_HEADER, таблицы смещений и блока названий основной
+    части, данных наследника и хвоста с названиями, добавленными после
+    сохранения. Основная часть читается из отображения файла в память, а
+    добавленные сервисы хранятся в памяти.
+
+    Наследники задают SUFFIX, MAGIC и VERSION и реализуют _index_service
+    (добавление сервиса в данные в памяти), _dump_body (данные индекса для
+    сохранения) и _load_body (чтение данных из отображения файла). Если
+    наследник задает EAGER = True, хранилище строит и сохраняет его файл
+    при каждой записи, а не только при первом поиске.
+
+    Attributes:
+        needs_compaction (bool): Хвост загруженного индекса стал слишком
+                                 большим, и индекс стоит сохранить целиком.
+    """
+    SUFFIX = None
+    MAGIC = None
+    VERSION = None
+    EAGER = False
+
+    def __init__(self):
+        """Создает пустой индекс."""
+        self.needs_compaction = False
+        self._map = None
+        self._views = []
+        self._base_count = 0
+        self._offsets = ()
+        self._names = b''
+        self._added = []
+
+    def __len__(self):
+        """Возвращает количество сервисов в индексе.
+
+        Returns:
+            int: Количество сервисов.
+        """
+        return self._base_count + len(self._added)
+
+    def name(self, number):
+        """Возвращает название сервиса по номеру.
+
+        Args:
+            number (int): Номер сервиса.
+
+        Returns:
+            str: Название сервиса.
+        """
+        if number >= self._base_count:
+            return self._added[number - self._base_count]
+        return str(self._names[self._offsets[number]:self._offsets[number + 1]], 'utf-8')
+
+    def add(self, service):
+        """Добавляет сервис в индекс.
+
+        Args:
+            service (str): Название сервиса.
+        """
+        self._index_service(len(self), service.lower())
+        self._added.append(service)
+
+    def _index_service(self, number, key):
+        """Добавляет сервис в данные индекса в памяти.
+
+        Args:
+            number (int): Номер сервиса.
+            key (str): Название сервиса в нижнем регистре.
+        """
+        raise NotImplementedError
+
+    def _dump_body(self):
+        """Возвращает данные индекса для сохранения в файл.
+
+        Returns:
+            list: Фрагменты данных в байтах.
+        """
+        raise NotImplementedError
+
+    def _load_body(self, body):
+        """Читает данные индекса из отображения файла.
+
+        Args:
+            body (memoryview): Данные индекса.
+
+        Returns:
+            bool: False, если данные построены с другими параметрами.
+        """
+        raise NotImplementedError
+
+    def _map_view(self, view, format=None):
+        """Запоминает срез отображения файла, чтобы освободить его при закрытии.
+
+        Args:
+            view (memoryview): Срез отображения файла.
+            format (str): Формат элементов для memoryview.cast или None.
+
+        Returns:
+            memoryview: Срез с нужным форматом элементов.
+        """
+        if format is not None:
+            view = view.cast(format)
+        self._views.append(view)
+        return view
+
+    @classmethod
+    def build(cls, services):
+        """Строит индекс по названиям сервисов.
+
+        Args:
+            services (iterable): Названия сервисов.
+
+        Returns:
+            ServiceIndex: Индекс.
+        """
+        index = cls()
+        for service in services:
+            index.add(service)
+        return index
+
+    @classmethod
+    def load(cls, path, fingerprint):
+        """Загружает индекс из файла, если он соответствует хранилищу.
+
+        Args:
+            path (str): Путь к файлу индекса.
+            fingerprint (str): Текущий отпечаток хранилища.
+
+        Returns:
+            ServiceIndex: Индекс или None, если файл отсутствует, поврежден
+                          или построен для другого состояния хранилища.
+        """
+        try:
+            with open(path, 'rb') as f:
+                index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        index = cls()
+        try:
+            loaded = index._from_map(index_map, fingerprint)
+        except (ValueError, TypeError, struct.error, UnicodeDecodeError):
+            loaded = False
+        if not loaded:
+            index.close()
+            index_map.close()
+            return None
+        return index
+
+    def _from_map(self, index_map, fingerprint):
+        """Разбирает отображенный в память файл индекса.
+
+        Args:
+            index_map (mmap.mmap): Отображение файла индекса.
+            fingerprint (str): Текущий отпечаток хранилища.
+
+        Returns:
+            bool: False, если индекс устарел или построен с другими параметрами.
+
+        Raises:
+            ValueError: Если файл индекса поврежден.
+        """
+        (magic, version, digest, base_count, names_size, body_size,
+         tail_count) = INDEX_HEADER.unpack_from(index_map)
+        if (magic, version, digest) != (self.MAGIC, self.VERSION, _digest(fingerprint)):
+            return False
+
+        position = INDEX_HEADER.size
+        offsets_end = position + 8 * (base_count + 1)
+        names_end = offsets_end + names_size
+        body_end = names_end + body_size
+        if body_end > len(index_map):
+            raise ValueError("Файл индекса поврежден")
+
+        view = self._map_view(memoryview(index_map))
+        self._base_count = base_count
+        self._offsets = self._map_view(view[position:offsets_end], 'Q')
+        self._names = self._map_view(view[offsets_end:names_end])
+        if not self._load_body(view[names_end:body_end]):
+            return False
+        self._map = index_map
+
+        position = body_end
+        for _ in range(tail_count):
+            (length,) = TAIL_RECORD.unpack_from(index_map, position)
+            position += TAIL_RECORD.size
+            if position + length > len(index_map):
+                raise ValueError("Файл индекса поврежден")
+            self.add(index_map[position:position + length].decode('utf-8'))
+            position += length
+        self.needs_compaction = tail_count > max(TAIL_COMPACT_MIN, base_count // 4)
+        return True
+
+    def save(self, path, fingerprint):
+        """Атомарно записывает индекс целиком, без хвоста.
+
+        Args:
+            path (str): Путь к файлу индекса.
+            fingerprint (str): Отпечаток хранилища, которому соответствует индекс.
+        """
+        offsets = array('Q', [0])
+        names = []
+        size = 0
+        for number in range(len(self)):
+            encoded = self.name(number).encode('utf-8')
+            names.append(encoded)
+            size += len(encoded)
+            offsets.append(size)
+
+        body = self._dump_body()
+        header = INDEX_HEADER.pack(self.MAGIC, self.VERSION, _digest(fingerprint), len(self),
+                                   size, sum(len(chunk) for chunk in body), 0)
+        write_atomic(path, b''.join([header, offsets.tobytes(), *names, *body]))
+        self.needs_compaction = False
+
+    @classmethod
+    def append(cls, path, old_fingerprint, new_fingerprint, services):
+        """Дописывает новые сервисы в хвост сохраненного индекса.
+
+        Хвост дописывается, только если индекс соответствует состоянию
+        хранилища до изменения. Заголовок с новым отпечатком записывается
+        последним, поэтому при сбое индекс окажется устаревшим и будет
+        построен заново, но не станет неверным.
+
+        Args:
+            path (str): Путь к файлу индекса.
+            old_fingerprint (str): Отпечаток хранилища до изменения.
+            new_fingerprint (str): Отпечаток хранилища после изменения.
+            services (list): Названия добавленных сервисов.
+
+        Returns:
+            bool: True, если индекс обновлен, False, если он отсутствует или устарел.
+        """
+        try:
+            f = open(path, 'r+b')
+        except OSError:
+            return False
+        with f:
+            header = f.read(INDEX_HEADER.size)
+            if len(header) != INDEX_HEADER.size:
+                return False
+            fields = list(INDEX_HEADER.unpack(header))
+            if fields[:3] != [cls.MAGIC, cls.VERSION, _digest(old_fingerprint)]:
+                return False
+
+            f.seek(0, os.SEEK_END)
+            f.write(_tail_records(services))
+            fields[2] = _digest(new_fingerprint)
+            fields[-1] += len(services)
+            f.seek(0)
+            f.write(INDEX_HEADER.pack(*fields))
+        return True
+
+    def close(self):
+        """Закрывает отображение файла индекса."""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class TrigramIndex(ServiceIndex):
+    """Триграммный индекс названий сервисов.
+
+    Списки триграмм основной части хранятся в отображении файла в память,
+    а номера сервисов, добавленных позже, - в словаре списков в памяти.
+    """
+    SUFFIX = INDEX_SUFFIX
+    MAGIC = INDEX_MAGIC
+    VERSION = INDEX_VERSION
+
+    def __init__(self):
+        """Создает пустой индекс."""
+        super().__init__()
+        self._directory = {}
+        self._postings = ()
+        self._delta = {}
+
+    def _index_service(self, number, key):
+        """Добавляет номер сервиса в списки его триграмм.
+
+        Args:
+            number (int): Номер сервиса.
+            key (str): Название сервиса в нижнем регистре.
+        """
+        delta = self._delta
+        for trigram in trigrams(key):
+            posting = delta.get(trigram)
+            if posting is None:
+                delta[trigram] = [number]
+            else:
+                posting.append(number)
+
+    def _posting(self, trigram):
+        """Возвращает список номеров сервисов, содержащих триграмму.
+
+        Args:
+            trigram (str): Триграмма.
+
+        Returns:
+            tuple: Отсортированные номера из основной части и из добавленных сервисов.
+        """
+        base = ()
+        entry = self._directory.get(trigram)
+        if entry is not None:
+            start, count = entry
+            base = self._postings[start:start + count]
+        return base, self._delta.get(trigram, ())
+
+    def search(self, query):
+        """Находит сервисы, название которых содержит подстроку без учета регистра.
+
+        Результат совпадает с проверкой ``query.lower() in service.lower()``
+        по всем сервисам. Кандидаты берутся из самого короткого списка
+        триграмм запроса и пересекаются со списками остальных триграмм в
+        порядке возрастания длины, пока списки не станут намного длиннее
+        кандидатов. Оставшиеся кандидаты проверяются непосредственно.
+
+        Args:
+            query (str): Подстрока длиной не менее TRIGRAM_SIZE символов.
+
+        Returns:
+            list: Названия найденных сервисов в порядке добавления или None,
+                  если даже самая редкая триграмма запроса встречается
+                  больше чем в SCAN_FRACTION названий и быстрее просмотреть
+                  все записи.
+
+        Raises:
+            ValueError: Если запрос короче TRIGRAM_SIZE символов.
+        """
+        query = query.lower()
+        if len(query) < TRIGRAM_SIZE:
+            raise ValueError(f"Запрос должен содержать не менее {TRIGRAM_SIZE} символов")
+
+        postings = sorted((self._posting(trigram) for trigram in trigrams(query)),
+                          key=lambda posting: len(posting[0]) + len(posting[1]))
+        base, added = postings[0]
+        if len(base) + len(added) > SCAN_FRACTION * len(self):
+            return None
+
+        candidates = set(base)
+        candidates.update(added)
+        for base, added in postings[1:]:
+            if not candidates or len(base) + len(added) > INTERSECT_RATIO * len(candidates):
+                break
+            other = set(base)
+            other.update(added)
+            candidates &= other
+
+        names = (self.name(number) for number in sorted(candidates))
+        return [name for name in names if query in name.lower()]
+
+    def _dump_body(self):
+        """Возвращает каталог триграмм и их списки номеров.
+
+        Returns:
+            list: Фрагменты данных в байтах.
+        """
+        directory = []
+        postings = array('I')
+        for trigram in sorted(self._directory.keys() | self._delta.keys()):
+            base, added = self._posting(trigram)
+            encoded = trigram.encode('utf-8')
+            directory.append(TRIGRAM_ENTRY.pack(len(encoded), encoded, len(postings),
+                                                len(base) + len(added)))
+            postings.extend(base)
+            postings.extend(added)
+        return [TRIGRAM_COUNTS.pack(len(directory), len(postings)), *directory,
+                postings.tobytes()]
+
+    def _load_body(self, body):
+        """Читает каталог триграмм и отображает их списки номеров.
+
+        Args:
+            body (memoryview): Данные индекса.
+
+        Returns:
+            bool: True.
+
+        Raises:
+            ValueError: Если данные индекса повреждены.
+        """
+        trigram_count, postings_count = TRIGRAM_COUNTS.unpack_from(body)
+        directory_end = TRIGRAM_COUNTS.size + TRIGRAM_ENTRY.size * trigram_count
+        if directory_end + 4 * postings_count != len(body):
+            raise ValueError("Файл индекса поврежден")
+        for length, raw, start, count in TRIGRAM_ENTRY.iter_unpack(
+                body[TRIGRAM_COUNTS.size:directory_end]):
+            self._directory[raw[:length].decode('utf-8')] = (start, count)
+        self._postings = self._map_view(body[directory_end:], 'I')
+        return True
@@ -4,6 +4,10 @@
 """
 
 import argparse
+import json
+import sys
+
+WRITE_CHUNK_SIZE = 10000
 
 def valid_len(length):
     """Проверяет корректность длины пароля для argparse.
@@ -23,6 +27,27 @@ def valid_len(length):
         raise argparse.ArgumentTypeError("Пароль должен быть не более 50 символов")
     return length
 
+def valid_count(count):
+    """Проверяет корректность количества паролей для argparse.
+    
+    Args:
+        count (str): Количество паролей из командной строки.
+    
+    Returns:
+        int: Проверенное количество паролей.
+    
+    Raises:
+        argparse.ArgumentTypeError: Если значение не является целым числом
+                                    или меньше 1.
+    """
+    try:
+        count = int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Количество паролей должно быть целым числом")
+    if count < 1:
+        raise argparse.ArgumentTypeError("Количество паролей должно быть не менее 1")
+    return count
+
 def get_password_strength(password):
     """Оценивает сложность пароля по 5-балльной шкале.
     
@@ -55,4 +80,110 @@ def print_password_information(password):
     
     print(f"Пароль: {password}")
     print(f"Длина пароля: {len(password)}")
-    print(f"Сила пароля: {strength_levels[strength - 1]} ({strength}/5)")
\ No newline at end of file
+    print(f"Сила пароля: {strength_levels[strength - 1]} ({strength}/5)")
+
+def valid_minimum(minimum):
+    """Проверяет корректность минимального количества символов для argparse.
+    
+    Args:
+        minimum (str): Минимальное количество символов из командной строки.
+    
+    Returns:
+        int: Проверенное количество символов.
+    
+    Raises:
+        argparse.ArgumentTypeError: Если значение не является целым числом
+                                    или отрицательно.
+    """
+    try:
+        minimum = int(minimum)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Минимальное количество символов должно быть целым числом")
+    if minimum < 0:
+        raise argparse.ArgumentTypeError("Минимальное количество символов не может быть отрицательным")
+    return minimum
+
+def valid_offset(offset):
+    """Проверяет корректность номера первого пароля для argparse.
+    
+    Args:
+        offset (str): Номер пароля из командной строки.
+    
+    Returns:
+        int: Проверенный номер пароля.
+    
+    Raises:
+        argparse.ArgumentTypeError: Если значение не является целым числом
+                                    или вне диапазона от 0 до 2**64 - 1.
+    """
+    try:
+        offset = int(offset)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Номер пароля должен быть целым числом")
+    if not 0 <= offset < 1 << 64:
+        raise argparse.ArgumentTypeError("Номер пароля должен быть от 0 до 2**64 - 1")
+    return offset
+
+def valid_seconds(seconds):
+    """Проверяет корректность ограничения по времени для argparse.
+    
+    Args:
+        seconds (str): Количество секунд из командной строки.
+    
+    Returns:
+        float: Проверенное количество секунд.
+    
+    Raises:
+        argparse.ArgumentTypeError: Если значение не является числом
+                                    или не положительно.
+    """
+    try:
+        seconds = float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Ограничение по времени должно быть числом")
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError("Ограничение по времени должно быть положительным")
+    return seconds
+
+def write_passwords(passwords, stream=None, output_format='plain'):
+    """Выводит пароли по одному на строку через буферизованную запись.
+    
+    Пароли объединяются в блоки по WRITE_CHUNK_SIZE штук, и каждый блок
+    записывается одним вызовом write, а не отдельным print на пароль.
+    Пароли читаются из итерируемого объекта по мере вывода, поэтому
+    бесконечный поток выводится с постоянным расходом памяти.
+    
+    Args:
+        passwords (iterable): Пароли для вывода.
+        stream: Поток для записи. По умолчанию sys.stdout.
+        output_format (str): Формат строк: 'plain' - пароль как есть,
+                             'jsonl' - JSON-объект с ключом 'password'.
+                             По умолчанию 'plain'.
+    
+    Returns:
+        int: Количество выведенных паролей.
+    
+    Raises:
+        ValueError: Если формат вывода неизвестен.
+    """
+    if output_format not in ('plain', 'jsonl'):
+        raise ValueError(f"Неизвестный формат вывода: {output_format}")
+    if stream is None:
+        stream = sys.stdout
+        
+    written = 0
+    chunk = []
+    for password in passwords:
+        if output_format == 'jsonl':
+            password = json.dumps({'password': password})
+        chunk.append(password)
+        if len(chunk) >= WRITE_CHUNK_SIZE:
+            stream.write('\n'.join(chunk) + '\n')
+            stream.flush()
+            written += len(chunk)
+            chunk = []
+    if chunk:
+        stream.write('\n'.join(chunk) + '\n')
+        written += len(chunk)
+    stream.flush()
+    return written
@@ -0,0 +1,189 @@
+"""Модуль кеша разобранного JSON-файла хранилища.
+
+Разбор большого passwords.json занимает основную часть времени запуска
+CLI. Поэтому разобранные данные сохраняются рядом с хранилищем в файле
+``<файл>.cache``: заголовок CACHE_HEADER, абсолютный путь к хранилищу,
+остальные поля хранилища в JSON и таблица записей, сериализованная
+RecordTable.to_bytes, которая загружается в несколько раз быстрее JSON.
+
+Кеш действителен, если совпадают путь, inode, размер и время изменения
+файла хранилища. Если они отличаются или файл мог измениться в пределах
+точности времени изменения (RACY_WINDOW_NS), сверяется SHA-256
+содержимого. Устаревший кеш перестраивается при следующей загрузке.
+Кеш можно удалить в любой момент: он не содержит данных, которых нет в
+хранилище.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import time
+
+from records import RecordTable
+
+CACHE_SUFFIX = '.cache'
+CACHE_MAGIC = b'PWC1'
+CACHE_VERSION = 2
+# Хранилища меньше этого размера разбираются быстрее, чем читается кеш.
+CACHE_MIN_SIZE = 1 << 16
+# Изменение файла позже записи кеша, но в пределах точности времени
+# изменения, не меняет st_mtime_ns: такой кеш проверяется по содержимому.
+RACY_WINDOW_NS = 2 * 10 ** 9
+# Сигнатура, версия, inode, размер и время изменения хранилища, время
+# записи кеша, SHA-256 содержимого хранилища, длина пути и длина остальных
+# полей хранилища в JSON.
+CACHE_HEADER = struct.Struct('<4sIQQqq32sII')
+
+
+def _file_digest(path):
+    """Вычисляет SHA-256 содержимого файла.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        bytes: Дайджест содержимого.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _load_cache(path, stat):
+    """Загружает данные из кеша, если он соответствует файлу хранилища.
+
+    Если кеш совпал с хранилищем по содержимому, но не по метаданным
+    (например, файл был скопирован), метаданные в заголовке кеша обновляются.
+
+    Args:
+        path (str): Путь к файлу хранилища.
+        stat (os.stat_result): Метаданные файла хранилища.
+
+    Returns:
+        dict: Данные хранилища или None, если кеша нет или он устарел.
+    """
+    cache_path = path + CACHE_SUFFIX
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = f.read()
+        (magic, version, inode, size, mtime_ns, written_ns, digest, path_size,
+         fields_size) = CACHE_HEADER.unpack_from(cache)
+    except (OSError, struct.error):
+        return None
+    fields_start = CACHE_HEADER.size + path_size
+    table_start = fields_start + fields_size
+    if ((magic, version) != (CACHE_MAGIC, CACHE_VERSION)
+            or cache[CACHE_HEADER.size:fields_start] != os.path.abspath(path).encode('utf-8')):
+        return None
+
+    if ((inode, size, mtime_ns) != (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            or stat.st_mtime_ns + RACY_WINDOW_NS >= written_ns):
+        try:
+            if _file_digest(path) != digest:
+                return None
+        except OSError:
+            return None
+        _touch_cache(cache_path, stat, digest, path_size, fields_size)
+
+    try:
+        data = json.loads(cache[fields_start:table_start])
+        data['passwords'] = RecordTable.from_bytes(cache[table_start:])
+    except (ValueError, IndexError, struct.error):
+        return None
+    return data
+
+
+def _header(stat, digest, path_size, fields_size):
+    """Составляет заголовок кеша для текущего состояния файла хранилища.
+
+    Args:
+        stat (os.stat_result): Метаданные файла хранилища.
+        digest (bytes): SHA-256 содержимого хранилища.
+        path_size (int): Длина пути к хранилищу в UTF-8.
+        fields_size (int): Длина остальных полей хранилища в JSON.
+
+    Returns:
+        bytes: Заголовок кеша.
+    """
+    return CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, stat.st_ino, stat.st_size,
+                             stat.st_mtime_ns, time.time_ns(), digest, path_size, fields_size)
+
+
+def _touch_cache(cache_path, stat, digest, path_size, fields_size):
+    """Обновляет метаданные хранилища в заголовке действительного кеша.
+
+    Args:
+        cache_path (str): Путь к файлу кеша.
+        stat (os.stat_result): Метаданные файла хранилища.
+        digest (bytes): SHA-256 содержимого хранилища.
+        path_size (int): Длина пути к хранилищу в UTF-8.
+        fields_size (int): Длина остальных полей хранилища в JSON.
+    """
+    try:
+        with open(cache_path, 'r+b') as f:
+            f.write(_header(stat, digest, path_size, fields_size))
+    except OSError:
+        pass
+
+
+def _write_cache(path, stat, digest, data):
+    """Записывает кеш разобранных данных хранилища.
+
+    Кеш заменяется переименованием временного файла, чтобы другой процесс
+    не прочитал его наполовину записанным. Сброс на диск не нужен: кеш
+    после сбоя будет отвергнут проверкой и построен заново.
+
+    Args:
+        path (str): Путь к файлу хранилища.
+        stat (os.stat_result): Метаданные файла хранилища до чтения.
+        digest (bytes): SHA-256 прочитанного содержимого.
+        data (dict): Данные хранилища с таблицей записей RecordTable.
+    """
+    encoded_path = os.path.abspath(path).encode('utf-8')
+    fields = json.dumps({key: value for key, value in data.items() if key != 'passwords'},
+                        separators=(',', ':')).encode()
+    table = data.get('passwords', RecordTable())
+    cache_path = path + CACHE_SUFFIX
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(_header(stat, digest, len(encoded_path), len(fields)))
+            f.write(encoded_path)
+            f.write(fields)
+            f.write(table.to_bytes())
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def load_json_vault(path):
+    """Загружает JSON-файл хранилища, используя кеш разобранных данных.
+
+    Args:
+        path (str): Путь к файлу хранилища.
+
+    Returns:
+        dict: Данные хранилища с записями в RecordTable или пустой словарь,
+              если файл не существует.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {}
+    if stat.st_size >= CACHE_MIN_SIZE:
+        data = _load_cache(path, stat)
+        if data is not None:
+            return data
+
+    with open(path, 'rb') as f:
+        content = f.read()
+    data = json.loads(content)
+    if 'passwords' in data:
+        data['passwords'] = RecordTable(data['passwords'])
+    if len(content) >= CACHE_MIN_SIZE and len(content) == stat.st_size:
+        _write_cache(path, stat, hashlib.sha256(content).digest(), data)
+    return data
@@ -0,0 +1,258 @@
+"""Модуль двоичного формата файла хранилища паролей.
+
+Файл состоит из заголовка VAULT_HEADER, хеша мастер-пароля, блока записей
+в порядке добавления и таблицы смещений записей, отсортированной по
+названию сервиса. Запись - заголовок VAULT_ENTRY, название сервиса в
+UTF-8 и данные: 32-байтный дайджест хеша пароля и имя пользователя,
+16-байтная соль, дайджест и имя пользователя (для хешей с солью, см.
+модуль kdf) либо, для записей другого вида, запись в компактном JSON.
+Блоки выровнены по 8 байтам.
+
+Файл отображается в память, а записи декодируются только при обращении:
+поиск сервиса - двоичный поиск по таблице смещений, поэтому проверка
+пароля читает одну запись, а не разбирает все хранилище.
+"""
+
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from kdf import join_entry_hash
+from records import DIGEST_SIZE, SALT_SIZE, ZERO_SALT, pack_record
+
+VAULT_MAGIC = b'PWV1'
+VAULT_VERSION = 1
+# Сигнатура, версия, число записей, размер блока записей, длина хеша
+# мастер-пароля в UTF-8 и флаги (VAULT_HAS_MASTER).
+VAULT_HEADER = struct.Struct('<4sIQQII')
+VAULT_HAS_MASTER = 1
+# Вид записи, длина названия сервиса и длина данных записи.
+VAULT_ENTRY = struct.Struct('<BII')
+DIGEST_ENTRY = 0
+JSON_ENTRY = 1
+SALTED_ENTRY = 2
+
+
+def _padding(size):
+    """Возвращает число байтов выравнивания блока по 8 байтам.
+
+    Args:
+        size (int): Размер блока.
+
+    Returns:
+        int: Число байтов выравнивания.
+    """
+    return -size % 8
+
+
+def encode_vault(master_hash, records):
+    """Кодирует данные хранилища в двоичный формат.
+
+    Args:
+        master_hash (str): Хеш мастер-пароля или None.
+        records (iterable): Пары (название сервиса, запись) без повторов.
+
+    Returns:
+        bytes: Содержимое файла хранилища.
+    """
+    chunks = []
+    entries = []
+    size = 0
+    for service, record in records:
+        encoded = service.encode('utf-8')
+        packed = pack_record(record)
+        if packed is not None:
+            username, digest, salt = packed
+            if salt == ZERO_SALT:
+                kind, payload = DIGEST_ENTRY, digest + username.encode('utf-8')
+            else:
+                kind, payload = SALTED_ENTRY, salt + digest + username.encode('utf-8')
+        else:
+            kind = JSON_ENTRY
+            payload = json.dumps(record, separators=(',', ':')).encode()
+        entries.append((encoded, size))
+        chunks.extend((VAULT_ENTRY.pack(kind, len(encoded), len(payload)), encoded, payload))
+        size += VAULT_ENTRY.size + len(encoded) + len(payload)
+
+    entries.sort()
+    offsets = array('Q', (offset for _, offset in entries))
+    master = (master_hash or '').encode('utf-8')
+    flags = VAULT_HAS_MASTER if master_hash is not None else 0
+    header = VAULT_HEADER.pack(VAULT_MAGIC, VAULT_VERSION, len(entries), size, len(master), flags)
+    return b''.join([header, master, bytes(_padding(len(master))), *chunks,
+                     bytes(_padding(size)), offsets.tobytes()])
+
+
+class VaultFile():
+    """Отображенный в память двоичный файл хранилища.
+
+    Отсутствующий файл читается как пустое хранилище.
+
+    Attributes:
+        master_hash (str): Хеш мастер-пароля или None.
+    """
+
+    def __init__(self, path):
+        """Открывает файл хранилища и проверяет его заголовок.
+
+        Args:
+            path (str): Путь к файлу хранилища.
+
+        Raises:
+            ValueError: Если файл поврежден или имеет другой формат.
+        """
+        self.master_hash = None
+        self._map = None
+        self._offsets = ()
+        self._records_start = self._records_end = 0
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except (ValueError, struct.error, UnicodeDecodeError) as e:
+            self.close()
+            raise ValueError(f"Файл хранилища {path} поврежден") from e
+
+    def _parse(self):
+        """Разбирает заголовок и отображает таблицу смещений.
+
+        Raises:
+            ValueError: Если файл поврежден или имеет другой формат.
+        """
+        magic, version, count, records_size, master_size, flags = VAULT_HEADER.unpack_from(self._map)
+        if (magic, version) != (VAULT_MAGIC, VAULT_VERSION):
+            raise ValueError("Неизвестный формат файла")
+        master_end = VAULT_HEADER.size + master_size
+        self._records_start = master_end + _padding(master_size)
+        self._records_end = self._records_start + records_size
+        offsets_start = self._records_end + _padding(records_size)
+        if offsets_start + 8 * count != len(self._map):
+            raise ValueError("Неверный размер файла")
+        if flags & VAULT_HAS_MASTER:
+            self.master_hash = self._map[VAULT_HEADER.size:master_end].decode('utf-8')
+        self._offsets = memoryview(self._map)[offsets_start:].cast('Q')
+
+    def __len__(self):
+        """Возвращает количество записей.
+
+        Returns:
+            int: Количество записей.
+        """
+        return len(self._offsets)
+
+    def _entry(self, offset):
+        """Читает заголовок записи.
+
+        Args:
+            offset (int): Смещение записи в блоке записей.
+
+        Returns:
+            tuple: Вид записи, начало и конец названия сервиса, конец данных.
+        """
+        start = self._records_start + offset
+        kind, service_size, payload_size = VAULT_ENTRY.unpack_from(self._map, start)
+        service_start = start + VAULT_ENTRY.size
+        service_end = service_start + service_size
+        return kind, service_start, service_end, service_end + payload_size
+
+    def _record(self, kind, start, end):
+        """Декодирует данные записи.
+
+        Args:
+            kind (int): Вид записи.
+            start (int): Начало данных записи.
+            end (int): Конец данных записи.
+
+        Returns:
+            dict: Запись сервиса.
+        """
+        if kind == DIGEST_ENTRY:
+            digest_end = start + DIGEST_SIZE
+            return {'username': self._map[digest_end:end].decode('utf-8'),
+                    'password_hash': self._map[start:digest_end].hex()}
+        if kind == SALTED_ENTRY:
+            salt_end = start + SALT_SIZE
+            digest_end = salt_end + DIGEST_SIZE
+            return {'username': self._map[digest_end:end].decode('utf-8'),
+                    'password_hash': join_entry_hash(self._map[start:salt_end],
+                                                     self._map[salt_end:digest_end])}
+        return json.loads(self._map[start:end])
+
+    def get(self, service):
+        """Находит запись сервиса двоичным поиском по таблице смещений.
+
+        Args:
+            service (str): Название сервиса.
+
+        Returns:
+            dict: Запись сервиса или None, если сервис не найден.
+        """
+        encoded = service.encode('utf-8')
+        low, high = 0, len(self._offsets)
+        while low < high:
+            middle = (low + high) // 2
+            kind, start, end, payload_end = self._entry(self._offsets[middle])
+            name = self._map[start:end]
+            if name == encoded:
+                return self._record(kind, end, payload_end)
+            if name < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def __contains__(self, service):
+        """Проверяет наличие сервиса.
+
+        Args:
+            service (str): Название сервиса.
+
+        Returns:
+            bool: True, если сервис есть в файле.
+        """
+        return self.get(service) is not None
+
+    def _entries(self):
+        """Перебирает записи блока записей по порядку.
+
+        Yields:
+            tuple: Вид записи, начало и конец названия сервиса, конец данных.
+        """
+        offset = 0
+        records_size = self._records_end - self._records_start
+        while offset < records_size:
+            entry = self._entry(offset)
+            yield entry
+            offset = entry[3] - self._records_start
+
+    def __iter__(self):
+        """Перебирает названия сервисов в порядке добавления, не декодируя записи.
+
+        Yields:
+            str: Название сервиса.
+        """
+        for _, start, end, _ in self._entries():
+            yield self._map[start:end].decode('utf-8')
+
+    def items(self):
+        """Перебирает записи в порядке добавления.
+
+        Yields:
+            tuple: Название сервиса и его запись.
+        """
+        for kind, start, end, payload_end in self._entries():
+            yield self._map[start:end].decode('utf-8'), self._record(kind, end, payload_end)
+
+    def close(self):
+        """Закрывает отображение файла."""
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._offsets = ()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
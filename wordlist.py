@@ -0,0 +1,168 @@
+"""Модуль работы со списком слов для парольных фраз.
+
+Содержит класс Wordlist, который отображает файл со списком слов в память
+через mmap и использует индекс смещений строк, сохраненный рядом со списком.
+Индекс строится один раз, поэтому последующие запуски не разбирают весь список,
+а выбор слова по номеру выполняется за O(1).
+"""
+
+import mmap
+import os
+import struct
+from array import array
+
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'WLIX'
+INDEX_VERSION = 1
+# Сигнатура, версия, размер и время изменения списка, количество слов.
+INDEX_HEADER = struct.Struct('<4sIQQQ')
+
+
+class Wordlist():
+    """Список слов, отображенный в память.
+
+    Файл содержит по одному слову на строку. Строки в формате Diceware
+    (``11111<TAB>слово``) тоже поддерживаются: словом считается последнее
+    поле строки. Пустые строки пропускаются.
+
+    Attributes:
+        path (str): Путь к файлу со списком слов.
+        index_path (str): Путь к файлу индекса.
+    """
+    def __init__(self, path):
+        """Открывает список слов и загружает или строит индекс.
+
+        Args:
+            path (str): Путь к файлу со списком слов.
+
+        Raises:
+            FileNotFoundError: Если файл со списком слов не существует.
+            ValueError: Если список слов пуст.
+        """
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self._file = open(path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        if stat.st_size == 0:
+            self._file.close()
+            raise ValueError(f"Список слов {path} пуст")
+
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index_map = None
+        self._offsets = self._load_index(stat) or self._build_index(stat)
+        if len(self._offsets) == 0:
+            self.close()
+            raise ValueError(f"Список слов {path} пуст")
+
+    def __len__(self):
+        """Возвращает количество слов в списке.
+
+        Returns:
+            int: Количество слов.
+        """
+        return len(self._offsets) // 2
+
+    def __getitem__(self, number):
+        """Возвращает слово по его номеру.
+
+        Args:
+            number (int): Номер слова от 0 до len(self) - 1.
+
+        Returns:
+            str: Слово.
+        """
+        start = self._offsets[2 * number]
+        end = self._offsets[2 * number + 1]
+        return self._map[start:end].decode('utf-8')
+
+    def __enter__(self):
+        """Возвращает список слов для использования в блоке with."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Закрывает отображения файлов при выходе из блока with."""
+        self.close()
+
+    def close(self):
+        """Закрывает отображения файлов списка и индекса."""
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        self._map.close()
+        self._file.close()
+
+    def _load_index(self, stat):
+        """Загружает индекс из файла, если он соответствует текущему списку.
+
+        Индекс отображается в память и используется без разбора содержимого.
+
+        Args:
+            stat (os.stat_result): Сведения о файле со списком слов.
+
+        Returns:
+            memoryview: Смещения начала и конца слов или None, если индекс
+                        отсутствует или устарел.
+        """
+        try:
+            with open(self.index_path, 'rb') as f:
+                index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(index_map) < INDEX_HEADER.size:
+            index_map.close()
+            return None
+        magic, version, size, mtime, count = INDEX_HEADER.unpack_from(index_map)
+        expected_size = INDEX_HEADER.size + count * 2 * 8
+        if (magic != INDEX_MAGIC or version != INDEX_VERSION or size != stat.st_size
+                or mtime != stat.st_mtime_ns or len(index_map) != expected_size):
+            index_map.close()
+            return None
+
+        self._index_map = index_map
+        return memoryview(index_map)[INDEX_HEADER.size:].cast('Q')
+
+    def _build_index(self, stat):
+        """Строит индекс смещений слов и сохраняет его рядом со списком.
+
+        Если сохранить индекс не удается (например, каталог только для
+        чтения), индекс используется только в текущем процессе.
+
+        Args:
+            stat (os.stat_result): Сведения о файле со списком слов.
+
+        Returns:
+            array: Смещения начала и конца слов.
+        """
+        offsets = array('Q')
+        data = self._map
+        size = len(data)
+        position = 0
+        while position < size:
+            end = data.find(b'\n', position)
+            if end == -1:
+                end = size
+            line_end = end
+            while line_end > position and data[line_end - 1] in b'\r \t':
+                line_end -= 1
+            word_start = max(data.rfind(b'\t', position, line_end),
+                             data.rfind(b' ', position, line_end)) + 1
+            word_start = max(word_start, position)
+            if line_end > word_start:
+                offsets.append(word_start)
+                offsets.append(line_end)
+            position = end + 1
+
+        header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, stat.st_size,
+                                   stat.st_mtime_ns, len(offsets) // 2)
+        temp_path = f'{self.index_path}.{os.getpid()}.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(header)
+                offsets.tofile(f)
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            pass
+        return offsets